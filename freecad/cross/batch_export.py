@@ -0,0 +1,251 @@
+"""Headless batch export of robots and workcells to ROS description packages.
+
+Run with FreeCADCmd, for example:
+
+    FreeCADCmd -c "from freecad.cross.batch_export import main; main(['robots/', '--output-dir', 'ros2_ws/src', '--report', 'report.json'])"
+
+Each document is exported in its own FreeCADCmd process, up to `--jobs`
+processes in parallel. The JSON report contains the per-stage timings of
+each document and object and the errors, the exit code is 1 if any export
+failed.
+
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Optional
+
+import FreeCAD as fc
+
+from . import wb_globals
+from .wb_utils import is_robot
+from .wb_utils import is_workcell
+from .wb_utils import ros_name
+
+# Typing hints.
+DO = fc.DocumentObject
+
+
+def get_documents(paths: list[Path | str]) -> list[Path]:
+    """Return the FreeCAD documents given as files or in directories."""
+    documents: list[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            documents += sorted(path.rglob('*.FCStd'))
+        else:
+            documents.append(path)
+    return documents
+
+
+def _get_exportable_objects(doc: fc.Document) -> list[DO]:
+    return [o for o in doc.Objects if is_robot(o) or is_workcell(o)]
+
+
+def _set_output_path(obj: DO, output_dir: Path) -> None:
+    """Redirect the package of `obj` into `output_dir`."""
+    package_name = Path(obj.OutputPath).name if obj.OutputPath else ''
+    if not package_name:
+        package_name = f'{ros_name(obj)}_description'
+    obj.OutputPath = str((output_dir / package_name).absolute())
+
+
+def export_document(
+        path: Path | str,
+        output_dir: Optional[Path | str] = None,
+) -> dict[str, Any]:
+    """Export all robots and workcells of a document, return the report.
+
+    The document is closed without saving.
+
+    Parameters
+    ----------
+    - path: path to the FreeCAD document.
+    - output_dir: if given, the packages are written into this directory
+                  instead of the `OutputPath` of each object.
+
+    """
+    report: dict[str, Any] = {
+        'document': str(path),
+        'status': 'ok',
+        'stages': {},
+        'objects': [],
+    }
+    t_start = time.perf_counter()
+    try:
+        doc = fc.openDocument(str(path))
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f'Cannot open document: {e}'
+        return report
+    report['stages']['open'] = time.perf_counter() - t_start
+
+    try:
+        t0 = time.perf_counter()
+        doc.recompute()
+        report['stages']['recompute'] = time.perf_counter() - t0
+
+        for obj in _get_exportable_objects(doc):
+            obj_report: dict[str, Any] = {
+                'object': obj.Name,
+                'label': obj.Label,
+                'type': 'robot' if is_robot(obj) else 'workcell',
+                'status': 'ok',
+            }
+            report['objects'].append(obj_report)
+            t0 = time.perf_counter()
+            try:
+                if output_dir is not None:
+                    _set_output_path(obj, Path(output_dir))
+                obj_report['output_path'] = obj.OutputPath
+                xml = obj.Proxy.export_urdf(interactive=False)
+                if xml is None:
+                    obj_report['status'] = 'error'
+                    obj_report['error'] = 'Export failed, see the FreeCAD console output'
+            except Exception as e:
+                obj_report['status'] = 'error'
+                obj_report['error'] = f'{e}\n{traceback.format_exc()}'
+            obj_report['export'] = time.perf_counter() - t0
+            if obj_report['status'] != 'ok':
+                report['status'] = 'error'
+    finally:
+        t0 = time.perf_counter()
+        fc.closeDocument(doc.Name)
+        report['stages']['close'] = time.perf_counter() - t0
+    report['total'] = time.perf_counter() - t_start
+    return report
+
+
+def _export_in_process(
+        freecadcmd: str,
+        path: Path,
+        output_dir: Optional[Path],
+        workspace: Optional[Path],
+) -> dict[str, Any]:
+    """Run `export_document` in a new FreeCADCmd process."""
+    with tempfile.TemporaryDirectory(prefix='cross-batch-') as tmp_dir:
+        report_path = Path(tmp_dir) / 'report.json'
+        args = [str(path), '--single', '--report', str(report_path)]
+        if output_dir is not None:
+            args += ['--output-dir', str(output_dir)]
+        if workspace is not None:
+            args += ['--workspace', str(workspace)]
+        code = f'from freecad.cross.batch_export import main; main({args!r})'
+        t0 = time.perf_counter()
+        process = subprocess.run(
+            [freecadcmd, '-c', code],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            reports = json.loads(report_path.read_text())['documents']
+            report = reports[0]
+        except (OSError, ValueError, KeyError, IndexError):
+            report = {
+                'document': str(path),
+                'status': 'error',
+                'error': f'FreeCADCmd exited with code {process.returncode}',
+            }
+        report['process'] = time.perf_counter() - t0
+        if report['status'] != 'ok':
+            report['output'] = process.stdout + process.stderr
+        return report
+
+
+def _get_default_freecadcmd() -> Optional[str]:
+    for name in ('FreeCADCmd', 'freecadcmd'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point, return the exit code.
+
+    Also exits with this code if not called with an explicit `argv`.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog='batch_export',
+        description='Export robots and workcells of FreeCAD documents to ROS packages',
+    )
+    parser.add_argument(
+        'documents', nargs='+',
+        help='FreeCAD documents or directories searched for *.FCStd',
+    )
+    parser.add_argument(
+        '--output-dir', type=Path,
+        help='Directory for the packages, instead of the OutputPath of each object',
+    )
+    parser.add_argument(
+        '--workspace', type=Path,
+        help='ROS workspace to resolve relative OutputPath, default: $ROS_WORKSPACE',
+    )
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=os.cpu_count() or 1,
+        help='Number of documents exported in parallel',
+    )
+    parser.add_argument(
+        '--freecadcmd', default=_get_default_freecadcmd(),
+        help='FreeCADCmd executable for the parallel exports',
+    )
+    parser.add_argument('--report', type=Path, help='Output JSON report')
+    parser.add_argument(
+        '--single', action='store_true',
+        help='Export in this process, one document after the other',
+    )
+    exit_on_return = argv is None
+    args = parser.parse_args(argv)
+
+    if args.workspace is not None:
+        wb_globals.g_ros_workspace = args.workspace
+    elif (not wb_globals.g_ros_workspace.name) and (args.output_dir is not None):
+        # Avoid asking for the workspace, all paths are absolute.
+        wb_globals.g_ros_workspace = args.output_dir
+
+    if args.output_dir is not None:
+        args.output_dir = args.output_dir.absolute()
+    documents = [d.absolute() for d in get_documents(args.documents)]
+    t0 = time.perf_counter()
+    if args.single or (args.jobs <= 1) or (len(documents) <= 1) or (not args.freecadcmd):
+        reports = [export_document(d, args.output_dir) for d in documents]
+    else:
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            reports = list(executor.map(
+                lambda d: _export_in_process(
+                    args.freecadcmd, d,
+                    args.output_dir, args.workspace,
+                ),
+                documents,
+            ))
+    report = {
+        'documents': reports,
+        'total': time.perf_counter() - t0,
+        'jobs': 1 if args.single else args.jobs,
+    }
+
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    code = 0 if all(r['status'] == 'ok' for r in reports) else 1
+    if exit_on_return:
+        sys.exit(code)
+    return code
+
+
+if __name__ == '__main__':
+    main()
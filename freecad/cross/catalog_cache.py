@@ -0,0 +1,260 @@
+"""Persistent cache of the catalogs of controllers and sensors.
+
+Building the catalog of the controllers (resp. sensors) parses all parameter
+YAML and plugin XML files of the ros2_controllers submodule (resp. the SDF
+files of the sensors and the SDF schema). A `CatalogCache` builds a catalog
+once, stores it pickled on disk, and rebuilds it only when its sources
+change, i.e. when the commit of a git submodule changes (e.g. when switching
+the ROS version of the controllers) or when a source file is added, removed
+or modified.
+
+The source files are checked once per session, the git commits at each
+access. The catalog is returned as a new object at each access, so that the
+callers can modify it. Single entries can be looked up by name or type
+through an index without unpickling the whole catalog.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+import FreeCAD as fc
+
+from .freecad_utils import warn
+
+# An entry of the index as (name, type, entry).
+IndexEntry = Tuple[str, str, Any]
+
+
+def get_default_catalog_cache_dir() -> Path:
+    """Return the default directory of the catalog caches."""
+    if hasattr(fc, 'getUserCachePath'):
+        return Path(fc.getUserCachePath()) / 'cross' / 'catalogs'
+    return Path(fc.getUserAppDataDir()) / 'cross_cache' / 'catalogs'
+
+
+def get_git_head(path: Path) -> Optional[str]:
+    """Return the commit checked out in the repository or submodule at `path`.
+
+    Read the git files directly, which is faster than running git.
+    Return None if `path` is not the root of a git work tree.
+
+    """
+    git_path = path / '.git'
+    try:
+        if git_path.is_file():
+            # Submodule: ".git" contains "gitdir: <path>".
+            gitdir = git_path.read_text().strip().split(':', 1)[1].strip()
+            git_path = (path / gitdir).resolve()
+        head = (git_path / 'HEAD').read_text().strip()
+    except (OSError, IndexError):
+        return None
+    if not head.startswith('ref:'):
+        # Detached head, the usual case of submodules.
+        return head
+    ref = head.split(':', 1)[1].strip()
+    try:
+        return (git_path / ref).read_text().strip()
+    except OSError:
+        pass
+    try:
+        packed_refs = (git_path / 'packed-refs').read_text()
+    except OSError:
+        return None
+    for line in packed_refs.splitlines():
+        if line.endswith(f' {ref}'):
+            return line.split(' ', 1)[0]
+    return None
+
+
+class CatalogCache:
+    """Catalog built once per version of its sources and cached on disk.
+
+    Thread-safe.
+
+    """
+
+    # Increase when the format of the cache file changes.
+    version = 1
+
+    def __init__(
+            self,
+            name: str,
+            build: Callable[[], Any],
+            get_index_entries: Callable[[Any], Iterable[IndexEntry]],
+            source_dirs: list[Path],
+            source_suffixes: tuple[str, ...],
+            builder_version: int = 1,
+            cache_dir: Optional[Path | str] = None,
+    ):
+        """Constructor.
+
+        Parameters
+        ----------
+        - name: name of the cache file.
+        - build: function returning the catalog, must be picklable.
+        - get_index_entries: function returning the entries to index, as
+                             (name, type, entry), from the catalog.
+        - source_dirs: directories of the source files, either roots of git
+                       work trees or not.
+        - source_suffixes: suffixes of the source files, e.g. ('.yaml',).
+        - builder_version: to increase when `build()` changes.
+        - cache_dir: directory of the cache file.
+
+        """
+        self.name = name
+        self.build = build
+        self.get_index_entries = get_index_entries
+        self.source_dirs = [Path(d) for d in source_dirs]
+        self.source_suffixes = source_suffixes
+        self.builder_version = builder_version
+        self.cache_dir = Path(cache_dir) if cache_dir else get_default_catalog_cache_dir()
+        self._lock = threading.RLock()
+        # Fingerprint of the sources when last checked.
+        self._fingerprint: Optional[str] = None
+        self._git_heads: Optional[list[Optional[str]]] = None
+        # Pickled catalog.
+        self._data: Optional[bytes] = None
+        # Pickled entries.
+        self._entries: list[bytes] = []
+        # Name or type -> indices in `self._entries`.
+        self._names: dict[str, list[int]] = {}
+        self._types: dict[str, list[int]] = {}
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / f'{self.name}.pickle'
+
+    def get(self) -> Any:
+        """Return the catalog, a new object at each call."""
+        with self._lock:
+            self._update()
+            return pickle.loads(self._data)
+
+    def find(
+            self,
+            name: Optional[str] = None,
+            type: Optional[str] = None,
+    ) -> list[Any]:
+        """Return the entries with the given name and/or type.
+
+        The entries are new objects at each call.
+
+        """
+        with self._lock:
+            self._update()
+            indices: Optional[set[int]] = None
+            if name is not None:
+                indices = set(self._names.get(name, []))
+            if type is not None:
+                type_indices = set(self._types.get(type, []))
+                indices = type_indices if indices is None else (indices & type_indices)
+            if indices is None:
+                indices = set(range(len(self._entries)))
+            return [pickle.loads(self._entries[i]) for i in sorted(indices)]
+
+    def get_names(self, type: Optional[str] = None) -> list[str]:
+        """Return the names of the entries, in catalog order."""
+        with self._lock:
+            self._update()
+            if type is None:
+                return list(self._names)
+            indices = set(self._types.get(type, []))
+            return [n for n, i in self._names.items() if indices.intersection(i)]
+
+    def invalidate(self) -> None:
+        """Check the sources again at next access."""
+        with self._lock:
+            self._fingerprint = None
+            self._git_heads = None
+
+    def _update(self) -> None:
+        """Load or build the catalog if not up to date."""
+        git_heads = [get_git_head(d) for d in self.source_dirs]
+        if (self._data is not None) and (git_heads == self._git_heads):
+            return
+        fingerprint = self._get_fingerprint(git_heads)
+        if (self._data is not None) and (fingerprint == self._fingerprint):
+            self._git_heads = git_heads
+            return
+        if not self._load(fingerprint):
+            self._build(fingerprint)
+        self._fingerprint = fingerprint
+        self._git_heads = git_heads
+
+    def _get_fingerprint(self, git_heads: list[Optional[str]]) -> str:
+        """Return a hash of the versions, git commits, and source files."""
+        fingerprint = hashlib.sha256()
+        fingerprint.update(f'{self.version} {self.builder_version}'.encode())
+        for source_dir, git_head in zip(self.source_dirs, git_heads):
+            fingerprint.update(f'\0{source_dir}\0{git_head}'.encode())
+            for root, dirs, files in os.walk(source_dir):
+                dirs[:] = sorted(d for d in dirs if d != '.git')
+                for filename in sorted(files):
+                    if not filename.endswith(self.source_suffixes):
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    fingerprint.update(
+                        f'\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode(),
+                    )
+        return fingerprint.hexdigest()
+
+    def _load(self, fingerprint: str) -> bool:
+        """Load the cache file, return False if missing or outdated."""
+        try:
+            with open(self.path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # Missing or corrupted file, or from an incompatible version.
+            return False
+        if (
+                (not isinstance(cached, dict))
+                or (cached.get('version') != self.version)
+                or (cached.get('fingerprint') != fingerprint)
+        ):
+            return False
+        self._data = cached['data']
+        self._entries = cached['entries']
+        self._names = cached['names']
+        self._types = cached['types']
+        return True
+
+    def _build(self, fingerprint: str) -> None:
+        """Build the catalog and its index and save them."""
+        catalog = self.build()
+        self._data = pickle.dumps(catalog, pickle.HIGHEST_PROTOCOL)
+        self._entries = []
+        self._names = {}
+        self._types = {}
+        for name, type_, entry in self.get_index_entries(catalog):
+            self._names.setdefault(name, []).append(len(self._entries))
+            self._types.setdefault(type_, []).append(len(self._entries))
+            self._entries.append(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        cached = {
+            'version': self.version,
+            'fingerprint': fingerprint,
+            'data': self._data,
+            'entries': self._entries,
+            'names': self._names,
+            'types': self._types,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write-and-rename to never expose partial files to other
+            # FreeCAD instances.
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            warn(f'Cannot write the cache of the {self.name} catalog: {e}')
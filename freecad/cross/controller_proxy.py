@@ -20,6 +20,7 @@ import FreeCAD as fc
 
 from PySide.QtWidgets import QMenu  # FreeCAD's PySide
 
+from .catalog_cache import CatalogCache
 from .freecad_utils import ProxyBase
 from .freecad_utils import add_property
 from .freecad_utils import error
@@ -172,15 +173,14 @@ class _ViewProviderController(ProxyBase):
 
             attr = getattr(obj, prop)
 
-            controllers = get_controllers_data()
-            controllers_merged = {}
-            controllers_merged.update(controllers['controllers'])
-            controllers_merged.update(controllers['broadcasters'])
+            controller_data = get_controller_data(ros_name(obj))
+            if controller_data is None:
+                raise KeyError(ros_name(obj))
 
             parameters_flatten_filtered = {}
-            for param_flatten in controllers_merged[ros_name(obj)]['parameters_flatten']:
+            for param_flatten in controller_data['parameters_flatten']:
                 if param_flatten in mapped_params_templates_filtered.keys():
-                    parameters_flatten_filtered[param_flatten] = controllers_merged[ros_name(obj)]['parameters_flatten'][param_flatten]
+                    parameters_flatten_filtered[param_flatten] = controller_data['parameters_flatten'][param_flatten]
 
 
             for el in attr:
@@ -197,8 +197,8 @@ class _ViewProviderController(ProxyBase):
                             attr_not_exist_trigger = getattr(obj, mapped_prop_name)
                         except AttributeError:
                             parameters = unflatten_params(deepcopy(parameters_flatten_filtered), param_to_replace, el)
-                            controllers_merged[ros_name(obj)]['parameters'] = parameters
-                            obj = add_controller_properties_block(obj, controllers_merged[ros_name(obj)])
+                            controller_data['parameters'] = parameters
+                            obj = add_controller_properties_block(obj, controller_data)
                             t = obj
 
 
@@ -379,13 +379,13 @@ class _ViewProviderController(ProxyBase):
         pass
 
 
-def make_broadcaster(controller_data: dict, doc: Optional[fc.Document] = None) -> CrossController | None:
+def make_broadcaster(controller_data: dict, doc: Optional[fc.Document] = None, recompute_after: bool = True) -> CrossController | None:
     dynamicType = ControllerProxy.BroadcasterType
 
-    return make_controller(controller_data, dynamicType, doc)
+    return make_controller(controller_data, dynamicType, doc, recompute_after)
 
 
-def make_controller(controller_data: dict, dynamicType = None, doc: Optional[fc.Document] = None) -> CrossController | None:
+def make_controller(controller_data: dict, dynamicType = None, doc: Optional[fc.Document] = None, recompute_after: bool = True) -> CrossController | None:
     """Add a Cross::Controller to the current document."""
 
     if doc is None:
@@ -420,7 +420,8 @@ def make_controller(controller_data: dict, dynamicType = None, doc: Optional[fc.
         doc.recompute()
         return None
 
-    doc.recompute()
+    if recompute_after:
+        doc.recompute()
     return controller
 
 
@@ -564,7 +565,45 @@ def add_controller_properties(
 
 
 def get_controllers_data(ROS2_CONTROLLERS_PATH: Path = ROS2_CONTROLLERS_PATH) -> dict :
-    ''' Get controllers data. '''
+    ''' Get controllers data.
+
+    The data of the default ros2_controllers submodule comes from the catalog
+    cache, rebuilt only when the submodule changes. The returned dict is a new
+    object at each call and can be modified.
+    '''
+
+    if Path(ROS2_CONTROLLERS_PATH) != _controllers_catalog.source_dirs[0]:
+        return build_controllers_data(ROS2_CONTROLLERS_PATH)
+    return _controllers_catalog.get()
+
+
+def find_controllers(name: str | None = None, type: str | None = None) -> list[dict] :
+    ''' Return the data of the controllers and broadcasters by name and/or type.
+
+    `type` is 'controller' or 'broadcaster'. Faster than `get_controllers_data()`
+    because only the found controllers are deserialized.
+    '''
+
+    return _controllers_catalog.find(name, type)
+
+
+def get_controller_data(name: str) -> dict | None :
+    ''' Return the data of a controller or broadcaster by name or None. '''
+
+    controllers = find_controllers(name)
+    # A broadcaster takes precedence over a controller with the same name.
+    return controllers[-1] if controllers else None
+
+
+def _get_controllers_index_entries(controllers: dict) -> Iterable[tuple[str, str, dict]] :
+    for name, controller in controllers['controllers'].items():
+        yield name, 'controller', controller
+    for name, broadcaster in controllers['broadcasters'].items():
+        yield name, 'broadcaster', broadcaster
+
+
+def build_controllers_data(ROS2_CONTROLLERS_PATH: Path = ROS2_CONTROLLERS_PATH) -> dict :
+    ''' Build controllers data by parsing the ros2_controllers sources. '''
 
     def collect_controllers_parameters(controllers: dict) -> dict :
         ''' Adding to controllers their collected parameters. '''
@@ -684,6 +723,17 @@ If base_frame_id is the direct parent of wheels the base_frame_id should not hav
     return controllers
 
 
+# Increase `builder_version` when `build_controllers_data()` changes.
+_controllers_catalog = CatalogCache(
+    'controllers',
+    build_controllers_data,
+    _get_controllers_index_entries,
+    [ROS2_CONTROLLERS_PATH],
+    ('.yaml', '.xml'),
+    builder_version=1,
+)
+
+
 def filter_controllers_dirs(controllers: dict):
     """Filter controllers directories for that not coded parsing yet"""
 
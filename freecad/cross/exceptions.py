@@ -5,3 +5,6 @@ class NoPartWrapperOfObject(Exception):
 
 class CallRecursion(Exception):
     pass
+
+class MeshReadError(Exception):
+    pass
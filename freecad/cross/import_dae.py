@@ -19,6 +19,8 @@
 #*                                                                         *
 #***************************************************************************
 
+import builtins
+
 import FreeCAD, Mesh, os, numpy, MeshPart, Arch, Draft
 
 from .freecad_utils import error
@@ -49,6 +51,9 @@ try:
 except NameError:
     pass
 
+collada = None
+
+
 def checkCollada():
 
     "checks if collada if available"
@@ -137,72 +142,114 @@ def read(filename):
 
     "reads a DAE file"
 
-    if not checkCollada():
-        return
+    meshes = read_meshes(filename)
+    if meshes is None:
+        return False
+    for triangles,color in meshes:
+        obj = FreeCAD.ActiveDocument.addObject("Mesh::Feature","Mesh")
+        obj.Mesh = mesh_from_triangles(triangles)
+        if color and FreeCAD.GuiUp:
+            obj.ViewObject.ShapeColor = color
+
 
-    global col
+def read_meshes(filename):
+
+    """read_meshes(filename) -- returns the triangles of a DAE file without creating objects.
+    Same as parse_meshes() but returns None and reports the error if the file cannot be
+    read. Uses the console, must be called from the main thread."""
+
+    if not checkCollada():
+        return None
     try:
-        col = collada.Collada(
-            filename,
-            ignore=[
-                collada.common.DaeUnsupportedError,
-                collada.common.DaeBrokenRefError,
-                collada.common.DaeMalformedError,
-            ],
-        )
+        return parse_meshes(filename)
     except Exception as e:
         error("Parse error: " + str(e) + '. File: ' + filename)
-        return False
+        return None
+
+
+def parse_meshes(filename):
+
+    """parse_meshes(filename) -- returns the triangles of a DAE file without creating objects.
+    Returns a list of (triangles,color) with one element per geometry primitive, where
+    triangles is a (n,3,3) numpy array of vertex coordinates in mm and color the diffuse
+    color of the bound material or None. Raises an exception if pycollada is missing or
+    the file cannot be read.
+    The index and vertex arrays of pycollada are used directly, no Python loop runs per
+    triangle. Neither FreeCAD nor module state is used, so that several files can be
+    parsed at once from worker threads."""
+
+    import collada
+    col = collada.Collada(
+        filename,
+        ignore=[
+            collada.common.DaeUnsupportedError,
+            collada.common.DaeBrokenRefError,
+            collada.common.DaeMalformedError,
+        ],
+    )
 
     # Read the unitmeter info from dae file and compute unit to convert to mm
     unitmeter = col.assetInfo.unitmeter or 1
     unit = unitmeter / 0.001
-    #for geom in col.geometries:
-    #for geom in col.scene.objects('geometry'):
+    meshes = []
     for node in col.scene.nodes:
-        if list(node.objects("geometry")):
-            color = None
-            # retrieving material
-            if "}" in node.xmlnode.tag:
-                bt = node.xmlnode.tag.split("}")[0]+"}"
-                gnode = node.xmlnode.find(bt+"instance_geometry")
-                if gnode is not None:
-                    bnode = gnode.find(bt+"bind_material")
-                    if bnode is not None:
-                        tnode = bnode.find(bt+"technique_common")
-                        if tnode is not None:
-                            mnode = tnode.find(bt+"instance_material")
-                            if mnode is not None:
-                                if "target" in mnode.keys():
-                                    mname = mnode.get("target").strip("#")
-                                    for m in col.materials:
-                                        if m.id == mname:
-                                            e = m.effect
-                                            if isinstance(e.diffuse,tuple):
-                                                color = e.diffuse
-            for geom in node.objects("geometry"):
-                for prim in geom.primitives():
-                    #print(prim, dir(prim))
-                    meshdata = []
-                    if hasattr(prim,"triangles"):
-                        tset = prim.triangles()
-                    elif hasattr(prim,"triangleset"):
-                        tset = prim.triangleset()
-                    else:
-                        tset = []
-                    for tri in tset:
-                        face = []
-                        for v in tri.vertices:
-                            v = [x * unit for x in v]
-                            face.append([v[0],v[1],v[2]])
-                        meshdata.append(face)
-                    #print(meshdata)
-                    newmesh = Mesh.Mesh(meshdata)
-                    #print(newmesh)
-                    obj = FreeCAD.ActiveDocument.addObject("Mesh::Feature","Mesh")
-                    obj.Mesh = newmesh
-                    if color and FreeCAD.GuiUp:
-                        obj.ViewObject.ShapeColor = color
+        if not list(node.objects("geometry")):
+            continue
+        color = _get_node_color(col,node)
+        for geom in node.objects("geometry"):
+            for prim in geom.primitives():
+                if hasattr(prim,"triangles"):
+                    tset = prim
+                elif hasattr(prim,"triangleset"):
+                    tset = prim.triangleset()
+                else:
+                    continue
+                vertex = getattr(tset,"vertex",None)
+                vertex_index = getattr(tset,"vertex_index",None)
+                if (vertex is None) or (vertex_index is None) or (len(vertex_index) == 0):
+                    continue
+                # (n,3) indices into the (m,3) vertices give the (n,3,3) triangles.
+                vertex = numpy.asarray(vertex,dtype=numpy.float64) * unit
+                vertex_index = numpy.asarray(vertex_index,dtype=numpy.int64).reshape(-1,3)
+                meshes.append((vertex[vertex_index],color))
+    return meshes
+
+
+def mesh_from_triangles(triangles):
+
+    """mesh_from_triangles(triangles) -- returns a Mesh.Mesh from a (n,3,3) array of vertex coordinates.
+    The facets are added in one call."""
+
+    return Mesh.Mesh(numpy.asarray(triangles,dtype=numpy.float64).reshape(-1,3).tolist())
+
+
+def _get_node_color(col,node):
+
+    "returns the diffuse color of the material bound to the geometry of a node or None"
+
+    if "}" not in node.xmlnode.tag:
+        return None
+    bt = node.xmlnode.tag.split("}")[0]+"}"
+    gnode = node.xmlnode.find(bt+"instance_geometry")
+    if gnode is None:
+        return None
+    bnode = gnode.find(bt+"bind_material")
+    if bnode is None:
+        return None
+    tnode = bnode.find(bt+"technique_common")
+    if tnode is None:
+        return None
+    mnode = tnode.find(bt+"instance_material")
+    if (mnode is None) or ("target" not in mnode.keys()):
+        return None
+    mname = mnode.get("target").strip("#")
+    color = None
+    for m in col.materials:
+        if m.id == mname:
+            e = m.effect
+            if isinstance(e.diffuse,tuple):
+                color = e.diffuse
+    return color
 
 
 def export(exportList,filename,tessellation=1,colors=None):
@@ -213,40 +260,44 @@ def export(exportList,filename,tessellation=1,colors=None):
     curved surfaces into triangles."""
 
     if not checkCollada(): return
+    write(get_export_data(exportList,tessellation,colors),filename)
+    FreeCAD.Console.PrintMessage(translate('Arch', f'File {filename} successfully created.\n'))
+
+
+def get_export_data(exportList,tessellation=1,colors=None):
+
+    """get_export_data(exportList,tessellation=1,colors=None) -- returns the data to write with write().
+    Triangulates the shapes and gathers the vertices, normals, faces and materials of the
+    FreeCAD objects into plain Python and numpy objects. Must be called from the main thread,
+    see export() for the parameters."""
+
     p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch")
     scale = p.GetFloat("ColladaScalingFactor",1.0)
     scale = scale * 0.001 # from millimeters (FreeCAD) to meters (Collada)
     p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/View")
     c = p.GetUnsigned("DefaultShapeColor",4294967295)
     defaultcolor = (float((c>>24)&0xFF)/255.0,float((c>>16)&0xFF)/255.0,float((c>>8)&0xFF)/255.0)
-    colmesh = collada.Collada()
-    colmesh.assetInfo.upaxis = collada.asset.UP_AXIS.Z_UP
     # authoring info
-    cont = collada.asset.Contributor()
     try:
         author = FreeCAD.ActiveDocument.CreatedBy
     except UnicodeEncodeError:
         author = FreeCAD.ActiveDocument.CreatedBy.encode("utf8")
     author = author.replace("<","")
     author = author.replace(">","")
-    cont.author = author
     ver = FreeCAD.Version()
     appli = "FreeCAD v" + ver[0] + "." + ver[1] + " build" + ver[2] + "\n"
-    cont.authoring_tool = appli
-    #print(author, appli)
-    colmesh.assetInfo.contributors.append(cont)
-    colmesh.assetInfo.unitname = "meter"
-    colmesh.assetInfo.unitmeter = 1.0
-    defaultmat = None
-    objind = 0
-    scenenodes = []
+    data = {
+        "author": author,
+        "authoring_tool": appli,
+        "defaultcolor": defaultcolor,
+        "objects": [],
+    }
     objectslist = Draft.get_group_contents(
         exportList, walls=True,
         addgroups=True,
     )
     objectslist = Arch.pruneIncluded(objectslist)
     for obj in objectslist:
-        findex = numpy.array([])
         m = None
         if obj.isDerivedFrom("Part::Feature"):
             print("exporting object ",obj.Name, obj.Shape)
@@ -264,47 +315,24 @@ def export(exportList,filename,tessellation=1,colors=None):
             continue
         if m:
             Topology = m.Topology
-            Facets = m.Facets
-
-            # vertex indices
-            vindex = numpy.empty(len(Topology[0]) * 3)
-            for i in range(len(Topology[0])):
-                v = Topology[0][i]
-                vindex[list(range(i*3, i*3+3))] = (v.x*scale,v.y*scale,v.z*scale)
-
-            # normals
-            nindex = numpy.empty(len(Facets) * 3)
-            for i in range(len(Facets)):
-                n = Facets[i].Normal
-                nindex[list(range(i*3, i*3+3))] = (n.x,n.y,n.z)
-
-            # face indices
-            findex = numpy.empty(len(Topology[1]) * 6, numpy.int64)
-            for i in range(len(Topology[1])):
-                f = Topology[1][i]
-                findex[list(range(i*6, i*6+6))] = (f[0],i,f[1],i,f[2],i)
-
-        print(len(vindex), " vert indices, ", len(nindex), " norm indices, ", len(findex), " face indices.")
-        vert_src = collada.source.FloatSource("cubeverts-array"+str(objind), vindex, ('X', 'Y', 'Z'))
-        normal_src = collada.source.FloatSource("cubenormals-array"+str(objind), nindex, ('X', 'Y', 'Z'))
-        geom = collada.geometry.Geometry(colmesh, "geometry"+str(objind), obj.Name, [vert_src, normal_src])
-        input_list = collada.source.InputList()
-        input_list.addInput(0, 'VERTEX', "#cubeverts-array"+str(objind))
-        input_list.addInput(1, 'NORMAL', "#cubenormals-array"+str(objind))
-        matnode = None
-        matref = "materialref"
+            vertices = numpy.array([tuple(v) for v in Topology[0]], dtype=numpy.float64).reshape(-1, 3) * scale
+            normals = numpy.array([tuple(f.Normal) for f in m.Facets], dtype=numpy.float64).reshape(-1, 3)
+            faces = numpy.array(Topology[1], dtype=numpy.int64).reshape(-1, 3)
+        else:
+            vertices = numpy.empty((0, 3))
+            normals = numpy.empty((0, 3))
+            faces = numpy.empty((0, 3), numpy.int64)
+        print(vertices.size, " vert indices, ", normals.size, " norm indices, ", faces.size * 2, " face indices.")
+        # (effect id, material id, material name, material reference, diffuse color)
+        # or None for the default material.
+        material = None
         if hasattr(obj,"Material"):
             if obj.Material:
                 if hasattr(obj.Material,"Material"):
                     if "DiffuseColor" in obj.Material.Material:
                         kd = tuple([float(k) for k in obj.Material.Material["DiffuseColor"].strip("()").split(",")])
-                        effect = collada.material.Effect("effect_"+obj.Material.Name, [], "phong", diffuse=kd, specular=(1,1,1))
-                        mat = collada.material.Material("mat_"+obj.Material.Name, obj.Material.Name, effect)
-                        colmesh.effects.append(effect)
-                        colmesh.materials.append(mat)
-                        matref = "ref_"+obj.Material.Name
-                        matnode = collada.scene.MaterialNode(matref, mat, inputs=[])
-        if not matnode:
+                        material = ("effect_"+obj.Material.Name, "mat_"+obj.Material.Name, obj.Material.Name, "ref_"+obj.Material.Name, kd)
+        if not material:
             if colors:
                 if obj.Name in colors:
                     color = colors[obj.Name]
@@ -313,38 +341,233 @@ def export(exportList,filename,tessellation=1,colors=None):
                             # this is a diffusecolor. For now, use the first color - #TODO: Support per-face colors
                             color = color[0]
                         #print("found color for obj",obj.Name,":",color)
-                        kd = color[:3]
-                        effect = collada.material.Effect("effect_"+obj.Name, [], "phong", diffuse=kd, specular=(1,1,1))
-                        mat = collada.material.Material("mat_"+obj.Name, obj.Name, effect)
-                        colmesh.effects.append(effect)
-                        colmesh.materials.append(mat)
-                        matref = "ref_"+obj.Name
-                        matnode = collada.scene.MaterialNode(matref, mat, inputs=[])
+                        kd = tuple(color[:3])
+                        material = ("effect_"+obj.Name, "mat_"+obj.Name, obj.Name, "ref_"+obj.Name, kd)
             elif FreeCAD.GuiUp:
                 if hasattr(obj.ViewObject,"ShapeColor"):
-                    kd = obj.ViewObject.ShapeColor[:3]
-                    effect = collada.material.Effect("effect_"+obj.Name, [], "phong", diffuse=kd, specular=(1,1,1))
-                    mat = collada.material.Material("mat_"+obj.Name, obj.Name, effect)
-                    colmesh.effects.append(effect)
-                    colmesh.materials.append(mat)
-                    matref = "ref_"+obj.Name
-                    matnode = collada.scene.MaterialNode(matref, mat, inputs=[])
+                    kd = tuple(obj.ViewObject.ShapeColor[:3])
+                    material = ("effect_"+obj.Name, "mat_"+obj.Name, obj.Name, "ref_"+obj.Name, kd)
+        data["objects"].append({
+            "name": obj.Name,
+            "vertices": vertices,
+            "normals": normals,
+            "faces": faces,
+            "material": material,
+        })
+    return data
+
+
+def write(data,filename):
+
+    """write(data,filename) -- writes the data returned by get_export_data() to a DAE file.
+    Doesn't use FreeCAD and can thus be called from a worker thread.
+    The document is built by pycollada with empty arrays, the arrays are then formatted
+    as text by format_floats() and format_ints(), which are several times faster than
+    pycollada's formatting (that also formats each float array twice)."""
+
+    if collada is None and not checkCollada(): return
+    from collada.common import tag
+    from collada.xmlutil import writeXML
+    colmesh = collada.Collada()
+    colmesh.assetInfo.upaxis = collada.asset.UP_AXIS.Z_UP
+    # authoring info
+    cont = collada.asset.Contributor()
+    cont.author = data["author"]
+    cont.authoring_tool = data["authoring_tool"]
+    colmesh.assetInfo.contributors.append(cont)
+    colmesh.assetInfo.unitname = "meter"
+    colmesh.assetInfo.unitmeter = 1.0
+    defaultmat = None
+    scenenodes = []
+    # (source,values) and (triangle set,indices) to fill after colmesh.save().
+    sources = []
+    trisets = []
+    for objind, objdata in enumerate(data["objects"]):
+        # vertex indices
+        vindex = objdata["vertices"].ravel()
+        # normals
+        nindex = objdata["normals"].ravel()
+        # face indices, interleaved with the normal index of each face
+        faces = objdata["faces"]
+        findex = numpy.empty((len(faces), 6), numpy.int64)
+        findex[:, 0::2] = faces
+        findex[:, 1::2] = numpy.arange(len(faces))[:, numpy.newaxis]
+
+        vert_src = collada.source.FloatSource("cubeverts-array"+str(objind), numpy.empty(0), ('X', 'Y', 'Z'))
+        normal_src = collada.source.FloatSource("cubenormals-array"+str(objind), numpy.empty(0), ('X', 'Y', 'Z'))
+        sources += [(vert_src, vindex), (normal_src, nindex)]
+        geom = collada.geometry.Geometry(colmesh, "geometry"+str(objind), objdata["name"], [vert_src, normal_src])
+        input_list = collada.source.InputList()
+        input_list.addInput(0, 'VERTEX', "#cubeverts-array"+str(objind))
+        input_list.addInput(1, 'NORMAL', "#cubenormals-array"+str(objind))
+        matnode = None
+        matref = "materialref"
+        if objdata["material"]:
+            effect_id, mat_id, mat_name, matref, kd = objdata["material"]
+            effect = collada.material.Effect(effect_id, [], "phong", diffuse=kd, specular=(1,1,1))
+            mat = collada.material.Material(mat_id, mat_name, effect)
+            colmesh.effects.append(effect)
+            colmesh.materials.append(mat)
+            matnode = collada.scene.MaterialNode(matref, mat, inputs=[])
         if not matnode:
             if not defaultmat:
-                effect = collada.material.Effect("effect_default", [], "phong", diffuse=defaultcolor, specular=(1,1,1))
+                effect = collada.material.Effect("effect_default", [], "phong", diffuse=data["defaultcolor"], specular=(1,1,1))
                 defaultmat = collada.material.Material("mat_default", "default_material", effect)
                 colmesh.effects.append(effect)
                 colmesh.materials.append(defaultmat)
             matnode = collada.scene.MaterialNode(matref, defaultmat, inputs=[])
-        triset = geom.createTriangleSet(findex, input_list, matref)
+        triset = geom.createTriangleSet(numpy.empty(0, numpy.int64), input_list, matref)
+        trisets.append((triset, findex))
         geom.primitives.append(triset)
         colmesh.geometries.append(geom)
         geomnode = collada.scene.GeometryNode(geom, [matnode])
         node = collada.scene.Node("node"+str(objind), children=[geomnode])
         scenenodes.append(node)
-        objind += 1
     myscene = collada.scene.Scene('myscene', scenenodes)
     colmesh.scenes.append(myscene)
     colmesh.scene = myscene
-    colmesh.write(filename)
-    FreeCAD.Console.PrintMessage(translate('Arch', f'File {filename} successfully created.\n'))
+    colmesh.save()
+    for src, values in sources:
+        arraynode = src.xmlnode.find(tag('float_array'))
+        arraynode.text = format_floats(values)
+        arraynode.set('count', str(len(values)))
+        accessor = src.xmlnode.find(tag('technique_common')+'/'+tag('accessor'))
+        accessor.set('count', str(len(values) // 3))
+    for triset, findex in trisets:
+        triset.xmlnode.set('count', str(len(findex)))
+        triset.xmlnode.find(tag('p')).text = format_ints(findex)
+    # Not colmesh.write(), which would save the empty arrays again.
+    with builtins.open(filename, 'wb') as f:
+        writeXML(colmesh.xmlnode, f)
+
+
+_DIGITS = numpy.frombuffer(b"0123456789", numpy.uint8)
+
+
+def format_ints(values):
+
+    """format_ints(values) -- returns the integers separated by spaces.
+    Same as " ".join(map(str,values)), vectorized: the characters of all numbers are
+    built column by column in a (columns,numbers) array."""
+
+    values = numpy.asarray(values, numpy.int64).ravel()
+    n = len(values)
+    if n == 0:
+        return ""
+    magnitudes = numpy.abs(values)
+    width = len(str(int(magnitudes.max())))
+    # sign, digits, separator
+    chars = numpy.empty((width + 2, n), numpy.uint8)
+    valid = numpy.empty((width + 2, n), bool)
+    chars[0] = ord("-")
+    numpy.less(values, 0, out=valid[0])
+    rest = magnitudes
+    for i in range(width, 0, -1):
+        chars[i] = _DIGITS[rest % 10]
+        rest = rest // 10
+        if i == width:
+            valid[i] = True
+        else:
+            # leading zeros are skipped
+            numpy.greater_equal(magnitudes, 10 ** (width - i), out=valid[i])
+    return _join_columns(chars, valid)
+
+
+def format_floats(values):
+
+    """format_floats(values) -- returns the floats separated by spaces.
+    Same as " ".join("%.7g" % v for v in values) as written by pycollada, vectorized
+    as format_ints(). The 7 significant digits are rounded in floating point, so that
+    the last digit may rarely differ by one from the correctly rounded one."""
+
+    values = numpy.asarray(values, numpy.float64).ravel()
+    n = len(values)
+    if n == 0:
+        return ""
+    if not numpy.all(numpy.isfinite(values)):
+        return " ".join("%.7g" % v for v in values.tolist())
+    magnitudes = numpy.abs(values)
+    zero = magnitudes == 0.0
+    exponents = numpy.floor(numpy.log10(numpy.where(zero, 1.0, magnitudes))).astype(numpy.int64)
+    mantissas = _get_mantissas(magnitudes, exponents)
+    # log10() may be off by one near the powers of 10 and rounding may carry.
+    wrong = (mantissas >= 10000000) | ((mantissas < 1000000) & ~zero)
+    if wrong.any():
+        exponents[wrong] += numpy.where(mantissas[wrong] >= 10000000, 1, -1)
+        mantissas[wrong] = _get_mantissas(magnitudes[wrong], exponents[wrong])
+        carry = mantissas >= 10000000
+        mantissas[carry] //= 10
+        exponents[carry] += 1
+    exponents[zero] = 0
+    # the 7 digits, most significant first, and their count without trailing zeros
+    digits = numpy.empty((7, n), numpy.int64)
+    lengths = numpy.zeros(n, numpy.int64)
+    rest = mantissas
+    for i in range(6, -1, -1):
+        digits[i] = rest % 10
+        rest = rest // 10
+        lengths[(lengths == 0) & (digits[i] != 0)] = i + 1
+    lengths[lengths == 0] = 1
+    fixed = (exponents >= -4) & (exponents < 7)
+    small = fixed & (exponents < 0)
+    large = fixed & (exponents >= 0)
+    scientific = ~fixed
+    # sign, "0.000" of small numbers, 7 digits each followed by an optional ".",
+    # exponent, separator
+    chars = numpy.empty((25, n), numpy.uint8)
+    valid = numpy.zeros((25, n), bool)
+    chars[0] = ord("-")
+    numpy.signbit(values, out=valid[0])
+    chars[1:6] = numpy.frombuffer(b"0.000", numpy.uint8)[:, numpy.newaxis]
+    valid[1] = small
+    valid[2] = small
+    for i in range(3):
+        numpy.logical_and(small, exponents < -1 - i, out=valid[3 + i])
+    for i in range(7):
+        row = 6 + 2 * i
+        chars[row] = _DIGITS[digits[i]]
+        valid[row] = (lengths > i) | (large & (exponents >= i))
+        if i < 6:
+            chars[row + 1] = ord(".")
+            dot = large & (exponents == i)
+            if i == 0:
+                dot |= scientific
+            valid[row + 1] = dot & (lengths > i + 1)
+    if scientific.any():
+        abs_exponents = numpy.abs(exponents)
+        chars[19] = ord("e")
+        valid[19] = scientific
+        chars[20] = numpy.where(exponents < 0, ord("-"), ord("+"))
+        valid[20] = scientific
+        chars[21] = _DIGITS[abs_exponents // 100 % 10]
+        valid[21] = scientific & (abs_exponents >= 100)
+        chars[22] = _DIGITS[abs_exponents // 10 % 10]
+        valid[22] = scientific
+        chars[23] = _DIGITS[abs_exponents % 10]
+        valid[23] = scientific
+    return _join_columns(chars, valid)
+
+
+def _get_mantissas(magnitudes, exponents):
+
+    "returns the 7 significant digits of the magnitudes as rounded integers"
+
+    shift = 6 - exponents
+    # powers of 10 are exact up to 1e22, so multiply or divide by them
+    scaled = numpy.where(
+        shift >= 0,
+        magnitudes * 10.0 ** numpy.maximum(shift, 0),
+        magnitudes / 10.0 ** numpy.maximum(-shift, 0),
+    )
+    return numpy.rint(scaled).astype(numpy.int64)
+
+
+def _join_columns(chars, valid):
+
+    """returns the valid characters of chars, number by number, separated by spaces.
+    chars and valid have the shape (columns,numbers), the last column is the separator."""
+
+    chars[-1] = ord(" ")
+    valid[-1] = True
+    valid[-1, -1] = False
+    return chars.T[valid.T].tobytes().decode("ascii")
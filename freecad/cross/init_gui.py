@@ -1,59 +1,70 @@
 
+from importlib import import_module
+
 import FreeCADGui as fcgui
 
-from .ui import command_assembly_from_urdf  # noqa: F401
-from .ui import command_box_from_bounding_box  # noqa: F401
-from .ui import command_calculate_mass_and_inertia  # noqa: F401
-from .ui import command_duplicate_robot # noqa: F401
-from .ui import command_get_planning_scene  # noqa: F401
-from .ui import command_kk_edit  # noqa: F401
-from .ui import command_new_attached_collision_object  # noqa: F401
-from .ui import command_new_joint # noqa: F401
-from .ui import command_new_joints_filled # noqa: F401
-from .ui import command_new_joints_filled_spider_connect # noqa: F401
-from .ui import command_new_link # noqa: F401
-from .ui import command_new_links_filled # noqa: F401
-from .ui import command_new_observer # noqa: F401
-from .ui import command_new_pose # noqa: F401
-from .ui import command_new_robot # noqa: F401
-from .ui import command_explode_links # noqa: F401
-from .ui import command_new_trajectory # noqa: F401
-from .ui import command_new_controller # noqa: F401
-from .ui import command_new_sensor # noqa: F401
-from .ui import command_open_models_library # noqa: F401
-from .ui import command_new_workcell # noqa: F401
-from .ui import command_new_xacro_object # noqa: F401
-from .ui import command_new_lcs_at_robot_link_body # noqa: F401
-from .ui import command_reload # Developer tool. # noqa: F401
-from .ui import command_robot_from_urdf # noqa: F401
-from .ui import command_set_joints # noqa: F401
-from .ui import command_set_placement # noqa: F401
-from .ui import command_set_placement_fast # noqa: F401
-from .ui import command_set_placement_fast_child_to_parent # noqa: F401
-from .ui import command_set_placement_fast_parent_to_child # noqa: F401
-from .ui import command_set_placement_fast_sensor # noqa: F401
-from .ui import command_set_placement_in_absolute_coordinates # noqa: F401
-from .ui import command_set_placement_by_orienteer # noqa: F401
-from .ui import command_set_placement_by_orienteer_with_hold_chain # noqa: F401
-from .ui import command_rotate_joint_x # noqa: F401
-from .ui import command_rotate_joint_y # noqa: F401
-from .ui import command_rotate_joint_z # noqa: F401
-from .ui import command_simplify_mesh # noqa: F401
-from .ui import command_sphere_from_bounding_box # noqa: F401
-from .ui import command_cylinder_x_aligned_from_bounding_box # noqa: F401
-from .ui import command_cylinder_y_aligned_from_bounding_box # noqa: F401
-from .ui import command_cylinder_z_aligned_from_bounding_box # noqa: F401
-from .ui import command_create_collision_copy_obj # noqa: F401
-from .ui import command_update_planning_scene # noqa: F401
-from .ui import command_urdf_export # noqa: F401
-from .ui import command_set_material # noqa: F401
-from .ui import command_calculate_mass_and_inertia # noqa: F401
-from .ui import command_world_generator # noqa: F401
-from .ui import command_transfer_project_to_external_code_generator # noqa: F401
-from .ui import command_wb_settings # noqa: F401
-
-from .wb_utils import ICON_PATH
-from . import wb_constants
+from .startup_timing import log_report
+from .startup_timing import timed
+
+with timed('import of the workbench utilities'):
+    from .ui.lazy_command import register_lazy_command
+    from .wb_utils import ICON_PATH
+    from .wb_utils import get_workbench_param
+    from . import wb_constants
+    from . import wb_globals
+
+# Command name -> module in ./ui defining the command.
+COMMAND_MODULES = {
+    'AssemblyFromUrdf': 'command_assembly_from_urdf',
+    'BoxFromBoundingBox': 'command_box_from_bounding_box',
+    'CalculateMassAndInertia': 'command_calculate_mass_and_inertia',
+    'DuplicateRobot': 'command_duplicate_robot',
+    'GetPlanningScene': 'command_get_planning_scene',
+    'KKEdit': 'command_kk_edit',
+    'NewAttachedCollisionObject': 'command_new_attached_collision_object',
+    'NewJoint': 'command_new_joint',
+    'NewJointsFilled': 'command_new_joints_filled',
+    'NewJointsFilledSpider': 'command_new_joints_filled_spider_connect',
+    'NewLink': 'command_new_link',
+    'NewLinksFilled': 'command_new_links_filled',
+    'NewObserver': 'command_new_observer',
+    'NewPose': 'command_new_pose',
+    'NewRobot': 'command_new_robot',
+    'ExplodeLinks': 'command_explode_links',
+    'NewTrajectory': 'command_new_trajectory',
+    'NewController': 'command_new_controller',
+    'NewSensor': 'command_new_sensor',
+    'OpenModelsLibrary': 'command_open_models_library',
+    'NewWorkcell': 'command_new_workcell',
+    'NewXacroObject': 'command_new_xacro_object',
+    'NewLCSAtRobotLinkBody': 'command_new_lcs_at_robot_link_body',
+    'Reload': 'command_reload',  # Developer tool.
+    'UrdfImport': 'command_robot_from_urdf',
+    'SetJoints': 'command_set_joints',
+    'SetCROSSPlacement': 'command_set_placement',
+    'SetCROSSPlacementFast': 'command_set_placement_fast',
+    'SetCROSSPlacementFastChildToParent': 'command_set_placement_fast_child_to_parent',
+    'SetCROSSPlacementFastParentToChild': 'command_set_placement_fast_parent_to_child',
+    'SetCROSSPlacementFastSensor': 'command_set_placement_fast_sensor',
+    'SetCROSSPlacementInAbsoluteCoordinates': 'command_set_placement_in_absolute_coordinates',
+    'SetCROSSPlacementByOrienteer': 'command_set_placement_by_orienteer',
+    'SetCROSSPlacementByOrienteerWithHoldChain': 'command_set_placement_by_orienteer_with_hold_chain',
+    'RotateJointX': 'command_rotate_joint_x',
+    'RotateJointY': 'command_rotate_joint_y',
+    'RotateJointZ': 'command_rotate_joint_z',
+    'SimplifyMesh': 'command_simplify_mesh',
+    'SphereFromBoundingBox': 'command_sphere_from_bounding_box',
+    'XAlignedCylinderFromBoundingBox': 'command_cylinder_x_aligned_from_bounding_box',
+    'YAlignedCylinderFromBoundingBox': 'command_cylinder_y_aligned_from_bounding_box',
+    'ZAlignedCylinderFromBoundingBox': 'command_cylinder_z_aligned_from_bounding_box',
+    'CreateCollisionCopyObj': 'command_create_collision_copy_obj',
+    'UpdatePlanningScene': 'command_update_planning_scene',
+    'UrdfExport': 'command_urdf_export',
+    'SetMaterial': 'command_set_material',
+    'WorldGenerator': 'command_world_generator',
+    'TransferProjectToExternalCodeGenerator': 'command_transfer_project_to_external_code_generator',
+    'WbSettings': 'command_wb_settings',
+}
 
 
 class CrossWorkbench(fcgui.Workbench):
@@ -72,6 +83,8 @@ class CrossWorkbench(fcgui.Workbench):
         This is the place to import all the commands.
 
         """
+        self._register_commands()
+
         # The order here defines the order of the icons in the GUI.
         toolbar_commands = [
             'NewRobot',  # Defined in ./ui/command_new_robot.py.
@@ -194,6 +207,22 @@ class CrossWorkbench(fcgui.Workbench):
 
         fcgui.addIconPath(str(ICON_PATH))
         # fcgui.addLanguagePath(joinDir('Resources/translations'))
+        log_report()
+
+    def _register_commands(self) -> None:
+        """Register the commands, as stubs in lazy mode.
+
+        In lazy mode, the implementation of a command is imported on its
+        first activation, see `./ui/lazy_command.py`.
+
+        """
+        if get_workbench_param(wb_globals.PREF_LAZY_COMMANDS, True):
+            for command_name, module_name in COMMAND_MODULES.items():
+                register_lazy_command(command_name, module_name)
+            return
+        for command_name, module_name in COMMAND_MODULES.items():
+            with timed(f'import of command {command_name} ({module_name})'):
+                import_module(f'.ui.{module_name}', __package__)
 
     def Activated(self):
         """Code run when a user switches to this workbench."""
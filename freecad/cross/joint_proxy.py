@@ -215,10 +215,18 @@ class JointProxy(ProxyBase):
                 )
                 # obj.MimickedJoint = None
             pass
+        if prop in ('Label', 'Label2', 'Parent', 'Child', 'Mimic', 'MimickedJoint'):
+            robot = self.get_robot()
+            if robot and hasattr(robot, 'Proxy'):
+                robot.Proxy.invalidate_topology(obj)
+        if prop in ('Position', 'Origin', 'Type', 'Multiplier', 'Offset'):
+            robot = self.get_robot()
+            if robot and hasattr(robot, 'Proxy'):
+                robot.Proxy.mark_pose_dirty(obj)
         if prop in ('Label', 'Label2'):
             robot = self.get_robot()
             if robot and hasattr(robot, 'Proxy'):
-                robot.Proxy.add_joint_variables()
+                robot.Proxy.run_or_defer('add_joint_variables')
             if (
                 robot
                 and is_name_used(obj, robot)
@@ -394,12 +402,7 @@ class JointProxy(ProxyBase):
         robot = self.get_robot()
         if robot is None:
             return None
-        for candidate_joint in robot.Proxy.get_joints():
-            child_of_candidate = robot.Proxy.get_link(candidate_joint.Child)
-            parent_of_self = robot.Proxy.get_link(self.joint.Parent)
-            if child_of_candidate is parent_of_self:
-                return candidate_joint
-        return None
+        return robot.Proxy.get_topology().get_parent_joint(self.joint.Parent)
 
     def get_unit_type(self) -> str:
         """Return `Length` or `Angle`."""
@@ -0,0 +1,58 @@
+"""Vectorized kinematics helpers based on NumPy.
+
+The functions of this module work on stacks of 4x4 homogeneous transforms,
+i.e. arrays of shape (N, 4, 4), and don't need FreeCAD, so that they can be
+used headless. Lengths are in mm, as in FreeCAD, and angles in rad.
+
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def matrix_from_placement(placement: Any) -> np.ndarray:
+    """Return the 4x4 homogeneous matrix of a FreeCAD placement."""
+    return np.array(placement.toMatrix().A, dtype=np.float64).reshape(4, 4)
+
+
+def prismatic_matrices(values: ArrayLike) -> np.ndarray:
+    """Return the (N, 4, 4) translations along z by `values` (in mm)."""
+    values = np.asarray(values, dtype=np.float64)
+    matrices = np.broadcast_to(np.identity(4), (len(values), 4, 4)).copy()
+    matrices[:, 2, 3] = values
+    return matrices
+
+
+def revolute_matrices(values: ArrayLike) -> np.ndarray:
+    """Return the (N, 4, 4) rotations about z by `values` (in rad)."""
+    values = np.asarray(values, dtype=np.float64)
+    c = np.cos(values)
+    s = np.sin(values)
+    matrices = np.broadcast_to(np.identity(4), (len(values), 4, 4)).copy()
+    matrices[:, 0, 0] = c
+    matrices[:, 0, 1] = -s
+    matrices[:, 1, 0] = s
+    matrices[:, 1, 1] = c
+    return matrices
+
+
+def actuation_matrices(joint_type: str, values: ArrayLike) -> np.ndarray:
+    """Return the (N, 4, 4) transforms due to actuation of a joint.
+
+    Same semantics as `JointProxy.get_actuation_placement()` but with values
+    in m for prismatic joints and in rad for revolute and continuous joints,
+    as `Joint.Position`.
+    Only actuation around/about z is supported, other joint types give the
+    identity.
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if joint_type == 'prismatic':
+        return prismatic_matrices(values * 1000.0)
+    if joint_type in ('revolute', 'continuous'):
+        return revolute_matrices(values)
+    return np.broadcast_to(np.identity(4), (len(values), 4, 4)).copy()
@@ -28,6 +28,8 @@ from .wb_utils import ros_name
 try:
     import numpy as np
     from . import geometry_helpers as gh
+    from . import kk_tables
+    from .kinematics_utils import matrix_from_placement
 except ImportError as e:
     warn(
         f'numpy not available, some functionalities will not work, error: {e}',
@@ -144,18 +146,23 @@ class KKFrame:
         RobotCAD workbench).
         Joints in RobotCAD are along/about the z-axis, no need for the `axis`
         parameter as in `set_dh_from_matrix`.
+        Gamma and epsilon are 0.0 if the placement is compatible with the
+        modified DH convention, see `kk_tables.kk_from_matrices()`.
 
         """
-        placement = placement.copy()
-        placement.Base = placement.Base / 1000.0  # Convert to meters.
-        matrix = placement.toMatrix()
+        self.set_from_table_row(
+            kk_tables.kk_from_matrices(matrices_from_placements([placement]))[0],
+        )
+
+    def set_from_table_row(self, row: ArrayLike) -> None:
+        """Set the parameters from a row of a KK table, see `kk_tables`."""
+        self.pre_rz, self.pre_tz, self.rx, self.tx, self.rz, self.tz = (
+            float(v) for v in row
+        )
 
-        self.set_dh_from_matrix([
-            [matrix.A11, matrix.A12, matrix.A13, matrix.A14],
-            [matrix.A21, matrix.A22, matrix.A23, matrix.A24],
-            [matrix.A31, matrix.A32, matrix.A33, matrix.A34],
-            [matrix.A41, matrix.A42, matrix.A43, matrix.A44],
-        ])
+    def to_table_row(self) -> list[float]:
+        """Return the parameters as a row of a KK table, see `kk_tables`."""
+        return [self.pre_rz, self.pre_tz, self.rx, self.tx, self.rz, self.tz]
 
     def set_dh_from_matrix(
         self,
@@ -492,6 +499,25 @@ class KKRobot:
         """
         return all(j.is_dh_compatible for j in self.kk_frames)
 
+    def to_table(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the KK table (N, 6) and the joint types (N), see `kk_tables`."""
+        table = np.array(
+            [f.to_table_row() for f in self.kk_frames],
+            dtype=np.float64,
+        ).reshape(-1, len(kk_tables.KK_COLUMNS))
+        prismatic = np.array([f.prismatic for f in self.kk_frames], dtype=bool)
+        return table, prismatic
+
+    @classmethod
+    def from_table(cls, table: ArrayLike, prismatic: ArrayLike) -> KKRobot:
+        """Return a robot from a KK table (N, 6) and joint types (N)."""
+        kk_frames: list[KKFrame] = []
+        for row, is_prismatic in zip(np.asarray(table), np.asarray(prismatic)):
+            kk_frame = KKFrame(0.0, 0.0, 0.0, 0.0, prismatic=bool(is_prismatic))
+            kk_frame.set_from_table_row(row)
+            kk_frames.append(kk_frame)
+        return cls(kk_frames)
+
     def set_from_robot(
         self,
         robot: CrossRobot,
@@ -508,11 +534,17 @@ class KKRobot:
                 warn(f'Joint type {joint.Type} of {joint.Label} not supported', True)
                 return False
 
-        for joint in robot.Proxy.get_joints():
-            prismatic = (joint.Type == 'prismatic')
+        joints = robot.Proxy.get_joints()
+        if not joints:
+            return True
+        # All joints at once.
+        table = kk_tables.kk_from_matrices(
+            matrices_from_placements([joint.Origin for joint in joints]),
+        )
+        for joint, row in zip(joints, table):
             kk_joint = KKFrame(0.0, 0.0, 0.0, 0.0)  # Irrelevant values.
-            kk_joint.set_dh_from_placement(joint.Origin)
-            kk_joint.prismatic = prismatic
+            kk_joint.set_from_table_row(row)
+            kk_joint.prismatic = (joint.Type == 'prismatic')
             self.kk_frames.append(kk_joint)
         return True
 
@@ -689,41 +721,36 @@ def kk_from_dh(
 def dh_from_kk(
         kk_frames: list[KKFrame],
 ) -> (list[DHFrame], fc.Placement):
-    if not kk_frames:
-        return []
+    """Return the DH frames and the base placement of DH-compatible frames.
 
-    dh_frames: list[DHFrame] = []
+    Inverse of `kk_from_dh()`, see `kk_tables.dh_from_kk()`.
 
-    # Base transform.
-    kk_frame = KKFrame(
-                tx=kk_frames[0].tx,
-                rx=kk_frames[0].rx,
-                tz=0.0,
-                rz=0.0,
-                prismatic=True,  # Irrelevant value.
-    )
-    base = kk_frame.to_placement()
-
-    # middle joints
-    for i in range(len(kk_frames) - 1):
-        dh_frames.append(
-            DHFrame(
-                    tx=dh_frames[i + 1].tx,
-                    rx=dh_frames[i + 1].rx,
-                    tz=dh_frames[i].tz,
-                    rz=dh_frames[i].rz,
-                    prismatic=dh_frames[i].prismatic,
-            ),
-        )
-
-    # last joint
-    dh_frames.append(
-        DHFrame(
-            rz=kk_frames[-1].rz,
-            tz=kk_frames[-1].tz,
-            rx=0.0,
-            tx=0.0,
-        ),
-    )
-
-    return dh_frames, base
+    """
+    if not kk_frames:
+        return [], fc.Placement()
+
+    table = np.array([f.to_table_row() for f in kk_frames], dtype=np.float64)
+    dh_table, base = kk_tables.dh_from_kk(table)
+    dh_frames = [
+        DHFrame(*(float(v) for v in row), prismatic=kk_frame.prismatic)
+        for row, kk_frame in zip(dh_table, kk_frames)
+    ]
+    return dh_frames, placement_from_matrix(base)
+
+
+def matrices_from_placements(placements: list[fc.Placement]) -> np.ndarray:
+    """Return the (N, 4, 4) matrices of placements, with translations in m."""
+    matrices = np.array(
+        [matrix_from_placement(p) for p in placements],
+        dtype=np.float64,
+    ).reshape(-1, 4, 4)
+    matrices[:, :3, 3] /= 1000.0  # Convert to meters.
+    return matrices
+
+
+def placement_from_matrix(matrix: ArrayLike) -> fc.Placement:
+    """Return the placement of a 4x4 matrix with translation in m."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    placement = fc.Placement(fc.Matrix(*matrix.flatten()))
+    placement.Base *= 1000.0  # Convert to mm.
+    return placement
@@ -0,0 +1,331 @@
+"""Vectorized Khalil-Kleinfinger (KK) and Denavit-Hartenberg (DH) tables.
+
+The functions of this module work on stacks of parameter tables and of 4x4
+homogeneous transforms, for example the tables of many variants of an arm or
+many configurations at once, and don't need FreeCAD, so that they can be
+used headless. Lengths are in m and angles in rad, as in `KKFrame` and
+`DHFrame`.
+
+A KK table has shape (..., N, 6), with the columns `KK_COLUMNS`, i.e. the
+fields of `KKFrame` in the order of the applied transforms. A DH table has
+shape (..., N, 4), with the columns `DH_COLUMNS`, i.e. the fields of
+`DHFrame` in the order of the applied transforms. The joint types are given
+separately, as boolean arrays of shape (..., N), True for prismatic.
+
+Example, forward kinematics of 1000 configurations of a 2R arm:
+
+    >>> dh = np.array([[0.0, 0.0, 0.0, 0.5], [0.0, 0.0, 0.0, 0.3]])
+    >>> q = np.random.uniform(-np.pi, np.pi, (1000, 2))
+    >>> poses = dh_forward_kinematics(dh, [False, False], q)
+    >>> poses.shape
+    (1000, 2, 4, 4)
+
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Columns of a KK table, see `KKFrame`.
+KK_COLUMNS = ('pre_rz', 'pre_tz', 'rx', 'tx', 'rz', 'tz')
+
+# Columns of a DH table, see `DHFrame`.
+DH_COLUMNS = ('rz', 'tz', 'rx', 'tx')
+
+# Values smaller than this, in m or rad, are considered 0.
+_TOLERANCE = 1e-9
+
+
+def _rotations_z(angles: np.ndarray) -> np.ndarray:
+    c = np.cos(angles)
+    s = np.sin(angles)
+    matrices = np.zeros(angles.shape + (4, 4))
+    matrices[..., 0, 0] = c
+    matrices[..., 0, 1] = -s
+    matrices[..., 1, 0] = s
+    matrices[..., 1, 1] = c
+    matrices[..., 2, 2] = 1.0
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def kk_matrices(kk: ArrayLike) -> np.ndarray:
+    """Return the (..., 4, 4) transforms of a KK table of shape (..., 6).
+
+    Same as `KKFrame.to_placement()`, with translations in m.
+
+    """
+    kk = np.asarray(kk, dtype=np.float64)
+    pre_rz, pre_tz, rx, tx, rz, tz = np.moveaxis(kk, -1, 0)
+    cθ = np.cos(rz)
+    sθ = np.sin(rz)
+    cα = np.cos(rx)
+    sα = np.sin(rx)
+    cγ = np.cos(pre_rz)
+    sγ = np.sin(pre_rz)
+    matrices = np.zeros(kk.shape[:-1] + (4, 4))
+    matrices[..., 0, 0] = -sγ*sθ*cα + cγ*cθ
+    matrices[..., 0, 1] = -sγ*cα*cθ - sθ*cγ
+    matrices[..., 0, 2] = sα*sγ
+    matrices[..., 0, 3] = tx*cγ + tz*sα*sγ
+    matrices[..., 1, 0] = sγ*cθ + sθ*cα*cγ
+    matrices[..., 1, 1] = -sγ*sθ + cα*cγ*cθ
+    matrices[..., 1, 2] = -sα*cγ
+    matrices[..., 1, 3] = tx*sγ - tz*sα*cγ
+    matrices[..., 2, 0] = sα*sθ
+    matrices[..., 2, 1] = sα*cθ
+    matrices[..., 2, 2] = cα
+    matrices[..., 2, 3] = pre_tz + tz*cα
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def dh_matrices(dh: ArrayLike) -> np.ndarray:
+    """Return the (..., 4, 4) transforms of a DH table of shape (..., 4).
+
+    The transform is Rz(rz) * Tz(tz) * Tx(tx) * Rx(rx), with translations
+    in m.
+
+    """
+    dh = np.asarray(dh, dtype=np.float64)
+    rz, tz, rx, tx = np.moveaxis(dh, -1, 0)
+    cθ = np.cos(rz)
+    sθ = np.sin(rz)
+    cα = np.cos(rx)
+    sα = np.sin(rx)
+    matrices = np.zeros(dh.shape[:-1] + (4, 4))
+    matrices[..., 0, 0] = cθ
+    matrices[..., 0, 1] = -sθ*cα
+    matrices[..., 0, 2] = sθ*sα
+    matrices[..., 0, 3] = tx*cθ
+    matrices[..., 1, 0] = sθ
+    matrices[..., 1, 1] = cθ*cα
+    matrices[..., 1, 2] = -cθ*sα
+    matrices[..., 1, 3] = tx*sθ
+    matrices[..., 2, 1] = sα
+    matrices[..., 2, 2] = cα
+    matrices[..., 2, 3] = tz
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def kk_from_matrices(
+        matrices: ArrayLike,
+        tolerance: float = _TOLERANCE,
+) -> np.ndarray:
+    """Return the KK table (..., 6) of transforms of shape (..., 4, 4).
+
+    The translations of `matrices` must be in m. Any rigid transform has KK
+    parameters. Among the possible solutions, the one with
+    `abs(pre_rz) <= pi / 2` is returned and, if the z axes are parallel,
+    the one with `pre_rz = 0.0` if possible and `pre_tz = 0.0`, so that
+    transforms compatible with the modified DH convention give
+    `pre_rz = pre_tz = 0.0`. Parameters smaller than `tolerance` are set to
+    0.0.
+
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    r = matrices[..., :3, :3]
+    p = matrices[..., :3, 3]
+    sin_rx = np.hypot(r[..., 0, 2], r[..., 1, 2])
+    parallel = sin_rx < tolerance
+
+    # General case, R = Rz(pre_rz) * Rx(rx) * Rz(rz) with rx in ]0, pi[.
+    rx = np.arctan2(sin_rx, r[..., 2, 2])
+    pre_rz = np.arctan2(r[..., 0, 2], -r[..., 1, 2])
+    rz = np.arctan2(r[..., 2, 0], r[..., 2, 1])
+    # The other solution is (pre_rz + pi, -rx, rz + pi).
+    flip = np.abs(pre_rz) > (np.pi / 2.0)
+    pre_rz = np.where(flip, pre_rz - np.copysign(np.pi, pre_rz), pre_rz)
+    rx = np.where(flip, -rx, rx)
+    rz = np.where(flip, _wrap(rz + np.pi), rz)
+
+    # Parallel z axes, pre_rz is chosen to bring the translation into the
+    # xz plane and rz gets the rest of the rotation about z.
+    cos_rx = np.where(r[..., 2, 2] < 0.0, -1.0, 1.0)
+    parallel_pre_rz = np.arctan2(p[..., 1], p[..., 0])
+    parallel_pre_rz = np.where(
+        np.hypot(p[..., 0], p[..., 1]) < tolerance,
+        0.0,
+        parallel_pre_rz,
+    )
+    parallel_flip = np.abs(parallel_pre_rz) > (np.pi / 2.0)
+    parallel_pre_rz = np.where(
+        parallel_flip,
+        parallel_pre_rz - np.copysign(np.pi, parallel_pre_rz),
+        parallel_pre_rz,
+    )
+    # With rx = 0: R = Rz(pre_rz + rz).
+    # With rx = pi: R = Rx(pi) * Rz(rz - pre_rz).
+    rotation_z = np.where(
+        cos_rx > 0.0,
+        np.arctan2(r[..., 1, 0], r[..., 0, 0]),
+        np.arctan2(-r[..., 0, 1], r[..., 0, 0]),
+    )
+    parallel_rz = _wrap(rotation_z - cos_rx * parallel_pre_rz)
+
+    pre_rz = np.where(parallel, parallel_pre_rz, pre_rz)
+    rx = np.where(parallel, np.where(cos_rx > 0.0, 0.0, np.pi), rx)
+    rz = np.where(parallel, parallel_rz, rz)
+
+    # Translation in the frame rotated by pre_rz:
+    # (tx, -tz * sin(rx), pre_tz + tz * cos(rx)).
+    c = np.cos(pre_rz)
+    s = np.sin(pre_rz)
+    px = c * p[..., 0] + s * p[..., 1]
+    py = -s * p[..., 0] + c * p[..., 1]
+    pz = p[..., 2]
+    tx = px
+    safe_sin_rx = np.where(parallel, 1.0, np.sin(rx))
+    tz = np.where(parallel, pz * cos_rx, -py / safe_sin_rx)
+    pre_tz = np.where(parallel, 0.0, pz - tz * np.cos(rx))
+
+    kk = np.stack([pre_rz, pre_tz, rx, tx, rz, tz], axis=-1)
+    kk[np.abs(kk) < tolerance] = 0.0
+    return kk
+
+
+def _wrap(angles: np.ndarray) -> np.ndarray:
+    """Return the angles in [-pi, pi[."""
+    return np.mod(angles + np.pi, 2.0 * np.pi) - np.pi
+
+
+def is_dh_compatible(
+        kk: ArrayLike,
+        tolerance: float = _TOLERANCE,
+) -> np.ndarray:
+    """Return whether each KK table (..., N, 6) has no pre-transform.
+
+    Same as `KKRobot.is_dh_compatible` for each table, the result has
+    shape (...).
+
+    """
+    kk = np.asarray(kk, dtype=np.float64)
+    return np.all(np.abs(kk[..., :2]) < tolerance, axis=(-2, -1))
+
+
+def kk_from_dh(dh: ArrayLike) -> np.ndarray:
+    """Return the KK tables (..., N + 1, 6) of DH tables (..., N, 4).
+
+    Same as `kk_robot.kk_from_dh()`: the last frame only holds the `rx` and
+    `tx` of the last DH frame. The joint types are unchanged, the joint type
+    of the last frame (a fixed frame) being irrelevant.
+
+    """
+    dh = np.asarray(dh, dtype=np.float64)
+    shape = dh.shape[:-2] + (dh.shape[-2] + 1, len(KK_COLUMNS))
+    kk = np.zeros(shape)
+    # rz and tz of frame i.
+    kk[..., :-1, 4] = dh[..., 0]
+    kk[..., :-1, 5] = dh[..., 1]
+    # rx and tx of frame i - 1.
+    kk[..., 1:, 2] = dh[..., 2]
+    kk[..., 1:, 3] = dh[..., 3]
+    return kk
+
+
+def dh_from_kk(kk: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+    """Return the DH tables (..., N, 4) and base transforms of KK tables.
+
+    Inverse of `kk_from_dh()` for DH-compatible KK tables (..., N, 6), see
+    `is_dh_compatible()`: the `rx` and `tx` of the first KK frame are
+    returned as base transforms (..., 4, 4) and the last DH frame has
+    `rx = tx = 0.0`.
+
+    """
+    kk = np.asarray(kk, dtype=np.float64)
+    dh = np.zeros(kk.shape[:-1] + (len(DH_COLUMNS),))
+    dh[..., 0] = kk[..., 4]
+    dh[..., 1] = kk[..., 5]
+    dh[..., :-1, 2] = kk[..., 1:, 2]
+    dh[..., :-1, 3] = kk[..., 1:, 3]
+    base_kk = np.zeros(kk.shape[:-2] + (len(KK_COLUMNS),))
+    base_kk[..., 2:4] = kk[..., 0, 2:4]
+    return dh, kk_matrices(base_kk)
+
+
+def _actuated(
+        table: np.ndarray,
+        prismatic: ArrayLike,
+        q: Optional[ArrayLike],
+        rz_column: int,
+        tz_column: int,
+) -> np.ndarray:
+    """Return `table` with the joint values added to rz or tz."""
+    if q is None:
+        return table
+    q = np.asarray(q, dtype=np.float64)
+    prismatic = np.asarray(prismatic, dtype=bool)
+    shape = np.broadcast_shapes(table.shape[:-1], q.shape, prismatic.shape)
+    table = np.broadcast_to(table, shape + table.shape[-1:]).copy()
+    table[..., rz_column] += np.where(prismatic, 0.0, q)
+    table[..., tz_column] += np.where(prismatic, q, 0.0)
+    return table
+
+
+def chain_matrices(
+        matrices: ArrayLike,
+        base: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """Return the cumulative products along the chain axis.
+
+    Return the poses (..., N, 4, 4) of the frames of chains of transforms
+    (..., N, 4, 4), each relative to the previous one, optionally preceded
+    by `base` (..., 4, 4).
+
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    poses = np.empty(matrices.shape)
+    if matrices.shape[-3] == 0:
+        # Empty chains.
+        return poses
+    if base is None:
+        pose = matrices[..., 0, :, :]
+    else:
+        pose = np.asarray(base, dtype=np.float64) @ matrices[..., 0, :, :]
+    poses[..., 0, :, :] = pose
+    for i in range(1, matrices.shape[-3]):
+        pose = pose @ matrices[..., i, :, :]
+        poses[..., i, :, :] = pose
+    return poses
+
+
+def kk_forward_kinematics(
+        kk: ArrayLike,
+        prismatic: ArrayLike,
+        q: Optional[ArrayLike] = None,
+        base: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """Return the poses (..., N, 4, 4) of the frames of KK tables (..., N, 6).
+
+    Parameters
+    ----------
+    - kk: KK tables of serial chains.
+    - prismatic: joint types (..., N), True for prismatic.
+    - q: joint values (..., N), in rad for revolute joints and in m for
+         prismatic joints, added to `rz` resp. `tz`. `kk`, `prismatic`, and
+         `q` are broadcast together, e.g. `kk` of shape (V, 1, N, 6) and `q`
+         of shape (C, N) give the poses of C configurations of V variants.
+    - base: pose (..., 4, 4) of the base, defaults to the identity.
+
+    """
+    kk = _actuated(np.asarray(kk, dtype=np.float64), prismatic, q, 4, 5)
+    return chain_matrices(kk_matrices(kk), base)
+
+
+def dh_forward_kinematics(
+        dh: ArrayLike,
+        prismatic: ArrayLike,
+        q: Optional[ArrayLike] = None,
+        base: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """Return the poses (..., N, 4, 4) of the frames of DH tables (..., N, 4).
+
+    Same as `kk_forward_kinematics()` for DH tables.
+
+    """
+    dh = _actuated(np.asarray(dh, dtype=np.float64), prismatic, q, 0, 1)
+    return chain_matrices(dh_matrices(dh), base)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 from typing import NewType, List, Optional, cast
 import xml.etree.ElementTree as et
@@ -17,16 +18,16 @@ from .freecad_utils import message
 from .freecad_utils import add_object
 from .freecad_utils import is_part
 from .freecad_utils import is_derived_from
+from .mesh_utils import MeshExportCache
+from .mesh_utils import MeshExportPipeline
 from .mesh_utils import save_mesh_dae
 from .urdf_utils import XmlForExport
 from .urdf_utils import urdf_collision_from_object
 from .urdf_utils import urdf_inertial
 from .urdf_utils import urdf_visual_from_object
-from .utils import attr_equals
 from .utils import warn_unsupported
 from .wb_utils import ICON_PATH, get_link_sensors
 from .wb_utils import get_chain
-from .wb_utils import get_joints
 from .wb_utils import get_links
 from .wb_utils import get_valid_urdf_name
 from .wb_utils import is_joint
@@ -110,6 +111,8 @@ def _get_xmls_and_export_meshes(
         placement,
         package_parent: [Path | str] = Path(),
         package_name: str = '',
+        mesh_cache: Optional[MeshExportCache] = None,
+        mesh_pipeline: Optional[MeshExportPipeline] = None,
 ) -> list[et.Element]:
     """
     Save the meshes as dae files.
@@ -123,12 +126,17 @@ def _get_xmls_and_export_meshes(
     - package_parent: where to find the ROS package
     - package_name: name of the ROS package, also name of the directory where
                     to save the package.
+    - mesh_cache: cache of the meshes in the package. Meshes that are up to
+                  date in the cache are not exported again.
+    - mesh_pipeline: if given, the meshes are written by the pipeline, which
+                     also records them in its cache, instead of synchronously.
 
     """
     export_data: list[XmlForExport] = urdf_function(
         obj,
         package_name=str(package_name),
         placement=placement,
+        mesh_cache=mesh_cache,
     )
     xmls: list[et.Element] = []
     for export_datum in export_data:
@@ -144,11 +152,24 @@ def _get_xmls_and_export_meshes(
             if not any_with_volume_inside:
                 continue
         if not is_primitive(export_datum.object):
+            if (
+                (mesh_cache is not None)
+                and mesh_cache.is_up_to_date(export_datum.object)
+            ):
+                # Unchanged or already exported for another object.
+                xmls.append(export_datum.xml)
+                continue
             mesh_path = (
                 package_parent / package_name
                 / 'meshes' / export_datum.mesh_filename
             )
+            if mesh_pipeline is not None:
+                mesh_pipeline.submit(export_datum.object, mesh_path)
+                xmls.append(export_datum.xml)
+                continue
             save_mesh_dae(export_datum.object, mesh_path)
+            if mesh_cache is not None:
+                mesh_cache.set_exported(export_datum.object)
         xmls.append(export_datum.xml)
     return xmls
 
@@ -197,11 +218,6 @@ class LinkProxy(ProxyBase):
         # Save the robot to speed-up self.get_robot().
         self._robot: Optional[CrossRobot] = None
 
-        # Save the parent joint to speed-up self.get_ref_joint().
-        self._ref_joint: Optional[CrossJoint] = None
-        # Save the child joints to speed-up self.get_ref_child_joints().
-        self._ref_child_joints: Optional[list[CrossJoint]] = []
-
         self._sensors: Optional[list[CrossSensor]] = None
 
         self.init_extensions(obj)
@@ -219,6 +235,14 @@ class LinkProxy(ProxyBase):
         obj.setPropertyStatus('_Type', ['Hidden', 'ReadOnly'])
         obj._Type = self.Type
 
+        # JSON description of the geometries not created yet, see
+        # `materialize()`.
+        add_property(
+            obj, 'App::PropertyString', '_DeferredGeometry', 'Internal',
+            'Description of the geometries created on first use',
+        )
+        obj.setPropertyStatus('_DeferredGeometry', ['Hidden'])
+
         add_property(
             obj, 'App::PropertyLinkListGlobal', 'Real', 'Elements',
             'The real part objects of this link, optional',
@@ -349,6 +373,7 @@ class LinkProxy(ProxyBase):
         if prop in ('Label', 'Label2'):
             robot = self.get_robot()
             if robot and hasattr(robot, 'Proxy'):
+                robot.Proxy.invalidate_topology(obj)
                 robot.Proxy.set_joint_enum()
             if (
                 robot
@@ -373,6 +398,8 @@ class LinkProxy(ProxyBase):
             robot = self.get_robot()
             if robot:
                 # The placement of FreeCAD links is managed by the robot.
+                if hasattr(robot, 'Proxy'):
+                    robot.Proxy.mark_pose_dirty(obj)
                 return
             new_placement = obj.Placement * obj.MountedPlacement
             for fclink in obj.Group:
@@ -460,22 +487,7 @@ class LinkProxy(ProxyBase):
         robot = self.get_robot()
         if robot is None:
             return None
-        if (
-            self._ref_joint
-            and attr_equals(self._ref_joint, 'Child', ros_name(self.link))
-            and hasattr(self._ref_joint, 'Proxy')
-            and robot == self._ref_joint.Proxy.get_robot()
-        ):
-            return self._ref_joint
-        joints = get_joints(robot.Group)
-        for joint in joints:
-            if joint.Child == ros_name(self.link):
-                # Parallel mechanisms are not supported, there should be only
-                # one joint that has `link` as child.
-                self._ref_joint = joint
-                return joint
-        return None
-    
+        return robot.Proxy.get_topology().get_parent_joint(ros_name(self.link))
 
     def get_ref_child_joints(self) -> Optional[list[CrossJoint]]:
         """Return the joint(s) this link is the parent of."""
@@ -483,21 +495,7 @@ class LinkProxy(ProxyBase):
         robot = self.get_robot()
         if robot is None:
             return None
-        if (
-            len(self._ref_child_joints)
-            and attr_equals(self._ref_child_joints[0], 'Parent', ros_name(self.link))
-            and hasattr(self._ref_child_joints[0], 'Proxy')
-            and robot == self._ref_child_joints[0].Proxy.get_robot()
-        ):
-            return self._ref_child_joints
-        joints = get_joints(robot.Group)
-        for joint in joints:
-            if joint.Parent == ros_name(self.link):
-                self._ref_child_joints.append(joint)
-        if len(self._ref_child_joints):
-            return self._ref_child_joints
-        return None
-    
+        return robot.Proxy.get_topology().get_child_joints(ros_name(self.link))
 
     def may_be_base_link(self) -> bool:
         """Return True if the link is child of no joint."""
@@ -509,11 +507,7 @@ class LinkProxy(ProxyBase):
         if robot is None:
             # Not attached to any robot.
             return True
-        joints = robot.Proxy.get_joints()
-        for joint in joints:
-            if joint.Parent == ros_name(self.link):
-                return False
-        return True
+        return robot.Proxy.get_topology().is_tip_link(ros_name(self.link))
 
     def is_in_chain_to_joint(self, joint: CrossJoint) -> bool:
         """Return True if `link` is in the chain from base to joint.
@@ -539,6 +533,35 @@ class LinkProxy(ProxyBase):
                 return True
         return False
 
+    def get_deferred_lods(self) -> list[str]:
+        """Return the levels of details whose geometries are not created yet.
+
+        Geometries are deferred when importing a robot with `lazy_lod`.
+
+        """
+        if ((not self.is_execute_ready())
+                or (not getattr(self.link, '_DeferredGeometry', ''))):
+            return []
+        return json.loads(self.link._DeferredGeometry)['lods']
+
+    def materialize(self, lods: Optional[list[str]] = None) -> None:
+        """Create the deferred geometries of the given levels of details.
+
+        Parameters
+        ----------
+        - lods: levels of details among 'real' and 'collision', defaults to
+                all deferred ones.
+
+        """
+        deferred_lods = self.get_deferred_lods()
+        if lods is not None:
+            deferred_lods = [lod for lod in deferred_lods if lod in lods]
+        if not deferred_lods:
+            return
+        # Import here because robot_from_urdf imports this module.
+        from .robot_from_urdf import materialize_deferred_geometry
+        materialize_deferred_geometry(self.link, deferred_lods)
+
     def update_fc_links(self) -> None:
         """Update the FreeCAD link according to the level of details."""
         # Implementation note: must be public because it is called by the ViewProxy.
@@ -560,6 +583,14 @@ class LinkProxy(ProxyBase):
         if vlink is None:
             return
 
+        # Create the deferred geometries when first shown.
+        lods_to_materialize: list[str] = []
+        if vlink.ShowReal:
+            lods_to_materialize.append('real')
+        if vlink.ShowCollision:
+            lods_to_materialize.append('collision')
+        self.materialize(lods_to_materialize)
+
         links_real = get_sorted_concated_names(self._fc_links_real)
         reals = get_sorted_concated_names(link.Real)
         links_visual = get_sorted_concated_names(self._fc_links_visual)
@@ -628,6 +659,8 @@ class LinkProxy(ProxyBase):
         self,
         package_parent: Path,
         package_name: [Path | str],
+        mesh_cache: Optional[MeshExportCache] = None,
+        mesh_pipeline: Optional[MeshExportPipeline] = None,
     ) -> et.ElementTree:
         """Return the xml for this link.
 
@@ -637,8 +670,21 @@ class LinkProxy(ProxyBase):
                           will be saved.
         - package_name: the name of the exported package (also the name of the
                         directory).
+        - mesh_cache: cache of the meshes in the package, shared between the
+                      links of a robot. If not given, a cache is created and
+                      saved for this link only.
+        - mesh_pipeline: pipeline to write the meshes with, shared between the
+                         links of a robot. If given, `mesh_pipeline.finish()`
+                         must be called by the caller. If not given, the meshes
+                         are written synchronously.
 
         """
+        # Collision is exported, create it if deferred.
+        self.materialize(['collision'])
+
+        save_mesh_cache = mesh_cache is None
+        if mesh_cache is None:
+            mesh_cache = MeshExportCache(Path(package_parent) / package_name / 'meshes')
 
         link_xml = et.fromstring(
             f'<link name="{get_valid_urdf_name(ros_name(self.link))}" />',
@@ -650,6 +696,8 @@ class LinkProxy(ProxyBase):
                     self.link.MountedPlacement,
                     package_parent,
                     package_name,
+                    mesh_cache,
+                    mesh_pipeline,
             ):
                 link_xml.append(xml)
         for obj in self.link.Collision:
@@ -659,6 +707,8 @@ class LinkProxy(ProxyBase):
                     self.link.MountedPlacement,
                     package_parent,
                     package_name,
+                    mesh_cache,
+                    mesh_pipeline,
             ):
                 link_xml.append(xml)
         # link with zero mass and inertia can leads to error ("pose must be finite") in Gazebo
@@ -675,6 +725,8 @@ class LinkProxy(ProxyBase):
                     izz=self.link.Izz,
                 ),
             )
+        if save_mesh_cache:
+            mesh_cache.save()
         return link_xml
 
     def _fix_lost_fc_links(self) -> None:
@@ -0,0 +1,313 @@
+"""Mass properties of the Real geometry of robot links.
+
+The geometry of each Real object of a link is evaluated separately by a
+`MassPropertiesEngine` and the results are combined per link, as for the
+compound of all Real objects. Results are cached by the hash of the
+geometry (BREP of the shape or arrays of the mesh), so that computing again
+after modifying one part only evaluates the modified part. The properties
+are computed for a density of 1, the density of the material only scales
+them, so that changing the material doesn't invalidate the cache.
+
+Mesh-only geometry (e.g. STL or DAE imported as `Mesh::Feature`) is
+evaluated by integration over the signed tetrahedra formed by the origin
+and each triangle, which requires a closed mesh.
+
+Only meshes are evaluated in worker threads: the NumPy integration releases
+the GIL. `Part.Shape` objects are evaluated serially in the calling thread,
+the getters of `Part` hold the GIL and the shapes are OCC objects owned by
+the document, which are not safe to share between threads.
+
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import os
+import threading
+from typing import Optional, Union
+
+import FreeCAD as fc
+import Part
+
+import numpy as np
+
+from .freecad_utils import get_linked_obj
+from .wb_utils import get_workbench_param
+from . import wb_globals
+
+# Stubs and type hints.
+DO = fc.DocumentObject
+
+# Maximum number of geometries in the cache of `MassPropertiesEngine`.
+_CACHE_SIZE = 1024
+
+
+@dataclass
+class MassProperties:
+    """Mass properties for a density of 1, in mm."""
+
+    volume_mm3: float
+    # Center of gravity, shape (3,).
+    center_of_gravity: np.ndarray
+    # Matrix of inertia relative to the center of gravity, in the axes of the
+    # geometry, shape (3, 3), in mm^5 as `Part.Shape.MatrixOfInertia`.
+    matrix_of_inertia: np.ndarray
+
+
+@dataclass
+class MeshArrays:
+    """Geometry of a triangle mesh."""
+
+    # Shape (N, 3), in mm.
+    vertices: np.ndarray
+    # Indices into `vertices`, shape (M, 3).
+    triangles: np.ndarray
+
+
+# A geometry evaluated by `MassPropertiesEngine`.
+Geometry = Union[Part.Shape, MeshArrays]
+
+
+def combine_mass_properties(
+        properties: list[MassProperties],
+) -> Optional[MassProperties]:
+    """Return the mass properties of the union of disjoint bodies."""
+    properties = [p for p in properties if p.volume_mm3 > 0.0]
+    if not properties:
+        return None
+    volumes = np.array([p.volume_mm3 for p in properties])
+    centers = np.array([p.center_of_gravity for p in properties])
+    volume = float(volumes.sum())
+    center = (volumes[:, np.newaxis] * centers).sum(axis=0) / volume
+    matrix = np.zeros((3, 3))
+    for p, v, c in zip(properties, volumes, centers):
+        # Parallel axis theorem.
+        r = c - center
+        matrix += p.matrix_of_inertia + v * (np.dot(r, r) * np.eye(3) - np.outer(r, r))
+    return MassProperties(volume, center, matrix)
+
+
+def shape_mass_properties(shape: Part.Shape) -> Optional[MassProperties]:
+    """Return the mass properties of the solids of a shape, or None."""
+    try:
+        volume = shape.Volume
+        if volume > 0.0:
+            return MassProperties(
+                volume,
+                np.array(shape.CenterOfGravity),
+                np.array(shape.MatrixOfInertia.A).reshape(4, 4)[:3, :3],
+            )
+    except (AttributeError, RuntimeError):
+        # Compounds may not have a center of gravity.
+        pass
+    properties: list[MassProperties] = []
+    for solid in shape.Solids:
+        try:
+            if solid.Volume > 0.0:
+                properties.append(MassProperties(
+                    solid.Volume,
+                    np.array(solid.CenterOfGravity),
+                    np.array(solid.MatrixOfInertia.A).reshape(4, 4)[:3, :3],
+                ))
+        except (AttributeError, RuntimeError):
+            continue
+    return combine_mass_properties(properties)
+
+
+def mesh_mass_properties(mesh: MeshArrays) -> Optional[MassProperties]:
+    """Return the mass properties of the volume enclosed by a mesh, or None.
+
+    The mesh must be closed, its orientation doesn't matter.
+
+    """
+    if len(mesh.triangles) == 0:
+        return None
+    # Vertices of the triangles, shape (M, 3, 3).
+    corners = mesh.vertices[mesh.triangles]
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    # Signed volumes of the tetrahedra (origin, a, b, c).
+    volumes = np.einsum('ij,ij->i', a, np.cross(b, c)) / 6.0
+    volume = volumes.sum()
+    if abs(volume) <= 0.0:
+        return None
+    s = a + b + c
+    center = (volumes[:, np.newaxis] * s).sum(axis=0) / (4.0 * volume)
+    # Second moments relative to the origin, integral of x.x^T over the
+    # volume: sum of V / 20 * (a.a^T + b.b^T + c.c^T + s.s^T).
+    second_moments = np.einsum(
+        'i,ijk->jk',
+        volumes / 20.0,
+        (
+            np.einsum('ij,ik->ijk', a, a)
+            + np.einsum('ij,ik->ijk', b, b)
+            + np.einsum('ij,ik->ijk', c, c)
+            + np.einsum('ij,ik->ijk', s, s)
+        ),
+    )
+    if volume < 0.0:
+        # Inward normals.
+        volume = -volume
+        second_moments = -second_moments
+    # Relative to the center of gravity.
+    second_moments -= volume * np.outer(center, center)
+    matrix = np.trace(second_moments) * np.eye(3) - second_moments
+    return MassProperties(float(volume), center, matrix)
+
+
+def get_geometry_key(geometry: Geometry) -> str:
+    """Return a hash of the geometry, independent of the object."""
+    geometry_hash = hashlib.sha256()
+    if isinstance(geometry, MeshArrays):
+        geometry_hash.update(b'mesh')
+        geometry_hash.update(np.ascontiguousarray(geometry.vertices, dtype=np.float64).tobytes())
+        geometry_hash.update(np.ascontiguousarray(geometry.triangles, dtype=np.int64).tobytes())
+    else:
+        geometry_hash.update(b'brep')
+        geometry_hash.update(geometry.exportBrepToString().encode())
+    return geometry_hash.hexdigest()
+
+
+def get_real_geometries(link: DO) -> list[Geometry]:
+    """Return the geometries of the Real objects of a Cross::Link.
+
+    Must be called from the main thread. The placement of each Real object is
+    ignored, as the geometries are relative to the link. Deferred Real
+    geometries (see `lazy_lod` in `robot_from_urdf`) are created first.
+
+    """
+    link.Proxy.materialize(['real'])
+    geometries: list[Geometry] = []
+    for obj in link.Real:
+        try:
+            shape = Part.getShape(obj, '', needSubElement=False, transform=False)
+        except Exception:
+            shape = Part.Shape()
+        if (not shape.isNull()) and shape.Solids:
+            geometries.append(shape)
+            continue
+        mesh = _get_mesh(obj)
+        if mesh is not None:
+            geometries.append(mesh)
+    return geometries
+
+
+def _get_mesh(obj: DO) -> Optional[MeshArrays]:
+    """Return the mesh of a mesh object or link to it, or None."""
+    linked_obj = get_linked_obj(obj)
+    if not hasattr(linked_obj, 'Mesh'):
+        return None
+    mesh = linked_obj.Mesh.copy()
+    mesh.Placement = fc.Placement()
+    points, facets = mesh.Topology
+    if not facets:
+        return None
+    return MeshArrays(
+        np.array(points, dtype=np.float64).reshape(-1, 3),
+        np.array(facets, dtype=np.int64).reshape(-1, 3),
+    )
+
+
+class MassPropertiesEngine:
+    """Evaluate the mass properties of geometries, cached.
+
+    Must be called from the main thread. Shapes are evaluated in the calling
+    thread, meshes in worker threads. The number of threads is the workbench
+    parameter `wb_globals.PREF_MASS_PROPERTIES_WORKERS`, with at most one
+    thread the meshes are also evaluated in the calling thread.
+
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = get_workbench_param(
+                wb_globals.PREF_MASS_PROPERTIES_WORKERS,
+                os.cpu_count() or 1,
+            )
+        self.workers = max(int(workers), 1)
+        # Geometry key -> MassProperties or None if the geometry has no volume.
+        self._cache: OrderedDict[str, Optional[MassProperties]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Statistics of the last call to `compute()`.
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def compute(
+            self,
+            geometries: dict[str, list[Geometry]],
+    ) -> dict[str, Optional[MassProperties]]:
+        """Return the combined mass properties of each list of geometries.
+
+        Parameters
+        ----------
+        - geometries: lists of geometries by name, e.g. by link name.
+
+        Return None for the names without any geometry with volume.
+
+        """
+        self.hit_count = 0
+        self.miss_count = 0
+        jobs = [g for gs in geometries.values() for g in gs]
+        results: list[Optional[MassProperties]] = [None] * len(jobs)
+        mesh_indices: list[int] = []
+        for i, geometry in enumerate(jobs):
+            if isinstance(geometry, MeshArrays):
+                mesh_indices.append(i)
+            else:
+                results[i] = self._evaluate(geometry)
+        meshes = [jobs[i] for i in mesh_indices]
+        if (self.workers > 1) and (len(meshes) > 1):
+            with ThreadPoolExecutor(
+                    max_workers=min(self.workers, len(meshes)),
+                    thread_name_prefix='cross-mass-properties',
+            ) as executor:
+                mesh_results = list(executor.map(self._evaluate, meshes))
+        else:
+            mesh_results = [self._evaluate(m) for m in meshes]
+        for i, mesh_result in zip(mesh_indices, mesh_results):
+            results[i] = mesh_result
+
+        properties: dict[str, Optional[MassProperties]] = {}
+        i = 0
+        for name, link_geometries in geometries.items():
+            link_results = results[i:i + len(link_geometries)]
+            i += len(link_geometries)
+            properties[name] = combine_mass_properties(
+                [r for r in link_results if r is not None],
+            )
+        return properties
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _evaluate(self, geometry: Geometry) -> Optional[MassProperties]:
+        key = get_geometry_key(geometry)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hit_count += 1
+                return self._cache[key]
+        if isinstance(geometry, MeshArrays):
+            properties = mesh_mass_properties(geometry)
+        else:
+            properties = shape_mass_properties(geometry)
+        with self._lock:
+            self.miss_count += 1
+            self._cache[key] = properties
+            while len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return properties
+
+
+_engine: Optional[MassPropertiesEngine] = None
+
+
+def get_mass_properties_engine() -> MassPropertiesEngine:
+    """Return the session-wide engine, whose cache is kept between calls."""
+    global _engine
+    if _engine is None:
+        _engine = MassPropertiesEngine()
+    return _engine
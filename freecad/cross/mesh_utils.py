@@ -2,21 +2,34 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+import hashlib
+import json
+import os
 from pathlib import Path
 import subprocess
 import tempfile
-from typing import Iterable
+import threading
+import time
+from typing import Any, Iterable, Optional
 
 import FreeCAD as fc
 
 import Mesh  # FreeCAD
+import numpy as np
 
 from . import wb_globals
 from .deep_copy import deep_copy_object
+from .exceptions import MeshReadError
 from .freecad_utils import is_mesh
+from .freecad_utils import is_part
+from .freecad_utils import message
 from .freecad_utils import warn
-from .import_dae import export as export_dae
-from .import_dae import read as read_dae
+from .import_dae import get_export_data as get_dae_export_data
+from .import_dae import mesh_from_triangles
+from .import_dae import parse_meshes as parse_dae_meshes
+from .import_dae import write as write_dae
+from .utils import get_valid_filename
 from .wb_gui_utils import WbSettingsGetter
 from .wb_utils import get_workbench_param
 from .wb_utils import set_workbench_param
@@ -29,22 +42,54 @@ DOList = Iterable[DO]
 def read_mesh_dae(
         filename: Path | str,
 ) -> Mesh.Mesh:
+    """Return the merged mesh of all geometries of a dae file.
+
+    No document object is created and the console is not used, so that the
+    function can be called from a worker thread.
+    Raise `MeshReadError` if the file cannot be read.
+
+    """
+    try:
+        meshes = parse_dae_meshes(str(filename))
+    except Exception as e:
+        raise MeshReadError(f'Parse error: {e}. File: {filename}') from e
+    if not meshes:
+        return Mesh.Mesh()
+    triangles = np.concatenate([triangles for triangles, _ in meshes])
+    return mesh_from_triangles(triangles)
+
+
+def get_mesh_dae_data(obj: DO) -> dict[str, Any]:
+    """Return the tessellated data of a FreeCAD object for `write_mesh_dae`.
+
+    Must be called from the main thread.
+
+    """
     current_doc = fc.activeDocument()
-    path = Path(filename)
-    # `read_dae` does not export its object, so we need to let it create an
-    # object in a temporary document.
+    # `get_dae_export_data` doesn't support links. Deep copy the shape in a
+    # new temporary document and export them.
     tmp_doc = fc.newDocument(hidden=True, temp=True)
-    fc.setActiveDocument(tmp_doc.Name)
-    read_dae(str(path))
-    tmp_doc.recompute()
-    merged_raw_mesh = Mesh.Mesh()
-    for mesh_obj in tmp_doc.Objects:
-        if hasattr(mesh_obj, 'Mesh'):
-            merged_raw_mesh.addMesh(mesh_obj.Mesh)
-    fc.closeDocument(tmp_doc.Name)
-    if current_doc:
-        fc.setActiveDocument(current_doc.Name)
-    return merged_raw_mesh
+    try:
+        copies = deep_copy_object(obj, tmp_doc)
+        data = get_dae_export_data(copies)
+    finally:
+        fc.closeDocument(tmp_doc.Name)
+        if current_doc:
+            fc.setActiveDocument(current_doc.Name)
+    return data
+
+
+def write_mesh_dae(
+    data: dict[str, Any],
+    filename: Path | str,
+) -> None:
+    """Write the data from `get_mesh_dae_data` into a Collada file.
+
+    Doesn't use FreeCAD and can be called from a worker thread.
+
+    """
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+    write_dae(data, str(filename))
 
 
 def save_mesh_dae(
@@ -52,15 +97,383 @@ def save_mesh_dae(
     filename: Path | str,
 ) -> None:
     """Save the mesh of a FreeCAD object into a Collada file."""
-    current_doc = fc.activeDocument()
-    # `export_dae` doesn't support links. Deep copy the shape in a new
-    # temporary document and export them.
-    tmp_doc = fc.newDocument(hidden=True, temp=True)
-    copies = deep_copy_object(obj, tmp_doc)
-    Path(filename).parent.mkdir(parents=True, exist_ok=True)
-    export_dae(copies, str(filename))
-    if current_doc:
-        fc.setActiveDocument(current_doc.Name)
+    write_mesh_dae(get_mesh_dae_data(obj), filename)
+
+
+@dataclass
+class MeshExportTiming:
+    """Time spent to export a mesh, in seconds."""
+
+    filename: str
+    tessellation: float = 0.0
+    write: float = 0.0
+
+
+class MeshExportPipeline:
+    """Export meshes into files and report the time spent on each mesh.
+
+    The tessellation needs FreeCAD objects and is done by `submit()` in the
+    calling thread, which must be the main thread, as well as the writing of
+    the file. `finish()` records the exported meshes in the cache and
+    reports the timings.
+
+    Implementation note: the export doesn't scale with the number of cores.
+    The tessellation uses FreeCAD objects, and the writing of Collada files
+    was dominated by pycollada's formatting of the arrays as text, which
+    holds the GIL. This formatting is now done with NumPy by
+    `import_dae.write()`, which makes the writing several times faster.
+
+    """
+
+    def __init__(
+            self,
+            mesh_cache: Optional[MeshExportCache] = None,
+    ):
+        """Constructor.
+
+        Parameters
+        ----------
+        - mesh_cache: if given, the exported meshes are recorded in the cache
+                      by `finish()`.
+
+        """
+        self.mesh_cache = mesh_cache
+        self.timings: list[MeshExportTiming] = []
+        # List of (object, timing).
+        self._jobs: list[tuple[DO, MeshExportTiming]] = []
+        self._paths: set[Path] = set()
+
+    def submit(self, obj: DO, filename: Path | str) -> None:
+        """Tessellate `obj` and write its mesh file.
+
+        Objects submitted for a file already submitted are ignored.
+
+        """
+        path = Path(filename)
+        if path in self._paths:
+            return
+        self._paths.add(path)
+        timing = MeshExportTiming(path.name)
+        start = time.perf_counter()
+        data = get_mesh_dae_data(obj)
+        timing.tessellation = time.perf_counter() - start
+        self._write(data, path, timing)
+        self._jobs.append((obj, timing))
+
+    @staticmethod
+    def _write(
+            data: dict[str, Any],
+            path: Path,
+            timing: MeshExportTiming,
+    ) -> None:
+        start = time.perf_counter()
+        write_mesh_dae(data, path)
+        timing.write = time.perf_counter() - start
+
+    def finish(self) -> list[MeshExportTiming]:
+        """Record the exported meshes and return the timings."""
+        for obj, timing in self._jobs:
+            if self.mesh_cache is not None:
+                self.mesh_cache.set_exported(obj)
+            self.timings.append(timing)
+            fc.Console.PrintLog(
+                f'Mesh "{timing.filename}": tessellation'
+                f' {timing.tessellation:.3f} s, write {timing.write:.3f} s\n',
+            )
+        if self.timings:
+            message(
+                f'Exported {len(self.timings)} meshes,'
+                f' tessellation {sum(t.tessellation for t in self.timings):.3f} s,'
+                f' write {sum(t.write for t in self.timings):.3f} s (cumulated)',
+            )
+        self._jobs.clear()
+        return list(self.timings)
+
+
+def get_mesh_export_hash(obj: DO) -> str:
+    """Return a hash of what `save_mesh_dae(obj)` would write.
+
+    The hash covers the geometry (shape or mesh), the placement, the color,
+    and the tessellation and scaling parameters of the Collada exporter.
+    Return an empty string if the geometry of `obj` cannot be hashed, for
+    example for containers.
+
+    """
+    if is_part(obj):
+        # The geometry is given by the children.
+        return ''
+    md5 = hashlib.md5()
+    if is_mesh(obj):
+        points, facets = obj.Mesh.Topology
+        md5.update(b'mesh')
+        md5.update(np.array(points, dtype=np.float64).reshape(-1, 3).tobytes())
+        md5.update(np.array(facets, dtype=np.int64).reshape(-1, 3).tobytes())
+    elif hasattr(obj, 'Shape') and (not obj.Shape.isNull()):
+        md5.update(b'shape')
+        md5.update(obj.Shape.exportBrepToString().encode())
+    else:
+        return ''
+    if hasattr(obj, 'Placement'):
+        md5.update(repr(obj.Placement.toMatrix().A).encode())
+    if (
+        fc.GuiUp
+        and hasattr(obj, 'ViewObject')
+        and hasattr(obj.ViewObject, 'ShapeColor')
+    ):
+        md5.update(repr(obj.ViewObject.ShapeColor).encode())
+    # Parameters used by `import_dae.export`.
+    arch_params = fc.ParamGet('User parameter:BaseApp/Preferences/Mod/Arch')
+    md5.update(repr((
+        arch_params.GetInt('ColladaMesher', 0),
+        arch_params.GetFloat('ColladaTessellation', 1.0),
+        arch_params.GetFloat('ColladaGrading', 0.3),
+        arch_params.GetInt('ColladaSegsPerEdge', 1),
+        arch_params.GetInt('ColladaSegsPerRadius', 2),
+        arch_params.GetBool('ColladaSecondOrder', False),
+        arch_params.GetBool('ColladaOptimize', True),
+        arch_params.GetBool('ColladaAllowQuads', False),
+        arch_params.GetFloat('ColladaScalingFactor', 1.0),
+    )).encode())
+    return md5.hexdigest()
+
+
+class MeshExportCache:
+    """Persistent cache of the meshes exported into a directory.
+
+    Map the hash of exported objects (see `get_mesh_export_hash()`) to the
+    file they were exported to, so that unchanged meshes are not exported
+    again and identical meshes are exported only once, with a stable file
+    name. The map is saved as JSON into the directory by `save()`.
+
+    A cache instance is meant to be used for a single export, the hash of
+    each object is computed only once.
+
+    """
+
+    manifest_filename = '.mesh_export_cache.json'
+
+    # Increase when the format of the manifest or of the hash changes.
+    version = 1
+
+    def __init__(self, meshes_dir: Path | str):
+        self.meshes_dir = Path(meshes_dir)
+        # Map {hash: {'filename': str, 'size': int, 'mtime_ns': int}}.
+        # 'size' and 'mtime_ns' are only set once the file was written.
+        self._entries: dict[str, dict] = {}
+        self._hashes: dict[DO, str] = {}
+        self._load()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.meshes_dir / self.manifest_filename
+
+    def _load(self) -> None:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return
+        if (
+            (not isinstance(manifest, dict))
+            or (manifest.get('version') != self.version)
+        ):
+            return
+        # Drop the entries whose file was removed, e.g. by hand or by a
+        # cleanup of the directory, so that the manifest doesn't grow forever.
+        self._entries = {
+            h: e for h, e in manifest.get('meshes', {}).items()
+            if isinstance(e, dict)
+            and (self.meshes_dir / e.get('filename', '')).is_file()
+        }
+
+    def save(self) -> None:
+        """Write the map of the exported meshes into the directory."""
+        entries = {h: e for h, e in self._entries.items() if 'size' in e}
+        if (not entries) and (not self.manifest_path.exists()):
+            return
+        self.meshes_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {'version': self.version, 'meshes': entries}
+        self.manifest_path.write_text(json.dumps(manifest, indent=1))
+
+    def get_hash(self, obj: DO) -> str:
+        """Return the memoized result of `get_mesh_export_hash(obj)`."""
+        if obj not in self._hashes:
+            self._hashes[obj] = get_mesh_export_hash(obj)
+        return self._hashes[obj]
+
+    def get_filename(self, obj: DO, stem: str) -> str:
+        """Return the name of the mesh file for `obj`.
+
+        Return the name of the file an identical mesh was exported to, if
+        any, or a name derived from `stem` and the hash of `obj`.
+
+        """
+        geometry_hash = self.get_hash(obj)
+        if not geometry_hash:
+            return get_valid_filename(f'{stem}.dae')
+        entry = self._entries.get(geometry_hash)
+        if entry is None:
+            entry = {'filename': get_valid_filename(f'{stem}_{geometry_hash[:12]}.dae')}
+            self._entries[geometry_hash] = entry
+        return entry['filename']
+
+    def is_up_to_date(self, obj: DO) -> bool:
+        """Return True if the mesh file of `obj` exists and is unchanged."""
+        geometry_hash = self.get_hash(obj)
+        entry = self._entries.get(geometry_hash)
+        if (not geometry_hash) or (entry is None) or ('size' not in entry):
+            return False
+        try:
+            stat = (self.meshes_dir / entry['filename']).stat()
+        except OSError:
+            return False
+        return (
+            (stat.st_size == entry['size'])
+            and (stat.st_mtime_ns == entry['mtime_ns'])
+        )
+
+    def set_exported(self, obj: DO) -> None:
+        """Record that the mesh file of `obj` was written."""
+        geometry_hash = self.get_hash(obj)
+        entry = self._entries.get(geometry_hash)
+        if (not geometry_hash) or (entry is None):
+            return
+        try:
+            stat = (self.meshes_dir / entry['filename']).stat()
+        except OSError:
+            return
+        entry['size'] = stat.st_size
+        entry['mtime_ns'] = stat.st_mtime_ns
+
+
+def get_file_hash(path: Path | str) -> str:
+    """Return the SHA-256 hash of the content of a file."""
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_default_solid_cache_dir() -> Path:
+    """Return the default directory of `MeshSolidCache`."""
+    if hasattr(fc, 'getUserCachePath'):
+        return Path(fc.getUserCachePath()) / 'cross' / 'mesh_solids'
+    return Path(fc.getUserAppDataDir()) / 'cross_cache' / 'mesh_solids'
+
+
+class MeshSolidCache:
+    """On-disk cache of the solids converted from mesh files.
+
+    The solids are saved as BREP files named after the hash of the mesh file
+    and of the conversion options, so that importing the same meshes again
+    skips both reading and conversion.
+    The total size of the directory is bounded by the workbench parameter
+    `wb_globals.PREF_SOLID_CACHE_SIZE` (in MB, 0 disables the cache), the
+    least recently used files are removed first.
+    Thread-safe.
+
+    """
+
+    # Increase when the conversion from mesh to solid changes.
+    version = 1
+
+    def __init__(
+            self,
+            cache_dir: Optional[Path | str] = None,
+            max_size_mb: Optional[float] = None,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_default_solid_cache_dir()
+        if max_size_mb is None:
+            max_size_mb = get_workbench_param(wb_globals.PREF_SOLID_CACHE_SIZE, 2048)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get_key(
+            self,
+            mesh_path: Path | str,
+            scale: Optional[tuple[float, float, float]] = None,
+            remove_solid_splitter: bool = False,
+    ) -> str:
+        """Return the cache key for the conversion of a mesh file."""
+        options = json.dumps([
+            self.version,
+            get_file_hash(mesh_path),
+            list(scale) if scale is not None else None,
+            remove_solid_splitter,
+        ])
+        return hashlib.sha256(options.encode()).hexdigest()
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.brep'
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached `Part.Shape` or None."""
+        if not self.enabled:
+            return None
+        path = self._get_path(key)
+        if not path.exists():
+            return None
+        import Part
+        shape = Part.Shape()
+        try:
+            shape.read(str(path))
+        except Exception:
+            return None
+        try:
+            # Keep track of the last use for the eviction.
+            os.utime(path)
+        except OSError:
+            pass
+        return shape
+
+    def add(self, key: str, shape: Any) -> None:
+        """Save a `Part.Shape` and evict old files if the cache is too big."""
+        if not self.enabled:
+            return
+        path = self._get_path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write-and-rename to never expose partial files to other
+            # threads or FreeCAD instances.
+            tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+            shape.exportBrep(str(tmp_path))
+            os.replace(tmp_path, path)
+        except (OSError, RuntimeError):
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[int, int, Path]] = []
+            total_size = 0
+            for path in self.cache_dir.glob('*.brep'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total_size += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total_size -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.cache_dir.glob('*.brep'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
 
 
 def read_mesh(
@@ -13,6 +13,8 @@ VPPlanningSceneProxy = ForwardRef('VPPlanningSceneProxy')
 
 
 class PlanningScene(DO):
+    LiveTopic: str
+    LiveUpdate: bool
     _Type: str
 
 
@@ -13,7 +13,11 @@ from .freecad_utils import ProxyBase
 from .freecad_utils import add_property
 from .freecad_utils import warn
 from .gui_utils import tr
-from .planning_scene_utils import coin_from_planning_scene_msg
+from .planning_scene_utils import PlanningSceneChanges
+from .planning_scene_utils import coin_from_collision_object
+from .planning_scene_utils import coin_from_octomap
+from .planning_scene_utils import merge_planning_scene_diff
+from .planning_scene_utils import update_transform_from_pose
 from .wb_utils import ICON_PATH
 from .wb_utils import is_robot
 
@@ -44,6 +48,8 @@ class PlanningSceneProxy(ProxyBase):
             [
                 '_Type',
                 'Robot',
+                'LiveUpdate',
+                'LiveTopic',
             ],
         )
         obj.Proxy = self
@@ -51,6 +57,9 @@ class PlanningSceneProxy(ProxyBase):
 
         self.planning_scene_msg = planning_scene_msg
 
+        # Subscription to diffs of the planning scene, see `LiveUpdate`.
+        self._subscription = None
+
         self.init_properties(obj)
 
     def init_properties(self, obj: CrossPlanningScene):
@@ -66,6 +75,20 @@ class PlanningSceneProxy(ProxyBase):
                 tr('The associated robot.'),
         )
 
+        add_property(
+                obj, 'App::PropertyBool', 'LiveUpdate', 'ROS',
+                tr('Mirror the planning scene published by MoveIt on'
+                   ' `LiveTopic`, only the differences are redrawn.'
+                   ' Not restored when opening the document.'),
+                False,
+        )
+
+        add_property(
+                obj, 'App::PropertyString', 'LiveTopic', 'ROS',
+                tr('The topic of the planning scene diffs for `LiveUpdate`.'),
+                'monitored_planning_scene',
+        )
+
     def execute(self, obj: CrossPlanningScene) -> None:
         self._update_robot_joint_values()
 
@@ -75,10 +98,15 @@ class PlanningSceneProxy(ProxyBase):
                 if obj.Robot:
                     warn('The selected object is not a robot, rejecting.', True)
                 obj.Robot = None
+        if prop in ('LiveUpdate', 'LiveTopic'):
+            self._update_subscription()
 
     def onDocumentRestored(self, obj):
         """Restore attributes because __init__ is not called on restore."""
         self.__init__(obj)
+        # Don't subscribe automatically when opening a document.
+        if obj.LiveUpdate:
+            obj.LiveUpdate = False
 
     def dumps(self):
         return self.Type,
@@ -89,11 +117,48 @@ class PlanningSceneProxy(ProxyBase):
             self.Type, = state
 
     def update_scene(self, planning_scene_msg: PlanningSceneMsg) -> None:
-        """Update the scene with a new PlanningScene message."""
-        self.planning_scene_msg = planning_scene_msg
-        self.scene.recompute()
+        """Update the scene with a new PlanningScene message.
+
+        If `planning_scene_msg.is_diff` is True, the message is merged into
+        the current scene and only the changed collision objects are
+        redrawn.
+
+        """
+        if planning_scene_msg.is_diff and (self.planning_scene_msg is not None):
+            changes = merge_planning_scene_diff(
+                    self.planning_scene_msg,
+                    planning_scene_msg,
+            )
+        else:
+            self.planning_scene_msg = planning_scene_msg
+            changes = PlanningSceneChanges(full=True, robot_state=True)
+        if changes.robot_state:
+            self.scene.recompute()
         if self.scene.ViewObject and self.scene.ViewObject.Proxy:
-            self.scene.ViewObject.Proxy.draw()
+            self.scene.ViewObject.Proxy.apply_changes(changes)
+
+    def _update_subscription(self) -> None:
+        if not self.is_execute_ready():
+            return
+        self.stop_subscription()
+        if not self.scene.LiveUpdate:
+            return
+        if not (hasattr(fc, 'GuiUp') and fc.GuiUp):
+            return
+        # Import late to avoid loading ROS modules when not used.
+        from .ros.planning_scene import PlanningSceneSubscription
+
+        self._subscription = PlanningSceneSubscription(
+                self.update_scene,
+                self.scene.LiveTopic,
+        )
+        if not self._subscription.start():
+            self._subscription = None
+
+    def stop_subscription(self) -> None:
+        if getattr(self, '_subscription', None) is not None:
+            self._subscription.stop()
+            self._subscription = None
 
     def export_urdf(self, interactive: bool = False) -> Optional[et.Element]:
         """Export the scene as URDF, writing files."""
@@ -140,6 +205,11 @@ class _ViewProviderPlanningScene(ProxyBase):
     def _init(self, vobj: VP) -> None:
         self.view_object = vobj
         self.scene = vobj.Object
+        # The group of collision objects and their separator by id, to
+        # update only the changed objects.
+        self._scene_group: Optional[coin.SoSeparator] = None
+        self._co_separators: dict[str, coin.SoSeparator] = {}
+        self._octomap_separator: Optional[coin.SoSeparator] = None
         self._init_properties(vobj)
 
     def _init_properties(self, vobj: VP):
@@ -186,6 +256,11 @@ class _ViewProviderPlanningScene(ProxyBase):
     def onChanged(self, vobj: VP, prop: str) -> None:
         self.draw()
 
+    def onDelete(self, vobj: VP, subelements) -> bool:
+        if hasattr(vobj.Object.Proxy, 'stop_subscription'):
+            vobj.Object.Proxy.stop_subscription()
+        return True
+
     def getDisplayModes(self, vobj: VP) -> list[str]:
         """Return a list of display modes."""
         modes = []
@@ -221,6 +296,9 @@ class _ViewProviderPlanningScene(ProxyBase):
         style = coin.SoDrawStyle()
         style.style = coin.SoDrawStyle.LINES
         self.wireframe.addChild(style)
+        self._scene_group = None
+        self._co_separators.clear()
+        self._octomap_separator = None
 
         if not self.view_object.Visibility:
             return
@@ -228,13 +306,56 @@ class _ViewProviderPlanningScene(ProxyBase):
         if not msg:
             return
 
-        planning_scene_group = coin_from_planning_scene_msg(
-                msg,
+        # Same structure as `coin_from_planning_scene_msg()` but keep the
+        # separators for `apply_changes()`.
+        self._scene_group = coin.SoSeparator()
+        for co in msg.world.collision_objects:
+            self._add_collision_object(co)
+        if msg.world.octomap.octomap.data:
+            self._octomap_separator = coin_from_octomap(msg.world.octomap)
+            self._scene_group.addChild(self._octomap_separator)
+        self.shaded.addChild(self._scene_group)
+        self.wireframe.addChild(self._scene_group)
+
+    def apply_changes(self, changes: PlanningSceneChanges) -> None:
+        """Update the Coin nodes of the changed collision objects only."""
+        if (
+                changes.full
+                or (self._scene_group is None)
+                or (not self.is_execute_ready())
+                or (not hasattr(self.scene.Proxy, 'planning_scene_msg'))
+        ):
+            self.draw()
+            return
+        msg = self.scene.Proxy.planning_scene_msg
+        objects = {co.id: co for co in msg.world.collision_objects}
+        for id_ in changes.removed | changes.rebuilt:
+            separator = self._co_separators.pop(id_, None)
+            if separator is not None:
+                self._scene_group.removeChild(separator)
+        for id_ in changes.rebuilt:
+            if id_ in objects:
+                self._add_collision_object(objects[id_])
+        for id_ in changes.moved:
+            separator = self._co_separators.get(id_)
+            if (separator is not None) and (id_ in objects):
+                # The first child is the transform, see
+                # `coin_from_collision_object()`.
+                update_transform_from_pose(separator.getChild(0), objects[id_].pose)
+        if changes.octomap:
+            if self._octomap_separator is not None:
+                self._scene_group.removeChild(self._octomap_separator)
+            self._octomap_separator = coin_from_octomap(msg.world.octomap)
+            self._scene_group.addChild(self._octomap_separator)
+
+    def _add_collision_object(self, co) -> None:
+        separator = coin_from_collision_object(
+                co,
                 plane_sides_mm=self.view_object.PlaneSides,
                 subframe_length_mm=self.view_object.SubframeSize,
         )
-        self.shaded.addChild(planning_scene_group)
-        self.wireframe.addChild(planning_scene_group)
+        self._scene_group.addChild(separator)
+        self._co_separators[co.id] = separator
 
 
 def make_planning_scene(
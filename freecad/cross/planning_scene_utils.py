@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from typing import Callable
 
 import FreeCAD as fc
 
+import numpy as np
+
 from geometry_msgs.msg import Pose
 
 from moveit_msgs.msg import PlanningScene
 from moveit_msgs.msg import PlanningSceneWorld
 from moveit_msgs.msg import CollisionObject
+from octomap_msgs.msg import OctomapWithPose
 
 from shape_msgs.msg import Mesh
 from shape_msgs.msg import Plane
@@ -17,6 +21,126 @@ from shape_msgs.msg import SolidPrimitive
 from pivy import coin
 
 from .coin_utils import frame_group
+from .freecad_utils import warn
+
+# Depth of the octree of an octomap, as in `octomap::OcTree`.
+_OCTREE_DEPTH = 16
+_OCTREE_MAX_KEY = 1 << (_OCTREE_DEPTH - 1)
+
+# Corners of a unit cube centered on the origin and its triangles, for
+# `coin_mesh_from_voxels()`.
+_CUBE_CORNERS = np.array(
+    [
+        [-0.5, -0.5, -0.5], [0.5, -0.5, -0.5],
+        [0.5, 0.5, -0.5], [-0.5, 0.5, -0.5],
+        [-0.5, -0.5, 0.5], [0.5, -0.5, 0.5],
+        [0.5, 0.5, 0.5], [-0.5, 0.5, 0.5],
+    ],
+)
+_CUBE_TRIANGLES = np.array(
+    [
+        [0, 2, 1], [0, 3, 2],  # Bottom.
+        [4, 5, 6], [4, 6, 7],  # Top.
+        [0, 1, 5], [0, 5, 4],  # Front.
+        [2, 3, 7], [2, 7, 6],  # Back.
+        [1, 2, 6], [1, 6, 5],  # Right.
+        [3, 0, 4], [3, 4, 7],  # Left.
+    ],
+    dtype=np.int32,
+)
+
+
+@dataclass
+class PlanningSceneChanges:
+    """Changes due to a PlanningScene message, see `merge_planning_scene_diff()`."""
+
+    # The whole scene was replaced.
+    full: bool = False
+    # Ids of the collision objects added or whose shapes changed.
+    rebuilt: set[str] = field(default_factory=set)
+    # Ids of the collision objects whose `pose` only changed.
+    moved: set[str] = field(default_factory=set)
+    # Ids of the removed collision objects.
+    removed: set[str] = field(default_factory=set)
+    octomap: bool = False
+    robot_state: bool = False
+
+
+def merge_planning_scene_diff(
+        scene: PlanningScene,
+        diff: PlanningScene,
+) -> PlanningSceneChanges:
+    """Apply a PlanningScene message with `is_diff=True` to `scene`.
+
+    `scene` is modified in place, collision objects are identified by their
+    `id` and their `operation` (ADD, REMOVE, APPEND, MOVE) is applied as by
+    MoveIt. A REMOVE with an empty `id` removes all collision objects.
+
+    Returns:
+    - the changes to apply to the Coin representation of `scene`.
+
+    """
+    changes = PlanningSceneChanges()
+    objects: dict[str, CollisionObject] = {
+        co.id: co for co in scene.world.collision_objects
+    }
+    for co in diff.world.collision_objects:
+        if co.operation == CollisionObject.REMOVE:
+            ids = [co.id] if co.id else list(objects)
+            for id_ in ids:
+                if objects.pop(id_, None) is not None:
+                    changes.removed.add(id_)
+                changes.rebuilt.discard(id_)
+                changes.moved.discard(id_)
+            continue
+        old_co = objects.get(co.id)
+        if (co.operation == CollisionObject.ADD) or (old_co is None):
+            co.operation = CollisionObject.ADD
+            objects[co.id] = co
+            changes.rebuilt.add(co.id)
+            changes.moved.discard(co.id)
+        elif co.operation == CollisionObject.APPEND:
+            for shapes, poses in (
+                    ('primitives', 'primitive_poses'),
+                    ('meshes', 'mesh_poses'),
+                    ('planes', 'plane_poses'),
+            ):
+                setattr(old_co, shapes, list(getattr(old_co, shapes)) + list(getattr(co, shapes)))
+                setattr(old_co, poses, list(getattr(old_co, poses)) + list(getattr(co, poses)))
+            changes.rebuilt.add(co.id)
+            changes.moved.discard(co.id)
+        elif co.operation == CollisionObject.MOVE:
+            old_co.pose = co.pose
+            shape_poses_changed = False
+            for poses in ('primitive_poses', 'mesh_poses', 'plane_poses'):
+                new_poses = list(getattr(co, poses))
+                if new_poses and (len(new_poses) == len(getattr(old_co, poses))):
+                    setattr(old_co, poses, new_poses)
+                    shape_poses_changed = True
+            if shape_poses_changed:
+                changes.rebuilt.add(co.id)
+            if co.id not in changes.rebuilt:
+                changes.moved.add(co.id)
+    scene.world.collision_objects = list(objects.values())
+
+    if diff.world.octomap.octomap.data:
+        scene.world.octomap = diff.world.octomap
+        changes.octomap = True
+
+    joint_state = diff.robot_state.joint_state
+    if joint_state.name:
+        if diff.robot_state.is_diff:
+            positions = dict(zip(
+                scene.robot_state.joint_state.name,
+                scene.robot_state.joint_state.position,
+            ))
+            positions.update(zip(joint_state.name, joint_state.position))
+            scene.robot_state.joint_state.name = list(positions.keys())
+            scene.robot_state.joint_state.position = list(positions.values())
+        else:
+            scene.robot_state = diff.robot_state
+        changes.robot_state = True
+    return changes
 
 
 def coin_from_planning_scene_msg(
@@ -56,7 +180,8 @@ def coin_from_planning_scene_world(
 ) -> coin.SoSeparator:
     """Convert a moveit_msgs.msg.PlanningSceneWorld to Coin3D.
 
-    Only the collision objects are considered for now, not the octomap.
+    The collision objects and the occupied voxels of a binary octomap are
+    considered.
 
     Parameters:
     - scene: moveit_msgs.msg.PlanningSceneWorld
@@ -75,6 +200,8 @@ def coin_from_planning_scene_world(
                 subframe_length_mm=subframe_length_mm,
             ),
         )
+    if world.octomap.octomap.data:
+        separator.addChild(coin_from_octomap(world.octomap))
     return separator
 
 
@@ -161,7 +288,15 @@ def transform_from_pose(pose: Pose) -> coin.SoTransform:
 
     """
     so_transform = coin.SoTransform()
+    update_transform_from_pose(so_transform, pose)
+    return so_transform
 
+
+def update_transform_from_pose(
+        so_transform: coin.SoTransform,
+        pose: Pose,
+) -> None:
+    """Set an existing SoTransform from a geometry_msgs.msg.Pose."""
     # Extract position and orientation from the Pose message
     ros_to_coin_scale = 1000.0  # m -> mm.
     translation = (
@@ -176,8 +311,6 @@ def transform_from_pose(pose: Pose) -> coin.SoTransform:
     so_transform.translation = translation
     so_transform.rotation = rotation
 
-    return so_transform
-
 
 def str_from_pose(pose: Pose) -> str:
     """Return a string representation of a geometry_msgs.msg.Pose.
@@ -370,28 +503,172 @@ def coin_from_mesh(
 
 
 def coin_mesh_from_shape_mesh(mesh_msg: Mesh) -> coin.SoSeparator:
+    """Convert a shape_msgs.msg.Mesh to Coin3D nodes, without pose."""
+    if not mesh_msg.triangles:
+        return coin.SoSeparator()
     ros_to_coin_scale = 1000.0  # m (ROS) to mm (coin,FreeCAD).
+    vertices = np.array(
+        [(v.x, v.y, v.z) for v in mesh_msg.vertices],
+        dtype=np.float64,
+    ) * ros_to_coin_scale
+    triangles = np.array(
+        [t.vertex_indices for t in mesh_msg.triangles],
+        dtype=np.int32,
+    )
+    return coin_mesh_from_arrays(vertices, triangles)
+
+
+def coin_mesh_from_arrays(
+        vertices: np.ndarray,
+        triangles: np.ndarray,
+) -> coin.SoSeparator:
+    """Return a triangle mesh as Coin3D nodes.
+
+    The Coin fields are filled with one call each.
+
+    Parameters:
+    - vertices: array of shape (N, 3), vertex coordinates in millimeters.
+    - triangles: array of shape (M, 3), vertex indices of each triangle.
+
+    Returns:
+    - coin.SoSeparator with an SoCoordinate3 and an SoIndexedFaceSet.
+
+    """
     mesh = coin.SoSeparator()
-    if mesh_msg.triangles:
-        vertices = coin.SoCoordinate3()
-        vertices.point.setNum(len(mesh_msg.vertices))
-        for i, vertex in enumerate(mesh_msg.vertices):
-            vertices.point.set1Value(
-                i,
-                vertex.x * ros_to_coin_scale,
-                vertex.y * ros_to_coin_scale,
-                vertex.z * ros_to_coin_scale,
+    if len(triangles) == 0:
+        return mesh
+    coordinates = coin.SoCoordinate3()
+    points = np.asarray(vertices, dtype=np.float32).reshape(-1, 3).tolist()
+    coordinates.point.setValues(0, len(points), points)
+
+    # Each triangle is closed by -1.
+    indices = np.full((len(triangles), 4), -1, dtype=np.int32)
+    indices[:, :3] = triangles
+    indices = indices.ravel().tolist()
+    face_set = coin.SoIndexedFaceSet()
+    face_set.coordIndex.setValues(0, len(indices), indices)
+
+    mesh.addChild(coordinates)
+    mesh.addChild(face_set)
+    return mesh
+
+
+def coin_mesh_from_voxels(
+        centers: np.ndarray,
+        sizes: np.ndarray,
+) -> coin.SoSeparator:
+    """Return axis-aligned cubes as a single Coin3D mesh.
+
+    Parameters:
+    - centers: array of shape (N, 3), cube centers in millimeters.
+    - sizes: array of shape (N,), cube sides in millimeters.
+
+    Returns:
+    - coin.SoSeparator, see `coin_mesh_from_arrays()`.
+
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1)
+    vertices = (
+        centers[:, np.newaxis, :]
+        + _CUBE_CORNERS[np.newaxis, :, :] * sizes[:, np.newaxis, np.newaxis]
+    )
+    triangles = (
+        _CUBE_TRIANGLES[np.newaxis, :, :]
+        + (len(_CUBE_CORNERS) * np.arange(len(centers), dtype=np.int32))[:, np.newaxis, np.newaxis]
+    )
+    return coin_mesh_from_arrays(vertices.reshape(-1, 3), triangles.reshape(-1, 3))
+
+
+def occupied_voxels_from_octomap_data(
+        data: bytes,
+        resolution: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the occupied leaves of a binary `octomap::OcTree`.
+
+    Decode the data of an octomap_msgs.msg.Octomap with `binary=True`, i.e.
+    the stream of `octomap::OcTree::writeBinary()`.
+
+    Parameters:
+    - data: the binary stream, as bytes or as signed values.
+    - resolution: size of the smallest voxels, in meters.
+
+    Returns:
+    - array of shape (N, 3), voxel centers in meters,
+    - array of shape (N,), voxel sides in meters.
+
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        # `int8[]` of the message, a sequence of signed values.
+        data = np.asarray(data, dtype=np.int8).tobytes()
+    # Keys and depth of the occupied leaves.
+    keys: list[tuple[int, int, int]] = []
+    depths: list[int] = []
+    offset = 0
+    # Stack of (key, depth) of the inner nodes to read, in stream order.
+    stack = [((_OCTREE_MAX_KEY,) * 3, 0)]
+    while stack:
+        key, depth = stack.pop()
+        if offset + 2 > len(data):
+            raise ValueError('Truncated octomap data')
+        children = data[offset] | (data[offset + 1] << 8)
+        offset += 2
+        center_offset = _OCTREE_MAX_KEY >> (depth + 1)
+        inner_children: list[tuple[tuple[int, int, int], int]] = []
+        for i in range(8):
+            # As in `octomap::OcTree::readBinaryNode()`: 0 unknown, 1 free
+            # leaf, 2 occupied leaf, 3 inner node.
+            status = (children >> (2 * i)) & 3
+            if status in (0, 1):
+                # Unknown or free.
+                continue
+            child_key = tuple(
+                key[k] + (
+                    center_offset if (i & (1 << k))
+                    else -center_offset - (0 if center_offset else 1)
+                )
+                for k in range(3)
             )
+            if status == 2:
+                keys.append(child_key)
+                depths.append(depth + 1)
+            else:
+                inner_children.append((child_key, depth + 1))
+        # Children are read depth-first in order.
+        stack.extend(reversed(inner_children))
 
-        face_set = coin.SoIndexedFaceSet()
-        for t, triangle in enumerate(mesh_msg.triangles):
-            for i, index in enumerate(triangle.vertex_indices):
-                face_set.coordIndex.set1Value(t * 4 + i, int(index))
-            face_set.coordIndex.set1Value(t * 4 + 3, -1)  # Close the triangle.
+    key_array = np.array(keys, dtype=np.float64).reshape(-1, 3) - _OCTREE_MAX_KEY
+    depth_array = np.array(depths, dtype=np.int64)
+    level = np.left_shift(1, _OCTREE_DEPTH - depth_array)
+    sizes = resolution * level
+    centers = (np.floor(key_array / level[:, np.newaxis]) + 0.5) * sizes[:, np.newaxis]
+    return centers, sizes
 
-        mesh.addChild(vertices)
-        mesh.addChild(face_set)
-    return mesh
+
+def coin_from_octomap(octomap: OctomapWithPose) -> coin.SoSeparator:
+    """Convert the occupied voxels of an octomap_msgs.msg.OctomapWithPose.
+
+    Only binary maps of type `OcTree` are supported.
+
+    """
+    separator = coin.SoSeparator()
+    separator.setName('octomap')
+    msg = octomap.octomap
+    if (not msg.binary) or (msg.id != 'OcTree'):
+        warn(f'Only binary OcTree octomaps are supported, got {msg.id}', False)
+        return separator
+    try:
+        centers, sizes = occupied_voxels_from_octomap_data(msg.data, msg.resolution)
+    except ValueError as e:
+        warn(f'Cannot read the octomap: {e}', False)
+        return separator
+    ros_to_coin_scale = 1000.0  # m (ROS) to mm (coin,FreeCAD).
+    separator.addChild(transform_from_pose(octomap.origin))
+    separator.addChild(coin_mesh_from_voxels(
+        centers * ros_to_coin_scale,
+        sizes * ros_to_coin_scale,
+    ))
+    return separator
 
 
 def coin_from_plane(
@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
+import json
 from math import degrees
 from pathlib import Path
-from typing import Any, List, Optional, Tuple
+import threading
+import time
+import xml.etree.ElementTree as et
+from typing import Any, Callable, List, Optional, Tuple
 from typing import TYPE_CHECKING
 
 import FreeCAD as fc
@@ -19,19 +25,27 @@ except:
     from PySide2 import QtGui, QtCore, QtWidgets
 
 from freecad.cross.freecadgui_utils import get_progress_bar, set_collision_appearance
+from . import wb_globals
 from .freecad_utils import add_object
+from .freecad_utils import is_link as is_freecad_link
+from .freecad_utils import is_part
 from .freecad_utils import make_group
+from .freecad_utils import message
 from .freecad_utils import warn
 from .joint_proxy import make_joint
 from .link_proxy import make_link
 from .robot_proxy import make_robot
+from .ros.utils import abs_path_from_ros_path
 from .wb_utils import get_joints
+from .wb_utils import get_workbench_param
 
 try:
+    from .urdf_parser_utils import MeshLoader
     from .urdf_parser_utils import axis_to_z
     from .urdf_parser_utils import obj_from_geometry
     from .urdf_parser_utils import placement_along_z_from_joint
     from .urdf_parser_utils import placement_from_origin
+    from urdf_parser_py.urdf import Link as UrdfLinkClass
 except ModuleNotFoundError:
     pass
 
@@ -71,6 +85,14 @@ urdf_filename = None
 package_path = None
 repository_path = None
 
+# Minimal duration between two processings of the GUI events during an
+# import, in seconds. The objects created in-between form a batch.
+_EVENTS_INTERVAL = 0.1
+
+
+class UrdfImportCancelled(Exception):
+    """Raised when the user cancels the import of a URDF robot."""
+
 
 @dataclass
 class Color:
@@ -116,7 +138,9 @@ def robot_from_urdf_path(
         create_without_solids: bool = False,
         remove_solid_splitter: bool = False,
 ) -> CrossRobot:
-    urdf_robot = get_urdf_robot_from_urdf_filename(
+    # Parse in a worker thread to keep the GUI responsive.
+    urdf_robot = _run_in_worker(
+        get_urdf_robot_from_urdf_filename,
         filename_path,
         package_path,
         repository_path,
@@ -176,24 +200,105 @@ def robot_from_urdf(
         urdf_robot: UrdfRobot,
         create_without_solids: bool = False,
         remove_solid_splitter: bool = False,
-) -> CrossRobot:
-    """Creates a CROSS::Robot from URDF."""
+        cancel_event: Optional[threading.Event] = None,
+        lazy_lod: Optional[bool] = None,
+) -> Optional[CrossRobot]:
+    """Creates a CROSS::Robot from URDF.
+
+    The import runs in stages:
+    - the mesh files are submitted to a pool of worker threads which read and
+      possibly convert them to solids, see `MeshLoader`,
+    - the FreeCAD objects are created in the main thread, link by link, using
+      the meshes as they become available; the GUI events are processed
+      between batches of objects.
+
+    Return None if the import was cancelled, either with the cancel button
+    or by setting `cancel_event`. All objects created are then removed.
+
+    With `lazy_lod` (default: workbench parameter `wb_globals.PREF_LAZY_LOD`),
+    the Real and Collision geometries are not created, only the description
+    to create them, see `materialize_deferred_geometry()`.
+
+    """
+    if lazy_lod is None:
+        lazy_lod = get_workbench_param(wb_globals.PREF_LAZY_LOD, False)
+    # To remove the created objects on cancel, aborting the transaction does
+    # nothing when undo is disabled.
+    names_before = {o.Name for o in doc.Objects}
     doc.openTransaction(tr('Robot from URDF'))
 
     pkg_name = ''
     if current_file.package_path:
         pkg_name = 'of ' + Path(current_file.package_path).name
-    progressBar = get_progress_bar(
+    progress = _ImportProgress(
         title = "Creating model based on URDF/xacro " + pkg_name + ". May take a few minutes...",
-        min = 0,
-        max = len(urdf_robot.links) + len(urdf_robot.joints) + 10,
+        maximum = len(urdf_robot.links) + len(urdf_robot.joints) + 10,
+        cancel_event = cancel_event,
     )
-    progressBar.show()
+    mesh_loader = MeshLoader()
+    try:
+        robot = _build_robot(
+            doc, urdf_robot, progress, mesh_loader,
+            create_without_solids, remove_solid_splitter,
+            lazy_lod,
+        )
+    except UrdfImportCancelled:
+        mesh_loader.shutdown(cancel=True)
+        progress.close()
+        doc.abortTransaction()
+        _remove_new_objects(doc, names_before)
+        message(f'Import of robot "{urdf_robot.name}" cancelled', gui=False)
+        return None
+    except Exception:
+        mesh_loader.shutdown(cancel=True)
+        progress.close()
+        raise
+    mesh_loader.shutdown()
+    progress.close()
+    doc.commitTransaction()
+    return robot
+
+
+def _remove_new_objects(doc: fc.Document, names_before: set[str]) -> None:
+    """Remove the objects of `doc` whose name is not in `names_before`."""
+    for name in [o.Name for o in doc.Objects if o.Name not in names_before]:
+        # Removing an object may remove its children.
+        if doc.getObject(name) is not None:
+            doc.removeObject(name)
 
-    i = 0
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 1
+
+def _build_robot(
+        doc: fc.Document,
+        urdf_robot: UrdfRobot,
+        progress: _ImportProgress,
+        mesh_loader: MeshLoader,
+        create_without_solids: bool = False,
+        remove_solid_splitter: bool = False,
+        lazy_lod: bool = False,
+) -> CrossRobot:
+    """Create the objects of `robot_from_urdf()`.
+
+    Raise `UrdfImportCancelled` if the import is cancelled.
+
+    """
+    convert_mesh_to_solid = True
+    if create_without_solids:
+        convert_mesh_to_solid = False
+
+    # Start loading the meshes in the order the objects are created.
+    for urdf_link in urdf_robot.links:
+        for visual in urdf_link.visuals:
+            mesh_loader.submit(visual.geometry)
+            if not lazy_lod:
+                mesh_loader.submit(
+                    visual.geometry,
+                    convert_mesh_to_solid,
+                    remove_solid_splitter,
+                )
+        if not lazy_lod:
+            for collision in urdf_link.collisions:
+                mesh_loader.submit(collision.geometry)
+    progress.step(force=True)
 
     robot, parts_group, solids_meshes_group, collision_group, real_group, visual_group = _make_robot(doc, urdf_robot.name)
     # Change the Show properties before having added all links.
@@ -203,91 +308,462 @@ def robot_from_urdf(
         robot.ViewObject.ShowReal = False
         robot.ViewObject.ShowVisual = False
         robot.ViewObject.ShowCollision = False
-
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 1
+    progress.step()
 
     colors = _get_colors(urdf_robot)
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 1
-
-    convert_mesh_to_solid = True
-    if create_without_solids:
-        convert_mesh_to_solid = False
-
-    for urdf_link in urdf_robot.links:
-        progressBar.setValue(i)
-        QtGui.QApplication.processEvents()
-        i += 1
-        ros_link, visual_part, collision_part, real_part = _add_ros_link(
-            urdf_link, robot, collision_group, real_group, visual_group,
-        )
+    progress.step()
+
+    # The robot is updated once after having added all links and joints.
+    with robot.Proxy.batch_update():
+        for urdf_link in urdf_robot.links:
+            progress.step()
+            ros_link, visual_part, collision_part, real_part = _add_ros_link(
+                urdf_link, robot, collision_group, real_group, visual_group,
+            )
 
-        geoms, geom_containers = _add_visual(
-                urdf_link, solids_meshes_group, ros_link, visual_part, colors,
-        )
-        for geom in geoms:
-            robot.Proxy.created_objects.append(geom)
-        for geom_container in geom_containers:
-            robot.Proxy.created_objects.append(geom_container)
-
-        geoms, geom_containers = _add_real(
-                urdf_link, solids_meshes_group, ros_link, real_part, colors,
-                convert_mesh_to_solid = convert_mesh_to_solid,
-                remove_solid_splitter = remove_solid_splitter,
-        )
-        for geom in geoms:
-            robot.Proxy.created_objects.append(geom)
-        for geom_container in geom_containers:
-            robot.Proxy.created_objects.append(geom_container)
+            geoms, geom_containers = _add_visual(
+                    urdf_link, solids_meshes_group, ros_link, visual_part, colors,
+                    mesh_loader = mesh_loader,
+                    on_wait = progress.process_events,
+            )
+            for geom in geoms:
+                robot.Proxy.created_objects.append(geom)
+            for geom_container in geom_containers:
+                robot.Proxy.created_objects.append(geom_container)
+
+            if lazy_lod:
+                _set_deferred_geometry(
+                    ros_link, urdf_link, colors, solids_meshes_group,
+                    ['real', 'collision'],
+                    convert_mesh_to_solid, remove_solid_splitter,
+                )
+                continue
 
-        geoms, geom_containers = _add_collision(
-                urdf_link, solids_meshes_group, ros_link, collision_part, colors,
-        )
-        for geom in geoms:
-            robot.Proxy.created_objects.append(geom)
-        for geom_container in geom_containers:
-            set_collision_appearance(geom_container)
-            robot.Proxy.created_objects.append(geom_container)
-
-    joint_map: dict[str, CrossJoint] = {}
-    for urdf_joint in urdf_robot.joints:
-        progressBar.setValue(i)
-        QtGui.QApplication.processEvents()
-        i += 1
-        ros_joint = _add_ros_joint(urdf_joint, robot)
-        joint_map[urdf_joint.name] = ros_joint
-    # Mimic joints must be handled after creating all joints because the
-    # mimicking joint can be defined before the mimicked joint in URDF.
-    _define_mimic_joints(urdf_robot, joint_map)
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 2
-
-    _compensate_joint_placement(robot, urdf_robot, joint_map)
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 3
+            geoms, geom_containers = _add_real(
+                    urdf_link, solids_meshes_group, ros_link, real_part, colors,
+                    convert_mesh_to_solid = convert_mesh_to_solid,
+                    remove_solid_splitter = remove_solid_splitter,
+                    mesh_loader = mesh_loader,
+                    on_wait = progress.process_events,
+            )
+            for geom in geoms:
+                robot.Proxy.created_objects.append(geom)
+            for geom_container in geom_containers:
+                robot.Proxy.created_objects.append(geom_container)
+
+            geoms, geom_containers = _add_collision(
+                    urdf_link, solids_meshes_group, ros_link, collision_part, colors,
+                    mesh_loader = mesh_loader,
+                    on_wait = progress.process_events,
+            )
+            for geom in geoms:
+                robot.Proxy.created_objects.append(geom)
+            for geom_container in geom_containers:
+                set_collision_appearance(geom_container)
+                robot.Proxy.created_objects.append(geom_container)
+
+        joint_map: dict[str, CrossJoint] = {}
+        for urdf_joint in urdf_robot.joints:
+            progress.step()
+            ros_joint = _add_ros_joint(urdf_joint, robot)
+            joint_map[urdf_joint.name] = ros_joint
+        # Mimic joints must be handled after creating all joints because the
+        # mimicking joint can be defined before the mimicked joint in URDF.
+        _define_mimic_joints(urdf_robot, joint_map)
+        progress.step(2)
+
+        _compensate_joint_placement(robot, urdf_robot, joint_map)
+        progress.step(3)
 
     # Change the visual properties after having added all links.
     if hasattr(fc, 'GuiUp') and fc.GuiUp:
         robot.ViewObject.ShowReal = False
         robot.ViewObject.ShowVisual = True
         robot.ViewObject.ShowCollision = False
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
-    i += 2
+    progress.step(2, force=True)
 
     doc.recompute()
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
+    progress.step(force=True)
+    return robot
+
+
+class _ImportProgress:
+    """Progress bar and cancel button of a URDF import.
+
+    The GUI events are processed at most every `_EVENTS_INTERVAL` seconds,
+    so that the objects are created in batches.
+
+    """
+
+    def __init__(
+            self,
+            title: str,
+            maximum: int,
+            cancel_event: Optional[threading.Event] = None,
+    ):
+        self.cancel_event = threading.Event() if cancel_event is None else cancel_event
+        self.value = 0
+        self._last_events_time = 0.0
+        self._progress_bar = None
+        self._cancel_button = None
+        if not (hasattr(fc, 'GuiUp') and fc.GuiUp):
+            return
+        self._progress_bar = get_progress_bar(title=title, min=0, max=maximum)
+        self._progress_bar.show()
+        self._cancel_button = QtWidgets.QPushButton(tr('Cancel'))
+        self._cancel_button.clicked.connect(lambda *_: self.cancel_event.set())
+        fcgui.getMainWindow().statusBar().addWidget(self._cancel_button)
+        self._cancel_button.show()
+
+    def step(self, increment: int = 1, force: bool = False) -> None:
+        """Advance the progress bar and process the events if due."""
+        self.value += increment
+        self.process_events(force)
+
+    def process_events(self, force: bool = False) -> None:
+        """Process the GUI events if due.
+
+        Raise `UrdfImportCancelled` if the import was cancelled.
+
+        """
+        if self._progress_bar is not None:
+            now = time.monotonic()
+            if force or ((now - self._last_events_time) >= _EVENTS_INTERVAL):
+                self._last_events_time = now
+                self._progress_bar.setValue(self.value)
+                QtGui.QApplication.processEvents()
+        if self.cancel_event.is_set():
+            raise UrdfImportCancelled()
+
+    def close(self) -> None:
+        if self._progress_bar is None:
+            return
+        self._progress_bar.close()
+        self._cancel_button.close()
+        self._cancel_button.deleteLater()
+        self._progress_bar = None
+        self._cancel_button = None
+        QtGui.QApplication.processEvents()
+
+
+def _run_in_worker(function: Callable, *args, **kwargs) -> Any:
+    """Return `function(*args, **kwargs)` computed in a worker thread.
+
+    The GUI events are processed while waiting.
+
+    """
+    if not (hasattr(fc, 'GuiUp') and fc.GuiUp):
+        return function(*args, **kwargs)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(function, *args, **kwargs)
+        while True:
+            try:
+                return future.result(timeout=_EVENTS_INTERVAL)
+            except FutureTimeoutError:
+                QtGui.QApplication.processEvents()
+
+
+def update_robot_from_urdf(
+        robot: CrossRobot,
+        old_urdf_robot: UrdfRobot,
+        new_urdf_robot: UrdfRobot,
+) -> bool:
+    """Update a robot created by `robot_from_urdf()` to a new URDF.
+
+    Only the joints whose origin, axis or limits changed and the links whose
+    inertial or geometries changed are updated, the other objects and the
+    loaded meshes are kept.
+    Return False without modifying the robot if the structure changed, i.e.
+    the names of links and joints, the joint types, parents, children or
+    mimic, or the materials. Then the robot must be regenerated with
+    `robot_from_urdf()`.
 
-    progressBar.close()
-    QtGui.QApplication.processEvents()
+    """
+    if not _has_same_structure(old_urdf_robot, new_urdf_robot):
+        return False
+    doc = robot.Document
+    doc.openTransaction(tr('Update robot from URDF'))
+
+    changed_joints: set[str] = set()
+    for new_joint in new_urdf_robot.joints:
+        old_joint = old_urdf_robot.joint_map[new_joint.name]
+        if _xml(old_joint) != _xml(new_joint):
+            changed_joints.add(new_joint.name)
+    for new_joint in new_urdf_robot.joints:
+        parent_joint = _get_parent_urdf_joint(new_urdf_robot, new_joint)
+        if ((new_joint.name not in changed_joints)
+                and ((parent_joint is None) or (parent_joint.name not in changed_joints))):
+            continue
+        ros_joint = robot.Proxy.get_joint(new_joint.name)
+        if ros_joint is None:
+            doc.abortTransaction()
+            return False
+        # Same as `_add_ros_joint()` followed by `_compensate_joint_placement()`.
+        previous_rotation_to_z = (
+            axis_to_z(parent_joint) if parent_joint is not None else fc.Rotation()
+        )
+        ros_joint.Origin = (
+            previous_rotation_to_z.inverted()
+            * placement_along_z_from_joint(new_joint)
+        )
+        _set_child_placement(robot, new_joint, ros_joint)
+        _set_joint_limits(ros_joint, new_joint)
+
+    colors = _get_colors(new_urdf_robot)
+    for new_link in new_urdf_robot.links:
+        old_link = old_urdf_robot.link_map[new_link.name]
+        ros_link = robot.Proxy.get_link(new_link.name)
+        if ros_link is None:
+            doc.abortTransaction()
+            return False
+        if _xml(old_link.inertial) != _xml(new_link.inertial):
+            _set_link_inertial(ros_link, new_link)
+        if (
+            ([_xml(v) for v in old_link.visuals] != [_xml(v) for v in new_link.visuals])
+            or ([_xml(c) for c in old_link.collisions] != [_xml(c) for c in new_link.collisions])
+        ):
+            _replace_link_geometries(robot, ros_link, new_link, colors)
+
+    robot.Proxy.mark_pose_dirty()
+    doc.recompute()
     doc.commitTransaction()
-    return robot
+    return True
+
+
+def _xml(urdf_element: Any) -> str:
+    """Return the URDF string of an element from urdf_parser_py or ''."""
+    if urdf_element is None:
+        return ''
+    return urdf_element.to_xml_string()
+
+
+def _has_same_structure(
+        old_urdf_robot: UrdfRobot,
+        new_urdf_robot: UrdfRobot,
+) -> bool:
+    """Return True if both URDFs only differ by values `update_robot_from_urdf()` can update."""
+    def structure(urdf_robot: UrdfRobot) -> tuple:
+        return (
+            [link.name for link in urdf_robot.links],
+            [
+                (
+                    joint.name, joint.type, joint.parent, joint.child,
+                    _xml(joint.mimic),
+                )
+                for joint in urdf_robot.joints
+            ],
+            [_xml(m) for m in getattr(urdf_robot, 'materials', [])],
+        )
+    return structure(old_urdf_robot) == structure(new_urdf_robot)
+
+
+def _get_parent_urdf_joint(
+        urdf_robot: UrdfRobot,
+        urdf_joint: UrdfJoint,
+) -> Optional[UrdfJoint]:
+    """Return the joint whose child is the parent of `urdf_joint`."""
+    if urdf_joint.parent not in urdf_robot.parent_map:
+        return None
+    joint_name, _ = urdf_robot.parent_map[urdf_joint.parent]
+    return urdf_robot.joint_map[joint_name]
+
+
+def _replace_link_geometries(
+        robot: CrossRobot,
+        ros_link: CrossLink,
+        urdf_link: UrdfLink,
+        colors: dict[str, Color],
+) -> None:
+    """Replace the Visual, Real, and Collision geometries of a link.
+
+    The objects only used by the old geometries are removed. Mesh objects
+    are looked up by file and reused by `obj_from_mesh()`.
+
+    """
+    doc = robot.Document
+    parts = list(ros_link.Visual) + list(ros_link.Real) + list(ros_link.Collision)
+    if not all(is_part(p) for p in parts):
+        # Not created by `robot_from_urdf()`.
+        return
+    old_geoms: DOList = []
+    group = None
+    for part in parts:
+        for fc_link in list(part.Group):
+            linked = fc_link.getLinkedObject(False)
+            if linked is not fc_link:
+                old_geoms.append(linked)
+                if group is None:
+                    # Put the new geometries with the old ones.
+                    group = linked.getParentGroup()
+            fc_link.Label = 'to_be_removed'
+            doc.removeObject(fc_link.Name)
+    created_objects = robot.Proxy.created_objects
+    for geom in old_geoms:
+        try:
+            if any(is_freecad_link(o) for o in geom.InList):
+                # Still used by another link.
+                continue
+            if geom in created_objects:
+                created_objects.remove(geom)
+            geom_name = geom.Name
+        except ReferenceError:
+            # Already removed.
+            continue
+        doc.removeObject(geom_name)
+    # Cleanup the removed App::Link.
+    created_objects[:] = [o for o in created_objects if _is_alive(o)]
+
+    convert_mesh_to_solid = True
+    remove_solid_splitter = False
+    deferred_lods: list[str] = []
+    if getattr(ros_link, '_DeferredGeometry', ''):
+        deferred = json.loads(ros_link._DeferredGeometry)
+        convert_mesh_to_solid = deferred['convert_mesh_to_solid']
+        remove_solid_splitter = deferred['remove_solid_splitter']
+        deferred_lods = deferred['lods']
+        if group is None:
+            group = doc.getObject(deferred['group'])
+    if group is None:
+        group = doc
+
+    mesh_loader = MeshLoader(workers=1)
+    new_objects: DOList = []
+    if ros_link.Visual:
+        geoms, containers = _add_visual(
+            urdf_link, group, ros_link, ros_link.Visual[0], colors,
+            mesh_loader = mesh_loader,
+        )
+        new_objects += geoms + containers
+    if deferred_lods:
+        _set_deferred_geometry(
+            ros_link, urdf_link, colors, group, deferred_lods,
+            convert_mesh_to_solid, remove_solid_splitter,
+        )
+    if ros_link.Real and ('real' not in deferred_lods):
+        geoms, containers = _add_real(
+            urdf_link, group, ros_link, ros_link.Real[0], colors,
+            convert_mesh_to_solid = convert_mesh_to_solid,
+            remove_solid_splitter = remove_solid_splitter,
+            mesh_loader = mesh_loader,
+        )
+        new_objects += geoms + containers
+    if ros_link.Collision and ('collision' not in deferred_lods):
+        geoms, containers = _add_collision(
+            urdf_link, group, ros_link, ros_link.Collision[0], colors,
+            mesh_loader = mesh_loader,
+        )
+        for container in containers:
+            set_collision_appearance(container)
+        new_objects += geoms + containers
+    for obj in new_objects:
+        if obj not in created_objects:
+            created_objects.append(obj)
+    ros_link.Proxy.update_fc_links()
+
+
+def _is_alive(obj: DO) -> bool:
+    """Return False if the FreeCAD object was deleted."""
+    try:
+        obj.Name
+    except ReferenceError:
+        return False
+    return True
+
+
+def materialize_deferred_geometry(
+        link: CrossLink,
+        lods: Optional[list[str]] = None,
+) -> None:
+    """Create the geometries of a link that were deferred on import.
+
+    Parameters
+    ----------
+    - link: a Cross::Link imported with `lazy_lod`.
+    - lods: levels of details to create, among 'real' and 'collision',
+            defaults to all deferred ones.
+
+    """
+    if not getattr(link, '_DeferredGeometry', ''):
+        return
+    deferred = json.loads(link._DeferredGeometry)
+    if lods is None:
+        lods = list(deferred['lods'])
+    lods = [lod for lod in lods if lod in deferred['lods']]
+    if not lods:
+        return
+    doc = link.Document
+    urdf_link = UrdfLinkClass.from_xml_string(deferred['urdf'])
+    colors = {name: Color(*rgba) for name, rgba in deferred['colors'].items()}
+    group = doc.getObject(deferred['group'])
+    if group is None:
+        group = doc
+    robot = link.Proxy.get_robot() if hasattr(link, 'Proxy') else None
+    geoms: DOList = []
+    geom_containers: DOList = []
+    collision_containers: DOList = []
+    for lod in lods:
+        parts = link.Real if lod == 'real' else link.Collision
+        if not parts:
+            continue
+        if lod == 'real':
+            new_geoms, new_containers = _add_real(
+                urdf_link, group, link, parts[0], colors,
+                convert_mesh_to_solid = deferred['convert_mesh_to_solid'],
+                remove_solid_splitter = deferred['remove_solid_splitter'],
+                mesh_loader = MeshLoader(workers=1),
+            )
+        else:
+            new_geoms, new_containers = _add_collision(
+                urdf_link, group, link, parts[0], colors,
+                mesh_loader = MeshLoader(workers=1),
+            )
+            collision_containers += new_containers
+        geoms += new_geoms
+        geom_containers += new_containers
+    for geom_container in collision_containers:
+        set_collision_appearance(geom_container)
+    if robot and hasattr(robot, 'Proxy'):
+        robot.Proxy.created_objects.extend(geoms + geom_containers)
+    deferred['lods'] = [lod for lod in deferred['lods'] if lod not in lods]
+    link._DeferredGeometry = json.dumps(deferred) if deferred['lods'] else ''
+
+
+def _set_deferred_geometry(
+        ros_link: CrossLink,
+        urdf_link: UrdfLink,
+        colors: dict[str, Color],
+        group: DOG,
+        lods: list[str],
+        convert_mesh_to_solid: bool,
+        remove_solid_splitter: bool,
+) -> None:
+    """Store what `materialize_deferred_geometry()` needs in the link.
+
+    The mesh paths are made absolute because the package paths of the
+    current import are not known anymore when the geometries are created.
+
+    """
+    link_xml = et.fromstring(urdf_link.to_xml_string())
+    for mesh in link_xml.iter('mesh'):
+        mesh_path = abs_path_from_ros_path(mesh.get('filename', ''))
+        if mesh_path:
+            mesh.set('filename', f'file://{mesh_path}')
+    material_names = {
+        visual.material.name for visual in urdf_link.visuals
+        if getattr(visual, 'material', None) is not None
+    }
+    ros_link._DeferredGeometry = json.dumps({
+        'urdf': et.tostring(link_xml, encoding='unicode'),
+        'colors': {
+            name: [color.r, color.g, color.b, color.a]
+            for name, color in colors.items()
+            if name in material_names
+        },
+        'group': group.Name,
+        'lods': lods,
+        'convert_mesh_to_solid': convert_mesh_to_solid,
+        'remove_solid_splitter': remove_solid_splitter,
+    })
 
 
 def _make_robot(
@@ -463,21 +939,29 @@ def _add_ros_joint(
     ros_joint.Child = urdf_joint.child
     ros_joint.Type = urdf_joint.type
     ros_joint.Origin = placement_along_z_from_joint(urdf_joint)
-    if urdf_joint.limit is not None:
-        if ros_joint.Proxy.get_unit_type() == 'Angle':
-            factor = degrees(1.0)  # radians to degrees.
-        elif ros_joint.Proxy.get_unit_type() == 'Length':
-            factor = 1000.0  # meters to millimeters.
-        else:
-            factor = 1.0
-        # All attributes of `limit` are compulsory.
-        ros_joint.LowerLimit = factor * urdf_joint.limit.lower
-        ros_joint.UpperLimit = factor * urdf_joint.limit.upper
-        ros_joint.Effort = urdf_joint.limit.effort
-        ros_joint.Velocity = urdf_joint.limit.velocity
+    _set_joint_limits(ros_joint, urdf_joint)
     return ros_joint
 
 
+def _set_joint_limits(
+        ros_joint: CrossJoint,
+        urdf_joint: UrdfJoint,
+) -> None:
+    if urdf_joint.limit is None:
+        return
+    if ros_joint.Proxy.get_unit_type() == 'Angle':
+        factor = degrees(1.0)  # radians to degrees.
+    elif ros_joint.Proxy.get_unit_type() == 'Length':
+        factor = 1000.0  # meters to millimeters.
+    else:
+        factor = 1.0
+    # All attributes of `limit` are compulsory.
+    ros_joint.LowerLimit = factor * urdf_joint.limit.lower
+    ros_joint.UpperLimit = factor * urdf_joint.limit.upper
+    ros_joint.Effort = urdf_joint.limit.effort
+    ros_joint.Velocity = urdf_joint.limit.velocity
+
+
 def _define_mimic_joints(
         urdf_robot: UrdfRobot,
         joint_map: dict[str, CrossJoint],
@@ -564,6 +1048,8 @@ def _add_visual(
         visual_part: AppPart,
         colors: dict[str, Color],
         convert_mesh_to_solid: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[DOList, DOList]:
     """Add the visual geometries to a robot.
 
@@ -585,6 +1071,8 @@ def _add_visual(
         name_linked_geom,
         colors,
         convert_mesh_to_solid,
+        mesh_loader = mesh_loader,
+        on_wait = on_wait,
     )
 
 
@@ -596,6 +1084,8 @@ def _add_real(
         colors: dict[str, Color],
         convert_mesh_to_solid: bool = False,
         remove_solid_splitter: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[DOList, DOList]:
     """Add the real geometries to a robot.
 
@@ -618,6 +1108,8 @@ def _add_real(
         colors,
         convert_mesh_to_solid,
         remove_solid_splitter,
+        mesh_loader,
+        on_wait,
     )
 
 
@@ -628,6 +1120,8 @@ def _add_collision(
         collision_part: AppPart,
         colors: dict[str, Color],
         convert_mesh_to_solid: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[DOList, DOList]:
     """Add the collision geometries to a robot.
 
@@ -649,6 +1143,8 @@ def _add_collision(
         name_linked_geom,
         colors,
         convert_mesh_to_solid,
+        mesh_loader = mesh_loader,
+        on_wait = on_wait,
     )
 
 
@@ -688,6 +1184,8 @@ def _add_geometries(
         colors: dict[str, Color],
         convert_mesh_to_solid: bool = False,
         remove_solid_splitter: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[DOList, DOList]:
     """Add the geometries from URDF into `group` and an App::Link to it into `link`.
 
@@ -710,6 +1208,8 @@ def _add_geometries(
                         generated. The final name may then be
                         `name_linked_geom`, `name_linked_geom`001, ...
     - colors: a dictionary {material_name: Color} with the available colors.
+    - mesh_loader: loader of the meshes, possibly in worker threads.
+    - on_wait: called while waiting for a mesh, see `MeshLoader.get()`.
 
     """
     geom_objs: DOList = []
@@ -722,6 +1222,8 @@ def _add_geometries(
                 convert_mesh_to_solid,
                 min_vol_instead_zero = True,
                 remove_solid_splitter = remove_solid_splitter,
+                mesh_loader = mesh_loader,
+                on_wait = on_wait,
             )
         except NotImplementedError:
             continue
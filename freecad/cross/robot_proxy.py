@@ -7,10 +7,12 @@ exported as URDF file.
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from math import radians
 import os
 import shutil
-from typing import ForwardRef, List, Optional, Union, cast
+from typing import ForwardRef, Iterator, List, Optional, Union, cast
+from typing import TYPE_CHECKING
 import xml.etree.ElementTree as et
 from copy import deepcopy
 
@@ -33,6 +35,8 @@ from .freecad_utils import quantity_as
 from .freecad_utils import warn
 from .freecad_utils import is_link as is_fc_link
 from .gui_utils import tr
+from .kinematics_utils import actuation_matrices
+from .kinematics_utils import matrix_from_placement
 from .ros.utils import split_package_path
 from .ui.file_overwrite_confirmation_dialog import FileOverwriteConfirmationDialog
 from .urdf_utils import xml_comment_element
@@ -45,7 +49,8 @@ from .utils import warn_unsupported
 from .wb_utils import DYNAMIC_WORLD_GENERATOR_REPO_PATH, DYNAMIC_WORLD_GENERATOR_WORLDS_GAZEBO_PATH, ICON_PATH, get_chain, get_comulative_assemblies_placement, get_first_lcs_or_link, get_first_link, get_last_link_to_assembly
 from .wb_utils import export_templates
 from .wb_utils import get_attached_collision_objects
-from .wb_utils import get_chains
+from .robot_topology import RobotTopology
+from .robot_topology import build_topology
 from .wb_utils import get_joints
 from .wb_utils import get_links
 from .wb_utils import get_controllers
@@ -68,6 +73,8 @@ from xml.dom.minidom import parseString
 from pathlib import Path
 from .joint_proxy import make_robot_joint_filled, make_robot_joints_filled
 from .link_proxy import make_robot_link_filled, make_robot_links_filled
+from .mesh_utils import MeshExportCache
+from .mesh_utils import MeshExportPipeline
 from . import wb_constants
 from .wb_utils import get_xacro_wrapper_file_name
 from .wb_utils import get_sensors_file_name
@@ -80,6 +87,9 @@ from .joint import Joint as CrossJoint  # A Cross::Joint, i.e. a DocumentObject
 from .link import Link as CrossLink  # A Cross::Link, i.e. a DocumentObject with Proxy "Link". # noqa: E501
 from .robot import Robot as CrossRobot  # A Cross::Robot, i.e. a DocumentObject with Proxy "Robot". # noqa: E501
 from .controller import Controller as CrossController  # A Cross::Controller, i.e. a DocumentObject with Proxy "Controller". # noqa: E501
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+    import numpy as np
 BasicElement = Union[CrossJoint, CrossLink]
 DO = fc.DocumentObject
 DOList = List[DO]
@@ -222,6 +232,10 @@ class RobotProxy(ProxyBase):
     # properties of `self.robot`.
     _category_of_joint_values = 'JointValues'
 
+    # Updates that `batch_update()` defers, in the order they are run.
+    # `execute()` includes all others.
+    _deferrable_updates = ('execute', 'add_joint_variables', 'compute_poses')
+
     def __init__(self, obj: CrossRobot):
         # Implementation note: 'Group' is not required because
         # DocumentObjectGroupPython.
@@ -270,6 +284,38 @@ class RobotProxy(ProxyBase):
         self._controllers: Optional[list[CrossController]] = None
         self._broadcasters: Optional[list[CrossController]] = None
 
+        # Index of the kinematic tree, see `get_topology()`.
+        # Reset in `invalidate_topology()`.
+        self._topology: Optional[RobotTopology] = None
+        self._topology_version: int = 0
+
+        # State of the incremental forward kinematics, see `compute_poses()`.
+        # Map of joints to the placement of the frame of their child link,
+        # i.e. after actuation, in the frame of the robot's parent.
+        self._fk_placements: dict[CrossJoint, fc.Placement] = {}
+        # Links and joints whose pose and subtree must be recomputed.
+        self._fk_dirty: set[BasicElement] = set()
+        # Version of the topology `_fk_placements` is valid for, -1 if none.
+        self._fk_topology_version: int = -1
+        # True while the poses are being set, to ignore the resulting
+        # `mark_pose_dirty()` calls.
+        self._fk_computing: bool = False
+
+        # State of the incremental `set_joint_enum()`.
+        # Candidates shared by all joints, see `_get_joint_enum_candidates()`,
+        # the version of the topology they were computed for, and a version
+        # incremented when they change.
+        self._joint_enum_candidates: Optional[tuple] = None
+        self._joint_enum_topology_version: int = -1
+        self._joint_enum_candidates_version: int = 0
+        # Map of joints to the inputs of their enumerations when last set.
+        self._joint_enum_keys: dict[CrossJoint, tuple] = {}
+
+        # Nesting depth of `batch_update()` and updates deferred to the end of
+        # the outermost block, see `_deferrable_updates`.
+        self._batch_depth: int = 0
+        self._deferred_updates: set[str] = set()
+
         self._init_properties(obj)
 
     @property
@@ -371,6 +417,9 @@ class RobotProxy(ProxyBase):
         )
 
     def execute(self, obj: CrossRobot) -> None:
+        if self._batch_depth > 0:
+            self._deferred_updates.add('execute')
+            return
         self._cleanup_group()
         self.set_joint_enum()
         self.add_joint_variables()
@@ -388,13 +437,19 @@ class RobotProxy(ProxyBase):
             self._joints = None
             self._controllers = None
             self._broadcasters = None
+            self.invalidate_topology()
+            if self._batch_depth > 0:
+                # Only what new joints need immediately, i.e. the
+                # enumerations of `Parent` and `Child`.
+                self.set_joint_enum(only_new=True)
             self.execute(obj)
         if prop == 'OutputPath':
             rel_path = remove_ros_workspace(obj.OutputPath)
             if rel_path != obj.OutputPath:
                 obj.OutputPath = rel_path
         if prop == 'Placement':
-            self.compute_poses()
+            self.mark_pose_dirty()
+            self.run_or_defer('compute_poses')
 
     def onDocumentRestored(self, obj):
         """Handle the object after a document restore.
@@ -421,6 +476,65 @@ class RobotProxy(ProxyBase):
         if state:
             self.Type, self._joint_variables_ros_map = state
 
+    @contextmanager
+    def batch_update(self) -> Iterator[None]:
+        """Defer the updates of the robot to the end of the `with` block.
+
+        Adding a link or a joint runs `execute()`, i.e. cleans up `Group`,
+        adds the joint variables and computes the poses of all elements.
+        Within the block, only the caches of the children, the index of the
+        kinematic tree, and the enumerations of the new joints are updated
+        immediately, the other updates requested by the robot, its links and
+        its joints run once at the end of the outermost block.
+        They are dropped if the block raises an exception, the robot is then
+        updated by the next recompute.
+
+        Example:
+
+            with robot.Proxy.batch_update():
+                for name in names:
+                    link = make_link(name, doc, recompute_after=False)
+                    robot.addObject(link)
+
+        """
+        self._batch_depth += 1
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                updates = self._deferred_updates
+                self._deferred_updates = set()
+                if completed:
+                    for update in self._deferrable_updates:
+                        if update in updates:
+                            self._run_update(update)
+                            if update == 'execute':
+                                break
+
+    def run_or_defer(self, update: str) -> None:
+        """Run an update now or at the end of `batch_update()`.
+
+        Parameters
+        ----------
+        - update: one of `_deferrable_updates`.
+
+        """
+        if update not in self._deferrable_updates:
+            raise ValueError(f'Unsupported update "{update}"')
+        if self._batch_depth > 0:
+            self._deferred_updates.add(update)
+            return
+        self._run_update(update)
+
+    def _run_update(self, update: str) -> None:
+        if update == 'execute':
+            self.execute(self.robot)
+        else:
+            getattr(self, update)()
+
     def _reset_group(self) -> None:
         """Add FreeCAD links in CrossLinks for Real, Visual, and Collision."""
         if ((not self.is_execute_ready())
@@ -501,43 +615,56 @@ class RobotProxy(ProxyBase):
                 self.robot.Document.removeObject(name)
         self.created_objects.clear()
 
-    def set_joint_enum(self) -> None:
-        """Set the enum for Child and Parent of all joints."""
-        def get_possible_parent_links(joint: CrossJoint) -> list[str]:
-            links: list[str] = []
-            for link in self.get_links():
-                link_name = ros_name(link)
-                if ((joint.Parent == link_name)
-                    or (
-                        hasattr(link, 'Proxy')
-                        and link.Proxy.is_execute_ready()
-                    )):
-                    links.append(link_name)
-            return links
-
-        def get_possible_child_links(joint: CrossJoint) -> list[str]:
-            links: list[str] = []
-            for link in self.get_links():
-                link_name = ros_name(link)
-                if ((joint.Child == link_name)
-                    or (
-                        hasattr(link, 'Proxy')
-                        and link.Proxy.is_execute_ready()
-                        and link.Proxy.may_be_base_link()
-                        and (not link.Proxy.is_in_chain_to_joint(joint))
-                        and (joint.Parent != link_name)
-                    )):
-                    links.append(link_name)
-            return links
-
-        sym_diff_joints = set(self.get_joints()).symmetric_difference(set(self.get_joints_old()))
-        for joint in sym_diff_joints:
+    def set_joint_enum(self, only_new: bool = False) -> None:
+        """Set the enum for Child and Parent of all joints.
+
+        A link is a possible parent of any joint. A link is a possible child
+        of a joint if it is not the child of another joint and not in the
+        chain from the base link to the joint's parent. The current values
+        are always possible.
+        The candidates are computed once per version of the topology. The
+        enumerations of a joint are only computed when its parent, its child,
+        the ancestors of its parent, or the candidates changed, and only
+        written when different.
+
+        Parameters
+        ----------
+        - only_new: only set the enumerations of the joints never seen by
+                    this method, e.g. joints just added.
+
+        """
+        if not self.is_execute_ready():
+            return
+        link_index, parent_candidates, base_links = self._get_joint_enum_candidates()
+        candidates_version = self._joint_enum_candidates_version
+        topology = self.get_topology()
+
+        def with_current(candidates: list[str], current: str) -> list[str]:
+            """Return `candidates` with the current value, in link order."""
+            if (current not in link_index) or (current in candidates):
+                return candidates
+            return sorted(candidates + [current], key=link_index.get)
+
+        joints = self.get_joints()
+        for joint in joints:
+            if only_new and (joint in self._joint_enum_keys):
+                continue
+            parent = joint.Parent
+            child = joint.Child
+            ancestors = topology.get_ancestor_links(parent) if parent else frozenset()
+            key = (candidates_version, parent, child, ancestors)
+            if self._joint_enum_keys.get(joint) == key:
+                continue
             # We add the empty string to show that the child or parent
             # was not set yet.
-            parent_links: list[str] = ['']
-            parent_links += get_possible_parent_links(joint)
-            child_links: list[str] = ['']
-            child_links += get_possible_child_links(joint)
+            parent_links = [''] + with_current(parent_candidates, parent)
+            child_links = [''] + with_current(
+                [
+                    name for name in base_links
+                    if (name not in ancestors) and (name != parent)
+                ],
+                child,
+            )
             # Implementation note: setting to a list sets the enumeration.
             if joint.getEnumerationsOfProperty('Parent') != parent_links:
                 # Avoid recursive recompute.
@@ -547,6 +674,46 @@ class RobotProxy(ProxyBase):
                 # Avoid recursive recompute.
                 # Doesn't change the value if in the new enum.
                 joint.Child = child_links
+            self._joint_enum_keys[joint] = key
+        if len(self._joint_enum_keys) > len(joints):
+            # Forget the removed joints.
+            current_joints = set(joints)
+            self._joint_enum_keys = {
+                j: k for j, k in self._joint_enum_keys.items() if j in current_joints
+            }
+
+    def _get_joint_enum_candidates(self) -> tuple[dict[str, int], list[str], list[str]]:
+        """Return the data shared by the enumerations of all joints.
+
+        Return (map of link names to their index in `get_links()`, names of
+        the possible parent links, names of the links that are child of no
+        joint), computed once per version of the topology.
+        `_joint_enum_candidates_version` is incremented when they change.
+
+        """
+        topology = self.get_topology()
+        if (
+            (self._joint_enum_candidates is not None)
+            and (self._joint_enum_topology_version == topology.version)
+        ):
+            return self._joint_enum_candidates
+        link_index: dict[str, int] = {}
+        parent_candidates: list[str] = []
+        base_links: list[str] = []
+        for link in self.get_links():
+            link_name = ros_name(link)
+            link_index.setdefault(link_name, len(link_index))
+            if not (hasattr(link, 'Proxy') and link.Proxy.is_execute_ready()):
+                continue
+            parent_candidates.append(link_name)
+            if topology.get_parent_joint(link_name) is None:
+                base_links.append(link_name)
+        candidates = (link_index, parent_candidates, base_links)
+        if candidates != self._joint_enum_candidates:
+            self._joint_enum_candidates = candidates
+            self._joint_enum_candidates_version += 1
+        self._joint_enum_topology_version = topology.version
+        return self._joint_enum_candidates
 
     def set_joint_values(
             self,
@@ -601,22 +768,129 @@ class RobotProxy(ProxyBase):
             self.robot.removeProperty(p)
         return
 
+    def mark_pose_dirty(self, element: Optional[BasicElement] = None) -> None:
+        """Mark a link or joint to be updated by the next `compute_poses()`.
+
+        The whole subtree under `element` is updated, as well as the joints
+        mimicking `element` and their subtree.
+        If `element` is None, all poses are recomputed.
+
+        """
+        if not self.is_execute_ready():
+            return
+        if self._fk_computing:
+            return
+        if element is None:
+            self._fk_topology_version = -1
+            return
+        self._fk_dirty.add(element)
+        if is_joint(element):
+            self._fk_dirty.update(
+                self.get_topology().get_mimicking_joints(element),
+            )
+
     def compute_poses(self) -> None:
         """Set `Placement` of all joints, links, and attached collision objects.
 
         Compute and set the pose of all joints, links, and attached collision
         objects in the same frame as the robot.
 
+        The placement of the child frame of each joint is cached, so that only
+        the subtrees under the elements given to `mark_pose_dirty()` are
+        recomputed. All poses are recomputed after a change of topology or of
+        the robot's placement.
+
         """
-        joint_cache: dict[CrossJoint, fc.Placement] = {}
-        for chain in self.get_chains():
-            placement = self.robot.Placement  # A copy.
-            for link, joint in grouper(chain, 2):
-                if joint in joint_cache:
-                    placement = joint_cache[joint]
-                    # No need to update the link's placement because we support
-                    # only tree structures.
-                    continue
+        if not self.is_execute_ready():
+            return
+        topology = self.get_topology()
+        # List of (element, placement of the frame the element is relative to).
+        starts: list[tuple[BasicElement, fc.Placement]] = []
+        if self._fk_topology_version != topology.version:
+            self._fk_placements.clear()
+            starts = [
+                (link, self.robot.Placement)
+                for link in topology.get_base_links()
+            ]
+        else:
+            for element in self._fk_dirty:
+                start = self._get_fk_start(topology, element)
+                if start is not None:
+                    starts.append(start)
+        self._fk_dirty.clear()
+        self._fk_topology_version = topology.version
+
+        self._fk_computing = True
+        try:
+            self._update_subtree_poses(topology, starts)
+        finally:
+            self._fk_computing = False
+
+        for aco in self.get_attached_collision_objects():
+            if not aco.Link:
+                continue
+            if aco.Placement != aco.Link.Placement:
+                # Avoid recursive recompute.
+                aco.Placement = aco.Link.Placement
+
+    def _get_fk_start(
+            self,
+            topology: RobotTopology,
+            element: BasicElement,
+    ) -> Optional[tuple[BasicElement, fc.Placement]]:
+        """Return the start of the subtree to update for a dirty element.
+
+        Return `(element, placement)` where `placement` is the frame
+        `element` is relative to, or None if an ancestor of `element` is
+        also dirty (its subtree includes `element`) or if `element` is not
+        part of the kinematic tree.
+
+        """
+        if is_joint(element):
+            parent_link = topology.get_link(element.Parent)
+            if parent_link is None:
+                return None
+            if parent_link in self._fk_dirty:
+                return None
+            ref_joint = topology.get_parent_joint(element.Parent)
+        elif is_link(element):
+            ref_joint = topology.get_parent_joint(ros_name(element))
+        else:
+            return None
+        # Look for a dirty ancestor.
+        ancestor = ref_joint
+        visited: set[BasicElement] = set()
+        while (ancestor is not None) and (ancestor not in visited):
+            if ancestor in self._fk_dirty:
+                return None
+            visited.add(ancestor)
+            parent_link = topology.get_link(ancestor.Parent)
+            if parent_link in self._fk_dirty:
+                return None
+            ancestor = topology.get_parent_joint(ancestor.Parent)
+        if ref_joint is None:
+            return element, self.robot.Placement
+        if ref_joint not in self._fk_placements:
+            # Not reachable from a base link.
+            return None
+        return element, self._fk_placements[ref_joint]
+
+    def _update_subtree_poses(
+            self,
+            topology: RobotTopology,
+            starts: list[tuple[BasicElement, fc.Placement]],
+    ) -> None:
+        """Set the placement of the given elements and of their subtrees."""
+        stack = list(reversed(starts))
+        visited: set[BasicElement] = set()
+        while stack:
+            element, placement = stack.pop()
+            if element in visited:
+                # Only tree structures are supported.
+                continue
+            visited.add(element)
+            if is_link(element):
+                link = element
                 if hasattr(link, 'MountedPlacement'):
                     new_link_placement = placement * link.MountedPlacement
                 else:
@@ -625,23 +899,139 @@ class RobotProxy(ProxyBase):
                 if link.Placement != new_link_placement:
                     # Avoid recursive recompute.
                     link.Placement = new_link_placement
-                if joint:
-                    new_joint_placement = placement * joint.Origin
-                    if joint.Placement != new_joint_placement:
-                        # Avoid recursive recompute.
-                        joint.Placement = new_joint_placement
-                    # For next link.
-                    placement = (
-                        new_joint_placement
-                        * joint.Proxy.get_actuation_placement()
-                    )
-                    joint_cache[joint] = placement
-        for aco in self.get_attached_collision_objects():
-            if not aco.Link:
+                child_joints = topology.get_child_joints(ros_name(link))
+                for joint in reversed(child_joints):
+                    stack.append((joint, placement))
                 continue
-            if aco.Placement != aco.Link.Placement:
+            joint = element
+            new_joint_placement = placement * joint.Origin
+            if joint.Placement != new_joint_placement:
                 # Avoid recursive recompute.
-                aco.Placement = aco.Link.Placement
+                joint.Placement = new_joint_placement
+            # For next link.
+            child_placement = (
+                new_joint_placement
+                * joint.Proxy.get_actuation_placement()
+            )
+            self._fk_placements[joint] = child_placement
+            child = topology.get_link(joint.Child)
+            if child is not None:
+                stack.append((child, child_placement))
+
+    def batch_fk(
+            self,
+            joint_matrix: ArrayLike,
+            joints: Optional[list[CrossJoint]] = None,
+    ) -> np.ndarray:
+        """Return the link placements for many joint configurations at once.
+
+        Return an array of shape (N, len(self.get_links()), 4, 4) with the
+        4x4 homogeneous transform of each link, in the order of
+        `get_links()`, for each of the N configurations. The transforms are
+        in the same frame as the robot, with translations in mm, i.e. they
+        are the matrices of `link.Placement` that `compute_poses()` would
+        give. Links that are not reachable from a base link get NaN.
+
+        The properties of the robot, its links, and its joints are only read,
+        once, and the computation is done with NumPy, so that whole
+        trajectories can be evaluated without recompute.
+
+        Parameters
+        ----------
+        - joint_matrix: array of shape (N, DOF) or (DOF,) with joint values in
+                        m and rad, one column per joint in `joints`.
+        - joints: the joints of the columns of `joint_matrix`, defaults to
+                  the actuated non-mimicking joints, i.e. the keys of
+                  `joint_variables`. Mimicking joints follow their mimicked
+                  joint and other joints keep their current value.
+
+        """
+        import numpy as np
+
+        joint_matrix = np.asarray(joint_matrix, dtype=np.float64)
+        if joint_matrix.ndim == 1:
+            joint_matrix = joint_matrix[np.newaxis, :]
+        if joints is None:
+            joints = list(self.joint_variables.keys())
+        if (joint_matrix.ndim != 2) or (joint_matrix.shape[1] != len(joints)):
+            raise ValueError(
+                f'Expected an array of shape (N, {len(joints)}),'
+                f' got {joint_matrix.shape}',
+            )
+        n = joint_matrix.shape[0]
+        links = self.get_links()
+        link_poses = np.full((n, len(links), 4, 4), np.nan)
+        if not self.is_execute_ready():
+            return link_poses
+        topology = self.get_topology()
+        link_indexes = {link: i for i, link in enumerate(links)}
+        columns = {joint: i for i, joint in enumerate(joints)}
+        joint_values: dict[CrossJoint, np.ndarray] = {}
+
+        def get_joint_values(joint: CrossJoint) -> np.ndarray:
+            """Return the N values of `joint`, in m or rad."""
+            if joint in joint_values:
+                return joint_values[joint]
+            if joint in columns:
+                values = joint_matrix[:, columns[joint]]
+            elif (
+                joint.Mimic
+                and joint.MimickedJoint
+                and (joint.MimickedJoint is not joint)
+            ):
+                # Same semantics as `JointProxy.get_actuation_placement()`.
+                if joint.Type == 'prismatic':
+                    offset = joint.Offset / 1000.0
+                elif joint.Type in ('revolute', 'continuous'):
+                    offset = radians(joint.Offset)
+                else:
+                    offset = 0.0
+                # Break mimic cycles.
+                joint_values[joint] = np.full(n, joint.Position)
+                values = (
+                    joint.Multiplier * get_joint_values(joint.MimickedJoint)
+                    + offset
+                )
+            else:
+                values = np.full(n, joint.Position)
+            joint_values[joint] = values
+            return values
+
+        robot_placement = matrix_from_placement(self.robot.Placement)
+        # List of (element, (N, 4, 4) frame the element is relative to).
+        stack: list[tuple[BasicElement, np.ndarray]] = [
+            (link, np.broadcast_to(robot_placement, (n, 4, 4)))
+            for link in reversed(topology.get_base_links())
+        ]
+        visited: set[BasicElement] = set()
+        while stack:
+            element, frames = stack.pop()
+            if element in visited:
+                # Only tree structures are supported.
+                continue
+            visited.add(element)
+            if is_link(element):
+                link = element
+                if hasattr(link, 'MountedPlacement'):
+                    mounted = matrix_from_placement(link.MountedPlacement)
+                    link_poses[:, link_indexes[link]] = frames @ mounted
+                else:
+                    # As in `compute_poses()`.
+                    link_poses[:, link_indexes[link]] = matrix_from_placement(link.Placement)
+                for joint in reversed(topology.get_child_joints(ros_name(link))):
+                    stack.append((joint, frames))
+                continue
+            joint = element
+            child = topology.get_link(joint.Child)
+            if child is None:
+                continue
+            child_frames = (
+                frames
+                @ matrix_from_placement(joint.Origin)
+                @ actuation_matrices(joint.Type, get_joint_values(joint))
+            )
+            stack.append((child, child_frames))
+        return link_poses
 
     def get_attached_collision_objects(self) -> list[CrossAttachedCollisionObject]:
         # TODO: as property.
@@ -717,10 +1107,7 @@ class RobotProxy(ProxyBase):
         if not name:
             # Shortcut.
             return None
-        for link in self.get_links():
-            if ros_name(link) == name:
-                return link
-        return None
+        return self.get_topology().get_link(name)
 
     def get_joint(self, name: str) -> Optional[CrossJoint]:
         """Return the joint with ROS name `name`.
@@ -732,10 +1119,47 @@ class RobotProxy(ProxyBase):
         if not name:
             # Shortcut.
             return None
-        for joint in self.get_joints():
-            if ros_name(joint) == name:
-                return joint
-        return None
+        return self.get_topology().get_joint(name)
+
+    def get_topology(self) -> RobotTopology:
+        """Return the index of the kinematic tree.
+
+        The index is built once from `get_links()` and `get_joints()` and kept
+        until `invalidate_topology()` is called.
+
+        """
+        if not self.is_execute_ready():
+            # Not cached.
+            return RobotTopology()
+        if self._topology is not None:
+            return self._topology
+        self._topology_version += 1
+        self._topology = build_topology(
+            self.get_links(),
+            self.get_joints(),
+            self._topology_version,
+        )
+        return self._topology
+
+    def invalidate_topology(self, changed: Optional[BasicElement] = None) -> None:
+        """Force the index of the kinematic tree to be rebuilt.
+
+        Must be called when links or joints are added or removed and when the
+        name, the parent, or the child of a link or joint changes.
+        If `changed` is given and the index is still valid for it (for
+        example when only the enumeration of `Parent` was set), the index is
+        kept.
+
+        """
+        if not self.is_execute_ready():
+            return
+        if (
+            (changed is not None)
+            and (self._topology is not None)
+            and self._topology.is_up_to_date(changed)
+        ):
+            return
+        self._topology = None
 
     def get_root_link(self) -> Optional[CrossLink]:
         """Return the root link of the robot."""
@@ -762,9 +1186,9 @@ class RobotProxy(ProxyBase):
         if not is_robot(self.robot):
             warn(f'Internal error, {label_or(self.robot)} is not a CROSS::Robot', True)
             return []
-        links = self.get_links()
-        joints = self.get_joints()
-        return get_chains(links, joints, check_kinematics)
+        chains = self.get_topology().get_chains(check_kinematics)
+        # A copy of each chain.
+        return [list(chain) for chain in chains]
 
     def get_links_fixed_with(self, link_name: str) -> list[CrossLink]:
         """Return the list of links fixed with the specified link.
@@ -907,6 +1331,9 @@ class RobotProxy(ProxyBase):
             )
             ignore, write, overwrite = diag.exec_()
             diag.close()
+        else:
+            # Headless or scripted export, overwrite everything.
+            ignore, write, overwrite = [], [], list(write_files)
         if set(ignore) == set(write_files):
             # No files to write.
             return
@@ -924,14 +1351,26 @@ class RobotProxy(ProxyBase):
             ),
         )
 
+        # Shared between links to export identical meshes only once.
+        mesh_cache = MeshExportCache(Path(project_path) / package_name / 'meshes')
+        # Timings and cache records of the meshes of all links.
+        mesh_pipeline = MeshExportPipeline(mesh_cache=mesh_cache)
         for link in self.get_links():
             if not hasattr(link, 'Proxy'):
+                mesh_pipeline.finish()
                 error(
                     f"Internal error with '{link.Label}', has no 'Proxy' attribute",
                     True,
                 )
                 return
-            xml.append(link.Proxy.export_urdf(project_path, package_name))
+            xml.append(
+                link.Proxy.export_urdf(
+                    project_path, package_name,
+                    mesh_cache, mesh_pipeline,
+                ),
+            )
+        mesh_pipeline.finish()
+        mesh_cache.save()
 
         for joint in self.get_joints():
             if not joint.Parent:
@@ -993,7 +1432,9 @@ class RobotProxy(ProxyBase):
             cameras_topics_comma_sep=self.get_sensors_topics_by_types(sensor_types = ['camera','depth_camera','wideanglecamera','rgbd_camera'])
         )
 
-        self.copy_custom_worlds(description_package_path / 'worlds')
+        if interactive and fc.GuiUp:
+            # Asks the user.
+            self.copy_custom_worlds(description_package_path / 'worlds')
 
         return xml
     
@@ -1406,8 +1847,8 @@ class _ViewProviderRobot(ProxyBase):
     def load_trajectories_from_yaml(self, vobj: VPDO) -> None:
         # Import late to avoid slowing down workbench start-up.
         import FreeCADGui as fcgui
-        import yaml
         from .trajectory_proxy import make_trajectory
+        from .trajectory_yaml import get_trajectory_yaml_index
 
         dialog = QFileDialog(
             fcgui.getMainWindow(),
@@ -1419,10 +1860,12 @@ class _ViewProviderRobot(ProxyBase):
         else:
             return
 
-        display_trajs = yaml.safe_load_all(open(filename))
+        # Parse one document after the other to keep the memory usage low.
+        display_trajs = get_trajectory_yaml_index(filename)
 
         fcgui.Selection.clearSelection()
-        for display_traj in display_trajs:
+        for i in range(len(display_trajs)):
+            display_traj = display_trajs[i]
             if not display_traj:
                 continue
             traj_obj = make_trajectory('Trajectory', vobj.Object.Document)
@@ -1434,7 +1877,7 @@ class _ViewProviderRobot(ProxyBase):
         fcgui.runCommand('Std_ToggleFreeze', 0)
 
 
-def make_robot(name, doc: Optional[fc.Document] = None) -> CrossRobot:
+def make_robot(name, doc: Optional[fc.Document] = None, recompute_after: bool = True) -> CrossRobot:
     """Add a Cross::Robot to the current document."""
     if doc is None:
         doc = fc.activeDocument()
@@ -1451,7 +1894,8 @@ def make_robot(name, doc: Optional[fc.Document] = None) -> CrossRobot:
         robot.ViewObject.ShowVisual = False
         robot.ViewObject.ShowCollision = True
 
-    doc.recompute()
+    if recompute_after:
+        doc.recompute()
     return robot
 
 
@@ -1618,297 +2062,299 @@ def make_filled_robot_from_assembly(assembly:DO, robot:CrossRobot = None) -> Cro
     assembly_links, assembly_joints, grounded_joints = get_assembly_elements(assembly)
     
 
-    ### create robot links based on assembly links
-    progressBar = get_progress_bar(
-        title = "Make robot links...",
-        min = 0,
-        max = len(assembly_links),
-        show_percents = False,
-    )
-    progressBar.show()
-
-    i = 0
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
+    # The robot is updated once after having added all links and joints.
+    with robot.Proxy.batch_update():
+        ### create robot links based on assembly links
+        progressBar = get_progress_bar(
+            title = "Make robot links...",
+            min = 0,
+            max = len(assembly_links),
+            show_percents = False,
+        )
+        progressBar.show()
 
-    robot_links:list[CrossLink] = []
-    for link in assembly_links:
-        obj = link.getLinkedObject(True)
-        res = make_robot_link_filled(obj, True)
-        if is_link(res):
-            robot_link = res
-            robot_links.append(robot_link)
-            if robot:
-                robot_link.adjustRelativeLinks(robot)
-                robot.addObject(robot_link)
-        i += 1
+        i = 0
         progressBar.setValue(i)
-    progressBar.close()
-    QtGui.QApplication.processEvents()
+        QtGui.QApplication.processEvents()
+
+        robot_links:list[CrossLink] = []
+        for link in assembly_links:
+            obj = link.getLinkedObject(True)
+            res = make_robot_link_filled(obj, True)
+            if is_link(res):
+                robot_link = res
+                robot_links.append(robot_link)
+                if robot:
+                    robot_link.adjustRelativeLinks(robot)
+                    robot.addObject(robot_link)
+            i += 1
+            progressBar.setValue(i)
+        progressBar.close()
+        QtGui.QApplication.processEvents()
  
     
-    def get_next_child_joint(joint) -> DO:
-        for i in assembly_joints_sorted:
-            if joint['link1'].Name == i['link1'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'reverse'
-                yield i
-            elif joint['link2'].Name == i['link1'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'reverse'
-                yield i
-            elif joint['link1'].Name == i['link2'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'forward'
-                yield i
-            elif joint['link2'].Name == i['link2'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'forward'
-                yield i
+        def get_next_child_joint(joint) -> DO:
+            for i in assembly_joints_sorted:
+                if joint['link1'].Name == i['link1'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'reverse'
+                    yield i
+                elif joint['link2'].Name == i['link1'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'reverse'
+                    yield i
+                elif joint['link1'].Name == i['link2'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'forward'
+                    yield i
+                elif joint['link2'].Name == i['link2'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'forward'
+                    yield i
                 
 
-    def get_next_branch_root_joint(joint) -> DO:
-        for i in assembly_joints_sorted:
-            if joint['link1'].Name == i['link1'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'reverse'
-                yield i
-            elif joint['link2'].Name == i['link1'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'reverse'
-                yield i
-            elif joint['link1'].Name == i['link2'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'forward'
-                yield i
-            elif joint['link2'].Name == i['link2'].Name:
-                assembly_joints_sorted.remove(i)
-                i['chain_direction'] = 'forward'
-                yield i
-
-    ### make joint chain tree (not looped kinematic chain tree)
-    # make root joint sorted on top
-    assembly_joints_sorted = sorted(
-        assembly_joints, 
-        key=lambda x: x['is_link2_root_assembly_link'] or x['is_link1_root_assembly_link'],
-        reverse=True
-    )
-    # separated root joint
-    root_joint = assembly_joints_sorted[0]
-    assembly_joints_sorted.remove(root_joint) # we will use root_joint separetly 
+        def get_next_branch_root_joint(joint) -> DO:
+            for i in assembly_joints_sorted:
+                if joint['link1'].Name == i['link1'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'reverse'
+                    yield i
+                elif joint['link2'].Name == i['link1'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'reverse'
+                    yield i
+                elif joint['link1'].Name == i['link2'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'forward'
+                    yield i
+                elif joint['link2'].Name == i['link2'].Name:
+                    assembly_joints_sorted.remove(i)
+                    i['chain_direction'] = 'forward'
+                    yield i
+
+        ### make joint chain tree (not looped kinematic chain tree)
+        # make root joint sorted on top
+        assembly_joints_sorted = sorted(
+            assembly_joints,
+            key=lambda x: x['is_link2_root_assembly_link'] or x['is_link1_root_assembly_link'],
+            reverse=True
+        )
+        # separated root joint
+        root_joint = assembly_joints_sorted[0]
+        assembly_joints_sorted.remove(root_joint) # we will use root_joint separetly
     
-    progressBar = get_progress_bar(
-        title = "Calc kinematic chain tree...",
-        min = 0,
-        max = len(assembly_joints_sorted),
-        show_percents = False,
-    )
-    progressBar.show()
+        progressBar = get_progress_bar(
+            title = "Calc kinematic chain tree...",
+            min = 0,
+            max = len(assembly_joints_sorted),
+            show_percents = False,
+        )
+        progressBar.show()
 
-    i = 0
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
+        i = 0
+        progressBar.setValue(i)
+        QtGui.QApplication.processEvents()
 
-    joint_chain_tree = []
-    while len(assembly_joints_sorted):
-        if root_joint:
-            joint_chain_tree.append(root_joint)
-            i+=1
-            progressBar.setValue(i)
-            QtGui.QApplication.processEvents()
-            child_joint = root_joint
-            root_joint = None
-        else:
-            try:
-                child_joint = next(get_next_child_joint(child_joint))
-                joint_chain_tree.append(child_joint)
+        joint_chain_tree = []
+        while len(assembly_joints_sorted):
+            if root_joint:
+                joint_chain_tree.append(root_joint)
                 i+=1
                 progressBar.setValue(i)
                 QtGui.QApplication.processEvents()
-            except StopIteration:
-                for chain_joint in joint_chain_tree:
-                    try:
-                        child_joint = next(get_next_branch_root_joint(chain_joint))
-                        joint_chain_tree.append(child_joint)
-                        i+=1
-                        progressBar.setValue(i)
-                        QtGui.QApplication.processEvents()
-                        break
-                    except StopIteration:
-                        pass
-    progressBar.close()
-    QtGui.QApplication.processEvents()
+                child_joint = root_joint
+                root_joint = None
+            else:
+                try:
+                    child_joint = next(get_next_child_joint(child_joint))
+                    joint_chain_tree.append(child_joint)
+                    i+=1
+                    progressBar.setValue(i)
+                    QtGui.QApplication.processEvents()
+                except StopIteration:
+                    for chain_joint in joint_chain_tree:
+                        try:
+                            child_joint = next(get_next_branch_root_joint(chain_joint))
+                            joint_chain_tree.append(child_joint)
+                            i+=1
+                            progressBar.setValue(i)
+                            QtGui.QApplication.processEvents()
+                            break
+                        except StopIteration:
+                            pass
+        progressBar.close()
+        QtGui.QApplication.processEvents()
 
 
-    ### create robot joints based on assembly joints
-    progressBar = get_progress_bar(
-        title = "Make robot joints...",
-        min = 0,
-        max = len(joint_chain_tree),
-        show_percents = False,
-    )
-    progressBar.show()
+        ### create robot joints based on assembly joints
+        progressBar = get_progress_bar(
+            title = "Make robot joints...",
+            min = 0,
+            max = len(joint_chain_tree),
+            show_percents = False,
+        )
+        progressBar.show()
 
-    i = 0
-    progressBar.setValue(i)
-    QtGui.QApplication.processEvents()
+        i = 0
+        progressBar.setValue(i)
+        QtGui.QApplication.processEvents()
 
-    try:
-        root_link_setup = False
-        for joint in joint_chain_tree:
-            # prepare data
-            r1 = joint['joint'].Reference1[1][0]
-            r2 = joint['joint'].Reference2[1][0]
-            p1 = joint['joint'].Placement1
-            p2 = joint['joint'].Placement2
-            o1 = joint['joint'].Offset1
-            o2 = joint['joint'].Offset2
-            r1_name_path = r1.split('.')
-            r2_name_path = r2.split('.')
-            r1_obj_link = get_first_link(r1_name_path)
-            r2_obj_link = get_first_link(r2_name_path)
-            r1_obj = r1_obj_link.getLinkedObject(True)
-            r2_obj = r2_obj_link.getLinkedObject(True)
-            parent_robot_link = None
-            child_robot_link = None
-            for robot_link in robot_links:
-                if is_part(robot_link.Real[0]):
-                    for real_sub_el in robot_link.Real[0].Group:
-                        if is_fc_link(real_sub_el):
-                            real_sub_el = real_sub_el.getLinkedObject(True)
-
-                        if r1_obj.Name == real_sub_el.Name:
-                            if not joint['chain_direction'] or joint['chain_direction'] == 'forward':
-                                child_robot_link = robot_link
-                            else:
-                                parent_robot_link = robot_link
-                        elif r2_obj.Name == real_sub_el.Name:
-                            if joint['chain_direction'] == 'reverse':
-                                child_robot_link = robot_link
-                            else:
-                                parent_robot_link = robot_link
+        try:
+            root_link_setup = False
+            for joint in joint_chain_tree:
+                # prepare data
+                r1 = joint['joint'].Reference1[1][0]
+                r2 = joint['joint'].Reference2[1][0]
+                p1 = joint['joint'].Placement1
+                p2 = joint['joint'].Placement2
+                o1 = joint['joint'].Offset1
+                o2 = joint['joint'].Offset2
+                r1_name_path = r1.split('.')
+                r2_name_path = r2.split('.')
+                r1_obj_link = get_first_link(r1_name_path)
+                r2_obj_link = get_first_link(r2_name_path)
+                r1_obj = r1_obj_link.getLinkedObject(True)
+                r2_obj = r2_obj_link.getLinkedObject(True)
+                parent_robot_link = None
+                child_robot_link = None
+                for robot_link in robot_links:
+                    if is_part(robot_link.Real[0]):
+                        for real_sub_el in robot_link.Real[0].Group:
+                            if is_fc_link(real_sub_el):
+                                real_sub_el = real_sub_el.getLinkedObject(True)
+
+                            if r1_obj.Name == real_sub_el.Name:
+                                if not joint['chain_direction'] or joint['chain_direction'] == 'forward':
+                                    child_robot_link = robot_link
+                                else:
+                                    parent_robot_link = robot_link
+                            elif r2_obj.Name == real_sub_el.Name:
+                                if joint['chain_direction'] == 'reverse':
+                                    child_robot_link = robot_link
+                                else:
+                                    parent_robot_link = robot_link
             
-            if not child_robot_link:
-                break
+                if not child_robot_link:
+                    break
 
-            ### calc robot link MountedPlacement
-            # it need to adding assembly link placement to it`s elements (links)
-            # when assembly in other assembly case
-            # for get placement of elements relative to assembly link
-            r2_link_assembly_placement = fc.Placement()
-            r2_link_assembly_placement = get_comulative_assemblies_placement(r2_name_path)
+                ### calc robot link MountedPlacement
+                # it need to adding assembly link placement to it`s elements (links)
+                # when assembly in other assembly case
+                # for get placement of elements relative to assembly link
+                r2_link_assembly_placement = fc.Placement()
+                r2_link_assembly_placement = get_comulative_assemblies_placement(r2_name_path)
 
-            r1_link_assembly_placement = fc.Placement()
-            r1_link_assembly_placement = get_comulative_assemblies_placement(r1_name_path)
+                r1_link_assembly_placement = fc.Placement()
+                r1_link_assembly_placement = get_comulative_assemblies_placement(r1_name_path)
 
-            sub_el_r2 = get_first_lcs_or_link(r2_name_path)
-            sub_el_r1 = get_first_lcs_or_link(r1_name_path)
+                sub_el_r2 = get_first_lcs_or_link(r2_name_path)
+                sub_el_r1 = get_first_lcs_or_link(r1_name_path)
             
-            mounted_placement = fc.Placement()
-            if not joint['chain_direction'] or joint['chain_direction'] == 'forward':
+                mounted_placement = fc.Placement()
+                if not joint['chain_direction'] or joint['chain_direction'] == 'forward':
  
-                link_assembly_placement = r1_link_assembly_placement
+                    link_assembly_placement = r1_link_assembly_placement
                 
-                if is_lcs(sub_el_r1):
-                    r2_sub_el_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * sub_el_r2.Placement
-                    r1_sub_el_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * sub_el_r1.Placement
-                    r1_r2_sub_el_rel_to_outer_plc_diff = r2_sub_el_rel_to_outer_plc.inverse() * r1_sub_el_rel_to_outer_plc
-                    # r1_r2_sub_el_rel_to_outer_plc_diff - required to get parent reference for joint placement instead of child
-                    mounted_placement = (sub_el_r1.Placement * o1) * r1_r2_sub_el_rel_to_outer_plc_diff.inverse()
-                else: # face of obj case
-                    p2_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * p2
-                    p1_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * p1
-                    p1_p2_rel_to_outer_plc_diff = p2_rel_to_outer_plc.inverse() * p1_rel_to_outer_plc
-                    # p1_p2_rel_to_outer_plc_diff - required to get parent reference for joint placement instead of child                
-                    mounted_placement = (p1 * o1) * p1_p2_rel_to_outer_plc_diff.inverse()
-
-                child_robot_link.MountedPlacement = mounted_placement.inverse()
-                origin_mounted_placement_correction = mounted_placement
-                origin_obj_link_correction = r1_obj_link.Placement
-
-                if not root_link_setup:
-                    assembly_link_placement = fc.Placement()
-                    if joint['assembly_link']:
-                        assembly_link_placement = joint['assembly_link'].Placement
-                        parent_robot_link.MountedPlacement = assembly_link_placement * joint['link2'].Placement
-                    root_link_setup = True
-            else: # reverse chain direction
-                link_assembly_placement = r2_link_assembly_placement
-
-                if is_lcs(sub_el_r2):
-                    # r2_sub_el_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * sub_el_r2.Placement
-                    # r1_sub_el_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * sub_el_r1.Placement
-                    # r1_r2_sub_el_rel_to_outer_plc_diff = r2_sub_el_rel_to_outer_plc.inverse() * r1_sub_el_rel_to_outer_plc
-                    # mounted_placement = sub_el_r2.Placement * o2 * r1_r2_sub_el_rel_to_outer_plc_diff
-                    mounted_placement = sub_el_r2.Placement * o2
-                else: # face of obj case
-                    # p2_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * p2
-                    # p1_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * p1
-                    # p1_p2_rel_to_outer_plc_diff = p2_rel_to_outer_plc.inverse() * p1_rel_to_outer_plc                    
-                    # mounted_placement = p2 * o2 * p1_p2_rel_to_outer_plc_diff
-                    mounted_placement = p2 * o2
-
-                child_robot_link.MountedPlacement = mounted_placement.inverse()
-                origin_mounted_placement_correction = mounted_placement
-                origin_obj_link_correction = r2_obj_link.Placement
-
-                if not root_link_setup:
-                    assembly_link_placement = fc.Placement()
-                    if joint['assembly_link']:
-                        assembly_link_placement = joint['assembly_link'].Placement
-                        parent_robot_link.MountedPlacement = assembly_link_placement * joint['link1'].Placement
-                    root_link_setup = True
-
-            ### calc joint Origin
-            robot_joint = make_robot_joint_filled(parent_robot_link, child_robot_link, robot)
-            chain = get_chain(child_robot_link)
-            comulative_joint_placement = fc.Placement()
-            for el in chain:
-                if is_joint(el):
-                    comulative_joint_placement = comulative_joint_placement * el.Origin
-
-            assembly_link_cumulative_placement = fc.Placement()
-            for assembly_hierarhy_el in joint['assembly_hierarhy']:
-                    assembly_link_cumulative_placement = assembly_link_cumulative_placement * assembly_hierarhy_el.Placement
-            
-            # link_assembly_placement - used for first joint that connected new assembly with old one
-            # (becase technically this joint is in parent assembly and links to child assembly)
-            # assembly_link_placement - used for all other joints in new assembly
-            # (becase technically this joint is in child assembly and links directly to object)
-            # In other words: link_assembly_placement uses for joints between assemblies and assembly_link_placement in same assembly
-
-            robot_joint.Origin = comulative_joint_placement.inverse() * assembly_link_cumulative_placement * link_assembly_placement \
-                * origin_obj_link_correction * origin_mounted_placement_correction
+                    if is_lcs(sub_el_r1):
+                        r2_sub_el_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * sub_el_r2.Placement
+                        r1_sub_el_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * sub_el_r1.Placement
+                        r1_r2_sub_el_rel_to_outer_plc_diff = r2_sub_el_rel_to_outer_plc.inverse() * r1_sub_el_rel_to_outer_plc
+                        # r1_r2_sub_el_rel_to_outer_plc_diff - required to get parent reference for joint placement instead of child
+                        mounted_placement = (sub_el_r1.Placement * o1) * r1_r2_sub_el_rel_to_outer_plc_diff.inverse()
+                    else: # face of obj case
+                        p2_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * p2
+                        p1_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * p1
+                        p1_p2_rel_to_outer_plc_diff = p2_rel_to_outer_plc.inverse() * p1_rel_to_outer_plc
+                        # p1_p2_rel_to_outer_plc_diff - required to get parent reference for joint placement instead of child
+                        mounted_placement = (p1 * o1) * p1_p2_rel_to_outer_plc_diff.inverse()
+
+                    child_robot_link.MountedPlacement = mounted_placement.inverse()
+                    origin_mounted_placement_correction = mounted_placement
+                    origin_obj_link_correction = r1_obj_link.Placement
+
+                    if not root_link_setup:
+                        assembly_link_placement = fc.Placement()
+                        if joint['assembly_link']:
+                            assembly_link_placement = joint['assembly_link'].Placement
+                            parent_robot_link.MountedPlacement = assembly_link_placement * joint['link2'].Placement
+                        root_link_setup = True
+                else: # reverse chain direction
+                    link_assembly_placement = r2_link_assembly_placement
+
+                    if is_lcs(sub_el_r2):
+                        # r2_sub_el_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * sub_el_r2.Placement
+                        # r1_sub_el_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * sub_el_r1.Placement
+                        # r1_r2_sub_el_rel_to_outer_plc_diff = r2_sub_el_rel_to_outer_plc.inverse() * r1_sub_el_rel_to_outer_plc
+                        # mounted_placement = sub_el_r2.Placement * o2 * r1_r2_sub_el_rel_to_outer_plc_diff
+                        mounted_placement = sub_el_r2.Placement * o2
+                    else: # face of obj case
+                        # p2_rel_to_outer_plc = r2_link_assembly_placement * r2_obj_link.Placement * p2
+                        # p1_rel_to_outer_plc = r1_link_assembly_placement * r1_obj_link.Placement * p1
+                        # p1_p2_rel_to_outer_plc_diff = p2_rel_to_outer_plc.inverse() * p1_rel_to_outer_plc
+                        # mounted_placement = p2 * o2 * p1_p2_rel_to_outer_plc_diff
+                        mounted_placement = p2 * o2
+
+                    child_robot_link.MountedPlacement = mounted_placement.inverse()
+                    origin_mounted_placement_correction = mounted_placement
+                    origin_obj_link_correction = r2_obj_link.Placement
+
+                    if not root_link_setup:
+                        assembly_link_placement = fc.Placement()
+                        if joint['assembly_link']:
+                            assembly_link_placement = joint['assembly_link'].Placement
+                            parent_robot_link.MountedPlacement = assembly_link_placement * joint['link1'].Placement
+                        root_link_setup = True
+
+                ### calc joint Origin
+                robot_joint = make_robot_joint_filled(parent_robot_link, child_robot_link, robot)
+                chain = get_chain(child_robot_link)
+                comulative_joint_placement = fc.Placement()
+                for el in chain:
+                    if is_joint(el):
+                        comulative_joint_placement = comulative_joint_placement * el.Origin
+
+                assembly_link_cumulative_placement = fc.Placement()
+                for assembly_hierarhy_el in joint['assembly_hierarhy']:
+                        assembly_link_cumulative_placement = assembly_link_cumulative_placement * assembly_hierarhy_el.Placement
             
-            ### set joint type
-            assembly_wb_joint_type = joint['joint'].JointType
-            joint_match = wb_constants.ASSEMBLY_WB_JOINTS_MATCHING[assembly_wb_joint_type]
+                # link_assembly_placement - used for first joint that connected new assembly with old one
+                # (becase technically this joint is in parent assembly and links to child assembly)
+                # assembly_link_placement - used for all other joints in new assembly
+                # (becase technically this joint is in child assembly and links directly to object)
+                # In other words: link_assembly_placement uses for joints between assemblies and assembly_link_placement in same assembly
+
+                robot_joint.Origin = comulative_joint_placement.inverse() * assembly_link_cumulative_placement * link_assembly_placement \
+                    * origin_obj_link_correction * origin_mounted_placement_correction
             
-            if assembly_wb_joint_type == 'Revolute' \
-            and getattr(joint['joint'], 'EnableAngleMin') == False \
-            and getattr(joint['joint'], 'EnableAngleMax') == False:
-                assembly_wb_joint_type = 'Revolute_unlimited'
+                ### set joint type
+                assembly_wb_joint_type = joint['joint'].JointType
                 joint_match = wb_constants.ASSEMBLY_WB_JOINTS_MATCHING[assembly_wb_joint_type]
             
-            if joint_match['type'] != 'undefined':
-                robot_joint.Type = joint_match['type']
-                if joint_match['limits']:
-                    for limit in joint_match['limits']:
-                        if getattr(joint['joint'], limit['assembly_enable_param']) == True:
-                            setattr(robot_joint, limit['robotcad_value_param'], getattr(joint['joint'], limit['assembly_value_param']))
-            else:
-                warn('Can`t automatically match joint type ' + joint['joint'].JointType + ' of joint '+ joint['joint'].Name +' \
+                if assembly_wb_joint_type == 'Revolute' \
+                and getattr(joint['joint'], 'EnableAngleMin') == False \
+                and getattr(joint['joint'], 'EnableAngleMax') == False:
+                    assembly_wb_joint_type = 'Revolute_unlimited'
+                    joint_match = wb_constants.ASSEMBLY_WB_JOINTS_MATCHING[assembly_wb_joint_type]
+
+                if joint_match['type'] != 'undefined':
+                    robot_joint.Type = joint_match['type']
+                    if joint_match['limits']:
+                        for limit in joint_match['limits']:
+                            if getattr(joint['joint'], limit['assembly_enable_param']) == True:
+                                setattr(robot_joint, limit['robotcad_value_param'], getattr(joint['joint'], limit['assembly_value_param']))
+                else:
+                    warn('Can`t automatically match joint type ' + joint['joint'].JointType + ' of joint '+ joint['joint'].Name +' \
 to RobotCAD joint type. Set joint type manually in resulting structure or change joint type to supported by URDF in assembly.')
 
-            i+=1
-            progressBar.setValue(i)
+                i+=1
+                progressBar.setValue(i)
+                QtGui.QApplication.processEvents()
+        except Exception as e:
+            progressBar.close()
             QtGui.QApplication.processEvents()
-    except Exception as e:
+            raise e
+
         progressBar.close()
         QtGui.QApplication.processEvents()
-        raise e
-    
-    progressBar.close()
-    QtGui.QApplication.processEvents()
 
     return robot
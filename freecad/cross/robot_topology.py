@@ -0,0 +1,204 @@
+"""Index of the kinematic tree of a Cross::Robot.
+
+The index maps ROS names to links and joints and stores the parent/child
+relationships between them, so that lookups don't need to scan
+`robot.Group`.
+The index is owned by `RobotProxy` and rebuilt lazily after being
+invalidated, i.e. on change of the robot's `Group` or of the `Parent`,
+`Child`, `Label`, `Label2`, `Mimic`, or `MimickedJoint` of its links and
+joints.
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import FreeCAD as fc
+
+from .freecad_utils import warn
+from .wb_utils import is_joint
+from .wb_utils import ros_name
+
+# Stubs and typing hints.
+from .joint import Joint as CrossJoint  # A Cross::Joint, i.e. a DocumentObject with Proxy "Joint". # noqa: E501
+from .link import Link as CrossLink  # A Cross::Link, i.e. a DocumentObject with Proxy "Link". # noqa: E501
+DO = fc.DocumentObject
+
+
+@dataclass
+class RobotTopology:
+    """Name and parent/child maps of the links and joints of a robot."""
+
+    # Map of ROS names to links.
+    links: dict[str, CrossLink] = field(default_factory=dict)
+    # Map of ROS names to joints.
+    joints: dict[str, CrossJoint] = field(default_factory=dict)
+    # Map of link ROS names to the joints having this link as parent, in the
+    # order of creation.
+    child_joints: dict[str, list[CrossJoint]] = field(default_factory=dict)
+    # Map of link ROS names to the joint having this link as child.
+    # Parallel mechanisms are not supported, there should be only one such
+    # joint per link. The first one in the order of creation is kept.
+    parent_joint: dict[str, CrossJoint] = field(default_factory=dict)
+    # Map of joints to the joints mimicking them.
+    mimicking_joints: dict[CrossJoint, list[CrossJoint]] = field(default_factory=dict)
+    # Map of links and joints to the state they were indexed with, see
+    # `_get_indexed_state()`.
+    indexed_states: dict[DO, tuple] = field(default_factory=dict)
+    # Cache for `get_chains()`, keyed by `check_kinematics`.
+    chains: dict[bool, list[list]] = field(default_factory=dict)
+    # Cache for `get_ancestor_links()`.
+    ancestor_links: dict[str, frozenset[str]] = field(default_factory=dict)
+    # Incremented each time the topology of a robot is rebuilt.
+    version: int = 0
+
+    def is_up_to_date(self, obj: DO) -> bool:
+        """Return True if the link or joint `obj` is indexed in its current state."""
+        return self.indexed_states.get(obj) == _get_indexed_state(obj)
+
+    def get_link(self, name: str) -> Optional[CrossLink]:
+        """Return the link with ROS name `name` or None."""
+        return self.links.get(name)
+
+    def get_joint(self, name: str) -> Optional[CrossJoint]:
+        """Return the joint with ROS name `name` or None."""
+        return self.joints.get(name)
+
+    def get_parent_joint(self, link_name: str) -> Optional[CrossJoint]:
+        """Return the joint that has the link `link_name` as child."""
+        return self.parent_joint.get(link_name)
+
+    def get_child_joints(self, link_name: str) -> list[CrossJoint]:
+        """Return the joints that have the link `link_name` as parent."""
+        return list(self.child_joints.get(link_name, []))  # A copy.
+
+    def is_tip_link(self, link_name: str) -> bool:
+        """Return True if the link `link_name` is parent of no joint."""
+        return not self.child_joints.get(link_name)
+
+    def get_mimicking_joints(self, joint: CrossJoint) -> list[CrossJoint]:
+        """Return the joints that mimic `joint`."""
+        return list(self.mimicking_joints.get(joint, []))  # A copy.
+
+    def get_ancestor_links(self, link_name: str) -> frozenset[str]:
+        """Return the ROS names of the links from the base link to `link_name`.
+
+        `link_name` is included. Computed once per link and topology, the
+        ancestors of a link reuse the ones of its parent link.
+
+        """
+        if link_name in self.ancestor_links:
+            return self.ancestor_links[link_name]
+        # Walk up to the first link with known ancestors, a base link, or a
+        # link already visited (i.e. a loop).
+        path: list[str] = []
+        visited: set[str] = set()
+        name = link_name
+        known: frozenset[str] = frozenset()
+        while True:
+            if name in self.ancestor_links:
+                known = self.ancestor_links[name]
+                break
+            if name in visited:
+                break
+            visited.add(name)
+            path.append(name)
+            joint = self.parent_joint.get(name)
+            if (joint is None) or (not joint.Parent):
+                break
+            name = joint.Parent
+        for name in reversed(path):
+            known = known | {name}
+            self.ancestor_links[name] = known
+        return self.ancestor_links[link_name]
+
+    def get_chain(self, link: CrossLink) -> list:
+        """Return the chain from the base link to `link`, included.
+
+        The chain starts with the base link, then alternates a joint and a
+        link. If a joint on the way has no parent or its parent is not a link
+        of the index, return only this joint to indicate the error, as
+        `wb_utils.get_chain()`.
+
+        """
+        reversed_chain: list = [link]
+        name = ros_name(link)
+        visited: set[str] = {name}
+        while True:
+            joint = self.parent_joint.get(name)
+            if joint is None:
+                # Base link reached.
+                break
+            if not joint.Parent:
+                warn(f'Joint `{ros_name(joint)}` has no parent', False)
+                return [joint]
+            parent_link = self.links.get(joint.Parent)
+            if (parent_link is None) or (joint.Parent in visited):
+                warn(f'Joint `{ros_name(joint)}` has an invalid parent', False)
+                return [joint]
+            visited.add(joint.Parent)
+            reversed_chain += [joint, parent_link]
+            name = joint.Parent
+        return reversed_chain[::-1]
+
+    def get_chains(self, check_kinematics: bool = True) -> list[list]:
+        """Return the chains from the base link to each tip link.
+
+        Same as `wb_utils.get_chains()`, built from the parent/child maps
+        and cached.
+        Return an empty list if `check_kinematics` and there are several base
+        links.
+
+        """
+        if check_kinematics in self.chains:
+            return self.chains[check_kinematics]
+        chains: list[list] = []
+        if (not check_kinematics) or (len(self.get_base_links()) <= 1):
+            for name, link in self.links.items():
+                if self.is_tip_link(name):
+                    chains.append(self.get_chain(link))
+        self.chains[check_kinematics] = chains
+        return chains
+
+    def get_base_links(self) -> list[CrossLink]:
+        """Return the links that are child of no joint, in order of creation."""
+        return [
+            link for name, link in self.links.items()
+            if name not in self.parent_joint
+        ]
+
+
+def _get_indexed_state(obj: DO) -> tuple:
+    """Return the properties of a link or joint that the index depends on."""
+    if is_joint(obj):
+        mimicked = obj.MimickedJoint if obj.Mimic else None
+        return ros_name(obj), obj.Parent, obj.Child, mimicked
+    return ros_name(obj),
+
+
+def build_topology(
+        links: list[CrossLink],
+        joints: list[CrossJoint],
+        version: int = 0,
+) -> RobotTopology:
+    """Return the topology index of the given links and joints.
+
+    Each link and joint is visited once.
+
+    """
+    topology = RobotTopology(version=version)
+    for link in links:
+        topology.links.setdefault(ros_name(link), link)
+        topology.indexed_states[link] = _get_indexed_state(link)
+    for joint in joints:
+        topology.indexed_states[joint] = _get_indexed_state(joint)
+        topology.joints.setdefault(ros_name(joint), joint)
+        if joint.Parent:
+            topology.child_joints.setdefault(joint.Parent, []).append(joint)
+        if joint.Child:
+            topology.parent_joint.setdefault(joint.Child, joint)
+        if joint.Mimic and joint.MimickedJoint:
+            topology.mimicking_joints.setdefault(joint.MimickedJoint, []).append(joint)
+    return topology
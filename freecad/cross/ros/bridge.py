@@ -0,0 +1,273 @@
+"""Asynchronous access to ROS from FreeCAD.
+
+The `RosBridge` spins the ROS executor in a background thread. Service calls
+run concurrently in worker threads, each with its own timeout, and their
+results are delivered to callbacks in the thread of the Qt event loop, so
+that an unreachable server never blocks the GUI.
+
+Example with a stand-in service, e.g. in a test:
+
+    >>> import rclpy
+    >>> from rclpy.executors import MultiThreadedExecutor
+    >>> from std_srvs.srv import Trigger
+    >>> rclpy.init()
+    >>> server = rclpy.create_node('server')
+    >>> _ = server.create_service(
+    ...     Trigger, 'trigger',
+    ...     lambda req, res: setattr(res, 'success', True) or res)
+    >>> client = rclpy.create_node('client')
+    >>> executor = MultiThreadedExecutor()
+    >>> executor.add_node(server)
+    >>> executor.add_node(client)
+    >>> bridge = RosBridge(client, executor, dispatch=lambda f: f())
+    >>> bridge.call_service(Trigger, 'trigger', Trigger.Request()).result(5.0).success
+    True
+    >>> bridge.shutdown()
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .. import wb_globals
+from ..freecad_utils import warn
+
+# Maximum number of concurrent service calls.
+_MAX_CONCURRENT_CALLS = 8
+# Interval to check whether a service became available, in s.
+_WAIT_FOR_SERVICE_INTERVAL = 0.2
+
+# A function executing a callable in the GUI thread.
+Dispatch = Callable[[Callable[[], None]], None]
+
+
+class RosTimeoutError(FutureTimeoutError):
+    """A service was not reached or did not answer within the timeout."""
+
+
+def _get_qt_dispatch() -> Optional[Dispatch]:
+    """Return a function to run callables in the Qt event loop, or None."""
+    import FreeCAD as fc
+
+    if not (hasattr(fc, 'GuiUp') and fc.GuiUp):
+        return None
+    from PySide import QtCore  # FreeCAD's PySide!
+
+    class _Dispatcher(QtCore.QObject):
+        # Emitted from any thread, the slot runs in the thread of the
+        # QObject, i.e. the GUI thread.
+        called = QtCore.Signal(object)
+
+        def __init__(self):
+            super().__init__()
+            self.called.connect(self._run, QtCore.Qt.QueuedConnection)
+
+        def _run(self, function: Callable[[], None]) -> None:
+            function()
+
+    # The lambda keeps a reference to the QObject.
+    dispatcher = _Dispatcher()
+    return lambda function: dispatcher.called.emit(function)
+
+
+class RosBridge:
+    """Background ROS executor with callbacks in the GUI thread."""
+
+    def __init__(
+            self,
+            node: Any,
+            executor: Any,
+            dispatch: Optional[Dispatch] = None,
+    ):
+        """Constructor, must be called from the GUI thread.
+
+        Parameters
+        ----------
+        - node: the rclpy node to create clients and subscriptions with.
+        - executor: an rclpy executor containing `node`, spun by the bridge.
+        - dispatch: function to run callbacks in the GUI thread, defaults to
+                    the Qt event loop if the GUI is up, otherwise callbacks
+                    are called in the thread of the executor or request.
+
+        """
+        self.node = node
+        self.executor = executor
+        if dispatch is None:
+            dispatch = _get_qt_dispatch() or (lambda function: function())
+        self._dispatch = dispatch
+        self._clients: dict[tuple[Any, str], Any] = {}
+        self._clients_lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(
+            max_workers=_MAX_CONCURRENT_CALLS,
+            thread_name_prefix='cross-ros-call',
+        )
+        self._thread = threading.Thread(
+            target=self._spin,
+            name='cross-ros-executor',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _spin(self) -> None:
+        try:
+            self.executor.spin()
+        except Exception as e:
+            # Also raised on shutdown by some versions of rclpy.
+            # `e` is unbound at the end of the `except` clause.
+            msg = f'ROS executor stopped: {e}'
+            self._dispatch(lambda: warn(msg))
+
+    def shutdown(self) -> None:
+        """Stop the executor thread, pending calls will time out."""
+        self._workers.shutdown(wait=False)
+        self.executor.shutdown()
+        self._thread.join(timeout=1.0)
+
+    def call_service(
+            self,
+            srv_type: Any,
+            service_name: str,
+            request: Any,
+            callback: Optional[Callable[[Any], None]] = None,
+            error_callback: Optional[Callable[[Exception], None]] = None,
+            timeout_sec: float = 10.0,
+    ) -> Future:
+        """Call a service without blocking, return a future of the response.
+
+        Parameters
+        ----------
+        - srv_type: the service type, e.g. `moveit_msgs.srv.GetPlanningScene`.
+        - service_name: the name of the service.
+        - request: the request.
+        - callback: called in the GUI thread with the response.
+        - error_callback: called in the GUI thread with the exception, e.g.
+                          `RosTimeoutError`, if the call fails.
+        - timeout_sec: timeout to reach the server plus to get the response,
+                       wait indefinitely if 0.0.
+
+        """
+        future = self._workers.submit(
+            self._call_service,
+            srv_type,
+            service_name,
+            request,
+            timeout_sec,
+        )
+        if (callback is not None) or (error_callback is not None):
+            future.add_done_callback(
+                lambda f: self._dispatch(
+                    lambda: self._deliver(f, callback, error_callback),
+                ),
+            )
+        return future
+
+    def subscribe(
+            self,
+            msg_type: Any,
+            topic: str,
+            callback: Callable[[Any], None],
+            qos: Any = 10,
+    ) -> Any:
+        """Subscribe to a topic, `callback` is called in the GUI thread.
+
+        Return the subscription, to give to `unsubscribe()`.
+        The messages are delivered in order.
+
+        """
+        return self.node.create_subscription(
+            msg_type,
+            topic,
+            lambda msg: self._dispatch(lambda: callback(msg)),
+            qos,
+        )
+
+    def unsubscribe(self, subscription: Any) -> None:
+        self.node.destroy_subscription(subscription)
+
+    def _get_client(self, srv_type: Any, service_name: str) -> Any:
+        with self._clients_lock:
+            key = (srv_type, service_name)
+            if key not in self._clients:
+                self._clients[key] = self.node.create_client(srv_type, service_name)
+            return self._clients[key]
+
+    def _call_service(
+            self,
+            srv_type: Any,
+            service_name: str,
+            request: Any,
+            timeout_sec: float,
+    ) -> Any:
+        """Call the service and wait for the response, in a worker thread."""
+        deadline = (time.monotonic() + timeout_sec) if (timeout_sec > 0.0) else None
+
+        def remaining() -> Optional[float]:
+            if deadline is None:
+                return None
+            return max(deadline - time.monotonic(), 0.0)
+
+        client = self._get_client(srv_type, service_name)
+        while not client.wait_for_service(timeout_sec=_WAIT_FOR_SERVICE_INTERVAL):
+            if remaining() == 0.0:
+                raise RosTimeoutError(
+                    f'The server /{service_name} was not reached'
+                    f' within {timeout_sec} s',
+                )
+        ros_future = client.call_async(request)
+        done = threading.Event()
+        ros_future.add_done_callback(lambda _: done.set())
+        if not done.wait(remaining()):
+            ros_future.cancel()
+            client.remove_pending_request(ros_future)
+            raise RosTimeoutError(
+                f'The server /{service_name} was reached but the request'
+                f' timed out after {timeout_sec} s',
+            )
+        if ros_future.exception() is not None:
+            raise ros_future.exception()
+        return ros_future.result()
+
+    @staticmethod
+    def _deliver(
+            future: Future,
+            callback: Optional[Callable[[Any], None]],
+            error_callback: Optional[Callable[[Exception], None]],
+    ) -> None:
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is not None:
+            if error_callback is not None:
+                error_callback(exception)
+            else:
+                warn(str(exception), True)
+            return
+        if callback is not None:
+            callback(future.result())
+
+
+_bridge: Optional[RosBridge] = None
+
+
+def get_ros_bridge() -> Optional[RosBridge]:
+    """Return the bridge of the workbench's node, None if ROS is unavailable.
+
+    The bridge is created, i.e. the executor starts spinning, on first call,
+    which must happen in the GUI thread.
+
+    """
+    global _bridge
+    if _bridge is not None:
+        return _bridge
+    node = wb_globals.g_ros_node
+    executor = wb_globals.g_ros_executor
+    if (node is None) or (executor is None):
+        return None
+    _bridge = RosBridge(node, executor)
+    return _bridge
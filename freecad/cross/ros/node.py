@@ -1,28 +1,35 @@
+"""The ROS node of the workbench.
+
+rclpy is only imported when the node is created, i.e. on first use of a
+ROS-related feature, see `wb_globals.init_ros()`.
+
+"""
+
 from __future__ import annotations
 
-from typing import ForwardRef, Optional, Tuple
+from typing import Optional, Tuple
+import typing
 
-try:
-    import rclpy
+if typing.TYPE_CHECKING:
     from rclpy.node import Node
     from rclpy.executors import MultiThreadedExecutor
-    imports_ok = True
-except ImportError:
-    Node = ForwardRef('Node')
-    MultiThreadedExecutor = ForwardRef('MultiThreadedExecutor')
-    imports_ok = False
 
 
 def get_node() -> Optional[Node]:
-    if not imports_ok:
+    try:
+        from rclpy.node import Node
+    except ImportError:
         return None
 
     node = Node('cross')
     return node
 
 
-def get_node_and_executor() -> Tuple[Optional[MultiThreadedExecutor], Optional[Node]]:
-    if not imports_ok:
+def get_node_and_executor() -> Tuple[Optional[Node], Optional[MultiThreadedExecutor]]:
+    try:
+        import rclpy
+        from rclpy.executors import MultiThreadedExecutor
+    except ImportError:
         return None, None
 
     if not rclpy.ok():
@@ -30,6 +37,6 @@ def get_node_and_executor() -> Tuple[Optional[MultiThreadedExecutor], Optional[N
     node = get_node()
     if node is None:
         return None, None
-    executor = rclpy.executors.MultiThreadedExecutor()
+    executor = MultiThreadedExecutor()
     executor.add_node(node)
     return node, executor
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from typing import ForwardRef, Optional
-import time
+from concurrent.futures import Future
+from typing import Callable, ForwardRef, Optional
 
 try:
     from moveit_msgs.msg import PlanningScene as PlanningSceneMsg
@@ -12,15 +12,75 @@ except ImportError:
     GetPlanningScene = ForwardRef('GetPlanningScene')
     imports_ok = False
 
-from .. import wb_globals
-from ..freecad_utils import message
 from ..freecad_utils import tr
 from ..freecad_utils import warn
+from .bridge import RosTimeoutError
+from .bridge import get_ros_bridge
+
+_SERVICE_NAME = 'get_planning_scene'
+
+# Last scene received by `get_planning_scene_async()`, so that the step
+# changing the document can be run with `FreeCADGui.doCommand()`.
+_last_planning_scene: Optional[PlanningSceneMsg] = None
+
+
+def get_planning_scene_async(
+        callback: Callable[[PlanningSceneMsg], None],
+        error_callback: Optional[Callable[[Exception], None]] = None,
+        timeout_sec: float = 10.0,
+) -> Optional[Future]:
+    """Request the current planning scene without blocking.
+
+    Parameters:
+        - callback: called in the GUI thread with the planning scene.
+        - error_callback: called in the GUI thread with the exception if the
+                          server was not reached or did not answer in time,
+                          the default warns the user.
+        - timeout_sec: Timeout to reach the server and get the response.
+                       Will wait indefinitely if set to 0.0.
+
+    Return the future of the service response or None if ROS is not
+    available.
+
+    """
+    if not imports_ok:
+        warn(tr('ROS modules cannot be imported'), gui=True)
+        return None
+
+    bridge = get_ros_bridge()
+    if bridge is None:
+        return None
+
+    def on_error(e: Exception) -> None:
+        warn(tr(str(e)), gui=True)
+
+    def on_response(response) -> None:
+        global _last_planning_scene
+        _last_planning_scene = response.scene
+        callback(response.scene)
+
+    # TODO: configure the service name.
+    return bridge.call_service(
+        GetPlanningScene,
+        _SERVICE_NAME,
+        GetPlanningScene.Request(),
+        callback=on_response,
+        error_callback=error_callback or on_error,
+        timeout_sec=timeout_sec,
+    )
+
+
+def get_last_planning_scene() -> Optional[PlanningSceneMsg]:
+    """Return the last scene received by `get_planning_scene_async()`."""
+    return _last_planning_scene
 
 
 def get_planning_scene(timeout_sec=0.0) -> Optional[PlanningSceneMsg]:
     """Get the current planning scene by calling the ROS server.
 
+    Blocks until the response is received, prefer
+    `get_planning_scene_async()` in the GUI.
+
     Parameters:
         - timeout_sec: Timeout to reach the server and then timeout
                        to get the response. Will wait indefinitely if
@@ -31,27 +91,68 @@ def get_planning_scene(timeout_sec=0.0) -> Optional[PlanningSceneMsg]:
         warn(tr('ROS modules cannot be imported'), gui=True)
         return None
 
-    node = wb_globals.g_ros_node
-    if node is None:
+    bridge = get_ros_bridge()
+    if bridge is None:
         return None
 
-    executor = wb_globals.g_ros_executor
-
-    # TODO: configure the service name.
-    service_name = 'get_planning_scene'
-    client = node.create_client(GetPlanningScene, service_name)
-    start_time = time.time()
-    while not client.wait_for_service(timeout_sec=1.0):
-        msg = f'service /{service_name} not available, waiting again...'
-        message(msg)
-        node.get_logger().info(msg)
-        if (timeout_sec > 0.0) and (time.time() - start_time) > timeout_sec:
-            warn(tr(f'The server /{service_name} was not reached within {timeout_sec} s'), gui=True)
-            return None
-    request = GetPlanningScene.Request()
-    future = client.call_async(request)
-    executor.spin_until_future_complete(future, timeout_sec=timeout_sec)
-    if not future.done():
-        warn(tr('The server was reached but the request timed out'), gui=True)
+    future = bridge.call_service(
+        GetPlanningScene,
+        _SERVICE_NAME,
+        GetPlanningScene.Request(),
+        timeout_sec=timeout_sec,
+    )
+    try:
+        return future.result().scene
+    except RosTimeoutError as e:
+        warn(tr(str(e)), gui=True)
         return None
-    return future.result().scene
+
+
+class PlanningSceneSubscription:
+    """Subscription to the planning scene published by MoveIt.
+
+    The messages, typically diffs from `/monitored_planning_scene`, are
+    given in order to `callback` in the GUI thread.
+
+    """
+
+    def __init__(
+            self,
+            callback: Callable[[PlanningSceneMsg], None],
+            topic: str = 'monitored_planning_scene',
+    ):
+        self.callback = callback
+        self.topic = topic
+        self._subscription = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._subscription is not None
+
+    def start(self) -> bool:
+        """Subscribe, return False if ROS is not available."""
+        if self.is_active:
+            return True
+        if not imports_ok:
+            warn(tr('ROS modules cannot be imported'), gui=True)
+            return False
+        bridge = get_ros_bridge()
+        if bridge is None:
+            return False
+        self._subscription = bridge.subscribe(
+            PlanningSceneMsg,
+            self.topic,
+            self._on_message,
+        )
+        return True
+
+    def stop(self) -> None:
+        if not self.is_active:
+            return
+        get_ros_bridge().unsubscribe(self._subscription)
+        self._subscription = None
+
+    def _on_message(self, msg: PlanningSceneMsg) -> None:
+        # Messages may still be queued after `stop()`.
+        if self.is_active:
+            self.callback(msg)
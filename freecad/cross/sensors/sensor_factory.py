@@ -10,7 +10,7 @@ from ..freecad_utils import error, warn
 from .sensor import Sensor as CrossSensor  # A Cross::Sensor, i.e. a DocumentObject with Proxy "Sensor". # noqa: E501
 
 
-def make_sensor(sensor_data: dict, sensor_dir_name: str, doc: Optional[fc.Document] = None) -> CrossSensor | None:
+def make_sensor(sensor_data: dict, sensor_dir_name: str, doc: Optional[fc.Document] = None, recompute_after: bool = True) -> CrossSensor | None:
     """Add a Cross::SensorJoint or Cross::SensorLink to the current document."""
 
     if doc is None:
@@ -35,5 +35,6 @@ def make_sensor(sensor_data: dict, sensor_dir_name: str, doc: Optional[fc.Docume
         doc.recompute()
         return None
 
-    doc.recompute()
+    if recompute_after:
+        doc.recompute()
     return sensor
@@ -20,6 +20,7 @@ import FreeCAD as fc
 
 from PySide.QtWidgets import QMenu  # FreeCAD's PySide
 
+from ..catalog_cache import CatalogCache
 from ..freecad_utils import ProxyBase
 from ..freecad_utils import add_property
 from ..freecad_utils import error
@@ -263,7 +264,37 @@ def add_sensor_properties(
 
 
 def get_sensors_data(SENSORS_PATH: Path = SENSORS_DATA_PATH) -> dict :
-    ''' Get sensors data. '''
+    ''' Get sensors data, grouped by the directory they are attachable to.
+
+    The data of the default sensors directory comes from the catalog cache,
+    rebuilt only when the sensors or the SDF schema change. The returned dict
+    is a new object at each call and can be modified.
+    '''
+
+    if Path(SENSORS_PATH) != _sensors_catalog.source_dirs[0]:
+        return build_sensors_data(SENSORS_PATH)
+    return _sensors_catalog.get()
+
+
+def find_sensors(name: str | None = None, type: str | None = None) -> list[dict] :
+    ''' Return the data of the sensors by name and/or SDF type (e.g. 'camera').
+
+    Faster than `get_sensors_data()` because only the found sensors are
+    deserialized. A sensor attachable to both links and joints is returned
+    twice, see `sensor_dir_name` in the returned data.
+    '''
+
+    return _sensors_catalog.find(name, type)
+
+
+def _get_sensors_index_entries(sensors: dict) -> Iterable[tuple[str, str, dict]] :
+    for sensor_dir in sensors.values():
+        for name, sensor in sensor_dir.items():
+            yield name, sensor['type'], sensor
+
+
+def build_sensors_data(SENSORS_PATH: Path = SENSORS_DATA_PATH) -> dict :
+    ''' Build sensors data by parsing the sensors and the SDF schema. '''
 
     def collect_sensors_parameters(sensors_dirs: dict) -> dict :
         ''' Adding to sensors their collected parameters. '''
@@ -363,6 +394,17 @@ def get_sensors_data(SENSORS_PATH: Path = SENSORS_DATA_PATH) -> dict :
     return sensors
 
 
+# Increase `builder_version` when `build_sensors_data()` changes.
+_sensors_catalog = CatalogCache(
+    'sensors',
+    build_sensors_data,
+    _get_sensors_index_entries,
+    [SENSORS_DATA_PATH, SDFORMAT_PATH],
+    ('.sdf',),
+    builder_version=1,
+)
+
+
 def add_full_name_to_params(
     params: dict,
     param_name_prefix: list = [],
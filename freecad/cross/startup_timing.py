@@ -0,0 +1,83 @@
+"""Timings of the initialization steps of the workbench.
+
+The steps are recorded with `timed()`, e.g. the import of the command
+modules or the initialization of ROS, whenever they happen. The report is
+written to the log at the end of the workbench initialization and can be
+printed at any time from the Python console with
+
+    >>> from freecad.cross.startup_timing import print_report
+    >>> print_report()
+
+This module must stay light, it is imported first by `init_gui.py`.
+
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import time
+from typing import Iterator
+
+import FreeCAD as fc
+
+# Steps as (label, duration in s), in the order of their end.
+_timings: list[tuple[str, float]] = []
+_t0 = time.perf_counter()
+
+
+@contextmanager
+def timed(label: str) -> Iterator[None]:
+    """Record the duration of the `with` block under `label`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((label, time.perf_counter() - t0))
+
+
+def get_timings() -> list[tuple[str, float]]:
+    """Return the recorded steps as (label, duration in s)."""
+    return list(_timings)
+
+
+def get_report(min_duration: float = 0.0) -> str:
+    """Return a human-readable report of the recorded steps.
+
+    Parameters
+    ----------
+    - min_duration: steps shorter than this, in s, are summed up in a
+                    single line.
+
+    """
+    lines = ['RobotCAD initialization timings:']
+    total = 0.0
+    hidden_count = 0
+    hidden_duration = 0.0
+    for label, duration in _timings:
+        total += duration
+        if duration < min_duration:
+            hidden_count += 1
+            hidden_duration += duration
+            continue
+        lines.append(f'  {duration * 1000.0:8.1f} ms  {label}')
+    if hidden_count:
+        lines.append(
+            f'  {hidden_duration * 1000.0:8.1f} ms  {hidden_count} steps'
+            f' shorter than {min_duration * 1000.0:.0f} ms',
+        )
+    lines.append(f'  {total * 1000.0:8.1f} ms  total of the steps')
+    lines.append(
+        f'  {(time.perf_counter() - _t0) * 1000.0:8.1f} ms'
+        '  since the workbench was loaded',
+    )
+    return '\n'.join(lines)
+
+
+def log_report(min_duration: float = 0.005) -> None:
+    """Write the report to the log, see "Report view" in the preferences."""
+    fc.Console.PrintLog(get_report(min_duration) + '\n')
+
+
+def print_report(min_duration: float = 0.0) -> None:
+    """Write the report as message."""
+    fc.Console.PrintMessage(get_report(min_duration) + '\n')
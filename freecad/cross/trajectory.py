@@ -17,6 +17,7 @@ class Trajectory(DO):
     PointIndex: int
     Proxy: TrajectoryProxy
     Robot: CrossRobot
+    TrajectoryData: str
     ViewObject: Optional[ViewProviderTrajectory]
     _Type: str
 
@@ -0,0 +1,260 @@
+"""Real-time playback of a Cross::Trajectory.
+
+The player is driven by a Qt timer. At each tick, the joint positions are
+interpolated at the current time of the trajectory (`time_from_start` of its
+points), the link poses are computed with `RobotProxy.batch_fk()`, and only
+the Coin transforms of the FreeCAD links showing the robot are updated, i.e.
+without document recompute. Ticks that come too late are not caught up, the
+next tick shows the trajectory at the current time.
+The document is not modified during playback, `stop()` restores the Coin
+transforms.
+
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+import FreeCAD as fc
+
+import numpy as np
+from pivy import coin
+from PySide import QtCore  # FreeCAD's PySide!
+
+from .freecad_utils import is_link as is_freecad_link
+from .freecad_utils import message
+from .freecad_utils import warn
+from .kinematics_utils import matrix_from_placement
+from .wb_utils import is_robot
+
+# Stubs and type hints.
+from .trajectory import Trajectory as CrossTrajectory  # A Cross::Trajectory, i.e. a DocumentObject with Proxy "Trajectory". # noqa: E501
+DO = fc.DocumentObject
+
+# Interval between two updates of the FPS in `TrajectoryPlayer.fps`, in s.
+_FPS_INTERVAL = 0.5
+
+
+def _get_root_transform(obj: DO) -> Optional[coin.SoTransform]:
+    """Return the transform node that places `obj` in the 3D view."""
+    vobj = getattr(obj, 'ViewObject', None)
+    if vobj is None:
+        return None
+    root = vobj.RootNode
+    for i in range(root.getNumChildren()):
+        child = root.getChild(i)
+        if child.isOfType(coin.SoTransform.getClassTypeId()):
+            return child
+    return None
+
+
+def _set_transform(transform: coin.SoTransform, matrix: np.ndarray) -> None:
+    """Set a transform node from a FreeCAD-like 4x4 matrix."""
+    # Coin uses row vectors, i.e. the transpose of FreeCAD's matrices.
+    transform.setMatrix(coin.SbMatrix(*matrix.T.ravel().tolist()))
+
+
+class TrajectoryPlayer:
+    """Timer-driven playback of a trajectory on its robot."""
+
+    def __init__(
+            self,
+            trajectory: CrossTrajectory,
+            interpolation: str = 'linear',
+            fps: float = 60.0,
+            on_frame: Optional[Callable[[float, int], None]] = None,
+            on_finished: Optional[Callable[[], None]] = None,
+    ):
+        """Constructor.
+
+        Parameters
+        ----------
+        - trajectory: the Cross::Trajectory to play.
+        - interpolation: 'linear' or 'cubic', see
+                         `TrajectoryStore.get_positions_at()`.
+        - fps: the targeted number of frames per second.
+        - on_frame: called after each frame with the time from start and the
+                    index of the last point at or before this time.
+        - on_finished: called when reaching the end without looping.
+
+        """
+        self.trajectory = trajectory
+        self.interpolation = interpolation
+        self.on_frame = on_frame
+        self.on_finished = on_finished
+        self.loop = False
+        self.speed = 1.0
+        # Achieved frames per second, updated during playback.
+        self.fps = 0.0
+
+        self._timer = QtCore.QTimer()
+        self._timer.setInterval(max(1, int(1000.0 / fps)))
+        self._timer.timeout.connect(self._on_timeout)
+
+        self._store = None
+        self._robot = None
+        self._joints = []
+        # Joint values given to `batch_fk()`, in m and rad.
+        self._config = np.zeros(0)
+        # Columns of the store and of `self._config` for the trajectory joints.
+        self._store_columns = np.zeros(0, dtype=int)
+        self._config_columns = np.zeros(0, dtype=int)
+        # List of (index in `robot.Proxy.get_links()`, FreeCAD link,
+        # transform node).
+        self._transforms: list[tuple[int, DO, coin.SoTransform]] = []
+
+        self._time = 0.0
+        self._start_time = 0.0
+        self._t0 = 0.0
+        self._frame_count = 0
+        self._dropped_count = 0
+        self._fps_t0 = 0.0
+        self._fps_frame_count = 0
+
+    @property
+    def is_playing(self) -> bool:
+        return self._timer.isActive()
+
+    @property
+    def time(self) -> float:
+        """Return the time from start of the last shown frame, in s."""
+        return self._time
+
+    @property
+    def duration(self) -> float:
+        return self._store.duration if self._store else 0.0
+
+    def prepare(self) -> bool:
+        """Read the trajectory and robot, return False if not playable.
+
+        Must be called again if the trajectory or the robot changed.
+
+        """
+        self._transforms.clear()
+        robot = self.trajectory.Robot
+        if not is_robot(robot):
+            warn('The trajectory has no robot', True)
+            return False
+        store = self.trajectory.Proxy.get_store()
+        if (store is None) or (store.point_count == 0):
+            warn('The trajectory has no point', True)
+            return False
+        self._robot = robot
+        self._store = store
+
+        start_state = self.trajectory.Proxy.get_start_state()
+        joints = []
+        config: list[float] = []
+        store_columns: list[int] = []
+        config_columns: list[int] = []
+        for name in dict.fromkeys(store.joint_names + list(start_state)):
+            joint = robot.Proxy.get_joint(name)
+            if (joint is None) or joint.Mimic:
+                # Mimicking joints are managed by `batch_fk()`.
+                continue
+            column = store.get_joint_index(name)
+            if column is not None:
+                store_columns.append(column)
+                config_columns.append(len(joints))
+            joints.append(joint)
+            config.append(start_state.get(name, joint.Position))
+        self._joints = joints
+        self._config = np.array(config, dtype=np.float64)
+        self._store_columns = np.array(store_columns, dtype=int)
+        self._config_columns = np.array(config_columns, dtype=int)
+
+        for i, link in enumerate(robot.Proxy.get_links()):
+            for fc_link in link.Group:
+                if not is_freecad_link(fc_link):
+                    continue
+                transform = _get_root_transform(fc_link)
+                if transform is not None:
+                    self._transforms.append((i, fc_link, transform))
+        return True
+
+    def start(self, start_time: float = 0.0) -> bool:
+        """Start playing from `start_time`, return False if not playable."""
+        if self.is_playing:
+            self.stop()
+        if not self.prepare():
+            return False
+        if start_time >= self.duration:
+            start_time = 0.0
+        self._start_time = start_time
+        self._t0 = time.perf_counter()
+        self._frame_count = 0
+        self._dropped_count = 0
+        self._fps_t0 = self._t0
+        self._fps_frame_count = 0
+        self.show(start_time)
+        self._timer.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop playing and restore the Coin transforms from the document."""
+        if not self.is_playing:
+            return
+        self._timer.stop()
+        elapsed = time.perf_counter() - self._t0
+        if elapsed > 0.0:
+            message(
+                f'Trajectory playback: {self._frame_count} frames in'
+                f' {elapsed:.2f} s ({self._frame_count / elapsed:.1f} FPS),'
+                f' {self._dropped_count} dropped frames',
+            )
+        self.restore_view()
+
+    def restore_view(self) -> None:
+        """Set the Coin transforms from the placement of the FreeCAD links."""
+        for _, fc_link, transform in self._transforms:
+            try:
+                _set_transform(transform, matrix_from_placement(fc_link.Placement))
+            except ReferenceError:
+                # Object deleted.
+                pass
+
+    def show(self, time_from_start: float) -> None:
+        """Show the robot at `time_from_start`, without recompute."""
+        self._time = time_from_start
+        if self._store is None:
+            return
+        positions = self._store.get_positions_at(time_from_start, self.interpolation)
+        self._config[self._config_columns] = positions[self._store_columns]
+        link_poses = self._robot.Proxy.batch_fk(self._config, self._joints)[0]
+        for i, _, transform in self._transforms:
+            pose = link_poses[i]
+            if not np.isnan(pose[0, 0]):
+                _set_transform(transform, pose)
+        if self.on_frame:
+            self.on_frame(time_from_start, self._store.get_point_index_at(time_from_start))
+
+    def _on_timeout(self) -> None:
+        now = time.perf_counter()
+        interval = self._timer.interval() / 1000.0
+        t = self._start_time + (now - self._t0) * self.speed
+        finished = False
+        if t >= self.duration:
+            if self.loop and (self.duration > 0.0):
+                t %= self.duration
+            else:
+                t = self.duration
+                finished = True
+        self._frame_count += 1
+        # Frames not shown because the previous ones took too long.
+        expected_count = int((now - self._t0) / interval)
+        self._dropped_count = max(expected_count - self._frame_count, 0)
+        self._fps_frame_count += 1
+        if (now - self._fps_t0) >= _FPS_INTERVAL:
+            self.fps = self._fps_frame_count / (now - self._fps_t0)
+            self._fps_t0 = now
+            self._fps_frame_count = 0
+        try:
+            self.show(t)
+        except ReferenceError:
+            # Robot or trajectory deleted.
+            finished = True
+        if finished:
+            self.stop()
+            if self.on_finished:
+                self.on_finished()
@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+import tempfile
 from typing import Any
 from typing import NewType
 from typing import Optional
@@ -19,18 +20,17 @@ from PySide.QtWidgets import QFileDialog  # FreeCAD's PySide
 try:
     from moveit_msgs.msg import RobotState
     from trajectory_msgs.msg import JointTrajectory
-    from trajectory_msgs.msg import JointTrajectoryPoint
 except ImportError:
     RobotState = Any
     JointTrajectory = Any
-    JointTrajectoryPoint = Any
 
 from .freecad_utils import add_property
+from .freecad_utils import get_valid_property_name
 from .freecad_utils import message
 from .freecad_utils import warn
+from .trajectory_store import TrajectoryStore
 from .ui.replay_trajectory_dialog import ReplayTrajectoryDialog
 from .ui.choose_trajectory_dialog import ChooseTrajectoryDialog
-from .utils import i_th_item
 from .wb_utils import ICON_PATH
 from .wb_utils import is_robot
 from .wb_utils import ros_name
@@ -59,7 +59,7 @@ class TrajectoryViewProxy:
 
     def load_yaml(self):
         import FreeCADGui as fcgui
-        import yaml
+        from .trajectory_yaml import get_trajectory_yaml_index
 
         dialog = QFileDialog(
             fcgui.getMainWindow(),
@@ -71,10 +71,9 @@ class TrajectoryViewProxy:
         else:
             return
 
-        # Check and warn if the multi-doc YAML contains more than one message
-        # (1 message == 1 document) with `ros2 topic echo`.
-        # TODO: open a dialog to ask to choose a trajectory.
-        display_trajs = yaml.safe_load_all(open(filename))
+        # Only the document boundaries are read here, documents (i.e.
+        # messages) are parsed when chosen in the dialog.
+        display_trajs = get_trajectory_yaml_index(filename)
 
         dialog = ChooseTrajectoryDialog(
                 display_trajs,
@@ -83,7 +82,7 @@ class TrajectoryViewProxy:
         )
         message_index, trajectory_index = dialog.exec()
         if message_index >= 0:
-            self.Object.Proxy.load_yaml(filename, message_index)
+            self.Object.Proxy.load_yaml(filename, message_index, trajectory_index)
 
     def replay(self):
         old_index = self.Object.Proxy.point_index
@@ -128,6 +127,16 @@ class TrajectoryProxy:
             mode=fpo.PropertyEditorMode.Hidden,
     )
 
+    trajectory_data = fpo.PropertyFileIncluded(
+            name='TrajectoryData',
+            section='Internal',
+            description=(
+                'The trajectory points as binary block,'
+                ' see `trajectory_store.py`'
+            ),
+            mode=fpo.PropertyMode.Hidden,
+    )
+
     def __init__(self):
         super().__init__()
 
@@ -136,6 +145,9 @@ class TrajectoryProxy:
         # property cannot be updated with indexing or `merge()`.
         self._joint_map: dict[str, str] = {}
 
+        # The trajectory points, loaded lazily from `TrajectoryData`.
+        self._store: Optional[TrajectoryStore] = None
+
     def on_create(self, obj: CrossTrajectory):
         self._set_editor_mode()
 
@@ -148,6 +160,7 @@ class TrajectoryProxy:
 
     def on_deserialize(self, event: fpo.events.DeserializeEvent) -> None:
         self._joint_map = event.state['_joint_map']
+        self._store = None
 
     @robot.observer
     def on_robot_changed(self, event: fpo.events.PropertyChangedEvent) -> None:
@@ -165,10 +178,11 @@ class TrajectoryProxy:
             if not j.Proxy.is_fixed()
         ]
         # Remove joints not present in the new robot.
-        for name in self._joint_map.keys():
+        for name in list(self._joint_map.keys()):
             if name not in new_joint_names:
-                self._joint_map.pop(name)
-                self.Object.remove_property(name)
+                prop_name = self._joint_map.pop(name)
+                self._remove_property(self._start_state_property_name(prop_name))
+                self._remove_property(prop_name)
         # Add missing properties.
         for name in new_joint_names:
             if name not in self._joint_map:
@@ -189,10 +203,72 @@ class TrajectoryProxy:
 
     @property
     def point_count(self) -> int:
-        count = 0
-        for name, prop in self._joint_map.items():
-            count = max(count, len(getattr(self.Object, prop)))
-        return count
+        store = self.get_store()
+        return store.point_count if store else 0
+
+    def get_store(self) -> Optional[TrajectoryStore]:
+        """Return the trajectory points or None if there is no trajectory.
+
+        The store is loaded once from `TrajectoryData` and its arrays are
+        read-only, use `set_store()` to change the trajectory.
+
+        """
+        if getattr(self, '_store', None) is not None:
+            return self._store
+        path = self.trajectory_data
+        if path and Path(path).is_file():
+            try:
+                self._store = TrajectoryStore.load(path)
+            except (OSError, ValueError) as e:
+                warn(f'Cannot read the trajectory data of {self.Object.Label}: {e}', True)
+        else:
+            self._store = self._get_legacy_store()
+        return self._store
+
+    def set_store(
+            self,
+            store: TrajectoryStore,
+            start_state: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Set the trajectory points and the start state.
+
+        Parameters
+        ----------
+        - store: the trajectory points.
+        - start_state: map of joint names to the joint position used for
+                       joints that are not part of the trajectory.
+
+        """
+        for n in store.joint_names:
+            if n not in self._joint_map:
+                warn(f'Ignoring positions for unknown joint: {n}', True)
+        with tempfile.TemporaryDirectory(prefix='cross-') as tmp_dir:
+            # `App::PropertyFileIncluded` copies the file into the document.
+            path = Path(tmp_dir) / f'{self.Object.Name}.trj'
+            store.save(path)
+            self.trajectory_data = str(path)
+        self._store = store
+        for n, pos in (start_state or {}).items():
+            if n not in self._joint_map:
+                warn(f'Ignoring start state for unknown joint: {n}', True)
+                continue
+            start_prop_name = self._start_state_property_name(self._joint_map[n])
+            setattr(self.Object, start_prop_name, pos)
+        # The positions were stored as one `App::PropertyFloatList` per joint
+        # before the introduction of `TrajectoryData`.
+        for prop_name in self._joint_map.values():
+            self._remove_property(prop_name)
+        # Reset the point index (value, min, max, step).
+        self.point_index = (0, 0, max(store.point_count - 1, 0), 1)
+        self._set_editor_mode()
+
+    def get_start_state(self) -> dict[str, float]:
+        """Return the default joint positions, in m and rad."""
+        return {
+            n: getattr(self.Object, self._start_state_property_name(p))
+            for n, p in self._joint_map.items()
+            if self._start_state_property_name(p) in self.Object.PropertiesList
+        }
 
     def update_trajectory(
             self,
@@ -209,40 +285,11 @@ class TrajectoryProxy:
                             robot_state.joint_state.position,
                     )
                 }
-
-            traj: dict[str, list[float]] = {}
-            for n in trajectory.joint_names:
-                traj[n] = []
-            for p in trajectory.points:
-                for n, pos in zip(trajectory.joint_names, p.positions):
-                    traj[n].append(pos)
-        except AttributeError as e:
+            store = TrajectoryStore.from_joint_trajectory_msg(trajectory)
+        except (AttributeError, ValueError) as e:
             warn(f'Invalid trajectory message: {e}', True)
             return
-
-        # TODO: deactivate callbacks on property change.
-        # Reset joint values not used in the trajectory.
-        for joint_name, prop_name in self._joint_map.items():
-            if joint_name not in traj.keys():
-                setattr(self.Object, prop_name, [])
-        for n in traj.keys():
-            prop_name = self._joint_map[n]
-            # Verify that the joint belongs to the robot (i.e. exists as
-            # property of the trajectory).
-            if not hasattr(self.Object, prop_name):
-                warn(f'Ignoring positions for unknown joint: {n}', True)
-                continue
-            setattr(self.Object, prop_name, traj[n])
-        for n, pos in start_state.items():
-            start_prop_name = self._start_state_property_name(prop_name)
-            if not hasattr(self.Object, start_prop_name):
-                warn(f'Ignoring start state for unknown joint: {n}', True)
-                continue
-            setattr(self.Object, start_prop_name, start_state[n])
-        # TODO: reactivate callbacks on property change.
-        # Reset the point index (value, min, max, step).
-        self.point_index = (0, 0, self.point_count - 1, 1)
-        self._set_editor_mode()
+        self.set_store(store, start_state)
 
     def load_yaml(
         self,
@@ -252,15 +299,15 @@ class TrajectoryProxy:
     ) -> None:
         """Load a trajectory from a multi-doc YAML file.
 
-        Such files are generated with `ros2 topic echo`.
+        Such files are generated with `ros2 topic echo`. Empty documents are
+        not counted in `message_index`.
 
         """
-        import yaml
+        from .trajectory_yaml import get_trajectory_yaml_index
 
-        display_trajs = yaml.safe_load_all(open(file))
         try:
-            display_traj = i_th_item(display_trajs, message_index)
-        except StopIteration:
+            display_traj = get_trajectory_yaml_index(file)[message_index]
+        except IndexError:
             warn(
                  (
                      f'Invalid document index {message_index}'
@@ -290,9 +337,10 @@ class TrajectoryProxy:
 
         if not display_trajectory['trajectory']:
             message('No trajectory in the DisplayTrajectory message', False)
-            self.Object.Proxy.update_trajectory(JointTrajectory())
+            self.set_store(TrajectoryStore([], []))
+            return
 
-        if len(display_trajectory['trajectory']) > (trajectory_index + 1):
+        if len(display_trajectory['trajectory']) <= trajectory_index:
             message(
                     (
                         'The DisplayTrajectory does not contain a RobotTrajectory'
@@ -301,21 +349,19 @@ class TrajectoryProxy:
                     ),
                     True,
             )
+            return
 
-        traj = JointTrajectory()
         joint_traj = display_trajectory['trajectory'][trajectory_index]['joint_trajectory']
-        traj.joint_names = joint_traj['joint_names']
-        for point in joint_traj['points']:
-            traj_point = JointTrajectoryPoint()
-            traj_point.positions = point['positions']
-            traj.points.append(traj_point)
+        try:
+            store = TrajectoryStore.from_joint_trajectory_dict(joint_traj)
+        except (KeyError, TypeError, ValueError) as e:
+            warn(f'Wrongly formatted JointTrajectory message: {e}', True)
+            return
 
-        robot_state = RobotState()
-        js = display_trajectory['trajectory_start']['joint_state']
-        robot_state.joint_state.name = js['name']
-        robot_state.joint_state.position = js['position']
+        js = display_trajectory.get('trajectory_start', {}).get('joint_state', {})
+        start_state = dict(zip(js.get('name', []), js.get('position', [])))
 
-        self.update_trajectory(traj, robot_state)
+        self.set_store(store, start_state)
 
     def _set_editor_mode(self) -> None:
         if self.robot and (self.point_count > 0):
@@ -327,19 +373,37 @@ class TrajectoryProxy:
         """Return `start_q0` for joint `q0`."""
         return f'start_{prop_name}'
 
-    def _add_joint(self, name: str) -> None:
-        """Add `q0` and `start_q0` properties for joint `q0`.
+    def _remove_property(self, prop_name: str) -> None:
+        if prop_name in self.Object.PropertiesList:
+            self.Object.removeProperty(prop_name)
+
+    def _get_legacy_store(self) -> Optional[TrajectoryStore]:
+        """Return the positions stored as one `App::PropertyFloatList` per joint.
 
-        Add `q0` and `start_q0` properties for joint `q0` to the trajectory.
+        Documents created before the introduction of `TrajectoryData` have
+        such properties.
 
         """
-        _, prop_name = add_property(
-                self.Object,
-                'App::PropertyFloatList',
-                name,
-                'Trajectory',
-                f'The joint position for `{name}`',
+        columns = {
+            n: getattr(self.Object, p)
+            for n, p in self._joint_map.items()
+            if p in self.Object.PropertiesList
+            and self.Object.getTypeIdOfProperty(p) == 'App::PropertyFloatList'
+        }
+        point_count = max((len(c) for c in columns.values()), default=0)
+        if point_count == 0:
+            return None
+        # Joints with less values than the trajectory fall back to the start
+        # state, as before.
+        columns = {n: c for n, c in columns.items() if len(c) == point_count}
+        return TrajectoryStore(
+            list(columns),
+            list(zip(*columns.values())),
         )
+
+    def _add_joint(self, name: str) -> None:
+        """Add the `start_q0` property for joint `q0`."""
+        prop_name = get_valid_property_name(name)
         add_property(
                 self.Object,
                 'App::PropertyFloat',
@@ -352,12 +416,16 @@ class TrajectoryProxy:
     def _update_robot_joint_values(self):
         if not self.robot:
             return
+        store = self.get_store()
+        if (store is None) or not (0 <= self.point_index < store.point_count):
+            return
         joint_names = self._joint_map.keys()
-        # Get the current trajectory point.
+        # Get the current trajectory point, a view into the store.
+        point = store.get_point(self.point_index)
         positions = {
-            self.robot.Proxy.get_joint(n): getattr(self.Object, self._joint_map[n])[self.point_index]
-            for n in joint_names
-            if len(getattr(self.Object, self._joint_map[n])) > self.point_index
+            self.robot.Proxy.get_joint(n): float(point[i])
+            for i, n in enumerate(store.joint_names)
+            if n in self._joint_map
         }
         if not positions:
             return
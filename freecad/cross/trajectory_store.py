@@ -0,0 +1,308 @@
+"""Compact storage of joint trajectories as contiguous NumPy arrays.
+
+A `TrajectoryStore` holds the time stamps (in s) and the positions,
+velocities, and accelerations of a joint trajectory as contiguous float64
+arrays of shape (point_count, joint_count), in the units of ROS (m, rad).
+It is serialized into a small binary block, which is stored as a file inside
+the FCStd document by `TrajectoryProxy`, and deserialized without copy, i.e.
+the arrays are read-only views into the loaded buffer.
+This module doesn't need FreeCAD.
+
+Binary format, little endian:
+- magic `CROSSTRJ`, format version (uint32),
+- point count, joint count (uint64), flags (uint32, see `_HAS_*`),
+- length (uint32) and UTF-8 JSON list of the joint names, padded to 8 bytes,
+- times (point_count float64),
+- positions, then velocities and accelerations if present in the flags
+  (point_count * joint_count float64 each, row-major).
+
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import struct
+from typing import Any, Optional, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+_MAGIC = b'CROSSTRJ'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIQQI')
+_NAMES_LENGTH = struct.Struct('<I')
+_HAS_VELOCITIES = 1
+_HAS_ACCELERATIONS = 2
+
+
+def _as_array(
+        values: Optional[ArrayLike],
+        shape: tuple[int, ...],
+        name: str,
+) -> Optional[np.ndarray]:
+    if values is None:
+        return None
+    array = np.ascontiguousarray(values, dtype=np.float64)
+    if array.shape != shape:
+        raise ValueError(f'Wrong shape for {name}: {array.shape}, expected {shape}')
+    return array
+
+
+class TrajectoryStore:
+    """Joint-space trajectory as contiguous float64 arrays."""
+
+    def __init__(
+            self,
+            joint_names: list[str],
+            positions: ArrayLike,
+            times: Optional[ArrayLike] = None,
+            velocities: Optional[ArrayLike] = None,
+            accelerations: Optional[ArrayLike] = None,
+    ):
+        """Constructor.
+
+        Parameters
+        ----------
+        - joint_names: names of the joints, one per column.
+        - positions: joint positions, shape (point_count, joint_count).
+        - times: time from start of each point in s, shape (point_count,).
+                 Defaults to the point indices, i.e. one point per second.
+        - velocities: joint velocities or None, same shape as `positions`.
+        - accelerations: joint accelerations or None, same shape as
+                         `positions`.
+
+        """
+        self.joint_names = list(joint_names)
+        positions = np.ascontiguousarray(positions, dtype=np.float64)
+        if positions.size == 0:
+            positions = positions.reshape(0, len(self.joint_names))
+        shape = (len(positions), len(self.joint_names))
+        self.positions: np.ndarray = _as_array(positions, shape, 'positions')
+        if times is None:
+            times = np.arange(shape[0], dtype=np.float64)
+        self.times: np.ndarray = _as_array(times, shape[:1], 'times')
+        self.velocities = _as_array(velocities, shape, 'velocities')
+        self.accelerations = _as_array(accelerations, shape, 'accelerations')
+        self._joint_indices = {n: i for i, n in enumerate(self.joint_names)}
+        # Slopes for the cubic interpolation, see `_get_slopes()`.
+        self._slopes: Optional[np.ndarray] = None
+
+    @property
+    def point_count(self) -> int:
+        return self.positions.shape[0]
+
+    @property
+    def joint_count(self) -> int:
+        return self.positions.shape[1]
+
+    @property
+    def duration(self) -> float:
+        """Return the time from start of the last point, in s."""
+        return float(self.times[-1]) if self.point_count else 0.0
+
+    def get_joint_index(self, joint_name: str) -> Optional[int]:
+        """Return the column of `joint_name` or None."""
+        return self._joint_indices.get(joint_name)
+
+    def get_point(self, index: int) -> np.ndarray:
+        """Return the positions of point `index`, a view without copy."""
+        return self.positions[index]
+
+    def get_joint_positions(self, joint_name: str) -> Optional[np.ndarray]:
+        """Return the positions of a joint over time, a view without copy."""
+        index = self.get_joint_index(joint_name)
+        if index is None:
+            return None
+        return self.positions[:, index]
+
+    def get_point_index_at(self, time: float) -> int:
+        """Return the index of the last point at or before `time`.
+
+        `time` is clamped to the trajectory.
+
+        """
+        if self.point_count == 0:
+            raise IndexError('Empty trajectory')
+        index = int(np.searchsorted(self.times, time, side='right')) - 1
+        return min(max(index, 0), self.point_count - 1)
+
+    def get_positions_at(self, time: float, method: str = 'linear') -> np.ndarray:
+        """Return the joint positions interpolated at `time` (in s).
+
+        Parameters
+        ----------
+        - time: time from start, clamped to the trajectory.
+        - method: 'linear' or 'cubic'. 'cubic' is a Hermite interpolation
+                  with the velocities if given, with the slopes estimated
+                  from the positions otherwise.
+
+        """
+        if method not in ('linear', 'cubic'):
+            raise ValueError(f'Unknown interpolation method: {method}')
+        i = self.get_point_index_at(time)
+        if (i == self.point_count - 1) or (time <= self.times[0]):
+            return self.positions[i].copy()
+        t0, t1 = self.times[i], self.times[i + 1]
+        h = t1 - t0
+        if h <= 0.0:
+            return self.positions[i + 1].copy()
+        s = (time - t0) / h
+        p0, p1 = self.positions[i], self.positions[i + 1]
+        if method == 'linear':
+            return p0 + s * (p1 - p0)
+        slopes = self._get_slopes()
+        s2 = s * s
+        s3 = s2 * s
+        return (
+            (2.0 * s3 - 3.0 * s2 + 1.0) * p0
+            + (s3 - 2.0 * s2 + s) * h * slopes[i]
+            + (-2.0 * s3 + 3.0 * s2) * p1
+            + (s3 - s2) * h * slopes[i + 1]
+        )
+
+    def _get_slopes(self) -> np.ndarray:
+        if self._slopes is not None:
+            return self._slopes
+        if self.velocities is not None:
+            self._slopes = self.velocities
+        elif (self.point_count > 1) and np.all(np.diff(self.times) > 0.0):
+            self._slopes = np.gradient(self.positions, self.times, axis=0)
+        else:
+            self._slopes = np.zeros_like(self.positions)
+        return self._slopes
+
+    def to_bytes(self) -> bytes:
+        """Return the binary representation, see the module documentation."""
+        flags = 0
+        arrays = [self.times, self.positions]
+        if self.velocities is not None:
+            flags |= _HAS_VELOCITIES
+            arrays.append(self.velocities)
+        if self.accelerations is not None:
+            flags |= _HAS_ACCELERATIONS
+            arrays.append(self.accelerations)
+        names = json.dumps(self.joint_names).encode('utf-8')
+        padding = b'\0' * (-(_HEADER.size + _NAMES_LENGTH.size + len(names)) % 8)
+        chunks = [
+            _HEADER.pack(_MAGIC, _VERSION, self.point_count, self.joint_count, flags),
+            _NAMES_LENGTH.pack(len(names)),
+            names,
+            padding,
+        ]
+        chunks += [a.astype('<f8', copy=False).tobytes() for a in arrays]
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> TrajectoryStore:
+        """Return the store from its binary representation.
+
+        The arrays are read-only views into `data`.
+
+        """
+        magic, version, point_count, joint_count, flags = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError('Not a trajectory data block')
+        if version > _VERSION:
+            raise ValueError(f'Unsupported trajectory data version {version}')
+        offset = _HEADER.size
+        names_length, = _NAMES_LENGTH.unpack_from(data, offset)
+        offset += _NAMES_LENGTH.size
+        joint_names = json.loads(bytes(data[offset:offset + names_length]).decode('utf-8'))
+        offset += names_length
+        offset += -offset % 8
+
+        def read(count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype='<f8', count=count, offset=offset)
+            offset += count * 8
+            return array
+
+        shape = (point_count, joint_count)
+        size = point_count * joint_count
+        times = read(point_count)
+        positions = read(size).reshape(shape)
+        velocities = read(size).reshape(shape) if flags & _HAS_VELOCITIES else None
+        accelerations = read(size).reshape(shape) if flags & _HAS_ACCELERATIONS else None
+        return cls(joint_names, positions, times, velocities, accelerations)
+
+    def save(self, path: Union[Path, str]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> TrajectoryStore:
+        return cls.from_bytes(Path(path).read_bytes())
+
+    @classmethod
+    def from_joint_trajectory_dict(cls, joint_trajectory: dict[str, Any]) -> TrajectoryStore:
+        """Return the store from a `JointTrajectory` message as dict.
+
+        Velocities and accelerations are only kept if given for all points.
+
+        """
+        joint_names = joint_trajectory['joint_names']
+        points = joint_trajectory['points']
+        positions = np.array(
+            [p['positions'] for p in points],
+            dtype=np.float64,
+        ).reshape(len(points), len(joint_names))
+        times = np.array(
+            [_duration_to_sec(p.get('time_from_start')) for p in points],
+            dtype=np.float64,
+        ) if points and all('time_from_start' in p for p in points) else None
+        return cls(
+            joint_names,
+            positions,
+            times,
+            _get_optional_field(points, 'velocities', len(joint_names)),
+            _get_optional_field(points, 'accelerations', len(joint_names)),
+        )
+
+    @classmethod
+    def from_joint_trajectory_msg(cls, joint_trajectory: Any) -> TrajectoryStore:
+        """Return the store from a `trajectory_msgs/JointTrajectory` message."""
+        joint_names = list(joint_trajectory.joint_names)
+        points = joint_trajectory.points
+        positions = np.array(
+            [p.positions for p in points],
+            dtype=np.float64,
+        ).reshape(len(points), len(joint_names))
+        times = np.array(
+            [
+                p.time_from_start.sec + p.time_from_start.nanosec * 1e-9
+                for p in points
+            ],
+            dtype=np.float64,
+        ) if any(
+            p.time_from_start.sec or p.time_from_start.nanosec for p in points
+        ) else None
+        velocities = [p.velocities for p in points]
+        accelerations = [p.accelerations for p in points]
+        return cls(
+            joint_names,
+            positions,
+            times,
+            velocities if _is_complete(velocities, len(joint_names)) else None,
+            accelerations if _is_complete(accelerations, len(joint_names)) else None,
+        )
+
+
+def _duration_to_sec(duration: Optional[dict[str, Any]]) -> float:
+    """Return a `builtin_interfaces/Duration` as dict in s."""
+    if not duration:
+        return 0.0
+    return duration.get('sec', 0) + duration.get('nanosec', 0) * 1e-9
+
+
+def _is_complete(values: list, joint_count: int) -> bool:
+    """Return True if all points have a value for each joint."""
+    return bool(values) and all(len(v) == joint_count for v in values)
+
+
+def _get_optional_field(
+        points: list[dict[str, Any]],
+        field: str,
+        joint_count: int,
+) -> Optional[list]:
+    values = [p.get(field) or [] for p in points]
+    return values if _is_complete(values, joint_count) else None
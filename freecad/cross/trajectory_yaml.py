@@ -0,0 +1,192 @@
+"""Indexed access to multi-document YAML files of trajectories.
+
+Multi-document YAML files as generated by `ros2 topic echo` can be several
+GB large. `TrajectoryYamlIndex` scans such a file once for the document
+separators (`---` lines) and stores the byte range of each non-empty
+document, so that the i-th document (i.e. message) can be parsed without
+parsing the previous ones. Parsed documents and their summaries are cached.
+The C YAML loader is used if available.
+
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import re
+from typing import Any, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Number of bytes read at once while scanning.
+_CHUNK_SIZE = 1 << 22
+# Number of parsed documents kept in memory per index.
+_DOCUMENT_CACHE_SIZE = 2
+# Number of indexed files kept in memory, see `get_trajectory_yaml_index()`.
+_INDEX_CACHE_SIZE = 4
+
+# A document separator, `ros2 topic echo` doesn't write anything after it.
+_SEPARATOR = re.compile(rb'^---[ \t]*\r?$', re.MULTILINE)
+
+
+@dataclass
+class TrajectorySummary:
+    """Summary of a `RobotTrajectory` message."""
+
+    joint_names: list[str]
+    point_count: int
+    # Time from start of the last point, in s.
+    duration: float
+
+
+class TrajectoryYamlIndex:
+    """Random access to the documents of a multi-document YAML file.
+
+    Empty documents are not indexed.
+
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        self.path = Path(path)
+        stat = self.path.stat()
+        # Used to check whether the index is still valid.
+        self.file_state = (stat.st_size, stat.st_mtime_ns)
+        # Byte ranges (begin, end) of the non-empty documents.
+        self.ranges: list[tuple[int, int]] = self._scan()
+        self._documents: OrderedDict[int, Any] = OrderedDict()
+        self._summaries: dict[int, list[TrajectorySummary]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def __getitem__(self, index: int) -> Any:
+        """Return the parsed document `index`."""
+        if index < 0:
+            index += len(self)
+        if not (0 <= index < len(self)):
+            raise IndexError(
+                f'Document index {index} out of range, {self.path} has'
+                f' {len(self)} non-empty documents',
+            )
+        if index in self._documents:
+            self._documents.move_to_end(index)
+            return self._documents[index]
+        begin, end = self.ranges[index]
+        with open(self.path, 'rb') as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        document = yaml.load(data, Loader=SafeLoader)
+        self._documents[index] = document
+        while len(self._documents) > _DOCUMENT_CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return document
+
+    def is_up_to_date(self) -> bool:
+        """Return True if the file was not modified since indexing."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self.file_state
+
+    def get_summary(self, index: int) -> list[TrajectorySummary]:
+        """Return the summary of the trajectories of a `DisplayTrajectory`.
+
+        Return one summary per `RobotTrajectory` in document `index`.
+
+        """
+        if index not in self._summaries:
+            self._summaries[index] = summarize_display_trajectory(self[index])
+        return self._summaries[index]
+
+    def _scan(self) -> list[tuple[int, int]]:
+        """Return the byte ranges of the non-empty documents."""
+        separators: list[tuple[int, int]] = []
+        offset = 0  # Offset of `buffer` in the file.
+        buffer = b''
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                buffer += chunk
+                # Only search complete lines, except at the end of the file.
+                cut = (buffer.rfind(b'\n') + 1) if chunk else len(buffer)
+                for m in _SEPARATOR.finditer(buffer, 0, cut):
+                    separators.append((offset + m.start(), offset + m.end()))
+                buffer = buffer[cut:]
+                offset += cut
+                if not chunk:
+                    break
+            size = offset
+            ranges: list[tuple[int, int]] = []
+            begin = 0
+            for sep_begin, sep_end in separators + [(size, size)]:
+                if self._is_document(f, begin, sep_begin):
+                    ranges.append((begin, sep_begin))
+                begin = sep_end
+        return ranges
+
+    @staticmethod
+    def _is_document(f, begin: int, end: int) -> bool:
+        """Return True if the byte range contains more than blank lines."""
+        if end <= begin:
+            return False
+        # A non-empty document is typically large, only look at the start.
+        f.seek(begin)
+        head = f.read(min(end - begin, 4096))
+        return any(
+            line.strip() and not line.lstrip().startswith(b'#')
+            for line in head.splitlines()
+        ) or ((end - begin) > len(head))
+
+
+def summarize_display_trajectory(display_trajectory: Any) -> list[TrajectorySummary]:
+    """Return the summary of each trajectory of a `DisplayTrajectory` dict."""
+    summaries: list[TrajectorySummary] = []
+    try:
+        trajectories = display_trajectory['trajectory'] or []
+    except (KeyError, TypeError):
+        return summaries
+    for trajectory in trajectories:
+        joint_trajectory = (trajectory or {}).get('joint_trajectory') or {}
+        points = joint_trajectory.get('points') or []
+        duration = 0.0
+        if points:
+            time_from_start = points[-1].get('time_from_start') or {}
+            duration = (
+                time_from_start.get('sec', 0)
+                + time_from_start.get('nanosec', 0) * 1e-9
+            )
+        summaries.append(TrajectorySummary(
+            list(joint_trajectory.get('joint_names') or []),
+            len(points),
+            duration,
+        ))
+    return summaries
+
+
+_indices: OrderedDict[str, TrajectoryYamlIndex] = OrderedDict()
+
+
+def get_trajectory_yaml_index(path: Union[Path, str]) -> TrajectoryYamlIndex:
+    """Return the index of a multi-document YAML file.
+
+    The index of the last used files are kept as long as the files are not
+    modified.
+
+    """
+    key = os.path.realpath(path)
+    index = _indices.get(key)
+    if (index is None) or (not index.is_up_to_date()):
+        index = TrajectoryYamlIndex(key)
+        _indices[key] = index
+    _indices.move_to_end(key)
+    while len(_indices) > _INDEX_CACHE_SIZE:
+        _indices.popitem(last=False)
+    return index
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Union
 
 import FreeCAD as fc
 import FreeCADGui as fcgui
 
 from PySide import QtWidgets  # FreeCAD's PySide!
 
+from ..trajectory_yaml import TrajectorySummary
+from ..trajectory_yaml import TrajectoryYamlIndex
+from ..trajectory_yaml import summarize_display_trajectory
 from ..wb_utils import UI_PATH
 from .set_joints_from_trajectory import SetJointsFromTrajectory
 
@@ -22,7 +25,7 @@ class ChooseTrajectoryDialog(QtWidgets.QDialog):
 
     def __init__(
             self,
-            yamls: Iterable[dict],
+            yamls: Union[Iterable[dict], TrajectoryYamlIndex],
             robot: Optional[CrossRobot] = None,
             parent: Optional[QtWidgets.QWidget] = None,
     ):
@@ -31,15 +34,21 @@ class ChooseTrajectoryDialog(QtWidgets.QDialog):
         Constructor from the result of yaml.load_all() with a multi-doc YAML
         file of moveit_msgs.msg.DisplayTrajectory messages, typically from
         `ros2 topic echo /display_planned_path`.
+        With a `TrajectoryYamlIndex`, only the displayed message is parsed.
 
         """
 
         super().__init__(parent)
 
-        # Make a list from the generator.
-        # The last document in the multi-doc yaml is typically empty when using
-        # `ros2 topic echo` so that `list(yamls)` adds an undisered empty dict.
-        self._yamls = [y for y in yamls if y]
+        if isinstance(yamls, TrajectoryYamlIndex):
+            # Empty documents are not indexed.
+            self._yamls = yamls
+        else:
+            # Make a list from the generator.
+            # The last document in the multi-doc yaml is typically empty when
+            # using `ros2 topic echo` so that `list(yamls)` adds an undisered
+            # empty dict.
+            self._yamls = [y for y in yamls if y]
 
         self._message_index = 0 if self._yamls else -1
         self._trajectory_index = 0 if self._yamls else -1
@@ -90,22 +99,16 @@ class ChooseTrajectoryDialog(QtWidgets.QDialog):
 
         self.form.message_number_spin_box.setMaximum(len(self._yamls))  # 1-based.
 
-        trajectories = self._yamls[self._message_index]['trajectory']
-        try:
-            trajectory = trajectories[self._trajectory_index]
-        except TypeError:
+        summaries = self._get_summaries(self._message_index)
+        if not (0 <= self._trajectory_index < len(summaries)):
             raise RuntimeError(
                     f'Message index {self._message_index}'
-                    ' does not have the correct format'
-            )
-        except IndexError:
-            raise RuntimeError(
-                    f'Message index {self._message_index}'
-                    ' contains {len(trajectories)} trajectories,'
-                    ' trajectory index {self._trajectory_index}'
+                    f' contains {len(summaries)} trajectories,'
+                    f' trajectory index {self._trajectory_index}'
                     ' is out of range'
             )
-        if len(trajectories) == 1:
+        self.form.traj_number_spin_box.setMaximum(len(summaries))  # 1-based.
+        if len(summaries) == 1:
             self.form.traj_number_spin_box.setValue(1)  # 1-based.
             self.form.traj_number_spin_box.setEnabled(False)
             self.form.traj_number_widget.setVisible(False)
@@ -114,52 +117,48 @@ class ChooseTrajectoryDialog(QtWidgets.QDialog):
             self.form.traj_number_spin_box.setEnabled(True)
             self.form.traj_number_widget.setVisible(True)
 
-        self.form.traj_number_spin_box.setMaximum(len(trajectories))  # 1-based.
+        point_count = summaries[self._trajectory_index].point_count
+        self.form.point_number_spin_box.setMaximum(point_count)  # 1-based.
+        self.form.point_number_slider.setMaximum(point_count)  # 1-based.
 
-        try:
-            joint_trajectory = trajectory['joint_trajectory']
-        except KeyError:
-            raise RuntimeError(
-                f'Trajectory index {self._trajectory_index}'
-                ' does not have a joint_trajectory'
-            )
+    def _get_summaries(self, message_index: int) -> list[TrajectorySummary]:
+        """Return the summary of each trajectory of a message.
 
-        try:
-            point_count = len(joint_trajectory['points'])
-        except KeyError:
-            raise RuntimeError(
-                    f'Trajectory index {self._trajectory_index}'
-                    ' does not have points'
-            )
+        With a `TrajectoryYamlIndex`, the summaries are cached by the index.
 
-        self.form.point_number_spin_box.setMaximum(point_count)  # 1-based.
-        self.form.point_number_slider.setMaximum(point_count)  # 1-based.
+        """
+        if isinstance(self._yamls, TrajectoryYamlIndex):
+            return self._yamls.get_summary(message_index)
+        return summarize_display_trajectory(self._yamls[message_index])
+
+    def _get_robot_trajectory(self) -> dict:
+        """Return the selected RobotTrajectory, for the table of joint values."""
+        display_trajectory = self._yamls[self._message_index]
+        return display_trajectory['trajectory'][self._trajectory_index]
 
     def _on_message_number_spin_box_changed(self, value: int) -> None:
         self._message_index = value - 1  # `self._message_index` is 0-based.
-        display_trajectory = self._yamls[self._message_index]
-        self._trajectory_index = min(
-                self._trajectory_index,
-                len(display_trajectory['trajectory']) - 1
-        )
+        summaries = self._get_summaries(self._message_index)
+        self._trajectory_index = min(self._trajectory_index, len(summaries) - 1)
         if self._trajectory_index >= 0:
-            robot_trajectory = display_trajectory['trajectory'][self._trajectory_index]
-            self._point_index = 0 if robot_trajectory['joint_trajectory']['points'] else - 1
+            point_count = summaries[self._trajectory_index].point_count
+            self._point_index = 0 if point_count else -1
             self.form.traj_number_spin_box.setValue(self._trajectory_index + 1)
             self.form.point_number_spin_box.setValue(self._point_index + 1)
-            self.table_joint_values.trajectory = robot_trajectory
+            self.table_joint_values.trajectory = self._get_robot_trajectory()
         else:
             self._point_index = -1
         self._update_gui()
 
     def _on_traj_number_spin_box_changed(self, value: int) -> None:
-        robot_trajectories = self._yamls[self._message_index]['trajectory']
-        robot_trajectory = robot_trajectories[value - 1]  # `value` is 1-based.
-        self._point_index = min(self._point_index, len(robot_trajectory) - 1)
+        self._trajectory_index = value - 1  # `value` is 1-based.
+        summaries = self._get_summaries(self._message_index)
+        point_count = summaries[self._trajectory_index].point_count
+        self._point_index = min(self._point_index, point_count - 1)
         # TODO: disable update of table_joint_values
         self.table_joint_values.point_index = self._point_index
         # TODO: re-enable update of table_joint_values.
-        self.table_joint_values.trajectory = robot_trajectory
+        self.table_joint_values.trajectory = self._get_robot_trajectory()
         self._update_gui()
 
     def _on_point_number_spin_box_changed(self, value: int) -> None:
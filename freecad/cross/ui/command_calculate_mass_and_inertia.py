@@ -1,16 +1,18 @@
-from typing import Optional
+import time
+
 import FreeCAD as fc
 import FreeCADGui as fcgui
-from ..freecad_utils import DO, center_of_gravity_mm, first_object_with_volume, get_compound
 from ..freecad_utils import correct_matrix_of_inertia
 from ..freecad_utils import error
 from ..freecad_utils import material_from_material_editor
-from ..freecad_utils import matrix_of_inertia
+from ..freecad_utils import message
+from ..freecad_utils import numpy_to_fc_matrix
 from ..freecad_utils import quantity_as
-from ..freecad_utils import volume_mm3
 from ..freecad_utils import warn
 from ..gui_utils import tr
-from ..wb_utils import is_link, is_link_selected, is_robot, ros_name
+from ..mass_properties import get_mass_properties_engine
+from ..mass_properties import get_real_geometries
+from ..wb_utils import is_link, is_link_selected, is_robot
 from ..wb_utils import is_robot_selected
 
 
@@ -59,7 +61,10 @@ class _CalculateMassAndInertiaCommand:
         default_material = material_from_material_editor(robot.MaterialCardPath)
 
         doc.openTransaction(tr('Calculate mass and inertia'))
-        # TODO refactor this code block to be more readable (split to functions)
+        # Collect the geometries of all links first, to evaluate the meshes
+        # in parallel.
+        links_to_compute = []
+        geometries = {}
         for link in links:
             print('Start process inertia and mass of link - Label: ', link.Label, ' Label2: ', link.Label2)
 
@@ -76,24 +81,27 @@ class _CalculateMassAndInertiaCommand:
                 error(f'Link "{link.Label}" skipped. No bound Real element for Link.', gui=True)
                 continue
 
-            compound = get_compound(
-                link.Real,
-                fc.Placement(),
-                compound_name = "inert_link_" + ros_name(link),
-                compound_el_name = "inert_el_" + ros_name(link),
-                zeroing_real_objs_placement = True,
-            )
-            elem_with_volume = first_object_with_volume(compound)
-
-            if not elem_with_volume:
-                doc.removeObject(compound.Name)
+            geometries[link.Name] = get_real_geometries(link)
+            links_to_compute.append(link)
+
+        engine = get_mass_properties_engine()
+        t0 = time.perf_counter()
+        link_properties = engine.compute(geometries)
+        message(
+            f'Mass properties of {len(links_to_compute)} links computed in'
+            f' {time.perf_counter() - t0:.2f} s ({engine.miss_count} geometries'
+            f' evaluated, {engine.hit_count} unchanged)',
+        )
+
+        for link in links_to_compute:
+            properties = link_properties[link.Name]
+            if properties is None:
                 error(f'Link "{link.Label}" does not link to any child with volume.', gui=True)
                 continue
 
-            center_of_gravity = center_of_gravity_mm(elem_with_volume)
-            elem_matrix_of_inertia = matrix_of_inertia(elem_with_volume)
-            elem_volume_mm3 = volume_mm3(elem_with_volume)
-            doc.removeObject(elem_with_volume.Name)
+            center_of_gravity = fc.Vector(*properties.center_of_gravity)
+            elem_matrix_of_inertia = numpy_to_fc_matrix(properties.matrix_of_inertia)
+            elem_volume_mm3 = properties.volume_mm3
 
             elem_material = material_from_material_editor(link.MaterialCardPath)
 
@@ -107,18 +115,6 @@ class _CalculateMassAndInertiaCommand:
                     )
                     continue
 
-            if center_of_gravity is None:
-                error(
-                    f'Link "{link.Label}" skipped.'
-                    ' Can not get CenterOfGravity of bound Real element.',
-                    gui=True,
-                )
-                continue
-
-            if elem_matrix_of_inertia is None:
-                error(f'Cannot get the matrix of inertia of the object bound by "{link.Label}".Real[0].', gui=True)
-                continue
-
             if not link.CalculateInertiaBasedOnMass:
                 if elem_material.material_name is None:
                     material = default_material
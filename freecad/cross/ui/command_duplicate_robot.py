@@ -3,13 +3,17 @@
 # The `Collision`, `Visual`, and `Real` parts of the new links point to the same
 # objects as the original links (i.e. the linked objects are not duplicated).
 
+from __future__ import annotations
+
+from typing import Optional
+
 import FreeCADGui as fcgui
 import FreeCAD as fc
 
 from PySide import QtGui # FreeCAD's PySide!
 from freecad.cross.sensors.sensor_proxy import get_sensors_data
 
-from ..wb_utils import is_sensor_joint, is_sensor_link, ros_name
+from ..wb_utils import ros_name
 
 # Typing hints.
 from freecad.cross.controller_proxy import get_controllers_data
@@ -53,8 +57,8 @@ class _DuplicateRobotCommand:
         form = DuplicateRobotDialog(sel[0].Label)
 
         form.exec()
-        for _ in range(form.number_of_duplicates):
-            duplicate(sel[0], form.base_name)
+        if form.number_of_duplicates > 0:
+            duplicate_robots(sel[0], form.base_name, form.number_of_duplicates)
 
 
 def copy_scripted_obj_props(
@@ -104,126 +108,197 @@ def copy_scripted_obj_props(
 
 def duplicate(orig_robot: CrossRobot, base_name: str) -> CrossRobot:
     """Duplicate a Cross::Robot, its links and joints."""
+    return duplicate_robots(orig_robot, base_name)[0]
+
+
+def duplicate_robots(
+        orig_robot: CrossRobot,
+        base_name: str,
+        count: int = 1,
+        placements: Optional[list[fc.Placement]] = None,
+) -> list[CrossRobot]:
+    """Duplicate a Cross::Robot `count` times, e.g. for a fleet or a workcell.
+
+    The copies share the `Real`, `Visual`, and `Collision` objects of the
+    original links, only the FreeCAD links pointing to them are created.
+    The objects are created without intermediate recompute, within
+    `batch_update()` of each copy, so that each robot is updated once instead
+    of once per added object. The document is recomputed once at the end.
+
+    Parameters
+    ----------
+    - orig_robot: the robot to duplicate.
+    - base_name: base of the names of the new robots.
+    - count: number of copies.
+    - placements: placement of each copy, defaults to the placement of
+                  `orig_robot`.
+
+    """
+    if (placements is not None) and (len(placements) != count):
+        raise ValueError(
+            f'{len(placements)} placements given for {count} duplicates',
+        )
+    doc = orig_robot.Document
+
+    # `make_link()` and `make_joint()` add the new object to the selected
+    # robot, i.e. to `orig_robot` when called from the command.
+    selection = []
+    if hasattr(fc, 'GuiUp') and fc.GuiUp:
+        selection = fcgui.Selection.getSelection()
+        fcgui.Selection.clearSelection()
+
+    # The catalogs are read once for all copies.
+    catalogs = _Catalogs()
+    robots: list[CrossRobot] = []
+    try:
+        for i in range(count):
+            robot = _duplicate(orig_robot, base_name, catalogs)
+            if placements is not None:
+                robot.Placement = placements[i]
+            robots.append(robot)
+    finally:
+        doc.recompute()
+        for obj in selection:
+            fcgui.Selection.addSelection(obj)
+    return robots
+
+
+class _Catalogs:
+    """Data of the sensors and controllers, read on first use."""
+
+    def __init__(self):
+        self._sensors: Optional[dict] = None
+        # Plugin class name -> {type: controller data}, with type
+        # 'controller' or 'broadcaster'.
+        self._controllers: Optional[dict[str, dict[str, dict]]] = None
+
+    def get_sensor_data(self, sensor_dir_name: str, name: str) -> dict:
+        if self._sensors is None:
+            self._sensors = get_sensors_data()
+        return self._sensors[sensor_dir_name][name]
+
+    def get_controller_data(
+            self,
+            plugin_class_name: str,
+            preferred_type: str,
+    ) -> Optional[tuple[str, dict]]:
+        """Return (type, data) of a controller or broadcaster or None."""
+        if self._controllers is None:
+            controllers = get_controllers_data()
+            self._controllers = {}
+            for type_, key in (('controller', 'controllers'), ('broadcaster', 'broadcasters')):
+                for value in controllers[key].values():
+                    by_type = self._controllers.setdefault(value['controller_plugin_class_name'], {})
+                    by_type.setdefault(type_, value)
+        by_type = self._controllers.get(plugin_class_name, {})
+        if preferred_type in by_type:
+            return preferred_type, by_type[preferred_type]
+        for type_, value in by_type.items():
+            return type_, value
+        return None
+
+
+def _duplicate(orig_robot: CrossRobot, base_name: str, catalogs: _Catalogs) -> CrossRobot:
+    """Duplicate a Cross::Robot without recompute."""
     # Import late to avoid slowing down workbench start-up.
     from freecad.cross.joint_proxy import make_joint
     from freecad.cross.link_proxy import make_link
     from freecad.cross.robot_proxy import make_robot
     from freecad.cross.controller_proxy import make_controller
     from freecad.cross.controller_proxy import make_broadcaster
-    from freecad.cross.sensors.sensor_factory import make_sensor
 
     doc = orig_robot.Document
-    robot = make_robot(f'{base_name}_000', doc)
-
-    orig_proxy = orig_robot.Proxy
-    sensors = get_sensors_data()
-
-    # cloning links
-    for orig_link in orig_proxy.get_links():
-        link = make_link(orig_link.Label, doc)
-        robot.addObject(link)
-        copy_scripted_obj_props(orig_link, link)
-
-        # remove links to old link sensors
-        new_group = []
-        for v in link.Group:
-            if not is_sensor_link(v):
-                new_group.append(v)
-        if link.Group != new_group:
-            link.Group = new_group
-
-        # cloning sensors
-        for orig_sensor in orig_link.Proxy.get_sensors():
-            sensor_dir_name = 'link'
-            # remove not first same name instance postfix # 001, 002, etc.
-            orig_sensor_name_without_postfix = orig_sensor.Name.rstrip('0123456789')
-            sensor = make_sensor(sensors[sensor_dir_name][orig_sensor_name_without_postfix], sensor_dir_name)
-            link.addObject(sensor)
-            copy_scripted_obj_props(orig_sensor, sensor)
-    doc.recompute()
-
-    # cloning joints
-    for orig_joint in orig_proxy.get_joints():
-        joint = make_joint(orig_joint.Label, doc)
-        robot.addObject(joint)
-        copy_scripted_obj_props(orig_joint, joint)
-
-        # remove links to old joint sensors
-        new_group = []
-        for v in joint.Group:
-            if not is_sensor_joint(v):
-                new_group.append(v)
-        if joint.Group != new_group:
-            joint.Group = new_group
-
-        # cloning sensors
-        for orig_sensor in orig_joint.Proxy.get_sensors():
-            sensor_dir_name = 'joint'
-            # remove not first same name instance postfix # 001, 002, etc.
-            orig_sensor_name_without_postfix = orig_sensor.Name.rstrip('0123456789')
-            sensor = make_sensor(sensors[sensor_dir_name][orig_sensor_name_without_postfix], sensor_dir_name)
-            joint.addObject(sensor)
-            copy_scripted_obj_props(orig_sensor, sensor)
-    doc.recompute()
-
-    # get data controllers and broadcasters
-    controllers = get_controllers_data()
-
-    # cloning controllers
-    for orig_controller in orig_proxy.get_controllers():
-        controller_data = None
-        for key, value in controllers['controllers'].items():
-            if value['controller_plugin_class_name'] == orig_controller.plugin_class_name:
-                controller_data = value
-                break
-
-        # fix a bug with old broadcasters that has controllers type
-        if controller_data is None:
-            for key, value in controllers['broadcasters'].items():
-                if value['controller_plugin_class_name'] == orig_controller.plugin_class_name:
-                    controller_data = value
-                    break
-
-            if controller_data is None:
+    robot = make_robot(f'{base_name}_000', doc, recompute_after=False)
+
+    # The robot is updated once, at the end of the block.
+    with robot.Proxy.batch_update():
+        orig_proxy = orig_robot.Proxy
+
+        # Cloning links. The links are not part of the robot yet, so that their
+        # changes are not propagated to the robot.
+        # `Group` is managed by the link: FreeCAD links to the shared `Real`,
+        # `Visual`, and `Collision` objects and sensors cloned below.
+        links: list[DO] = []
+        for orig_link in orig_proxy.get_links():
+            link = make_link(orig_link.Label, doc, recompute_after=False)
+            copy_scripted_obj_props(orig_link, link, exclude_attrs_addition=['Group'])
+            _duplicate_sensors(orig_link, link, 'link', catalogs)
+            links.append(link)
+
+        joints: list[DO] = []
+        for orig_joint in orig_proxy.get_joints():
+            joint = make_joint(orig_joint.Label, doc, recompute_after=False)
+            joints.append(joint)
+
+        controllers: list[DO] = []
+        orig_controllers = (
+            [(c, 'controller') for c in orig_proxy.get_controllers()]
+            + [(b, 'broadcaster') for b in orig_proxy.get_broadcasters()]
+        )
+        for orig_controller, orig_type in orig_controllers:
+            found = catalogs.get_controller_data(orig_controller.plugin_class_name, orig_type)
+            if found is None:
                 raise ValueError(
                     "Cant get controller data for " + ros_name(orig_controller) + ' controller.\
  It can be too old verion. Recreate it before cloning.',
                 )
+            # Old broadcasters may have the type of controllers, cf. `_Type`.
+            controller_type, controller_data = found
+            if controller_type == 'broadcaster':
+                controller = make_broadcaster(controller_data, doc=doc, recompute_after=False)
+                exclude_attrs_addition = ['_Type']
+            else:
+                controller = make_controller(controller_data, doc=doc, recompute_after=False)
+                exclude_attrs_addition = []
+            copy_scripted_obj_props(orig_controller, controller, exclude_attrs_addition=exclude_attrs_addition)
+            controllers.append(controller)
+
+        # A single change of `Group`, which sets the enumerations of `Parent`
+        # and `Child` of all joints.
+        robot.Group = links + joints + controllers
+
+        # The properties of joints are copied once `Parent` and `Child` accept
+        # the names of the links.
+        for orig_joint, joint in zip(orig_proxy.get_joints(), joints):
+            copy_scripted_obj_props(orig_joint, joint, exclude_attrs_addition=['Group'])
+            _duplicate_sensors(orig_joint, joint, 'joint', catalogs)
+
+        copy_scripted_obj_props(orig_robot, robot, exclude_attrs_addition = ['Group'])
+
+        # The joint variables depend on the type of the joints, which was not set
+        # at the last update of the robot.
+        robot.Proxy.add_joint_variables()
+        for joint_variable_name in orig_proxy.joint_variables.values():
+            setattr(robot, joint_variable_name, getattr(orig_robot, joint_variable_name))
 
-            controller = make_broadcaster(controller_data, doc=doc)
-        else:
-            controller = make_controller(controller_data, doc=doc)
-
-        robot.addObject(controller)
-        copy_scripted_obj_props(orig_controller, controller, exclude_attrs_addition = ['_Type'])
-    doc.recompute()
-
-    # cloning broadcasters
-    for orig_broadcaster in orig_proxy.get_broadcasters():
-        broadcaster_data = None
-        for key, value in controllers['broadcasters'].items():
-            if value['controller_plugin_class_name'] == orig_broadcaster.plugin_class_name:
-                broadcaster_data = value
-                break
-
-        if broadcaster_data is None:
-            raise ValueError(
-                "Cant get broadcaster data for " + ros_name(orig_broadcaster) + ' broadcaster.\
- It can be too old verion. Recreate it before cloning.',
-            )
-
-        broadcaster = make_broadcaster(broadcaster_data, doc=doc)
-        robot.addObject(broadcaster)
-        copy_scripted_obj_props(orig_broadcaster, broadcaster)
-    doc.recompute()
+    return robot
 
-    copy_scripted_obj_props(orig_robot, robot, exclude_attrs_addition = ['Group'])
 
-    for joint_variable_name in orig_proxy.joint_variables.values():
-        setattr(robot, joint_variable_name, getattr(orig_robot, joint_variable_name))
+def _duplicate_sensors(
+        orig_obj: DO,
+        new_obj: DO,
+        sensor_dir_name: str,
+        catalogs: _Catalogs,
+) -> None:
+    """Clone the sensors of a link or joint without recompute."""
+    # Import late to avoid slowing down workbench start-up.
+    from freecad.cross.sensors.sensor_factory import make_sensor
 
-    doc.recompute()
-    return robot
+    doc = new_obj.Document
+    sensors: list[DO] = []
+    for orig_sensor in orig_obj.Proxy.get_sensors():
+        # remove not first same name instance postfix # 001, 002, etc.
+        orig_sensor_name_without_postfix = orig_sensor.Name.rstrip('0123456789')
+        sensor = make_sensor(
+            catalogs.get_sensor_data(sensor_dir_name, orig_sensor_name_without_postfix),
+            sensor_dir_name,
+            doc,
+            recompute_after=False,
+        )
+        copy_scripted_obj_props(orig_sensor, sensor)
+        sensors.append(sensor)
+    if sensors:
+        new_obj.addObjects(sensors)
 
 
 fcgui.addCommand('DuplicateRobot', _DuplicateRobotCommand())
@@ -27,23 +27,41 @@ class _GetPlanningSceneCommand:
         return True
 
     def Activated(self):
+        # Import late to avoid slowing down workbench start-up.
+        from ..ros.planning_scene import get_planning_scene_async
+
         doc = fc.activeDocument()
         if not doc:
             doc = fc.newDocument()
-        fcgui.addModule('freecad.cross.planning_scene_proxy')
-        fcgui.addModule('freecad.cross.ros.planning_scene')
-        fcgui.doCommand('_scene_msg = freecad.cross.ros.planning_scene.get_planning_scene(timeout_sec=10.0)')
-        doc.openTransaction(tr('Get Planning Scene'))
-        fcgui.doCommand(
-            'if _scene_msg is None:\n'
-            '    _scene = None\n'
-            'else:\n'
-            "    _scene = freecad.cross.planning_scene_proxy.make_planning_scene(_scene_msg.name, _scene_msg)",
+        # The GUI stays responsive while waiting for the server.
+        get_planning_scene_async(
+            lambda scene_msg: _add_planning_scene(doc, scene_msg),
+            timeout_sec=10.0,
         )
-        # fcgui.doCommand('FreeCADGui.ActiveDocument.setEdit(_scene.Name)')
-        doc.recompute()
-        doc.commitTransaction()
-        fcgui.doCommand("Gui.SendMsgToActiveView('ViewFit')")
+
+
+def _add_planning_scene(doc: fc.Document, scene_msg) -> None:
+    """Create a Cross::PlanningScene, in the GUI thread.
+
+    `scene_msg` is also available as
+    `freecad.cross.ros.planning_scene.get_last_planning_scene()` for the
+    commands recorded in macros.
+
+    """
+    fcgui.addModule('freecad.cross.planning_scene_proxy')
+    fcgui.addModule('freecad.cross.ros.planning_scene')
+    fcgui.doCommand('_scene_msg = freecad.cross.ros.planning_scene.get_last_planning_scene()')
+    doc.openTransaction(tr('Get Planning Scene'))
+    fcgui.doCommand(
+        'if _scene_msg is None:\n'
+        '    _scene = None\n'
+        'else:\n'
+        '    _scene = freecad.cross.planning_scene_proxy.make_planning_scene('
+        f"_scene_msg.name, _scene_msg, FreeCAD.getDocument('{doc.Name}'))",
+    )
+    doc.recompute()
+    doc.commitTransaction()
+    fcgui.doCommand("Gui.SendMsgToActiveView('ViewFit')")
 
 
 fcgui.addCommand('GetPlanningScene', _GetPlanningSceneCommand())
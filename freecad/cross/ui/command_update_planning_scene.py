@@ -39,20 +39,38 @@ class _UpdatePlanningSceneCommand:
         except RuntimeError:
             # The command is active only when a Cross::PlanningScene is active,
             # this should not happen.
-            warn('Internal error, no Cross::PlanningScene selected', true)
+            warn('Internal error, no Cross::PlanningScene selected', True)
             return
 
-        fcgui.addModule('freecad.cross.ros.planning_scene')
-        fcgui.doCommand('_scene_msg = freecad.cross.ros.planning_scene.get_planning_scene(timeout_sec=10.0)')
-        doc.openTransaction(tr('Update Planning Scene'))
-        fcgui.doCommand(
-            'if _scene_msg is not None:\n'
-            f"     FreeCAD.getDocument('{doc.Name}').getObject('{cross_planning_scene.Name}').Proxy.update_scene(_scene_msg)",
+        # Import late to avoid slowing down workbench start-up.
+        from ..ros.planning_scene import get_planning_scene_async
+
+        # The GUI stays responsive while waiting for the server.
+        get_planning_scene_async(
+            lambda scene_msg: _update_planning_scene(
+                doc, cross_planning_scene, scene_msg,
+            ),
+            timeout_sec=10.0,
         )
-        # fcgui.doCommand('FreeCADGui.ActiveDocument.setEdit(_scene.Name)')
-        doc.recompute()
-        doc.commitTransaction()
-        fcgui.doCommand("Gui.SendMsgToActiveView('ViewFit')")
+
+
+def _update_planning_scene(doc: fc.Document, scene, scene_msg) -> None:
+    """Update a Cross::PlanningScene, in the GUI thread."""
+    try:
+        scene.Name
+    except ReferenceError:
+        # Deleted while waiting for the response.
+        return
+    fcgui.addModule('freecad.cross.ros.planning_scene')
+    fcgui.doCommand('_scene_msg = freecad.cross.ros.planning_scene.get_last_planning_scene()')
+    doc.openTransaction(tr('Update Planning Scene'))
+    fcgui.doCommand(
+        'if _scene_msg is not None:\n'
+        f"    FreeCAD.getDocument('{doc.Name}').getObject('{scene.Name}').Proxy.update_scene(_scene_msg)",
+    )
+    doc.recompute()
+    doc.commitTransaction()
+    fcgui.doCommand("Gui.SendMsgToActiveView('ViewFit')")
 
 
 fcgui.addCommand('UpdatePlanningScene', _UpdatePlanningSceneCommand())
@@ -0,0 +1,191 @@
+"""Lightweight stubs of the workbench commands.
+
+Importing a command module also imports its dependencies (proxies, URDF and
+Xacro tools, ROS messages, ...), which makes the activation of the workbench
+slow. A `LazyCommand` is registered instead of the command, with the
+resources (icon, menu text, tooltip, shortcut) read from the source of the
+command module without importing it. The module is imported on the first
+activation of the command and the stub then forwards to the real command.
+Until then, the stub is shown enabled, because the toolbars are updated
+often and `IsActive()` must not import anything. When activated, the stub
+checks `IsActive()` of the real command and warns if the command is not
+available in the current context, e.g. without the required selection.
+
+A command module must end with `fcgui.addCommand('Name', _Command())` and
+`_Command.GetResources()` must return a dict of literals or `tr(literal)`.
+Otherwise, `register_lazy_command()` imports the module immediately.
+When the module is finally imported, its own call to `fcgui.addCommand()` is
+ignored by FreeCAD because the name is already registered by the stub.
+
+"""
+
+from __future__ import annotations
+
+import ast
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Optional
+
+import FreeCADGui as fcgui
+
+from ..freecad_utils import warn
+from ..gui_utils import tr
+from ..startup_timing import timed
+
+# Directory of the command modules.
+_UI_DIR = Path(__file__).parent
+
+
+class LazyCommand:
+    """Command importing its implementation on first activation."""
+
+    def __init__(
+            self,
+            name: str,
+            module_name: str,
+            class_name: str,
+            resources: dict[str, Any],
+    ):
+        """Constructor.
+
+        Parameters
+        ----------
+        - name: name of the command, e.g. 'NewRobot'.
+        - module_name: module defining the command, relative to this package,
+                       e.g. 'command_new_robot'.
+        - class_name: name of the command class in the module.
+        - resources: what `GetResources()` of the command returns.
+
+        """
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.resources = resources
+        self.command: Optional[Any] = None
+
+    def GetResources(self):
+        return self.resources
+
+    def IsActive(self):
+        if self.command is None:
+            # Checked in `Activated()`.
+            return True
+        return self.command.IsActive()
+
+    def Activated(self):
+        command = self.load()
+        if not command.IsActive():
+            warn(f'{self.name}: ' + tr('command not available in this context'), True)
+            return
+        command.Activated()
+
+    def load(self) -> Any:
+        """Import the command module and return the real command."""
+        if self.command is None:
+            with timed(f'import of command {self.name} ({self.module_name})'):
+                module = import_module(f'{__package__}.{self.module_name}')
+            self.command = getattr(module, self.class_name)()
+        return self.command
+
+
+def get_command_definition(
+        module_name: str,
+        command_name: str,
+) -> Optional[tuple[str, dict[str, Any]]]:
+    """Return the class name and the resources of a command.
+
+    The module is not imported.
+
+    Return None if the module doesn't follow the structure described in the
+    module documentation.
+
+    """
+    path = _UI_DIR / f'{module_name}.py'
+    try:
+        tree = ast.parse(path.read_bytes(), str(path))
+    except (OSError, SyntaxError):
+        return None
+    class_name = _get_registered_class_name(tree, command_name)
+    if class_name is None:
+        return None
+    for node in tree.body:
+        if not (isinstance(node, ast.ClassDef) and (node.name == class_name)):
+            continue
+        for method in node.body:
+            if (
+                    isinstance(method, ast.FunctionDef)
+                    and (method.name == 'GetResources')
+            ):
+                resources = _get_returned_resources(method)
+                if resources is None:
+                    return None
+                return class_name, resources
+    return None
+
+
+def _get_registered_class_name(tree: ast.Module, command_name: str) -> Optional[str]:
+    """Return `Class` from `fcgui.addCommand(command_name, Class())`."""
+    for node in tree.body:
+        if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)):
+            continue
+        call = node.value
+        if not (
+                isinstance(call.func, ast.Attribute)
+                and (call.func.attr == 'addCommand')
+                and (len(call.args) == 2)
+        ):
+            continue
+        name, command = call.args
+        if (
+                isinstance(name, ast.Constant)
+                and (name.value == command_name)
+                and isinstance(command, ast.Call)
+                and isinstance(command.func, ast.Name)
+        ):
+            return command.func.id
+    return None
+
+
+def _get_returned_resources(method: ast.FunctionDef) -> Optional[dict[str, Any]]:
+    """Return the dict returned by `GetResources()` or None."""
+    for node in ast.walk(method):
+        if isinstance(node, ast.Return) and isinstance(node.value, ast.Dict):
+            try:
+                return {
+                    _evaluate(k): _evaluate(v)
+                    for k, v in zip(node.value.keys, node.value.values)
+                }
+            except ValueError:
+                return None
+    return None
+
+
+def _evaluate(node: Optional[ast.expr]) -> Any:
+    """Return the value of a literal or of `tr(literal)`."""
+    if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and (node.func.id == 'tr')
+            and (len(node.args) == 1)
+            and (not node.keywords)
+    ):
+        return tr(_evaluate(node.args[0]))
+    if node is None:
+        # `**other_dict`.
+        raise ValueError('Unsupported dict unpacking')
+    return ast.literal_eval(node)
+
+
+def register_lazy_command(command_name: str, module_name: str) -> None:
+    """Register a stub of the command, or the command if not possible."""
+    with timed(f'registration of command {command_name}'):
+        definition = get_command_definition(module_name, command_name)
+        if definition is not None:
+            class_name, resources = definition
+            fcgui.addCommand(
+                command_name,
+                LazyCommand(command_name, module_name, class_name, resources),
+            )
+            return
+    with timed(f'import of command {command_name} ({module_name})'):
+        import_module(f'{__package__}.{module_name}')
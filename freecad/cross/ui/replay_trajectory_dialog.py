@@ -8,6 +8,7 @@ except:
     from PySide2 import QtGui # FreeCAD's PySide!
 
 from ..freecad_utils import warn
+from ..trajectory_player import TrajectoryPlayer
 from ..wb_utils import ICON_PATH
 from ..wb_utils import UI_PATH
 
@@ -27,12 +28,15 @@ class ReplayTrajectoryDialog:
         )
         self.dialog_confirmed = False
 
+        self.player = TrajectoryPlayer(
+                trajectory,
+                on_frame=self._on_player_frame,
+                on_finished=self._on_player_finished,
+        )
+
         self._set_icons()
         self._establish_connections()
-        # Hide not implemented buttons.
-        self.form.play_button.hide()
-        self.form.pause_button.hide()
-        self.form.loop_button.hide()
+        self.form.pause_button.setEnabled(False)
 
         try:
             self.point_index = self.trajectory.PointIndex
@@ -63,11 +67,19 @@ class ReplayTrajectoryDialog:
         self.form.index_slider.valueChanged.connect(self._on_slider_changed)
         self.form.previous_button.clicked.connect(self._on_previous_clicked)
         self.form.next_button.clicked.connect(self._on_next_clicked)
+        self.form.play_button.clicked.connect(self._on_play_clicked)
+        self.form.pause_button.clicked.connect(self._on_pause_clicked)
+        self.form.loop_button.toggled.connect(self._on_loop_toggled)
+        self.form.interpolation_combo_box.currentIndexChanged.connect(
+                self._on_interpolation_changed,
+        )
         self.form.button_box.accepted.connect(self._on_accept)
         self.form.button_box.rejected.connect(self._on_cancel)
 
     def exec_(self) -> int:
         self.form.exec_()
+        # Also stop when the dialog is closed by the window manager.
+        self._stop_playback()
         if not self.dialog_confirmed:
             return -1
         return self.form.index_spin_box.value()
@@ -89,10 +101,58 @@ class ReplayTrajectoryDialog:
     def _on_next_clicked(self) -> None:
         self.point_index += 1
 
+    def _on_play_clicked(self) -> None:
+        store = self.trajectory.Proxy.get_store()
+        if not store or (store.point_count == 0):
+            return
+        start_time = float(store.times[self.point_index])
+        if self.player.start(start_time):
+            self._set_playing(True)
+
+    def _on_pause_clicked(self) -> None:
+        self._stop_playback()
+
+    def _on_loop_toggled(self, checked: bool) -> None:
+        self.player.loop = checked
+
+    def _on_interpolation_changed(self, index: int) -> None:
+        self.player.interpolation = 'cubic' if index == 1 else 'linear'
+
+    def _on_player_frame(self, time_from_start: float, point_index: int) -> None:
+        # Only update the widgets, the document is updated on stop.
+        for widget in (self.form.index_slider, self.form.index_spin_box):
+            widget.blockSignals(True)
+            widget.setValue(point_index)
+            widget.blockSignals(False)
+        self.form.fps_label.setText(
+                f'{time_from_start:.2f} s, {self.player.fps:.0f} FPS',
+        )
+
+    def _on_player_finished(self) -> None:
+        self._set_playing(False)
+        self._update_trajectory()
+
+    def _stop_playback(self) -> None:
+        if not self.player.is_playing:
+            return
+        self.player.stop()
+        self._set_playing(False)
+        self._update_trajectory()
+
+    def _set_playing(self, playing: bool) -> None:
+        self.form.play_button.setEnabled(not playing)
+        self.form.pause_button.setEnabled(playing)
+        self.form.previous_button.setEnabled(not playing)
+        self.form.next_button.setEnabled(not playing)
+        self.form.index_slider.setEnabled(not playing)
+        self.form.index_spin_box.setEnabled(not playing)
+
     def _on_accept(self) -> None:
+        self._stop_playback()
         self.dialog_confirmed = True
 
     def _on_cancel(self) -> None:
+        self._stop_playback()
         self.dialog_confirmed = False
 
     def _update_trajectory(self) -> None:
@@ -128,4 +188,5 @@ class ReplayTrajectoryDialog:
         self.form.index_slider.setMaximum(value)
 
     def close(self) -> None:
+        self._stop_playback()
         self.form.close()
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
-import gc
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+import os
 from pathlib import Path
-from typing import Optional
+import threading
+from typing import Any, Callable, Optional
 
 import FreeCAD as fc
 
@@ -18,16 +24,20 @@ from urdf_parser_py.urdf import Mesh
 from urdf_parser_py.urdf import Pose
 from urdf_parser_py.urdf import Sphere
 
+from . import wb_globals
+from .exceptions import MeshReadError
 from .freecad_utils import add_object, is_part_feature
+from .freecad_utils import error
 from .freecad_utils import is_group
 from .freecad_utils import is_mesh
 from .freecad_utils import warn
+from .mesh_utils import MeshSolidCache
 from .mesh_utils import read_mesh_dae
-from .mesh_utils import scale_mesh_object
 from .ros.utils import abs_path_from_ros_path
 from .ros.utils import pkg_and_file_from_ros_path
 from .ros.utils import ros_path_from_abs_path
 from .urdf_utils import rotation_from_rpy
+from .wb_utils import get_workbench_param
 
 # Typing hints.
 Doc = fc.Document
@@ -35,20 +45,343 @@ DO = fc.DocumentObject
 Shape = [Box, Cylinder, Mesh, Sphere]
 
 
+@dataclass
+class LoadedMesh:
+    """Result of `load_mesh_geometry()`."""
+
+    # A `Mesh.Mesh` or a `Part.Solid`.
+    geometry: Any
+    # Warnings to show to the user, from the main thread.
+    warnings: list[str] = field(default_factory=list)
+    # Estimated memory footprint, in bytes.
+    size: int = 0
+
+
+class MeshMemoryCache:
+    """LRU cache of loaded meshes and solids with a memory cap.
+
+    Used to load meshes on demand, e.g. when geometries are created lazily,
+    without reading the same file again, unless it was modified, see
+    `MeshLoader._get_key()`. Thread-safe.
+
+    """
+
+    def __init__(self, max_size_mb: Optional[float] = None):
+        if max_size_mb is None:
+            max_size_mb = get_workbench_param(wb_globals.PREF_MESH_CACHE_SIZE, 512)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.size = 0
+        self._meshes: OrderedDict[tuple, LoadedMesh] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[LoadedMesh]:
+        with self._lock:
+            loaded = self._meshes.get(key)
+            if loaded is not None:
+                self._meshes.move_to_end(key)
+            return loaded
+
+    def add(self, key: tuple, loaded: LoadedMesh) -> None:
+        """Add a mesh, evicting the least recently used ones if needed.
+
+        Meshes larger than the cap are not added.
+
+        """
+        if loaded.size > self.max_size:
+            return
+        with self._lock:
+            old = self._meshes.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self._meshes[key] = loaded
+            self.size += loaded.size
+            while self.size > self.max_size:
+                _, evicted = self._meshes.popitem(last=False)
+                self.size -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._meshes.clear()
+            self.size = 0
+
+
+# Shared by all `MeshLoader`s, created on first use.
+_mesh_memory_cache: Optional[MeshMemoryCache] = None
+
+
+def get_mesh_memory_cache() -> MeshMemoryCache:
+    """Return the session-wide cache of loaded meshes."""
+    global _mesh_memory_cache
+    if _mesh_memory_cache is None:
+        _mesh_memory_cache = MeshMemoryCache()
+    return _mesh_memory_cache
+
+
+def load_mesh_geometry(
+        mesh_path: Path,
+        scale: Optional[float | list[float]] = None,
+        convert_mesh_to_solid: bool = False,
+        remove_solid_splitter: bool = False,
+) -> LoadedMesh:
+    """Return the mesh or solid from a mesh file, scaled to mm.
+
+    No document is used and errors are raised rather than reported, so that
+    the function can be called from a worker thread and the errors reported
+    from the main thread. The warnings are returned in `LoadedMesh.warnings`.
+    Raise `MeshReadError` if a dae file cannot be read, or the exception of
+    FreeCAD if another mesh file cannot be read or converted.
+
+    Parameters
+    ----------
+    - mesh_path: path to the mesh file.
+    - scale: `scale` attribute of the URDF mesh, a float or 3 floats.
+    - convert_mesh_to_solid: return a `Part.Solid` instead of a `Mesh.Mesh`.
+    - remove_solid_splitter: remove the splitter of the solid (only with
+                             `convert_mesh_to_solid`).
+
+    """
+    warnings: list[str] = []
+    solid_cache: Optional[MeshSolidCache] = None
+    if convert_mesh_to_solid:
+        solid_cache = get_mesh_solid_cache()
+    if (solid_cache is not None) and solid_cache.enabled:
+        cache_key = solid_cache.get_key(
+            mesh_path,
+            _get_scale_tuple(mesh_path, scale),
+            remove_solid_splitter,
+        )
+        solid = solid_cache.get(cache_key)
+        if solid is not None:
+            return LoadedMesh(solid, warnings, mesh_path.stat().st_size * 10)
+    else:
+        solid_cache = None
+
+    if mesh_path.suffix.lower() == '.dae':
+        mesh = read_mesh_dae(mesh_path)
+    else:
+        mesh = fcmesh.read(str(mesh_path))
+
+    scaling = _get_scale_tuple(mesh_path, scale)
+    if scaling != (1.0, 1.0, 1.0):
+        scale_mat = fc.Matrix()
+        scale_mat.scale(fc.Vector(*scaling))
+        mesh.transform(scale_mat)
+
+    # 3 doubles per point, 3 indices and 3 neighbours per facet.
+    size = (mesh.CountPoints * 24) + (mesh.CountFacets * 24)
+    if not convert_mesh_to_solid:
+        return LoadedMesh(mesh, warnings, size)
+
+    import Part
+    # As the commands Part_ShapeFromMesh and Part_MakeSolid.
+    shape = Part.Shape()
+    shape.makeShapeFromMesh(mesh.Topology, 0.100000, False)
+    shell = Part.Shell(shape.Faces)
+    if remove_solid_splitter:
+        try:
+            shell = shell.removeSplitter()
+        except Exception:
+            warnings.append(f'Can`t remove splitter from body - {mesh_path.name}')
+    solid = Part.Solid(shell)
+    if solid_cache is not None:
+        solid_cache.add(cache_key, solid)
+    # Rough estimate, B-rep faces are much heavier than facets.
+    return LoadedMesh(solid, warnings, size * 10)
+
+
+def _get_scale_tuple(
+        mesh_path: Path,
+        scale: Optional[float | list[float]],
+) -> tuple[float, float, float]:
+    """Return the scale factors from the mesh file to mm."""
+    unit = 1000.0 if mesh_path.suffix.lower() in ['.stl', '.obj'] else 1.0  # m to mm.
+    if ((scale is None)
+            or not (
+                not (scale == 1.0)
+                or scale == [1.0, 1.0, 1.0]
+            )):
+        return (unit, unit, unit)
+    if isinstance(scale, (int, float)):
+        scale = [scale] * 3
+    return (unit * scale[0], unit * scale[1], unit * scale[2])
+
+
+# Created on first use.
+_mesh_solid_cache: Optional[MeshSolidCache] = None
+
+
+def get_mesh_solid_cache() -> MeshSolidCache:
+    """Return the session-wide on-disk cache of solids from meshes."""
+    global _mesh_solid_cache
+    if _mesh_solid_cache is None:
+        _mesh_solid_cache = MeshSolidCache()
+    return _mesh_solid_cache
+
+
+class MeshLoader:
+    """Load the mesh files of a URDF robot in worker threads.
+
+    Meshes are submitted in the order they will be needed, from the main
+    thread, and the objects using them are created by `obj_from_mesh()` in
+    the main thread while the next meshes are loaded.
+    The number of threads is the workbench parameter
+    `wb_globals.PREF_URDF_IMPORT_WORKERS`, with at most one thread the meshes
+    are loaded on demand.
+
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = get_workbench_param(
+                wb_globals.PREF_URDF_IMPORT_WORKERS,
+                os.cpu_count() or 1,
+            )
+        self.workers = max(int(workers), 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='cross_urdf_import',
+            )
+        # Futures of LoadedMesh, keyed by `_get_key()`.
+        self._futures: dict[tuple, Future] = {}
+        # Create the session-wide caches from the main thread, they read
+        # workbench parameters.
+        get_mesh_memory_cache()
+        get_mesh_solid_cache()
+
+    @staticmethod
+    def _get_key(
+            mesh_path: Path,
+            scale: Optional[float | list[float]],
+            convert_mesh_to_solid: bool,
+            remove_solid_splitter: bool,
+    ) -> tuple:
+        """Return the key of a mesh in `MeshMemoryCache` and `_futures`.
+
+        The key includes the modification time and size of the file, so that
+        a mesh modified on disk is read again.
+
+        """
+        if isinstance(scale, (list, tuple)):
+            scale = tuple(scale)
+        try:
+            stat = mesh_path.stat()
+            file_id = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Reading the file will fail, nothing will be cached.
+            file_id = None
+        return (
+            str(mesh_path), file_id, scale, convert_mesh_to_solid,
+            convert_mesh_to_solid and remove_solid_splitter,
+        )
+
+    def submit(
+            self,
+            geometry: Mesh,
+            convert_mesh_to_solid: bool = False,
+            remove_solid_splitter: bool = False,
+    ) -> None:
+        """Start loading the file of a URDF mesh, if not already started.
+
+        Geometries other than meshes are ignored. Meshes whose path cannot be resolved are ignored, `obj_from_mesh()`
+        will warn about them.
+
+        """
+        if (self._executor is None) or (not isinstance(geometry, Mesh)):
+            return
+        mesh_path = abs_path_from_ros_path(geometry.filename)
+        if not mesh_path:
+            return
+        key = self._get_key(
+            mesh_path, geometry.scale,
+            convert_mesh_to_solid, remove_solid_splitter,
+        )
+        if (key in self._futures) or (get_mesh_memory_cache().get(key) is not None):
+            return
+        self._futures[key] = self._executor.submit(
+            load_mesh_geometry,
+            mesh_path, geometry.scale,
+            convert_mesh_to_solid, remove_solid_splitter,
+        )
+
+    def get(
+            self,
+            mesh_path: Path,
+            scale: Optional[float | list[float]] = None,
+            convert_mesh_to_solid: bool = False,
+            remove_solid_splitter: bool = False,
+            on_wait: Optional[Callable[[], None]] = None,
+    ) -> LoadedMesh:
+        """Return the loaded mesh, loading it now if it wasn't submitted.
+
+        The mesh is also kept in the session-wide `MeshMemoryCache`.
+
+        Parameters
+        ----------
+        - on_wait: called regularly while waiting for a worker thread, for
+                   example to process the GUI events. May raise an exception
+                   to stop waiting.
+
+        """
+        key = self._get_key(
+            mesh_path, scale,
+            convert_mesh_to_solid, remove_solid_splitter,
+        )
+        memory_cache = get_mesh_memory_cache()
+        loaded = memory_cache.get(key)
+        if loaded is not None:
+            return loaded
+        future = self._futures.get(key)
+        if future is None:
+            loaded = load_mesh_geometry(
+                mesh_path, scale,
+                convert_mesh_to_solid, remove_solid_splitter,
+            )
+        else:
+            while on_wait is not None and not future.done():
+                on_wait()
+                try:
+                    future.exception(timeout=0.05)
+                except FutureTimeoutError:
+                    pass
+            loaded = future.result()
+        memory_cache.add(key, loaded)
+        return loaded
+
+    def shutdown(self, cancel: bool = False) -> None:
+        """Stop the worker threads, cancel the pending loads if `cancel`."""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=not cancel, cancel_futures=cancel)
+        self._executor = None
+
+
 def obj_from_geometry(
         geometry: Shape,
         doc_or_group: [Doc | DO],
         convert_mesh_to_solid: bool = False,
         min_vol_instead_zero: bool = False,
         remove_solid_splitter: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[Optional[DO], Optional[Path]]:
-    """Return a FreeCAD object for the URDF shape with the path for meshes."""
+    """Return a FreeCAD object for the URDF shape with the path for meshes.
+
+    `mesh_loader` and `on_wait` are only used for meshes, see
+    `obj_from_mesh()`.
+
+    """
     if isinstance(geometry, Box):
         return obj_from_box(geometry, doc_or_group, min_vol_instead_zero)
     if isinstance(geometry, Cylinder):
         return obj_from_cylinder(geometry, doc_or_group, min_vol_instead_zero)
     if isinstance(geometry, Mesh):
-        return obj_from_mesh(geometry, doc_or_group, convert_mesh_to_solid, remove_solid_splitter)
+        return obj_from_mesh(
+            geometry, doc_or_group,
+            convert_mesh_to_solid, remove_solid_splitter,
+            mesh_loader, on_wait,
+        )
     if isinstance(geometry, Sphere):
         return obj_from_sphere(geometry, doc_or_group, min_vol_instead_zero)
     raise NotImplementedError('Primitive not implemented')
@@ -169,6 +502,8 @@ def obj_from_mesh(
         doc_or_group: [Doc | DO],
         convert_mesh_to_solid: bool = False,
         remove_solid_splitter: bool = False,
+        mesh_loader: Optional[MeshLoader] = None,
+        on_wait: Optional[Callable[[], None]] = None,
 ) -> tuple[Optional[DO], Optional[Path]]:
     """Return a `Mesh::Feature` object and the path to its file.
 
@@ -177,6 +512,12 @@ def obj_from_mesh(
     If the same file was already imported, return the corresponding existing
     object.
 
+    Parameters
+    ----------
+    - mesh_loader: if given, take the mesh or solid from it, it may have been
+                   loaded in a worker thread.
+    - on_wait: see `MeshLoader.get()`.
+
     """
     mesh_path = abs_path_from_ros_path(geometry.filename)
     if not mesh_path:
@@ -207,63 +548,46 @@ def obj_from_mesh(
             if obj.Label2 == mesh_ros_path:
                 return obj, mesh_path
 
-    if mesh_path.suffix.lower() == '.dae':
-        raw_mesh = read_mesh_dae(mesh_path)
-    else:
-        raw_mesh = fcmesh.read(str(mesh_path))
-
     if not mesh_ros_path:
         warn(f'Empty mesh_ros_path. Skip mesh file - ' + str(mesh_path))
         return None, None
 
-    mesh_obj = doc.addObject('Mesh::Feature', mesh_path.name)
-    mesh_obj.Label = mesh_path.name
-    mesh_obj.Label2 = mesh_ros_path
-    mesh_obj.Mesh = raw_mesh
-
-    if mesh_path.suffix.lower() in ['.stl', '.obj']:
-        scale_mesh_object(mesh_obj, 1000.0)  # m to mm.
-    if ((geometry.scale is not None)
-            and (
-                not (geometry.scale == 1.0)
-                or geometry.scale == [1.0, 1.0, 1.0]
-            )):
-        scale_mesh_object(mesh_obj, geometry.scale)
-
-    mesh_or_solid_obj = mesh_obj
+    try:
+        if mesh_loader is not None:
+            loaded = mesh_loader.get(
+                mesh_path, geometry.scale,
+                convert_mesh_to_solid, remove_solid_splitter,
+                on_wait,
+            )
+        else:
+            loaded = load_mesh_geometry(
+                mesh_path, geometry.scale,
+                convert_mesh_to_solid, remove_solid_splitter,
+            )
+    except MeshReadError as e:
+        # Reported here rather than in the worker thread.
+        error(str(e))
+        if convert_mesh_to_solid:
+            return None, None
+        loaded = LoadedMesh(fcmesh.Mesh())
+    except Exception as e:
+        if not convert_mesh_to_solid:
+            raise
+        warn(f'Can`t create solid for mesh. Skip creating solid. ' + str(e))
+        return None, None
+    for warning in loaded.warnings:
+        warn(warning)
 
     if convert_mesh_to_solid:
-        import Part
-        try:
-            ### Begin command Part_ShapeFromMesh
-            mesh_obj_shape = doc.addObject('Part::Feature', mesh_obj.Label2 + '_shape')
-            __shape__ = Part.Shape()
-            __shape__.makeShapeFromMesh(mesh_obj.Mesh.Topology, 0.100000, False)
-            mesh_obj_shape.Shape = __shape__
-            mesh_obj_shape.purgeTouched()
-            del __shape__
-            ### Begin command Part_MakeSolid
-            mesh_obj_solid = doc.addObject("Part::Feature", mesh_obj.Label2 + '_solid')
-            mesh_obj_solid.Label = mesh_path.name
-            mesh_obj_solid.Label2 = mesh_ros_path
-            shell = Part.Shell(mesh_obj_shape.Shape.Faces)
-            if remove_solid_splitter:
-                try:
-                    shell = shell.removeSplitter()
-                except:
-                    warn('Can`t remove splitter from body - ' + mesh_obj_solid.Label)
-                    pass
-            mesh_obj_solid.Shape = Part.Solid(shell)
-            mesh_obj_solid.purgeTouched()
-            mesh_or_solid_obj = mesh_obj_solid
-            del mesh_obj_solid, shell
-            # Remove intermediate objects
-            doc.removeObject(mesh_obj_shape.Name)
-            doc.removeObject(mesh_obj.Name)
-            gc.collect()
-        except Exception as e:
-            warn(f'Can`t create solid for mesh. Skip creating solid. ' + str(e))
-            return None, None
+        mesh_or_solid_obj = doc.addObject('Part::Feature', mesh_ros_path + '_solid')
+        mesh_or_solid_obj.Shape = loaded.geometry
+        mesh_or_solid_obj.purgeTouched()
+    else:
+        mesh_or_solid_obj = doc.addObject('Mesh::Feature', mesh_path.name)
+        mesh_or_solid_obj.Mesh = loaded.geometry
+    mesh_or_solid_obj.Label = mesh_path.name
+    mesh_or_solid_obj.Label2 = mesh_ros_path
+
     if group:
         group.addObject(mesh_or_solid_obj)
 
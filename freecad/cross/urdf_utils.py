@@ -10,6 +10,7 @@ import random
 import re
 import string
 from typing import Iterable, Tuple, Optional
+from typing import TYPE_CHECKING
 import xml.etree.ElementTree as et
 
 import FreeCAD as fc
@@ -32,6 +33,8 @@ from .freecad_utils import warn
 from .utils import get_valid_filename
 from .wb_utils import is_primitive
 
+if TYPE_CHECKING:
+    from .mesh_utils import MeshExportCache
 
 # Typing hints.
 DO = fc.DocumentObject
@@ -704,8 +707,18 @@ def clean_and_unique_string(input_str: str, rando_str_len: int = 6) -> str:
     return result_str
 
 
-def _get_mesh_filename(obj: DO) -> str:
-    """Return the mesh filename for a FreeCAD object."""
+def _get_mesh_filename(
+        obj: DO,
+        mesh_cache: Optional[MeshExportCache] = None,
+        exported_obj: Optional[DO] = None,
+) -> str:
+    """Return the mesh filename for a FreeCAD object.
+
+    Without `mesh_cache`, the filename has a random suffix. With `mesh_cache`,
+    the filename is stable and derived from the geometry of `exported_obj`
+    (defaults to `obj`), cf. `MeshExportCache.get_filename()`.
+
+    """
     if hasattr(obj, 'LinkedObject'):
         linked_obj = obj.LinkedObject
     else:
@@ -717,6 +730,12 @@ def _get_mesh_filename(obj: DO) -> str:
         doc_name = 'unsaved_doc'
 
     name = f'{doc_name}_{label}'
+    if mesh_cache is not None:
+        stem = clean_and_unique_string(name, rando_str_len=0).rstrip('_')
+        return mesh_cache.get_filename(
+            exported_obj if exported_obj is not None else obj,
+            stem,
+        )
     name = clean_and_unique_string(name)
     return get_valid_filename(f'{name}.dae')
 
@@ -726,6 +745,7 @@ def _urdf_generic_from_object(
         generic: str,
         package_name: Optional[str] = None,
         placement: Optional[fc.Placement] = None,
+        mesh_cache: Optional[MeshExportCache] = None,
 ) -> list[XmlForExport]:
     """Return the xml elements for visual or collision for a FreeCAD object.
 
@@ -747,6 +767,8 @@ def _urdf_generic_from_object(
     - generic: {'visual', 'collision'}.
     - placement: optional additional displacement. The object's placement will
         be added to this.
+    - mesh_cache: optional cache of the exported meshes, to get stable and
+        deduplicated mesh filenames.
 
     """
     out_data: list[XmlForExport] = []
@@ -804,7 +826,7 @@ def _urdf_generic_from_object(
             continue
         else:
             # TODO: handle duplicated labels.
-            filename = _get_mesh_filename(subobj)
+            filename = _get_mesh_filename(subobj, mesh_cache, linked_object)
             if not package_name:
                 warn(
                     'Internal error, `package_name` empty'
@@ -823,6 +845,7 @@ def urdf_visual_from_object(
         obj: fc.DocumentObject,
         package_name: Optional[str] = None,
         placement: Optional[fc.Placement] = None,
+        mesh_cache: Optional[MeshExportCache] = None,
 ) -> list[XmlForExport]:
     """Return the xml element for visual for a FreeCAD object.
 
@@ -840,15 +863,18 @@ def urdf_visual_from_object(
     - package_name: name of the ROS package.
     - placement: optional placement of the mesh relative to the URDF link.
         If not given, obj.Placement will be used.
+    - mesh_cache: optional cache of the exported meshes, to get stable and
+        deduplicated mesh filenames.
 
     """
-    return _urdf_generic_from_object(obj, 'visual', package_name, placement)
+    return _urdf_generic_from_object(obj, 'visual', package_name, placement, mesh_cache)
 
 
 def urdf_collision_from_object(
         obj: fc.DocumentObject,
         package_name: str = '',
         placement: Optional[fc.Placement] = None,
+        mesh_cache: Optional[MeshExportCache] = None,
 ) -> list[XmlForExport]:
     """Return the xml element for collision for a FreeCAD object.
 
@@ -866,9 +892,11 @@ def urdf_collision_from_object(
     - package_name: name of the ROS package.
     - placement: optional placement of the mesh relative to the URDF link.
         If not given, obj.Placement will be used.
+    - mesh_cache: optional cache of the exported meshes, to get stable and
+        deduplicated mesh filenames.
 
     """
-    return _urdf_generic_from_object(obj, 'collision', package_name, placement)
+    return _urdf_generic_from_object(obj, 'collision', package_name, placement, mesh_cache)
 
 
 def urdf_inertial(
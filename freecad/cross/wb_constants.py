@@ -11,6 +11,12 @@ def str_to_bool(s: str) -> bool:
 PREFS_CATEGORY = 'RobotCAD'  # Category in the preferences dialog.
 PREF_VHACD_PATH = 'vhacd_path'  # Path to the V-HACD executable.
 PREF_OVERCROSS_TOKEN = 'overcross_token'  # Auth token for external code generator
+PREF_URDF_IMPORT_WORKERS = 'urdf_import_workers'  # Number of threads to load meshes on URDF import.
+PREF_LAZY_LOD = 'lazy_lod'  # Create Real and Collision geometries of imported robots on first use.
+PREF_MESH_CACHE_SIZE = 'mesh_cache_size_mb'  # Memory cap of the cache of loaded meshes, in MB.
+PREF_SOLID_CACHE_SIZE = 'solid_cache_size_mb'  # Size bound of the on-disk cache of solids converted from meshes, in MB.
+PREF_LAZY_COMMANDS = 'lazy_commands'  # Import the implementation of the commands on first use.
+PREF_MASS_PROPERTIES_WORKERS = 'mass_properties_workers'  # Number of threads to compute mass properties of meshes.
 WORKBENCH_NAME = 'RobotCAD - ROS2'
 
 lcs_wrapper_prefix = "LCS wrapper "
@@ -1,6 +1,13 @@
-"""Global workbench configuration."""
+"""Global workbench configuration.
+
+The ROS node and executor (`g_ros_node` and `g_ros_executor`) are created on
+first access, so that rclpy is only initialized when a ROS-related feature is
+used.
+
+"""
 
 from pathlib import Path
+from typing import Any
 
 from .ros.utils import add_ros_library_path
 from .ros.utils import get_ros_distro_from_env_or_default
@@ -11,14 +18,43 @@ from . import wb_constants
 PREFS_CATEGORY = wb_constants.PREFS_CATEGORY  # Category in the preferences dialog.
 PREF_VHACD_PATH = wb_constants.PREF_VHACD_PATH  # Path to the V-HACD executable.
 PREF_OVERCROSS_TOKEN = wb_constants.PREF_OVERCROSS_TOKEN  # Auth token for external code generator
+PREF_URDF_IMPORT_WORKERS = wb_constants.PREF_URDF_IMPORT_WORKERS  # Number of threads to load meshes on URDF import.
+PREF_LAZY_LOD = wb_constants.PREF_LAZY_LOD  # Create Real and Collision geometries of imported robots on first use.
+PREF_MESH_CACHE_SIZE = wb_constants.PREF_MESH_CACHE_SIZE  # Memory cap of the cache of loaded meshes, in MB.
+PREF_SOLID_CACHE_SIZE = wb_constants.PREF_SOLID_CACHE_SIZE  # Size bound of the on-disk cache of solids converted from meshes, in MB.
+PREF_LAZY_COMMANDS = wb_constants.PREF_LAZY_COMMANDS  # Import the implementation of the commands on first use.
+PREF_MASS_PROPERTIES_WORKERS = wb_constants.PREF_MASS_PROPERTIES_WORKERS  # Number of threads to compute mass properties of meshes.
 
 # Session-wide globals.
 g_ros_distro = get_ros_distro_from_env_or_default()
 
+# Required to import the ROS messages.
 add_ros_library_path(g_ros_distro)
-# Must be imported after the call to `add_ros_library_path`.
-from .ros.node import get_node_and_executor  # noqa: E402.
-g_ros_node, g_ros_executor = get_node_and_executor()
 
 # Can be changed in the GUI.
 g_ros_workspace: Path = get_ros_workspace_from_env()
+
+
+def init_ros() -> None:
+    """Create `g_ros_node` and `g_ros_executor` if not already done.
+
+    Both are None if rclpy is not available.
+
+    """
+    global g_ros_node, g_ros_executor
+    if 'g_ros_node' in globals():
+        return
+    # Must be imported after the call to `add_ros_library_path`.
+    from .ros.node import get_node_and_executor
+    from .startup_timing import timed
+    with timed('ROS initialization (rclpy, node, executor)'):
+        g_ros_node, g_ros_executor = get_node_and_executor()
+
+
+def __getattr__(name: str) -> Any:
+    # Called for the attributes not found, i.e. the ROS node and executor
+    # before their creation.
+    if name in ('g_ros_node', 'g_ros_executor'):
+        init_ros()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
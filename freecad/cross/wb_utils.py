@@ -275,18 +275,12 @@ def get_child_joints(link_or_joint: DO) -> list[CrossJoint] | bool:
     if is_joint(link_or_joint):
         link_name = link_or_joint.Child
     elif is_link(link_or_joint):
-        link_name = link_or_joint.Name
+        link_name = ros_name(link_or_joint)
     else:
         return False
 
     robot = link_or_joint.Proxy.get_robot()
-    robot_joints = robot.Proxy.get_joints()
-    child_joints = []
-    for joint in robot_joints:
-        if link_name == joint.Parent:
-            child_joints.append(joint)
-
-    return child_joints
+    return robot.Proxy.get_topology().get_child_joints(link_name)
 
 
 def get_link_sensors(objs: DOList) -> list[CrossSensor]:
@@ -322,59 +316,32 @@ def get_chains(
     """Return the list of chains.
 
     A chain starts at the root link, alternates links and joints, and ends
-    at the last joint of the chain.
+    at the tip link of the chain.
+    If a joint on the way to a tip link has no parent, the chain is reduced
+    to this joint.
 
-    If the last element of a chain would be a joint, that chain is not
-    considered.
+    If `check_kinematics` and several root links are found, return an empty
+    list, otherwise only the first root link is considered.
 
     """
-    # TODO: Make the function faster.
-    base_links: list[CrossLink] = []
-    tip_links: list[CrossLink] = []
-
-    for link in links:
-        if link.Proxy.may_be_base_link():
-            if check_kinematics == False: # avoid silent bug https://github.com/drfenixion/freecad.cross/issues/5
-                if len(base_links) < 1:
-                    base_links.append(link)
-            else:
-                base_links.append(link)
-        if link.Proxy.is_tip_link():
-            tip_links.append(link)
-    if len(base_links) > 1:
-        # At least two root links found, not supported.
-        return []
-    chains: list[list[CrossBasicElement]] = []
-    for link in tip_links:
-        chain = get_chain(link)
-        if chain:
-            chains.append(chain)
-    return chains
+    # Import here to avoid circular imports.
+    from .robot_topology import build_topology
+
+    return build_topology(links, joints).get_chains(check_kinematics)
 
 
 def get_chain(link: CrossLink) -> list[CrossBasicElement]:
-    """Return the chain from base link to link, excluded.
+    """Return the chain from base link to link, included.
 
     The chain starts with the base link, then alternates a joint and a link.
-    The last item is the joint that has `link` as child.
+    The last item is `link`.
 
     """
-    chain: list[CrossBasicElement] = []
-    ref_joint = link.Proxy.get_ref_joint()
-    if not ref_joint:
-        # A root link.
+    robot = link.Proxy.get_robot()
+    if robot is None:
+        # Not attached to any robot.
         return [link]
-    if not ref_joint.Parent:
-        warn(f'Joint `{ros_name(ref_joint)}` has no parent', False)
-        # Return only ref_joint to indicate an error.
-        return [ref_joint]
-    robot = ref_joint.Proxy.get_robot()
-    subchain = get_chain(robot.Proxy.get_link(ref_joint.Parent))
-    if subchain and is_joint(subchain[0]):
-        # Propagate the error of missing joint.Parent.
-        return subchain
-    chain += subchain + [ref_joint] + [link]
-    return chain
+    return robot.Proxy.get_topology().get_chain(link)
 
 
 def is_subchain(subchain: DOList, chain: DOList) -> bool:
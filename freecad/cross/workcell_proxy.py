@@ -280,6 +280,9 @@ class WorkcellProxy(ProxyBase):
             )
             ignore, write, overwrite = diag.exec_()
             diag.close()
+        else:
+            # Headless or scripted export, overwrite everything.
+            ignore, write, overwrite = [], [], list(write_files)
         if set(ignore) == set(write_files):
             return None
         elif set(write + overwrite) != set(write_files):
@@ -8,7 +8,9 @@ specifying a macro to use and its parameters.
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from copy import copy
+import os
 from pathlib import Path
 from typing import Any, Optional
 from xml.dom.minidom import Document
@@ -24,6 +26,34 @@ from xacro import process_doc
 
 from .ros.utils import get_package_and_file
 
+# Maximum number of generated URDFs memoized per `Xacro`.
+URDF_CACHE_SIZE = 32
+
+# Maximum number of `Xacro` kept by `XacroLoader.load_from_file()`.
+XACRO_CACHE_SIZE = 16
+
+
+def _get_file_state(filename: str) -> Optional[tuple[int, int]]:
+    """Return (mtime in ns, size) of a file or None if it doesn't exist."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_params_key(parameters: Optional[dict[str, Any]]) -> tuple:
+    """Return a hashable representation of macro parameters."""
+    if not parameters:
+        return ()
+    key = []
+    for name, value in sorted(parameters.items()):
+        if hasattr(value, 'toxml'):
+            # Block parameter.
+            value = value.toxml()
+        key.append((name, str(value)))
+    return tuple(key)
+
 
 class Xacro:
 
@@ -31,7 +61,12 @@ class Xacro:
         self.input_xml_doc: Document = xml_doc
         self.input_xacro_file = xacro_file
         self.macros = Table()
-        self.symbols = Table()
+        # Same root table as `process_doc()`, with the global symbols of
+        # xacro (math functions, `xacro.*`, ...) if the version defines them.
+        self.symbols = Table(getattr(xacro, '_global_symbols', None))
+
+        # Memoized results of `to_urdf_string()`.
+        self._urdf_cache: OrderedDict[tuple, str] = OrderedDict()
 
         tmp_output_xml_doc = copy(self.input_xml_doc)
 
@@ -45,8 +80,53 @@ class Xacro:
                 xacro.init_stacks(None)
             else:
                 xacro.restore_filestack([None])
+        # Record the transitively included files.
+        if hasattr(xacro, 'all_includes'):
+            xacro.all_includes = []
         eval_all(tmp_output_xml_doc.documentElement, self.macros, self.symbols)
 
+        # State of the input file and of all included files, see
+        # `is_up_to_date()`.
+        dependencies = [xacro_file] if xacro_file else []
+        dependencies += list(getattr(xacro, 'all_includes', []))
+        self.dependencies: dict[str, Optional[tuple[int, int]]] = {
+            str(f): _get_file_state(str(f)) for f in dependencies
+        }
+
+        # Whether `to_urdf_xml()` may expand macros with the tables above.
+        self._has_only_definitions = self._get_has_only_definitions(
+            tmp_output_xml_doc,
+        )
+
+    def _get_has_only_definitions(self, evaluated_xml_doc: Document) -> bool:
+        """Return True if expanding a macro with the cached tables is exact.
+
+        This is the case if the input file and its included files only define
+        macros and properties, i.e. no element is left after their evaluation
+        (`process_doc()` would output it), and declare or use no
+        `xacro:arg`, because the tables were evaluated without arguments.
+
+        """
+        for node in evaluated_xml_doc.documentElement.childNodes:
+            if node.nodeType == node.ELEMENT_NODE:
+                return False
+        texts = [self.input_xml_doc.toxml()]
+        for filename in self.dependencies:
+            try:
+                texts.append(Path(filename).read_text())
+            except (OSError, UnicodeDecodeError):
+                return False
+        return not any(('xacro:arg' in t) or ('$(arg' in t) for t in texts)
+
+    def is_up_to_date(self) -> bool:
+        """Return False if the input file or an included file changed."""
+        if not self.input_xacro_file:
+            return True
+        return all(
+            _get_file_state(f) == state
+            for f, state in self.dependencies.items()
+        )
+
     def get_macro_names(self):
         return list(self.macros.keys())
 
@@ -131,21 +211,67 @@ class Xacro:
         macro: Optional[str] = '',
         parameters: Optional[dict[str, Any]] = None,
     ) -> Document:
-        """Return the minidom Document of the generated URDF."""
+        """Return the minidom Document of the generated URDF.
+
+        When a macro is given and the input files only define macros and
+        properties, the macro table of the input file is used instead of
+        including and evaluating the input file again.
+
+        """
+        if macro and self._has_only_definitions:
+            try:
+                return self._to_urdf_xml_from_macros(robot_name, macro, parameters)
+            except Exception:
+                # Fall back to the complete processing by xacro.
+                pass
         # Now a xacro, later a URDF.
         out_xml = self.to_xml(robot_name, macro, parameters)
         process_doc(out_xml)
         return out_xml
 
+    def _to_urdf_xml_from_macros(
+        self,
+        robot_name: str,
+        macro: str,
+        parameters: Optional[dict[str, Any]] = None,
+    ) -> Document:
+        """Expand `macro` with the already evaluated macros and symbols."""
+        out_xml = self.to_xml(robot_name, macro, parameters)
+        robot = out_xml.documentElement
+        for include in robot.getElementsByTagName('xacro:include'):
+            robot.removeChild(include)
+        xacro.substitution_args_context['arg'] = {}
+        if not xacro.filestack:
+            if hasattr(xacro, 'init_stacks'):
+                xacro.init_stacks(None)
+            else:
+                xacro.restore_filestack([None])
+        # Child tables, the cached tables are not modified.
+        eval_all(robot, Table(self.macros), Table(self.symbols))
+        return out_xml
+
     def to_urdf_string(
         self,
         robot_name: str,
         macro: Optional[str] = '',
         parameters: Optional[dict[str, Any]] = None,
     ) -> str:
-        """Return the string of the generated URDF."""
-        doc = self.to_urdf_xml(robot_name, macro, parameters)
-        return doc.toxml()
+        """Return the string of the generated URDF.
+
+        The result is memoized, use `XacroLoader.load_from_file()` to get a
+        new `Xacro` when the input files change.
+
+        """
+        key = (robot_name, macro, _get_params_key(parameters))
+        urdf = self._urdf_cache.get(key)
+        if urdf is not None:
+            self._urdf_cache.move_to_end(key)
+            return urdf
+        urdf = self.to_urdf_xml(robot_name, macro, parameters).toxml()
+        self._urdf_cache[key] = urdf
+        if len(self._urdf_cache) > URDF_CACHE_SIZE:
+            self._urdf_cache.popitem(last=False)
+        return urdf
 
     def to_urdf_pretty_xml(
         self,
@@ -163,14 +289,41 @@ class Xacro:
 class XacroLoader:
     """Generate a urdf_parser_py.urdf.Robot from different sources."""
 
+    # Loaded files, {filename: Xacro}, least recently used first.
+    _xacros: OrderedDict[str, Xacro] = OrderedDict()
+
     def __init__(self):
         pass
 
     @classmethod
-    def load_from_file(cls, filename: [str | Path]) -> Xacro:
-        """Load from a xacro file."""
+    def load_from_file(
+        cls,
+        filename: [str | Path],
+        use_cache: bool = True,
+    ) -> Xacro:
+        """Load from a xacro file.
+
+        With `use_cache`, return the same `Xacro` as long as neither the file
+        nor the files it includes changed (modification time and size).
+
+        """
         filename = str(Path(filename).expanduser())
-        return Xacro(parse(filename), filename)
+        if use_cache:
+            xacro_obj = cls._xacros.get(filename)
+            if (xacro_obj is not None) and xacro_obj.is_up_to_date():
+                cls._xacros.move_to_end(filename)
+                return xacro_obj
+        xacro_obj = Xacro(parse(filename), filename)
+        if use_cache:
+            cls._xacros[filename] = xacro_obj
+            cls._xacros.move_to_end(filename)
+            if len(cls._xacros) > XACRO_CACHE_SIZE:
+                cls._xacros.popitem(last=False)
+        return xacro_obj
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._xacros.clear()
 
     @classmethod
     def load_from_string(cls, description: [str | bytes]) -> Xacro:
@@ -43,6 +43,7 @@ from .wb_utils import is_workcell
 from .wb_utils import ros_name
 try:
     from .robot_from_urdf import robot_from_urdf
+    from .robot_from_urdf import update_robot_from_urdf
     from .urdf_loader import UrdfLoader
     from .xacro_loader import XacroLoader
     from urdf_parser_py.urdf import Robot as UrdfRobot
@@ -150,6 +151,20 @@ class XacroObjectProxy(ProxyBase):
             obj, 'App::PropertyEnumeration', 'MainMacro', 'Input',
             'The macro to use',
         )
+        add_property(
+            obj, 'App::PropertyBool', 'IncrementalUpdate', 'XacroObject',
+            'If true, only the links and joints changed by a parameter'
+            ' change are updated, otherwise the robot is regenerated',
+            True,
+        )
+
+        # URDF of the generated robot, to compare with on parameter change,
+        # also after document restore.
+        add_property(
+            obj, 'App::PropertyString', '_GeneratedUrdf', 'Internal',
+            'URDF of the generated robot',
+        )
+        obj.setPropertyStatus('_GeneratedUrdf', ['Hidden'])
 
         # The computed placement (or the placement defined by the user if no
         # attachment mode is defined). This is only
@@ -380,12 +395,39 @@ class XacroObjectProxy(ProxyBase):
         if xacro_txt == self._old_xacro_file_content:
             return None
         self._old_xacro_file_content = xacro_txt
+        old_urdf_robot = self._get_old_urdf_robot()
         self._urdf_robot = self._generate_urdf(f'{ros_name(xo)}_robot', xo.MainMacro, params)
         self._root_link = self._urdf_robot.get_root()
+        old_robot = self.get_robot()
+        if (
+            getattr(xo, 'IncrementalUpdate', False)
+            and old_robot
+            and (old_urdf_robot is not None)
+            and update_robot_from_urdf(old_robot, old_urdf_robot, self._urdf_robot)
+        ):
+            # Updated in place, no new robot.
+            xo._GeneratedUrdf = self._urdf_robot.to_xml_string()
+            return None
         robot = robot_from_urdf(xo.Document, self._urdf_robot)
+        if robot is None:
+            # Cancelled by the user.
+            return None
         robot.Placement = self.xacro_object.Placement
+        xo._GeneratedUrdf = self._urdf_robot.to_xml_string()
         return robot
 
+    def _get_old_urdf_robot(self) -> Optional[UrdfRobot]:
+        """Return the URDF of the current robot, if known."""
+        if self._urdf_robot is not None:
+            return self._urdf_robot
+        urdf = getattr(self.xacro_object, '_GeneratedUrdf', '')
+        if not urdf:
+            return None
+        try:
+            return UrdfLoader.load_from_string(urdf)
+        except Exception:
+            return None
+
     def _generate_urdf(
         self,
         robot_name: str,
@@ -0,0 +1,35 @@
+"""Make the FreeCAD-independent modules importable without FreeCAD.
+
+`freecad/cross/__init__.py` needs FreeCAD. When it cannot be imported,
+`freecad` and `freecad.cross` are registered as bare packages, so that the
+pure NumPy modules (e.g. `kk_tables`, `trajectory_store`) can be tested
+headless. The tests of the other modules use `pytest.importorskip()`.
+
+"""
+
+from pathlib import Path
+import sys
+import types
+
+_FREECAD_DIR = Path(__file__).resolve().parent.parent / 'freecad'
+
+
+def _register_packages() -> None:
+    try:
+        import freecad.cross  # noqa: F401
+        return
+    except ImportError:
+        pass
+    for name in [n for n in sys.modules if (n == 'freecad') or n.startswith('freecad.')]:
+        del sys.modules[name]
+    for name, path in (
+            ('freecad', _FREECAD_DIR),
+            ('freecad.cross', _FREECAD_DIR / 'cross'),
+    ):
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        sys.modules[name] = package
+    sys.modules['freecad'].cross = sys.modules['freecad.cross']
+
+
+_register_packages()
@@ -0,0 +1,161 @@
+import pytest
+
+# Needs FreeCAD.
+catalog_cache = pytest.importorskip('freecad.cross.catalog_cache')
+CatalogCache = catalog_cache.CatalogCache
+get_git_head = catalog_cache.get_git_head
+
+_HEAD_1 = '1' * 40
+_HEAD_2 = '2' * 40
+
+
+class _Builder:
+    """Catalog builder counting its calls."""
+
+    def __init__(self, source_dir):
+        self.source_dir = source_dir
+        self.call_count = 0
+
+    def __call__(self) -> list[dict]:
+        self.call_count += 1
+        return [
+            {'name': p.stem, 'type': p.read_text().strip()}
+            for p in sorted(self.source_dir.glob('*.yaml'))
+        ]
+
+
+def _get_index_entries(catalog):
+    return [(e['name'], e['type'], e) for e in catalog]
+
+
+def _make_cache(tmp_path, builder) -> CatalogCache:
+    return CatalogCache(
+        'test',
+        builder,
+        _get_index_entries,
+        [builder.source_dir],
+        ('.yaml',),
+        cache_dir=tmp_path / 'cache',
+    )
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    (source_dir / 'a.yaml').write_text('controller')
+    (source_dir / 'b.yaml').write_text('broadcaster')
+    (source_dir / 'c.yaml').write_text('controller')
+    # Not a source file.
+    (source_dir / 'README.md').write_text('')
+    git_dir = source_dir / '.git'
+    git_dir.mkdir()
+    (git_dir / 'HEAD').write_text(_HEAD_1 + '\n')
+    return source_dir
+
+
+def test_build_once_and_load_from_disk(tmp_path, source_dir):
+    builder = _Builder(source_dir)
+    cache = _make_cache(tmp_path, builder)
+    catalog = cache.get()
+    assert [e['name'] for e in catalog] == ['a', 'b', 'c']
+    assert cache.path.is_file()
+    # A new object at each access.
+    catalog.clear()
+    assert len(cache.get()) == 3
+    assert builder.call_count == 1
+
+    # As in a new session.
+    other_builder = _Builder(source_dir)
+    other_cache = _make_cache(tmp_path, other_builder)
+    assert other_cache.get() == cache.get()
+    assert other_builder.call_count == 0
+
+
+def test_rebuild_on_source_change(tmp_path, source_dir):
+    builder = _Builder(source_dir)
+    cache = _make_cache(tmp_path, builder)
+    cache.get()
+    (source_dir / 'd.yaml').write_text('controller')
+    # Files are checked once per session.
+    assert len(cache.get()) == 3
+    cache.invalidate()
+    assert len(cache.get()) == 4
+    assert builder.call_count == 2
+    (source_dir / 'README.md').write_text('Not a source file.')
+    cache.invalidate()
+    cache.get()
+    assert builder.call_count == 2
+
+    other_builder = _Builder(source_dir)
+    (source_dir / 'a.yaml').write_text('broadcaster')
+    assert _make_cache(tmp_path, other_builder).find(name='a')[0]['type'] == 'broadcaster'
+    assert other_builder.call_count == 1
+
+
+def test_rebuild_on_git_head_change(tmp_path, source_dir):
+    builder = _Builder(source_dir)
+    cache = _make_cache(tmp_path, builder)
+    cache.get()
+    cache.get()
+    assert builder.call_count == 1
+    # Git commits are checked at each access.
+    (source_dir / '.git' / 'HEAD').write_text(_HEAD_2 + '\n')
+    cache.get()
+    assert builder.call_count == 2
+
+
+def test_corrupted_cache_file(tmp_path, source_dir):
+    builder = _Builder(source_dir)
+    cache = _make_cache(tmp_path, builder)
+    cache.get()
+    cache.path.write_bytes(b'not a pickle')
+    other_builder = _Builder(source_dir)
+    assert len(_make_cache(tmp_path, other_builder).get()) == 3
+    assert other_builder.call_count == 1
+
+
+def test_find_and_get_names(tmp_path, source_dir):
+    cache = _make_cache(tmp_path, _Builder(source_dir))
+    assert cache.get_names() == ['a', 'b', 'c']
+    assert cache.get_names('controller') == ['a', 'c']
+    assert cache.get_names('unknown') == []
+    assert cache.find(name='b') == [{'name': 'b', 'type': 'broadcaster'}]
+    assert [e['name'] for e in cache.find(type='controller')] == ['a', 'c']
+    assert cache.find(name='a', type='broadcaster') == []
+    assert len(cache.find()) == 3
+    # New objects at each call.
+    cache.find(name='a')[0]['type'] = 'modified'
+    assert cache.find(name='a')[0]['type'] == 'controller'
+
+
+def test_get_git_head(tmp_path):
+    repo = tmp_path / 'repo'
+    assert get_git_head(repo) is None
+    git_dir = repo / '.git'
+    git_dir.mkdir(parents=True)
+    # Detached head.
+    (git_dir / 'HEAD').write_text(_HEAD_1 + '\n')
+    assert get_git_head(repo) == _HEAD_1
+    # Loose ref.
+    (git_dir / 'HEAD').write_text('ref: refs/heads/main\n')
+    assert get_git_head(repo) is None
+    (git_dir / 'refs' / 'heads').mkdir(parents=True)
+    (git_dir / 'refs' / 'heads' / 'main').write_text(_HEAD_2 + '\n')
+    assert get_git_head(repo) == _HEAD_2
+    # Packed ref.
+    (git_dir / 'refs' / 'heads' / 'main').unlink()
+    (git_dir / 'packed-refs').write_text(
+        '# pack-refs with: peeled fully-peeled sorted\n'
+        f'{_HEAD_1} refs/heads/main\n',
+    )
+    assert get_git_head(repo) == _HEAD_1
+
+    # Submodule, ".git" is a file.
+    submodule = repo / 'submodule'
+    submodule.mkdir()
+    (submodule / '.git').write_text('gitdir: ../.git/modules/submodule\n')
+    module_dir = git_dir / 'modules' / 'submodule'
+    module_dir.mkdir(parents=True)
+    (module_dir / 'HEAD').write_text(_HEAD_2 + '\n')
+    assert get_git_head(submodule) == _HEAD_2
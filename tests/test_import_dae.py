@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+# Needs FreeCAD, Mesh, Arch, and Draft.
+import_dae = pytest.importorskip('freecad.cross.import_dae')
+
+
+def test_format_ints():
+    assert import_dae.format_ints([]) == ''
+    values = [0, 7, 10, 99, 100, 123456, -1, -305, 2**40]
+    assert import_dae.format_ints(values) == ' '.join(map(str, values))
+    values = np.random.default_rng(0).integers(0, 1_000_000, (1000, 6))
+    assert import_dae.format_ints(values) == ' '.join(map(str, values.ravel().tolist()))
+
+
+def test_format_floats():
+    assert import_dae.format_floats([]) == ''
+    values = [
+        0.0, -0.0, 1.0, -2.5, 0.15, 10.0, 100.0, 1e6, 1e7, 1234567.0, 12345678.0,
+        9999999.5, 0.99999996, 0.0001, 0.00012345678, 9.9999996e-5, 1e-5,
+        -3.25e-12, 6.02e23, 1e100, 1.5e-300,
+    ]
+    assert import_dae.format_floats(values) == ' '.join('%.7g' % v for v in values)
+    values.append(float('nan'))
+    assert import_dae.format_floats(values) == ' '.join('%.7g' % v for v in values)
+
+
+def test_format_random_floats():
+    rng = np.random.default_rng(1)
+    values = rng.uniform(-1.0, 1.0, 10000) * 10.0 ** rng.integers(-12, 12, 10000)
+    text = import_dae.format_floats(values)
+    expected = ['%.7g' % v for v in values]
+    formatted = text.split(' ')
+    assert len(formatted) == len(expected)
+    # The last digit may rarely differ, see `format_floats()`.
+    assert sum(f != e for f, e in zip(formatted, expected)) < 10
+    np.testing.assert_allclose(np.array(formatted, dtype=float), values, rtol=1e-6)
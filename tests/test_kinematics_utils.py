@@ -0,0 +1,104 @@
+from math import pi
+
+import numpy as np
+import pytest
+
+from freecad.cross.kinematics_utils import actuation_matrices
+from freecad.cross.kinematics_utils import prismatic_matrices
+from freecad.cross.kinematics_utils import revolute_matrices
+
+
+def test_revolute_matrices():
+    matrices = revolute_matrices([0.0, pi / 2.0])
+    assert matrices.shape == (2, 4, 4)
+    np.testing.assert_allclose(matrices[0], np.identity(4))
+    # x is brought onto y, the origin doesn't move.
+    np.testing.assert_allclose(matrices[1] @ [1.0, 0.0, 0.0, 1.0], [0.0, 1.0, 0.0, 1.0], atol=1e-12)
+    np.testing.assert_allclose(matrices[1] @ [0.0, 0.0, 1.0, 1.0], [0.0, 0.0, 1.0, 1.0], atol=1e-12)
+
+
+def test_prismatic_matrices():
+    matrices = prismatic_matrices([0.0, 12.5])
+    assert matrices.shape == (2, 4, 4)
+    np.testing.assert_allclose(matrices[0], np.identity(4))
+    expected = np.identity(4)
+    expected[2, 3] = 12.5
+    np.testing.assert_allclose(matrices[1], expected)
+
+
+def test_actuation_matrices():
+    # Prismatic values are in m, the transforms in mm.
+    np.testing.assert_allclose(
+        actuation_matrices('prismatic', [0.1]),
+        prismatic_matrices([100.0]),
+    )
+    np.testing.assert_allclose(
+        actuation_matrices('revolute', [0.2, 0.3]),
+        revolute_matrices([0.2, 0.3]),
+    )
+    np.testing.assert_allclose(
+        actuation_matrices('continuous', [0.2]),
+        revolute_matrices([0.2]),
+    )
+    fixed = actuation_matrices('fixed', [1.0, 2.0, 3.0])
+    assert fixed.shape == (3, 4, 4)
+    np.testing.assert_allclose(fixed, np.broadcast_to(np.identity(4), (3, 4, 4)))
+    assert actuation_matrices('revolute', []).shape == (0, 4, 4)
+
+
+def test_matrix_from_placement():
+    fc = pytest.importorskip('FreeCAD')
+    from freecad.cross.kinematics_utils import matrix_from_placement
+
+    placement = fc.Placement(fc.Vector(1.0, 2.0, 3.0), fc.Rotation(fc.Vector(0.0, 0.0, 1.0), 90.0))
+    matrix = matrix_from_placement(placement)
+    np.testing.assert_allclose(matrix[:3, 3], [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(matrix[:3, :3] @ [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], atol=1e-12)
+
+
+def test_batch_fk_matches_compute_poses():
+    fc = pytest.importorskip('FreeCAD')
+    from freecad.cross.joint_proxy import make_joint
+    from freecad.cross.kinematics_utils import matrix_from_placement
+    from freecad.cross.link_proxy import make_link
+    from freecad.cross.robot_proxy import make_robot
+
+    doc = fc.newDocument('test_batch_fk', hidden=True, temp=True)
+    try:
+        robot = make_robot('robot', doc, recompute_after=False)
+        robot.Placement = fc.Placement(fc.Vector(10.0, 0.0, 0.0), fc.Rotation())
+        for name in ('base', 'arm', 'tool'):
+            robot.addObject(make_link(name, doc, recompute_after=False))
+        joints = []
+        for name, parent, child, joint_type in (
+                ('shoulder', 'base', 'arm', 'revolute'),
+                ('slider', 'arm', 'tool', 'prismatic'),
+        ):
+            joint = make_joint(name, doc, recompute_after=False)
+            robot.addObject(joint)
+            joint.Parent = parent
+            joint.Child = child
+            joint.Type = joint_type
+            joint.Origin = fc.Placement(
+                fc.Vector(0.0, 50.0, 100.0),
+                fc.Rotation(fc.Vector(1.0, 0.0, 0.0), 30.0),
+            )
+            joints.append(joint)
+        doc.recompute()
+
+        joint_matrix = np.array([[0.0, 0.0], [0.3, 0.05], [-1.0, 0.1]])
+        poses = robot.Proxy.batch_fk(joint_matrix, joints)
+        links = robot.Proxy.get_links()
+        assert poses.shape == (3, len(links), 4, 4)
+        for values, configuration_poses in zip(joint_matrix, poses):
+            for joint, value in zip(joints, values):
+                joint.Position = value
+            robot.Proxy.compute_poses()
+            for link, pose in zip(links, configuration_poses):
+                np.testing.assert_allclose(
+                    pose,
+                    matrix_from_placement(link.Placement),
+                    atol=1e-9,
+                )
+    finally:
+        fc.closeDocument(doc.Name)
@@ -0,0 +1,148 @@
+import numpy as np
+
+from freecad.cross.kk_tables import chain_matrices
+from freecad.cross.kk_tables import dh_forward_kinematics
+from freecad.cross.kk_tables import dh_from_kk
+from freecad.cross.kk_tables import dh_matrices
+from freecad.cross.kk_tables import is_dh_compatible
+from freecad.cross.kk_tables import kk_forward_kinematics
+from freecad.cross.kk_tables import kk_from_dh
+from freecad.cross.kk_tables import kk_from_matrices
+from freecad.cross.kk_tables import kk_matrices
+
+
+def _rotation_x(angle: float) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[1.0, 0.0, 0.0], [0.0, c, -s], [0.0, s, c]])
+
+
+def _rotation_z(angle: float) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+
+
+def _transform(rotation: np.ndarray, translation) -> np.ndarray:
+    matrix = np.identity(4)
+    matrix[:3, :3] = rotation
+    matrix[:3, 3] = translation
+    return matrix
+
+
+def _random_dh(rng: np.random.Generator, shape: tuple[int, ...]) -> np.ndarray:
+    dh = rng.uniform(-1.0, 1.0, shape + (4,))
+    dh[..., 0] *= np.pi
+    dh[..., 2] *= np.pi
+    return dh
+
+
+def test_kk_matrices():
+    pre_rz, pre_tz, rx, tx, rz, tz = 0.3, 0.1, -0.7, 0.5, 1.2, -0.2
+    expected = (
+        _transform(_rotation_z(pre_rz), [0.0, 0.0, pre_tz])
+        @ _transform(_rotation_x(rx), [0.0, 0.0, 0.0])
+        @ _transform(np.identity(3), [tx, 0.0, 0.0])
+        @ _transform(_rotation_z(rz), [0.0, 0.0, 0.0])
+        @ _transform(np.identity(3), [0.0, 0.0, tz])
+    )
+    np.testing.assert_allclose(kk_matrices([pre_rz, pre_tz, rx, tx, rz, tz]), expected, atol=1e-12)
+
+
+def test_kk_from_matrices_round_trip():
+    rng = np.random.default_rng(0)
+    kk = rng.uniform(-1.0, 1.0, (100, 6))
+    # The canonical solution, see `kk_from_matrices()`.
+    kk[:, 0] *= np.pi / 2.0
+    kk[:, 2] = rng.uniform(0.1, np.pi - 0.1, 100)
+    kk[:, 4] *= np.pi
+    np.testing.assert_allclose(kk_from_matrices(kk_matrices(kk)), kk, atol=1e-9)
+
+
+def test_matrices_from_kk_round_trip():
+    rng = np.random.default_rng(1)
+    matrices = [
+        _transform(_rotation_z(a) @ _rotation_x(b) @ _rotation_z(c), t)
+        for a, b, c, t in zip(
+            rng.uniform(-np.pi, np.pi, 50),
+            rng.uniform(-np.pi, np.pi, 50),
+            rng.uniform(-np.pi, np.pi, 50),
+            rng.uniform(-1.0, 1.0, (50, 3)),
+        )
+    ]
+    # Parallel z axes.
+    matrices += [
+        _transform(_rotation_z(0.4), [0.3, -0.2, 0.1]),
+        _transform(_rotation_z(-2.0), [-0.3, -0.2, 0.1]),
+        _transform(_rotation_x(np.pi) @ _rotation_z(0.4), [0.3, 0.2, -0.1]),
+        _transform(np.identity(3), [0.0, 0.0, 0.5]),
+    ]
+    matrices = np.array(matrices)
+    kk = kk_from_matrices(matrices)
+    assert np.all(np.abs(kk[:, 0]) <= np.pi / 2.0 + 1e-12)
+    np.testing.assert_allclose(kk_matrices(kk), matrices, atol=1e-9)
+    # Transforms compatible with the modified DH convention.
+    mdh_matrices = np.array([
+        _transform(_rotation_x(0.3) @ _rotation_z(-1.0), [0.2, 0.0, 0.0])
+        @ _transform(np.identity(3), [0.0, 0.0, 0.4]),
+        _transform(_rotation_z(0.4), [0.3, 0.0, 0.1]),
+        _transform(_rotation_x(np.pi) @ _rotation_z(0.4), [0.3, 0.0, -0.1]),
+        _transform(np.identity(3), [0.0, 0.0, 0.5]),
+    ])
+    assert is_dh_compatible(kk_from_matrices(mdh_matrices))
+
+
+def test_dh_from_kk_round_trip():
+    dh = _random_dh(np.random.default_rng(2), (3, 5))
+    kk = kk_from_dh(dh)
+    assert kk.shape == (3, 6, 6)
+    assert np.all(is_dh_compatible(kk))
+    dh_back, base = dh_from_kk(kk)
+    assert dh_back.shape == (3, 6, 4)
+    np.testing.assert_allclose(dh_back[:, :-1], dh)
+    # The last frame of `kk` only holds rx and tx.
+    np.testing.assert_allclose(dh_back[:, -1], 0.0)
+    np.testing.assert_allclose(base, np.broadcast_to(np.identity(4), (3, 4, 4)))
+
+
+def test_dh_forward_kinematics_matches_kk():
+    rng = np.random.default_rng(3)
+    dh = _random_dh(rng, (4,))
+    prismatic = np.array([False, True, False, False])
+    q = rng.uniform(-1.0, 1.0, (10, 4))
+    dh_poses = dh_forward_kinematics(dh, prismatic, q)
+    assert dh_poses.shape == (10, 4, 4, 4)
+    # The KK table has an extra fixed frame.
+    kk_poses = kk_forward_kinematics(
+        kk_from_dh(dh),
+        np.append(prismatic, False),
+        np.pad(q, ((0, 0), (0, 1))),
+    )
+    assert kk_poses.shape == (10, 5, 4, 4)
+    # Frame i + 1 of the KK chain is frame i of the DH chain followed by the
+    # rz and tz of DH frame i + 1, the last frames are the same.
+    actuated_dh = np.broadcast_to(dh, q.shape + (4,)).copy()
+    actuated_dh[..., 0] += np.where(prismatic, 0.0, q)
+    actuated_dh[..., 1] += np.where(prismatic, q, 0.0)
+    actuated_dh[..., 2:] = 0.0
+    joint_matrices = dh_matrices(actuated_dh)
+    np.testing.assert_allclose(kk_poses[:, 0], joint_matrices[:, 0], atol=1e-12)
+    np.testing.assert_allclose(
+        kk_poses[:, 1:-1],
+        dh_poses[:, :-1] @ joint_matrices[:, 1:],
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(kk_poses[:, -1], dh_poses[:, -1], atol=1e-12)
+
+    # Without joint values and with a base.
+    base = _transform(_rotation_x(0.5), [1.0, 2.0, 3.0])
+    poses = dh_forward_kinematics(dh, prismatic, base=base)
+    expected = base.copy()
+    for matrix, pose in zip(dh_matrices(dh), poses):
+        expected = expected @ matrix
+        np.testing.assert_allclose(pose, expected, atol=1e-12)
+
+
+def test_chain_matrices_of_empty_chains():
+    assert chain_matrices(np.empty((0, 4, 4))).shape == (0, 4, 4)
+    assert chain_matrices(np.empty((3, 0, 4, 4)), np.identity(4)).shape == (3, 0, 4, 4)
+    assert kk_forward_kinematics(np.empty((0, 6)), [], []).shape == (0, 4, 4)
+    assert dh_forward_kinematics(np.empty((0, 4)), []).shape == (0, 4, 4)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+# Needs FreeCAD and Part.
+mass_properties = pytest.importorskip('freecad.cross.mass_properties')
+MassPropertiesEngine = mass_properties.MassPropertiesEngine
+MeshArrays = mass_properties.MeshArrays
+
+
+def _box_mesh(size, origin=(0.0, 0.0, 0.0), inward: bool = False) -> MeshArrays:
+    """Return the mesh of a box, with outward normals by default."""
+    corners = np.array([
+        [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0], [1.0, 0.0, 1.0], [1.0, 1.0, 1.0], [0.0, 1.0, 1.0],
+    ])
+    triangles = np.array([
+        [0, 2, 1], [0, 3, 2],  # Bottom.
+        [4, 5, 6], [4, 6, 7],  # Top.
+        [0, 1, 5], [0, 5, 4],  # Front.
+        [2, 3, 7], [2, 7, 6],  # Back.
+        [1, 2, 6], [1, 6, 5],  # Right.
+        [3, 0, 4], [3, 4, 7],  # Left.
+    ])
+    if inward:
+        triangles = triangles[:, ::-1]
+    return MeshArrays(corners * size + origin, triangles)
+
+
+def _box_inertia(size) -> np.ndarray:
+    """Return the matrix of inertia of a box of density 1 at its center."""
+    x, y, z = size
+    return x * y * z / 12.0 * np.diag([y**2 + z**2, x**2 + z**2, x**2 + y**2])
+
+
+@pytest.mark.parametrize('inward', [False, True])
+def test_mesh_mass_properties_box(inward):
+    size = np.array([10.0, 20.0, 30.0])
+    origin = np.array([5.0, -7.0, 100.0])
+    properties = mass_properties.mesh_mass_properties(_box_mesh(size, origin, inward))
+    assert properties.volume_mm3 == pytest.approx(6000.0)
+    np.testing.assert_allclose(properties.center_of_gravity, origin + size / 2.0)
+    np.testing.assert_allclose(
+        properties.matrix_of_inertia,
+        _box_inertia(size),
+        rtol=1e-9,
+        atol=1e-6,
+    )
+
+
+def test_mesh_mass_properties_without_volume():
+    assert mass_properties.mesh_mass_properties(
+        MeshArrays(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)),
+    ) is None
+    # Open mesh: a single flat square through the origin.
+    mesh = _box_mesh([1.0, 1.0, 1.0])
+    assert mass_properties.mesh_mass_properties(
+        MeshArrays(mesh.vertices, mesh.triangles[:2]),
+    ) is None
+
+
+def test_combine_mass_properties():
+    # Two cubes side by side form a box.
+    size = np.array([1.0, 1.0, 1.0])
+    cubes = [
+        mass_properties.mesh_mass_properties(_box_mesh(size, (x, 0.0, 0.0)))
+        for x in (0.0, 1.0)
+    ]
+    combined = mass_properties.combine_mass_properties(cubes)
+    box = mass_properties.mesh_mass_properties(_box_mesh([2.0, 1.0, 1.0]))
+    assert combined.volume_mm3 == pytest.approx(box.volume_mm3)
+    np.testing.assert_allclose(combined.center_of_gravity, box.center_of_gravity)
+    np.testing.assert_allclose(combined.matrix_of_inertia, box.matrix_of_inertia, atol=1e-12)
+    assert mass_properties.combine_mass_properties([]) is None
+
+
+def test_shape_mass_properties_box():
+    part = pytest.importorskip('Part')
+    properties = mass_properties.shape_mass_properties(part.makeBox(10.0, 20.0, 30.0))
+    mesh_properties = mass_properties.mesh_mass_properties(_box_mesh([10.0, 20.0, 30.0]))
+    assert properties.volume_mm3 == pytest.approx(mesh_properties.volume_mm3)
+    np.testing.assert_allclose(properties.center_of_gravity, mesh_properties.center_of_gravity)
+    np.testing.assert_allclose(
+        properties.matrix_of_inertia,
+        mesh_properties.matrix_of_inertia,
+        rtol=1e-9,
+        atol=1e-6,
+    )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_engine_combines_and_caches(workers):
+    engine = MassPropertiesEngine(workers)
+    cube = _box_mesh([1.0, 1.0, 1.0])
+    other_cube = _box_mesh([1.0, 1.0, 1.0], (1.0, 0.0, 0.0))
+    properties = engine.compute({
+        'link_a': [cube, other_cube],
+        'link_b': [cube],
+        'link_c': [],
+    })
+    assert properties['link_a'].volume_mm3 == pytest.approx(2.0)
+    np.testing.assert_allclose(properties['link_a'].center_of_gravity, [1.0, 0.5, 0.5])
+    assert properties['link_b'].volume_mm3 == pytest.approx(1.0)
+    assert properties['link_c'] is None
+    # Same geometry in another object.
+    copied_cube = MeshArrays(cube.vertices.copy(), cube.triangles.copy())
+    engine.compute({'link_a': [copied_cube, other_cube]})
+    assert engine.hit_count == 2
+    assert engine.miss_count == 0
@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+
+# Needs FreeCAD, pivy, and the ROS messages.
+planning_scene_utils = pytest.importorskip('freecad.cross.planning_scene_utils')
+
+
+def test_occupied_voxels_from_octomap_data():
+    # Stream of `octomap::OcTree::writeBinary()`, 2 bits per child, child 0
+    # in the lowest bits: 0 unknown, 1 free leaf, 2 occupied leaf, 3 inner.
+    data = bytes([
+        # Root: child 0 occupied, child 7 inner.
+        0b00000010, 0b11000000,
+        # Child 7 of the root: child 1 free, child 2 occupied.
+        0b00100100, 0b00000000,
+    ])
+    resolution = 0.05
+    centers, sizes = planning_scene_utils.occupied_voxels_from_octomap_data(data, resolution)
+    # Depth 1 leaf: the cube [-s, 0]^3 with s = resolution * 2^15.
+    # Depth 2 leaf: in the +x+y+z octant of the root, child 2 (+y, -x, -z).
+    side = resolution * 2**15
+    np.testing.assert_allclose(sizes, [side, side / 2.0])
+    np.testing.assert_allclose(
+        centers,
+        [
+            [-side / 2.0, -side / 2.0, -side / 2.0],
+            [side / 4.0, side * 3.0 / 4.0, side / 4.0],
+        ],
+    )
+    # As the `int8[]` field of the message.
+    signed_data = np.frombuffer(data, dtype=np.int8).tolist()
+    signed_centers, signed_sizes = planning_scene_utils.occupied_voxels_from_octomap_data(
+        signed_data,
+        resolution,
+    )
+    np.testing.assert_array_equal(signed_centers, centers)
+    np.testing.assert_array_equal(signed_sizes, sizes)
+
+
+def test_occupied_voxels_from_octomap_data_without_occupied_leaf():
+    # Root with only free and unknown children.
+    centers, sizes = planning_scene_utils.occupied_voxels_from_octomap_data(
+        bytes([0b01010101, 0b00000001]),
+        0.1,
+    )
+    assert centers.shape == (0, 3)
+    assert sizes.shape == (0,)
+
+
+def test_occupied_voxels_from_truncated_octomap_data():
+    with pytest.raises(ValueError):
+        # The inner child 0 is missing.
+        planning_scene_utils.occupied_voxels_from_octomap_data(bytes([0b11, 0]), 0.1)
+
+
+def _collision_object(id_: str, operation: int, x: float = 0.0, primitive_count: int = 1):
+    from geometry_msgs.msg import Pose
+    from moveit_msgs.msg import CollisionObject
+    from shape_msgs.msg import SolidPrimitive
+
+    co = CollisionObject()
+    co.id = id_
+    co.operation = operation
+    co.pose.position.x = x
+    co.primitives = [
+        SolidPrimitive(type=SolidPrimitive.BOX, dimensions=[0.1, 0.1, 0.1])
+        for _ in range(primitive_count)
+    ]
+    co.primitive_poses = [Pose() for _ in range(primitive_count)]
+    return co
+
+
+def _scene(*collision_objects, is_diff: bool = False):
+    from moveit_msgs.msg import PlanningScene
+
+    scene = PlanningScene()
+    scene.is_diff = is_diff
+    scene.world.collision_objects = list(collision_objects)
+    return scene
+
+
+def test_merge_planning_scene_diff_collision_objects():
+    from moveit_msgs.msg import CollisionObject
+
+    scene = _scene(
+        _collision_object('box', CollisionObject.ADD),
+        _collision_object('table', CollisionObject.ADD),
+        _collision_object('wall', CollisionObject.ADD),
+    )
+    diff = _scene(
+        # Only the pose of `box` changes.
+        _collision_object('box', CollisionObject.MOVE, x=1.0, primitive_count=0),
+        # A shape is added to `table`.
+        _collision_object('table', CollisionObject.APPEND),
+        _collision_object('wall', CollisionObject.REMOVE, primitive_count=0),
+        _collision_object('cup', CollisionObject.ADD),
+        is_diff=True,
+    )
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert not changes.full
+    assert changes.moved == {'box'}
+    assert changes.rebuilt == {'table', 'cup'}
+    assert changes.removed == {'wall'}
+    assert not changes.octomap
+    assert not changes.robot_state
+    objects = {co.id: co for co in scene.world.collision_objects}
+    assert set(objects) == {'box', 'table', 'cup'}
+    assert objects['box'].pose.position.x == 1.0
+    # The shapes of a moved object are kept.
+    assert len(objects['box'].primitives) == 1
+    assert len(objects['table'].primitives) == 2
+    assert len(objects['table'].primitive_poses) == 2
+
+
+def test_merge_planning_scene_diff_remove_all():
+    from moveit_msgs.msg import CollisionObject
+
+    scene = _scene(
+        _collision_object('box', CollisionObject.ADD),
+        _collision_object('table', CollisionObject.ADD),
+    )
+    diff = _scene(
+        _collision_object('', CollisionObject.REMOVE, primitive_count=0),
+        _collision_object('cup', CollisionObject.ADD),
+        is_diff=True,
+    )
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert changes.removed == {'box', 'table'}
+    assert changes.rebuilt == {'cup'}
+    assert [co.id for co in scene.world.collision_objects] == ['cup']
+
+
+def test_merge_planning_scene_diff_move_unknown_object_adds_it():
+    from moveit_msgs.msg import CollisionObject
+
+    scene = _scene()
+    diff = _scene(_collision_object('box', CollisionObject.MOVE), is_diff=True)
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert changes.rebuilt == {'box'}
+    assert not changes.moved
+    assert scene.world.collision_objects[0].operation == CollisionObject.ADD
+
+
+def test_merge_planning_scene_diff_robot_state():
+    scene = _scene()
+    scene.robot_state.joint_state.name = ['joint_a', 'joint_b']
+    scene.robot_state.joint_state.position = [0.0, 0.0]
+    diff = _scene(is_diff=True)
+    diff.robot_state.is_diff = True
+    diff.robot_state.joint_state.name = ['joint_b', 'joint_c']
+    diff.robot_state.joint_state.position = [1.0, 2.0]
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert changes.robot_state
+    positions = dict(zip(
+        scene.robot_state.joint_state.name,
+        scene.robot_state.joint_state.position,
+    ))
+    assert positions == {'joint_a': 0.0, 'joint_b': 1.0, 'joint_c': 2.0}
+
+
+def test_merge_planning_scene_diff_octomap():
+    scene = _scene()
+    diff = _scene(is_diff=True)
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert not changes.octomap
+    diff.world.octomap.octomap.resolution = 0.05
+    diff.world.octomap.octomap.data = [0b10, 0]
+    changes = planning_scene_utils.merge_planning_scene_diff(scene, diff)
+    assert changes.octomap
+    assert scene.world.octomap.octomap.resolution == 0.05
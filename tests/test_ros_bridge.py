@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+
+import pytest
+
+rclpy = pytest.importorskip('rclpy')
+pytest.importorskip('moveit_msgs')
+# Needs FreeCAD.
+bridge_module = pytest.importorskip('freecad.cross.ros.bridge')
+
+from moveit_msgs.srv import GetPlanningScene  # noqa: E402
+from rclpy.callback_groups import ReentrantCallbackGroup  # noqa: E402
+from rclpy.executors import MultiThreadedExecutor  # noqa: E402
+
+RosBridge = bridge_module.RosBridge
+RosTimeoutError = bridge_module.RosTimeoutError
+
+_SERVICE_NAME = 'get_planning_scene'
+# Time taken by the stand-in server to answer, in s.
+_SERVER_DELAY = 0.5
+
+
+def _handle_get_planning_scene(request, response):
+    """Answer after a delay with the requested components as scene name."""
+    time.sleep(_SERVER_DELAY)
+    response.scene.name = str(request.components.components)
+    return response
+
+
+def _make_request(components: int):
+    request = GetPlanningScene.Request()
+    request.components.components = components
+    return request
+
+
+@pytest.fixture
+def ros():
+    """Return a client node and an executor also spinning a stand-in server."""
+    context = rclpy.Context()
+    rclpy.init(context=context)
+    server = rclpy.create_node('planning_scene_server', context=context)
+    server.create_service(
+        GetPlanningScene,
+        _SERVICE_NAME,
+        _handle_get_planning_scene,
+        # Requests are served concurrently.
+        callback_group=ReentrantCallbackGroup(),
+    )
+    client = rclpy.create_node('cross_client', context=context)
+    executor = MultiThreadedExecutor(num_threads=8, context=context)
+    executor.add_node(server)
+    executor.add_node(client)
+    yield client, executor
+    executor.shutdown()
+    server.destroy_node()
+    client.destroy_node()
+    rclpy.shutdown(context=context)
+
+
+def test_concurrent_calls(ros):
+    node, executor = ros
+    bridge = RosBridge(node, executor, dispatch=lambda f: f())
+    call_count = 4
+    responses = {}
+    done = threading.Event()
+
+    def make_callback(components: int):
+        def callback(response):
+            responses[components] = response.scene.name
+            if len(responses) == call_count:
+                done.set()
+        return callback
+
+    start = time.monotonic()
+    futures = [
+        bridge.call_service(
+            GetPlanningScene,
+            _SERVICE_NAME,
+            _make_request(i),
+            callback=make_callback(i),
+            timeout_sec=10.0,
+        )
+        for i in range(call_count)
+    ]
+    assert done.wait(10.0)
+    # Each call got its own response.
+    assert responses == {i: str(i) for i in range(call_count)}
+    assert [f.result().scene.name for f in futures] == [str(i) for i in range(call_count)]
+    # Not one after the other.
+    assert time.monotonic() - start < call_count * _SERVER_DELAY
+    bridge.shutdown()
+
+
+def test_timeout_on_missing_service(ros):
+    node, executor = ros
+    bridge = RosBridge(node, executor, dispatch=lambda f: f())
+    errors = []
+    done = threading.Event()
+
+    def error_callback(e: Exception) -> None:
+        errors.append(e)
+        done.set()
+
+    future = bridge.call_service(
+        GetPlanningScene,
+        'missing_service',
+        GetPlanningScene.Request(),
+        callback=lambda _: pytest.fail('unexpected response'),
+        error_callback=error_callback,
+        timeout_sec=0.5,
+    )
+    assert done.wait(5.0)
+    assert isinstance(future.exception(), RosTimeoutError)
+    assert len(errors) == 1
+    assert isinstance(errors[0], RosTimeoutError)
+    assert 'missing_service' in str(errors[0])
+    bridge.shutdown()
+
+
+def test_queued_dispatch(ros):
+    node, executor = ros
+    # Stands in for the Qt queued connection: callables are queued by the
+    # worker threads and run here, in the "GUI" thread.
+    calls = queue.Queue()
+    bridge = RosBridge(node, executor, dispatch=calls.put)
+    threads = []
+    future = bridge.call_service(
+        GetPlanningScene,
+        _SERVICE_NAME,
+        _make_request(3),
+        callback=lambda r: threads.append((threading.current_thread(), r.scene.name)),
+    )
+    future.result(10.0)
+    # Not delivered until the queue is processed.
+    assert threads == []
+    calls.get(timeout=5.0)()
+    assert threads == [(threading.current_thread(), '3')]
+    bridge.shutdown()
+
+
+def test_fallback_dispatch(ros, monkeypatch):
+    # No Qt event loop, callbacks are called in the worker threads.
+    monkeypatch.setattr(bridge_module, '_get_qt_dispatch', lambda: None)
+    node, executor = ros
+    bridge = RosBridge(node, executor)
+    names = []
+    done = threading.Event()
+
+    def callback(response) -> None:
+        names.append(response.scene.name)
+        done.set()
+
+    bridge.call_service(
+        GetPlanningScene,
+        _SERVICE_NAME,
+        _make_request(5),
+        callback=callback,
+    )
+    assert done.wait(10.0)
+    assert names == ['5']
+    bridge.shutdown()
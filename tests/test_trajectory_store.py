@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from freecad.cross.trajectory_store import TrajectoryStore
+
+
+def _make_store(**kwargs) -> TrajectoryStore:
+    return TrajectoryStore(
+        ['joint_a', 'joint_b'],
+        [[0.0, 1.0], [1.0, 3.0], [3.0, 3.0]],
+        [0.0, 1.0, 3.0],
+        **kwargs,
+    )
+
+
+def test_round_trip():
+    store = _make_store(
+        velocities=[[0.0, 0.0], [1.0, 1.0], [0.0, 0.0]],
+        accelerations=[[0.5, 0.5], [0.0, 0.0], [-0.5, -0.5]],
+    )
+    loaded = TrajectoryStore.from_bytes(store.to_bytes())
+    assert loaded.joint_names == store.joint_names
+    np.testing.assert_array_equal(loaded.times, store.times)
+    np.testing.assert_array_equal(loaded.positions, store.positions)
+    np.testing.assert_array_equal(loaded.velocities, store.velocities)
+    np.testing.assert_array_equal(loaded.accelerations, store.accelerations)
+    # Views into the buffer.
+    assert not loaded.positions.flags.writeable
+
+
+def test_round_trip_without_optional_fields(tmp_path):
+    store = TrajectoryStore(['jé'], [[1.0], [2.0]])
+    path = tmp_path / 'trajectory.bin'
+    store.save(path)
+    loaded = TrajectoryStore.load(path)
+    assert loaded.joint_names == ['jé']
+    np.testing.assert_array_equal(loaded.times, [0.0, 1.0])
+    assert loaded.velocities is None
+    assert loaded.accelerations is None
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        TrajectoryStore.from_bytes(b'NOTATRJ!' + b'\0' * 32)
+
+
+def test_get_positions_at_linear():
+    store = _make_store()
+    np.testing.assert_allclose(store.get_positions_at(0.5), [0.5, 2.0])
+    np.testing.assert_allclose(store.get_positions_at(2.0), [2.0, 3.0])
+    # Clamped to the trajectory.
+    np.testing.assert_allclose(store.get_positions_at(-1.0), [0.0, 1.0])
+    np.testing.assert_allclose(store.get_positions_at(10.0), [3.0, 3.0])
+    # At the points.
+    for time, positions in zip(store.times, store.positions):
+        np.testing.assert_allclose(store.get_positions_at(time), positions)
+
+
+def test_get_positions_at_cubic():
+    store = _make_store()
+    for time, positions in zip(store.times, store.positions):
+        np.testing.assert_allclose(store.get_positions_at(time, 'cubic'), positions)
+    # Hermite interpolation with the given velocities: with zero velocities
+    # at both ends, the middle of a segment is the mean of its ends.
+    store = TrajectoryStore(
+        ['joint'],
+        [[0.0], [2.0]],
+        [0.0, 2.0],
+        velocities=[[0.0], [0.0]],
+    )
+    np.testing.assert_allclose(store.get_positions_at(1.0, 'cubic'), [1.0])
+    np.testing.assert_allclose(store.get_positions_at(0.5, 'cubic'), [0.3125])
+    # A linear motion is interpolated exactly with the estimated slopes.
+    store = TrajectoryStore(['joint'], [[0.0], [1.0], [2.0]], [0.0, 1.0, 2.0])
+    np.testing.assert_allclose(store.get_positions_at(0.25, 'cubic'), [0.25])
+    with pytest.raises(ValueError):
+        store.get_positions_at(0.5, 'quintic')
+
+
+def test_empty_store():
+    store = TrajectoryStore(['joint_a', 'joint_b'], [])
+    assert store.point_count == 0
+    assert store.joint_count == 2
+    assert store.duration == 0.0
+    with pytest.raises(IndexError):
+        store.get_positions_at(0.0)
+    loaded = TrajectoryStore.from_bytes(store.to_bytes())
+    assert loaded.point_count == 0
+    assert loaded.joint_names == ['joint_a', 'joint_b']
+
+
+def test_from_joint_trajectory_dict():
+    store = TrajectoryStore.from_joint_trajectory_dict({
+        'joint_names': ['joint_a', 'joint_b'],
+        'points': [
+            {
+                'positions': [0.0, 1.0],
+                'velocities': [0.1, 0.2],
+                'time_from_start': {'sec': 0, 'nanosec': 0},
+            },
+            {
+                'positions': [1.0, 2.0],
+                'velocities': [],
+                'time_from_start': {'sec': 1, 'nanosec': 500000000},
+            },
+        ],
+    })
+    np.testing.assert_allclose(store.times, [0.0, 1.5])
+    np.testing.assert_array_equal(store.get_joint_positions('joint_b'), [1.0, 2.0])
+    assert store.get_joint_positions('joint_c') is None
+    # Velocities are missing for a point.
+    assert store.velocities is None
@@ -0,0 +1,104 @@
+import pytest
+
+from freecad.cross import trajectory_yaml
+from freecad.cross.trajectory_yaml import TrajectoryYamlIndex
+from freecad.cross.trajectory_yaml import get_trajectory_yaml_index
+from freecad.cross.trajectory_yaml import summarize_display_trajectory
+
+
+def _display_trajectory(i: int, point_count: int = 2) -> str:
+    """Return a DisplayTrajectory as written by `ros2 topic echo`."""
+    points = ''.join(
+        f'''      - positions: [{i}.0, {p}.0]
+        time_from_start:
+          sec: {p}
+          nanosec: 500000000
+'''
+        for p in range(point_count)
+    )
+    return f'''model_id: robot_{i}
+trajectory:
+  - joint_trajectory:
+      joint_names: [joint_a, joint_b]
+      points:
+{points}trajectory_start:
+  joint_state:
+    name: [joint_a, joint_b]
+'''
+
+
+def _write(path, documents: list[str], newline: str = '\n') -> None:
+    text = ''.join(f'{d}---\n' for d in documents)
+    path.write_bytes(text.replace('\n', newline).encode())
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_index(tmp_path, newline):
+    path = tmp_path / 'trajectories.yaml'
+    _write(path, [_display_trajectory(i, i + 1) for i in range(3)], newline)
+    index = TrajectoryYamlIndex(path)
+    assert len(index) == 3
+    assert index[1]['model_id'] == 'robot_1'
+    assert index[-1]['model_id'] == 'robot_2'
+    with pytest.raises(IndexError):
+        index[3]
+    summary, = index.get_summary(2)
+    assert summary.joint_names == ['joint_a', 'joint_b']
+    assert summary.point_count == 3
+    assert summary.duration == pytest.approx(2.5)
+
+
+def test_index_across_chunk_boundaries(tmp_path, monkeypatch):
+    path = tmp_path / 'trajectories.yaml'
+    documents = [_display_trajectory(i, 3) for i in range(20)]
+    _write(path, documents)
+    reference = TrajectoryYamlIndex(path)
+    # Chunk sizes splitting separators and lines at various places.
+    for chunk_size in (1, 2, 3, 7, 64, 100, 1000):
+        monkeypatch.setattr(trajectory_yaml, '_CHUNK_SIZE', chunk_size)
+        index = TrajectoryYamlIndex(path)
+        assert index.ranges == reference.ranges
+    assert len(reference) == 20
+    for i in range(20):
+        assert reference[i]['model_id'] == f'robot_{i}'
+
+
+def test_empty_documents_are_not_indexed(tmp_path):
+    path = tmp_path / 'trajectories.yaml'
+    path.write_text(
+        '---\n'
+        + _display_trajectory(0)
+        + '---\n\n# A comment.\n---\n'
+        + _display_trajectory(1)
+        + '--- \n',
+    )
+    index = TrajectoryYamlIndex(path)
+    assert len(index) == 2
+    assert [index[i]['model_id'] for i in range(2)] == ['robot_0', 'robot_1']
+
+
+def test_last_document_without_separator(tmp_path):
+    path = tmp_path / 'trajectories.yaml'
+    path.write_text(_display_trajectory(0) + '---\n' + _display_trajectory(1))
+    index = TrajectoryYamlIndex(path)
+    assert len(index) == 2
+    assert index[1]['model_id'] == 'robot_1'
+
+
+def test_get_trajectory_yaml_index(tmp_path):
+    path = tmp_path / 'trajectories.yaml'
+    _write(path, [_display_trajectory(0)])
+    index = get_trajectory_yaml_index(path)
+    assert get_trajectory_yaml_index(path) is index
+    _write(path, [_display_trajectory(0), _display_trajectory(1)])
+    new_index = get_trajectory_yaml_index(path)
+    assert new_index is not index
+    assert len(new_index) == 2
+
+
+def test_summarize_malformed_message():
+    assert summarize_display_trajectory(None) == []
+    assert summarize_display_trajectory({'trajectory': None}) == []
+    summary, = summarize_display_trajectory({'trajectory': [{}]})
+    assert summary.point_count == 0
+    assert summary.duration == 0.0